@@ -0,0 +1,54 @@
+// 用服务端测试用例（meow-server/src/test/resources/protocol/binary-audio-frames.json）
+// 校验 wsBinaryProtocol.js 的编解码，与 BinaryAudioFrameTest 共用同一份字节序列。
+// 运行：npm run test:protocol
+import { readFileSync } from 'node:fs'
+import { fileURLToPath } from 'node:url'
+import {
+  createAudioInputBinaryFrame,
+  decodeBinaryFrame,
+  wsBinaryFrameTypes
+} from '../src/utils/wsBinaryProtocol.js'
+
+const fixturesPath = fileURLToPath(
+  new URL('../../meow-server/src/test/resources/protocol/binary-audio-frames.json', import.meta.url)
+)
+const { frames } = JSON.parse(readFileSync(fixturesPath, 'utf8'))
+
+const fromHex = (hex) => Uint8Array.from(hex.match(/../g) || [], (byte) => parseInt(byte, 16))
+const toHex = (buffer) => Array.from(new Uint8Array(buffer), (byte) => byte.toString(16).padStart(2, '0')).join('')
+
+let failures = 0
+function expectEqual(name, field, actual, expected) {
+  if (actual !== expected) {
+    failures++
+    console.error(`✗ ${name}: ${field} = ${actual}, expected ${expected}`)
+  }
+}
+
+for (const fixture of frames) {
+  const frame = decodeBinaryFrame(fromHex(fixture.frame))
+  expectEqual(fixture.name, 'version', frame.version, fixture.version)
+  expectEqual(fixture.name, 'frameType', frame.frameType, fixture.frameType)
+  expectEqual(fixture.name, 'format', frame.format, fixture.format)
+  expectEqual(fixture.name, 'isFinal', frame.isFinal, fixture.final)
+  expectEqual(fixture.name, 'payload', toHex(frame.payload), fixture.payload)
+  if (fixture.version === 2) {
+    expectEqual(fixture.name, 'turn', frame.turn, fixture.turn)
+    expectEqual(fixture.name, 'segment', frame.segment, fixture.segment)
+    expectEqual(fixture.name, 'seq', frame.seq, fixture.sequence)
+    expectEqual(fixture.name, 'timestampMs', frame.timestampMs, fixture.timestampMs)
+    expectEqual(fixture.name, 'frameCount', frame.frameCount, fixture.frameCount)
+  }
+
+  // 客户端只编码上行 v1 音频帧
+  if (fixture.version === 1 && fixture.frameType === wsBinaryFrameTypes.audioInput) {
+    const encoded = createAudioInputBinaryFrame(fixture.format, fromHex(fixture.payload), fixture.final)
+    expectEqual(fixture.name, 'encoded', toHex(encoded), fixture.frame)
+  }
+}
+
+if (failures > 0) {
+  console.error(`${failures} binary protocol check(s) failed`)
+  process.exit(1)
+}
+console.log(`binary protocol: ${frames.length} fixtures ok`)
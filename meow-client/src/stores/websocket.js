@@ -11,6 +11,11 @@ export const useWebSocketStore = defineStore('websocket', () => {
 
   const messageHandlers = []
 
+  // 客户端支持的协议能力，连接建立后通过 hello 与服务端协商
+  const clientCapabilities = ['llm_delta', 'audio_v2', 'server_vad', 'opus_input']
+  // 服务端接受的能力（hello 回复）
+  const serverCapabilities = ref([])
+
   function connect(url) {
     if (ws.value?.readyState === WebSocket.OPEN) {
       return
@@ -25,12 +30,18 @@ export const useWebSocketStore = defineStore('websocket', () => {
       console.log('WebSocket connected')
       reconnectAttempts.value = 0
       isConnected.value = true
+      serverCapabilities.value = []
+      send({ type: 'hello', capabilities: clientCapabilities })
+      sendAudioHints()
     }
 
     ws.value.onmessage = async (event) => {
       try {
         if (typeof event.data === 'string') {
           const data = JSON.parse(event.data)
+          if (data.type === 'hello') {
+            serverCapabilities.value = Array.isArray(data.capabilities) ? data.capabilities : []
+          }
           messageHandlers.forEach(handler => handler(data))
           return
         }
@@ -99,6 +110,34 @@ export const useWebSocketStore = defineStore('websocket', () => {
     }
   }
 
+  /**
+   * 上报网络提示，供服务端协商下行 Opus 码率和帧时长
+   * 网络类型变化时会重新上报，服务端在下一轮回复生效
+   */
+  function sendAudioHints() {
+    const connection = navigator.connection || navigator.mozConnection || navigator.webkitConnection
+    send({
+      type: 'audio_config',
+      network: connection?.type === 'cellular' && !connection?.effectiveType
+        ? 'cellular'
+        : (connection?.effectiveType || null),
+      saveData: Boolean(connection?.saveData)
+    })
+  }
+
+  const networkConnection = typeof navigator !== 'undefined'
+    ? (navigator.connection || navigator.mozConnection || navigator.webkitConnection)
+    : null
+  networkConnection?.addEventListener?.('change', () => {
+    if (ws.value?.readyState === WebSocket.OPEN) {
+      sendAudioHints()
+    }
+  })
+
+  function hasServerCapability(name) {
+    return serverCapabilities.value.includes(name)
+  }
+
   function onMessage(handler) {
     messageHandlers.push(handler)
     return () => {
@@ -116,6 +155,7 @@ export const useWebSocketStore = defineStore('websocket', () => {
     disconnect,
     send,
     sendBinary,
+    hasServerCapability,
     onMessage
   }
 })
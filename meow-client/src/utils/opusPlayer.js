@@ -1,4 +1,5 @@
 import { OpusDecoder } from 'opus-decoder'
+import { TtsJitterBuffer } from './ttsJitterBuffer'
 
 /**
  * Opus 音频流播放器
@@ -20,11 +21,19 @@ export class OpusStreamPlayer {
         // WebSocket 按消息边界交付，服务端每条 tts 消息就是完整帧包（可包含1-N个长度头帧）
         this.packetQueue = []
         this.isQueueProcessing = false
+        // 每批解码的音频时长，帧数按服务端协商的帧时长换算
+        this.decodeBatchMs = 120
+        this.frameDurationMs = 20
         this.maxFramesPerDecode = 6
 
         this.feedChain = Promise.resolve()
         this.streamVersion = 0
 
+        // v2 协议携带 turn/seq 时，先经抖动缓冲排序、去重、丢弃已中断轮次
+        this.jitterBuffer = new TtsJitterBuffer({
+            onRelease: (packet) => this.enqueueFeed(packet.data, packet.isLast)
+        })
+
         this.playbackStateListeners = new Set()
         this.playbackEndedListeners = new Set()
         this.playbackPausedListeners = new Set()
@@ -84,6 +93,23 @@ export class OpusStreamPlayer {
         }
     }
 
+    /**
+     * 应用服务端下发的编码配置（audio_config）
+     * Opus 帧自带时长信息，解码器无需重建；只需按帧时长调整每批解码帧数，保持批次时长不变
+     * @param {{frameDurationMs?: number, sampleRate?: number}} config
+     */
+    configure(config = {}) {
+        const frameDurationMs = Number(config.frameDurationMs)
+        if (frameDurationMs > 0) {
+            this.frameDurationMs = frameDurationMs
+            this.maxFramesPerDecode = Math.max(1, Math.round(this.decodeBatchMs / frameDurationMs))
+        }
+
+        if (config.sampleRate && config.sampleRate !== this.sampleRate) {
+            console.warn('Unsupported Opus sample rate from server:', config.sampleRate)
+        }
+    }
+
     /**
      * 解析单条 WebSocket 消息中的 Opus 帧包（[2字节长度头][帧数据]...）
      * @param {Uint8Array} packetData - 单条消息的二进制数据
@@ -203,9 +229,18 @@ export class OpusStreamPlayer {
     /**
      * 接收并播放 Opus 数据
      * @param {ArrayBuffer} opusData - 二进制 Opus 数据
-     * @param {boolean} isLastFrame - 当前句子的最后一帧
+     * @param {boolean} isLastFrame - 本轮回复的最后一帧
+     * @param {{ turn: number, seq: number, frameCount: number } | null} position - v2 帧的位置信息
      */
-    feed(opusData, isLastFrame = false) {
+    feed(opusData, isLastFrame = false, position = null) {
+        if (position && Number.isFinite(position.turn) && Number.isFinite(position.seq)) {
+            this.jitterBuffer.push({ ...position, data: opusData, isLast: isLastFrame })
+            return this.feedChain
+        }
+        return this.enqueueFeed(opusData, isLastFrame)
+    }
+
+    enqueueFeed(opusData, isLastFrame) {
         const requestVersion = this.streamVersion
 
         this.feedChain = this.feedChain
@@ -272,6 +307,7 @@ export class OpusStreamPlayer {
      */
     stop() {
         this.streamVersion += 1
+        this.jitterBuffer.discardCurrentTurn()
 
         for (const source of this.activeSources) {
             try {
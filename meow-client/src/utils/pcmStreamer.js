@@ -0,0 +1,173 @@
+/**
+ * 麦克风 PCM 流式采集
+ * 把麦克风音频重采样为 16 位单声道 PCM，按固定间隔回调，用于边录边上传（服务端端点检测）
+ */
+export const PCM_STREAM_SAMPLE_RATE = 16000
+export const PCM_STREAM_FORMAT = `pcm;rate=${PCM_STREAM_SAMPLE_RATE}`
+
+// 抗混叠低通滤波器阶数（奇数）与截止频率（相对目标奈奎斯特频率 8kHz 的比例）
+const LOWPASS_TAPS = 31
+const LOWPASS_CUTOFF_RATIO = 0.9
+
+/**
+ * 设计 Hamming 窗的 sinc 低通 FIR，系数归一化为直流增益 1
+ * @param {number} cutoff - 截止频率（相对输入采样率，0-0.5）
+ */
+function designLowpass(cutoff, taps) {
+  const coefficients = new Float32Array(taps)
+  const middle = (taps - 1) / 2
+  let sum = 0
+  for (let k = 0; k < taps; k++) {
+    const x = k - middle
+    const sinc = x === 0 ? 2 * cutoff : Math.sin(2 * Math.PI * cutoff * x) / (Math.PI * x)
+    const window = 0.54 - 0.46 * Math.cos(2 * Math.PI * k / (taps - 1))
+    coefficients[k] = sinc * window
+    sum += coefficients[k]
+  }
+  for (let k = 0; k < taps; k++) {
+    coefficients[k] /= sum
+  }
+  return coefficients
+}
+
+export class PcmStreamer {
+  /**
+   * @param {MediaStream} stream - 麦克风音频流
+   * @param {object} options
+   * @param {(chunk: ArrayBuffer) => void} options.onChunk - PCM 块回调
+   * @param {number} [options.chunkMs] - 每块时长
+   */
+  constructor(stream, { onChunk, chunkMs = 100 }) {
+    this.stream = stream
+    this.onChunk = onChunk
+    this.chunkSamples = Math.round(PCM_STREAM_SAMPLE_RATE * chunkMs / 1000)
+
+    this.audioContext = null
+    this.source = null
+    this.processor = null
+    this.pending = new Int16Array(this.chunkSamples)
+    this.pendingLength = 0
+    this.resamplePosition = 0
+    this.running = false
+
+    // 抗混叠滤波器，按实际输入采样率设计；输入已是 16kHz 时不需要
+    this.lowpass = null
+    this.lowpassRate = 0
+    this.filterHistory = new Float32Array(LOWPASS_TAPS - 1)
+  }
+
+  async start() {
+    const AudioContextClass = window.AudioContext || window.webkitAudioContext
+    if (!AudioContextClass) {
+      throw new Error('当前浏览器不支持AudioContext')
+    }
+
+    // 优先让浏览器直接以 16kHz 采集（内部重采样带抗混叠滤波）；不支持时回退到默认采样率，由 append 自行滤波降采样
+    try {
+      this.audioContext = new AudioContextClass({ sampleRate: PCM_STREAM_SAMPLE_RATE })
+    } catch {
+      this.audioContext = new AudioContextClass()
+    }
+    this.source = this.audioContext.createMediaStreamSource(this.stream)
+    // ScriptProcessor 兼容性最好；缓冲 2048 帧在 48kHz 下约 43ms
+    this.processor = this.audioContext.createScriptProcessor(2048, 1, 1)
+    this.processor.onaudioprocess = (event) => {
+      if (this.running) {
+        this.append(event.inputBuffer.getChannelData(0), event.inputBuffer.sampleRate)
+      }
+    }
+
+    this.source.connect(this.processor)
+    this.processor.connect(this.audioContext.destination)
+    this.running = true
+  }
+
+  /**
+   * 输入采样率高于 16kHz 时先低通滤波（截止约 7.2kHz），避免 8kHz 以上的成分混叠进语音频段
+   */
+  filter(input, inputSampleRate) {
+    if (inputSampleRate <= PCM_STREAM_SAMPLE_RATE) {
+      return input
+    }
+    if (this.lowpassRate !== inputSampleRate) {
+      this.lowpass = designLowpass(LOWPASS_CUTOFF_RATIO * PCM_STREAM_SAMPLE_RATE / 2 / inputSampleRate, LOWPASS_TAPS)
+      this.lowpassRate = inputSampleRate
+      this.filterHistory.fill(0)
+    }
+
+    const history = this.filterHistory.length
+    const extended = new Float32Array(history + input.length)
+    extended.set(this.filterHistory)
+    extended.set(input, history)
+
+    const output = new Float32Array(input.length)
+    const coefficients = this.lowpass
+    for (let i = 0; i < input.length; i++) {
+      let acc = 0
+      for (let k = 0; k < coefficients.length; k++) {
+        acc += coefficients[k] * extended[i + k]
+      }
+      output[i] = acc
+    }
+    this.filterHistory.set(extended.subarray(extended.length - history))
+    return output
+  }
+
+  /**
+   * 抗混叠滤波后线性插值重采样到 16kHz 并转为 16 位整数
+   */
+  append(rawInput, inputSampleRate) {
+    const input = this.filter(rawInput, inputSampleRate)
+    const step = inputSampleRate / PCM_STREAM_SAMPLE_RATE
+    let position = this.resamplePosition
+
+    while (position < input.length) {
+      const index = Math.floor(position)
+      const fraction = position - index
+      const next = index + 1 < input.length ? input[index + 1] : input[index]
+      const sample = input[index] + (next - input[index]) * fraction
+      const clamped = Math.max(-1, Math.min(1, sample))
+      this.pending[this.pendingLength++] = clamped < 0 ? clamped * 0x8000 : clamped * 0x7fff
+
+      if (this.pendingLength === this.chunkSamples) {
+        this.emit()
+      }
+      position += step
+    }
+
+    this.resamplePosition = position - input.length
+  }
+
+  emit() {
+    if (this.pendingLength === 0) {
+      return
+    }
+    const chunk = this.pending.slice(0, this.pendingLength)
+    this.pendingLength = 0
+    this.onChunk(chunk.buffer)
+  }
+
+  /**
+   * 停止采集，发出剩余的 PCM
+   * @param {boolean} flush - 是否发出剩余数据
+   */
+  async stop(flush = true) {
+    if (!this.running) {
+      return
+    }
+    this.running = false
+    if (flush) {
+      this.emit()
+    }
+    this.pendingLength = 0
+
+    try {
+      this.source?.disconnect()
+      this.processor?.disconnect()
+    } catch {
+      // 忽略重复断开
+    }
+    await this.audioContext?.close().catch(() => {})
+    this.audioContext = null
+  }
+}
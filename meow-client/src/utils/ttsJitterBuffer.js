@@ -0,0 +1,126 @@
+/**
+ * TTS 下行抖动缓冲（v2 二进制协议）
+ *
+ * 按 turn / seq 排序释放音频包：
+ * 1. 已中断轮次（discardCurrentTurn 之后）和更早轮次的包直接丢弃
+ * 2. 重复包丢弃
+ * 3. 乱序包最多等待 maxWaitMs，缺失的帧超时后跳过，继续播放后续音频
+ * 新一轮到达时，上一轮仍在等待的包按序释放
+ */
+export class TtsJitterBuffer {
+    /**
+     * @param {object} options
+     * @param {number} [options.maxWaitMs] - 缺帧时最长等待时间
+     * @param {(packet: object) => void} options.onRelease - 按序释放包的回调
+     */
+    constructor({ maxWaitMs = 80, onRelease }) {
+        this.maxWaitMs = maxWaitMs
+        this.onRelease = onRelease
+
+        this.turn = null
+        this.discardedTurn = -1
+        this.expectedSeq = 0
+        this.pending = new Map()
+        this.gapTimer = null
+
+        this.stats = {
+            received: 0,
+            released: 0,
+            duplicates: 0,
+            stale: 0,
+            gaps: 0,
+            lostFrames: 0
+        }
+    }
+
+    /**
+     * @param {{ turn: number, seq: number, frameCount: number, data: ArrayBuffer, isLast: boolean }} packet
+     */
+    push(packet) {
+        this.stats.received++
+
+        if (packet.turn <= this.discardedTurn || (this.turn !== null && packet.turn < this.turn)) {
+            this.stats.stale++
+            return
+        }
+
+        if (this.turn === null || packet.turn > this.turn) {
+            this.flushPending()
+            this.turn = packet.turn
+            this.expectedSeq = 0
+        }
+
+        if (packet.seq < this.expectedSeq || this.pending.has(packet.seq)) {
+            this.stats.duplicates++
+            return
+        }
+
+        this.pending.set(packet.seq, packet)
+        this.drain()
+    }
+
+    /**
+     * 丢弃当前轮次剩余的音频（用户中断时调用）
+     */
+    discardCurrentTurn() {
+        if (this.turn !== null) {
+            this.discardedTurn = Math.max(this.discardedTurn, this.turn)
+        }
+        this.pending.clear()
+        this.clearGapTimer()
+    }
+
+    drain() {
+        while (this.pending.has(this.expectedSeq)) {
+            const packet = this.pending.get(this.expectedSeq)
+            this.pending.delete(this.expectedSeq)
+            this.expectedSeq = packet.seq + Math.max(1, packet.frameCount || 0)
+            this.release(packet)
+        }
+
+        if (this.pending.size === 0) {
+            this.clearGapTimer()
+        } else if (!this.gapTimer) {
+            this.gapTimer = setTimeout(() => this.skipGap(), this.maxWaitMs)
+        }
+    }
+
+    /**
+     * 等待超时：跳过缺失的帧，从最小的待释放序号继续
+     */
+    skipGap() {
+        this.gapTimer = null
+        if (this.pending.size === 0) {
+            return
+        }
+        const nextSeq = Math.min(...this.pending.keys())
+        this.stats.gaps++
+        this.stats.lostFrames += nextSeq - this.expectedSeq
+        this.expectedSeq = nextSeq
+        this.drain()
+    }
+
+    /**
+     * 按序释放所有等待中的包（切换轮次时使用）
+     */
+    flushPending() {
+        const seqs = [...this.pending.keys()].sort((a, b) => a - b)
+        for (const seq of seqs) {
+            this.release(this.pending.get(seq))
+        }
+        this.pending.clear()
+        this.clearGapTimer()
+    }
+
+    release(packet) {
+        this.stats.released++
+        this.onRelease(packet)
+    }
+
+    clearGapTimer() {
+        if (this.gapTimer) {
+            clearTimeout(this.gapTimer)
+            this.gapTimer = null
+        }
+    }
+}
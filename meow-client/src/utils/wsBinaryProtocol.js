@@ -2,6 +2,10 @@ const FRAME_MAGIC = 0x4d // 'M'
 const FRAME_TYPE_AUDIO_INPUT = 1
 const FRAME_TYPE_TTS_OUTPUT = 2
 const FLAG_FINAL = 0x01
+const PROTOCOL_VERSION_2 = 2
+
+// v2 帧的数字编码 ID，与服务端 BinaryAudioFrame.CODEC_* 一致
+const CODEC_NAMES = ['', 'opus', 'pcm', 'wav', 'webm', 'ogg']
 
 const textEncoder = new TextEncoder()
 const textDecoder = new TextDecoder()
@@ -50,6 +54,59 @@ export function createAudioInputBinaryFrame(format, payload, isLast) {
   })
 }
 
+/**
+ * 读取无符号 LEB128 变长整数
+ * @returns {{ value: number, offset: number }}
+ */
+function readVarint(bytes, offset) {
+  let value = 0
+  let multiplier = 1
+  for (let i = 0; i < 8; i++) {
+    if (offset >= bytes.length) {
+      throw new Error('Truncated varint in binary frame')
+    }
+    const byte = bytes[offset++]
+    value += (byte & 0x7f) * multiplier
+    if ((byte & 0x80) === 0) {
+      return { value, offset }
+    }
+    multiplier *= 128
+  }
+  throw new Error('Varint is too long in binary frame')
+}
+
+/**
+ * 解码 v2 帧：[magic][version|type][flags][codecId][varint turn][varint segment]
+ * [varint sequence][varint timestampMs][varint frameCount][payload]
+ */
+function decodeBinaryFrameV2(bytes) {
+  const frameType = bytes[1] & 0x0f
+  const flags = bytes[2]
+  const codecId = bytes[3]
+  let offset = 4
+
+  const fields = []
+  for (let i = 0; i < 5; i++) {
+    const result = readVarint(bytes, offset)
+    fields.push(result.value)
+    offset = result.offset
+  }
+  const [turn, segment, seq, timestampMs, frameCount] = fields
+
+  return {
+    version: PROTOCOL_VERSION_2,
+    frameType,
+    format: CODEC_NAMES[codecId] || '',
+    isFinal: (flags & FLAG_FINAL) !== 0,
+    turn,
+    segment,
+    seq,
+    timestampMs,
+    frameCount,
+    payload: bytes.subarray(offset).slice().buffer
+  }
+}
+
 export function decodeBinaryFrame(data) {
   const bytes = toUint8Array(data)
   if (bytes.length < 4) {
@@ -59,6 +116,14 @@ export function decodeBinaryFrame(data) {
     throw new Error('Invalid binary frame magic')
   }
 
+  const version = bytes[1] >> 4
+  if (version === PROTOCOL_VERSION_2) {
+    return decodeBinaryFrameV2(bytes)
+  }
+  if (version !== 0) {
+    throw new Error(`Unsupported binary frame version: ${version}`)
+  }
+
   const frameType = bytes[1]
   const flags = bytes[2]
   const formatLength = bytes[3]
@@ -72,6 +137,7 @@ export function decodeBinaryFrame(data) {
   const payload = bytes.subarray(headerLength).slice().buffer
 
   return {
+    version: 1,
     frameType,
     format,
     isFinal: (flags & FLAG_FINAL) !== 0,
@@ -82,13 +148,21 @@ export function decodeBinaryFrame(data) {
 export function parseIncomingBinaryMessage(data) {
   const frame = decodeBinaryFrame(data)
   if (frame.frameType === FRAME_TYPE_TTS_OUTPUT) {
-    return {
+    const message = {
       type: 'tts',
       format: frame.format || 'opus',
       data: frame.payload,
       finished: frame.isFinal,
       binary: true
     }
+    if (frame.version === PROTOCOL_VERSION_2) {
+      message.turn = frame.turn
+      message.segment = frame.segment
+      message.seq = frame.seq
+      message.timestampMs = frame.timestampMs
+      message.frameCount = frame.frameCount
+    }
+    return message
   }
 
   return {
@@ -0,0 +1,164 @@
+package com.miaomiao.assistant.codec;
+
+import lombok.RequiredArgsConstructor;
+import lombok.extern.slf4j.Slf4j;
+import org.springframework.stereotype.Component;
+
+import java.nio.ByteBuffer;
+import java.nio.ByteOrder;
+import java.util.Locale;
+import java.util.Map;
+import java.util.concurrent.ConcurrentHashMap;
+
+/**
+ * ASR 输入音频规整
+ * <p>
+ * 把客户端上传的音频统一转为 ASR 需要的 16kHz 单声道 16 位 WAV：
+ * 1. WebM / Ogg（浏览器 MediaRecorder 的 Opus 录音）：解封装 -> Opus 解码（48kHz 单声道）-> 重采样
+ * 2. WAV：已是 16kHz 单声道时原样返回，否则混为单声道并重采样
+ * <p>
+ * 客户端因此可以直接上传压缩录音，不必在浏览器里整段解码再转 WAV；送 ASR 的载荷也比 48kHz WAV 小三倍。
+ */
+@Slf4j
+@Component
+@RequiredArgsConstructor
+public class AsrAudioTranscoder {
+
+    /**
+     * ASR 输入采样率
+     */
+    public static final int TARGET_SAMPLE_RATE = 16000;
+
+    /**
+     * Opus 解码采样率（Opus 内部即 48kHz）
+     */
+    private static final int OPUS_DECODE_RATE = 48000;
+
+    /**
+     * 解码时单包最大采样数：MediaRecorder 输出 20ms 的包
+     */
+    private static final int OPUS_DECODE_FRAME_SIZE = OPUS_DECODE_RATE / 50;
+
+    private static final int RESAMPLER_TAPS_PER_PHASE = 32;
+
+    private final OpusCodec opusCodec;
+
+    /**
+     * 按输入采样率缓存的重采样器（系数只计算一次）
+     */
+    private final Map<Integer, PolyphaseResampler> resamplers = new ConcurrentHashMap<>();
+
+    /**
+     * 是否是可以转码的压缩格式
+     */
+    public static boolean isCompressedFormat(String format) {
+        String normalized = normalize(format);
+        return normalized.equals("webm") || normalized.equals("ogg") || normalized.equals("opus");
+    }
+
+    /**
+     * 转为 16kHz 单声道 WAV
+     *
+     * @param data   客户端上传的完整音频
+     * @param format 客户端上报的格式，如 {@code webm}、{@code audio/ogg;codecs=opus}、{@code wav}
+     * @return 转码后的 WAV；不支持的格式返回 null
+     */
+    public byte[] toAsrWav(byte[] data, String format) {
+        if (data == null || data.length == 0) {
+            return data;
+        }
+        if (isCompressedFormat(format)) {
+            return transcodeOpus(data, format);
+        }
+        if (normalize(format).equals("wav")) {
+            return normalizeWav(data);
+        }
+        return null;
+    }
+
+    private byte[] transcodeOpus(byte[] data, String format) {
+        long start = System.nanoTime();
+        OpusContainerDemuxer.Demuxed demuxed = OpusContainerDemuxer.demux(data);
+        if (demuxed == null) {
+            throw new IllegalArgumentException("无法解析的音频容器: " + format);
+        }
+
+        // 解码器输出单声道，libopus 自动混音
+        OpusCodecPool.Key key = new OpusCodecPool.Key(OPUS_DECODE_RATE, 1, 64000, OPUS_DECODE_FRAME_SIZE);
+        byte[] pcm = opusCodec.decodeOpusPackets(demuxed.packets(), key);
+        int skipBytes = Math.min(pcm.length, demuxed.preSkip() * 2);
+
+        short[] samples = toShorts(pcm, skipBytes, pcm.length - skipBytes);
+        short[] resampled = resampler(OPUS_DECODE_RATE).process(samples);
+        byte[] wav = WavCodec.toWav(toBytes(resampled), TARGET_SAMPLE_RATE, 1);
+
+        log.debug("ASR 音频转码: format={}, packets={}, {} -> {} 字节, 耗时 {}ms", format, demuxed.packets().size(),
+                data.length, wav.length, (System.nanoTime() - start) / 1_000_000);
+        return wav;
+    }
+
+    private byte[] normalizeWav(byte[] wav) {
+        WavCodec.WavInfo info = WavCodec.parse(wav);
+        if (info == null || !info.isPcm16()
+                || (info.sampleRate() == TARGET_SAMPLE_RATE && info.channels() == 1)) {
+            return wav;
+        }
+
+        short[] mono = downmix(wav, info);
+        short[] resampled = info.sampleRate() == TARGET_SAMPLE_RATE
+                ? mono
+                : resampler(info.sampleRate()).process(mono);
+        byte[] normalized = WavCodec.toWav(toBytes(resampled), TARGET_SAMPLE_RATE, 1);
+        log.debug("ASR WAV 规整: {}Hz/{}ch -> {}Hz/1ch, {} -> {} 字节",
+                info.sampleRate(), info.channels(), TARGET_SAMPLE_RATE, wav.length, normalized.length);
+        return normalized;
+    }
+
+    private PolyphaseResampler resampler(int inputRate) {
+        return resamplers.computeIfAbsent(inputRate,
+                rate -> new PolyphaseResampler(rate, TARGET_SAMPLE_RATE, RESAMPLER_TAPS_PER_PHASE));
+    }
+
+    /**
+     * 多声道取平均混为单声道
+     */
+    private static short[] downmix(byte[] wav, WavCodec.WavInfo info) {
+        int channels = info.channels();
+        int frames = info.dataLength() / info.frameBytes();
+        short[] mono = new short[frames];
+        ByteBuffer buffer = ByteBuffer.wrap(wav, info.dataOffset(), info.dataLength()).order(ByteOrder.LITTLE_ENDIAN);
+        for (int i = 0; i < frames; i++) {
+            int sum = 0;
+            for (int c = 0; c < channels; c++) {
+                sum += buffer.getShort();
+            }
+            mono[i] = (short) (sum / channels);
+        }
+        return mono;
+    }
+
+    private static short[] toShorts(byte[] pcm, int offset, int length) {
+        short[] samples = new short[length / 2];
+        ByteBuffer.wrap(pcm, offset, length).order(ByteOrder.LITTLE_ENDIAN).asShortBuffer().get(samples);
+        return samples;
+    }
+
+    private static byte[] toBytes(short[] samples) {
+        ByteBuffer buffer = ByteBuffer.allocate(samples.length * 2).order(ByteOrder.LITTLE_ENDIAN);
+        buffer.asShortBuffer().put(samples);
+        return buffer.array();
+    }
+
+    private static String normalize(String format) {
+        if (format == null || format.isBlank()) {
+            return "";
+        }
+        String normalized = format.trim().toLowerCase(Locale.ROOT);
+        int semicolonIndex = normalized.indexOf(';');
+        if (semicolonIndex >= 0) {
+            normalized = normalized.substring(0, semicolonIndex);
+        }
+        normalized = normalized.replace("audio/", "");
+        return normalized.equals("x-wav") ? "wav" : normalized;
+    }
+}
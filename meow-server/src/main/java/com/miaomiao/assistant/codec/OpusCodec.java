@@ -1,10 +1,15 @@
 package com.miaomiao.assistant.codec;
 
-import jakarta.annotation.PreDestroy;
 import lombok.extern.slf4j.Slf4j;
+import org.springframework.beans.factory.annotation.Autowired;
 import org.springframework.stereotype.Component;
 
 import java.io.ByteArrayOutputStream;
+import java.nio.BufferOverflowException;
+import java.nio.ByteBuffer;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.List;
 
 /**
  * Opus音频编码器
@@ -24,18 +29,51 @@ public class OpusCodec {
     private static final int FRAME_SIZE = 480;
 
     /**
-     * 创建独立的 Opus 编解码器实例。
+     * 默认编解码参数对应的池键
+     */
+    public static final OpusCodecPool.Key DEFAULT_KEY =
+            new OpusCodecPool.Key(SAMPLE_RATE, CHANNELS, BITRATE, FRAME_SIZE);
+
+    /**
+     * 编码档位对应的池键
+     */
+    public static OpusCodecPool.Key keyFor(OpusProfile profile) {
+        if (profile == null) {
+            return DEFAULT_KEY;
+        }
+        return new OpusCodecPool.Key(SAMPLE_RATE, CHANNELS, profile.bitrate(), profile.frameSize(SAMPLE_RATE));
+    }
+
+    /**
+     * 单个 Opus 包的最大字节数（RFC 6716：单帧最多 1275 字节，60ms 包最多含 3 帧，另加包头）
+     */
+    public static final int MAX_PACKET_BYTES = 1275 * 3 + 7;
+
+    /**
+     * 输出采样率（客户端解码用）
+     */
+    public static int getSampleRate() {
+        return SAMPLE_RATE;
+    }
+
+    /**
+     * native codec 池
      * <p>
      * 不能在并发任务中复用同一个 native codec 实例，否则会出现状态互相污染，
-     * 导致输出音频杂音、节奏异常等问题。
+     * 导致输出音频杂音、节奏异常等问题。池保证借出期间调用方独占实例。
      */
-    private net.labymod.opus.OpusCodec createCodec() {
-        return net.labymod.opus.OpusCodec.newBuilder()
-                .withSampleRate(SAMPLE_RATE)
-                .withChannels(CHANNELS)
-                .withBitrate(BITRATE)
-                .withFrameSize(FRAME_SIZE)
-                .build();
+    private final OpusCodecPool codecPool;
+
+    /**
+     * 非 Spring 环境（如测试工具）使用，自带一个独立的池
+     */
+    public OpusCodec() {
+        this(new OpusCodecPool());
+    }
+
+    @Autowired
+    public OpusCodec(OpusCodecPool codecPool) {
+        this.codecPool = codecPool;
     }
 
     /**
@@ -50,50 +88,115 @@ public class OpusCodec {
             return new byte[0];
         }
 
-        net.labymod.opus.OpusCodec codec = createCodec();
-        try {
-            int frameSizeBytes = FRAME_SIZE * CHANNELS * 2;
-            ByteArrayOutputStream outputStream = new ByteArrayOutputStream();
-
-            // 分帧编码
-            int offset = 0;
-            while (offset + frameSizeBytes <= pcmData.length) {
-                // 提取一帧数据
-                byte[] frameData = new byte[frameSizeBytes];
-                System.arraycopy(pcmData, offset, frameData, 0, frameSizeBytes);
+        try (OpusCodecPool.Lease lease = codecPool.acquireEncoder(DEFAULT_KEY)) {
+            try {
+                net.labymod.opus.OpusCodec codec = lease.codec();
+                int frameSizeBytes = DEFAULT_KEY.frameBytes();
+                // 按码率预估输出大小，避免逐帧写入时反复扩容
+                ByteArrayOutputStream outputStream = new ByteArrayOutputStream(estimateEncodedSize(DEFAULT_KEY, pcmData.length));
 
-                // 编码这一帧
-                byte[] encoded = codec.encodeFrame(frameData);
+                // 分帧编码：直接在输入数组上按偏移编码，不再逐帧复制
+                int offset = 0;
+                while (offset + frameSizeBytes <= pcmData.length) {
+                    byte[] encoded = codec.encodeFrame(pcmData, offset, frameSizeBytes);
 
-                // 写入帧长度（2字节，小端序）和帧数据
-                outputStream.write(encoded.length & 0xFF);
-                outputStream.write((encoded.length >> 8) & 0xFF);
-                outputStream.write(encoded);
+                    // 写入帧长度（2字节，小端序）和帧数据
+                    outputStream.write(encoded.length & 0xFF);
+                    outputStream.write((encoded.length >> 8) & 0xFF);
+                    outputStream.write(encoded);
 
-                offset += frameSizeBytes;
-            }
+                    offset += frameSizeBytes;
+                }
 
-            // 处理剩余不足一帧的数据：补0凑成完整帧
-            int remaining = pcmData.length - offset;
-            if (remaining > 0) {
-                byte[] frameData = new byte[frameSizeBytes];
-                System.arraycopy(pcmData, offset, frameData, 0, remaining);
-                // 剩余部分自动为0（Java数组初始化）
+                // 处理剩余不足一帧的数据：补0凑成完整帧
+                int remaining = pcmData.length - offset;
+                if (remaining > 0) {
+                    byte[] frameData = new byte[frameSizeBytes];
+                    System.arraycopy(pcmData, offset, frameData, 0, remaining);
+                    // 剩余部分自动为0（Java数组初始化）
 
-                byte[] encoded = codec.encodeFrame(frameData);
-                outputStream.write(encoded.length & 0xFF);
-                outputStream.write((encoded.length >> 8) & 0xFF);
-                outputStream.write(encoded);
+                    byte[] encoded = codec.encodeFrame(frameData);
+                    outputStream.write(encoded.length & 0xFF);
+                    outputStream.write((encoded.length >> 8) & 0xFF);
+                    outputStream.write(encoded);
+                }
+                return outputStream.toByteArray();
+            } catch (Exception e) {
+                lease.invalidate();
+                throw e;
             }
-            return outputStream.toByteArray();
         } catch (Exception e) {
             log.error("PCM转Opus编码失败", e);
             throw new RuntimeException("音频编码失败", e);
-        } finally {
-            safeDestroy(codec);
         }
     }
 
+    /**
+     * 将 ByteBuffer 中的 PCM 编码为 Opus，写入调用方提供的输出缓冲区
+     * <p>
+     * 支持堆内和 direct ByteBuffer：堆内缓冲区直接按偏移交给 JNI，direct 缓冲区每帧拷贝到复用的帧缓冲，
+     * 不产生逐帧的临时数组，也没有 ByteArrayOutputStream 扩容。
+     * 最后不足一帧的数据补0编码。
+     *
+     * @param pcm 16位PCM数据(小端序)，读取 position 到 limit 之间的数据
+     * @param out 输出缓冲区，写入 [2字节长度头][帧数据]...，剩余空间应不小于 {@link #maxEncodedSize(int)}
+     * @return 写入的字节数
+     * @throws BufferOverflowException 输出缓冲区空间不足，此时 pcm 和 out 的 position 恢复为调用前的值
+     */
+    public int encodePcmToOpus(ByteBuffer pcm, ByteBuffer out) {
+        int pcmStart = pcm.position();
+        int start = out.position();
+        try (StreamEncoder encoder = newStreamEncoder()) {
+            encoder.encode(pcm, out);
+            encoder.finish(out);
+        } catch (BufferOverflowException e) {
+            pcm.position(pcmStart);
+            out.position(start);
+            throw e;
+        }
+        return out.position() - start;
+    }
+
+    /**
+     * 编码指定长度的 PCM 时输出可能占用的最大字节数
+     */
+    public static int maxEncodedSize(int pcmBytes) {
+        int frameBytes = DEFAULT_KEY.frameBytes();
+        int frames = (pcmBytes + frameBytes - 1) / frameBytes;
+        return frames * (2 + MAX_PACKET_BYTES);
+    }
+
+    /**
+     * 按码率预估编码输出大小（含 2 字节长度头，预留 1/4 余量给 VBR 波动）
+     */
+    private static int estimateEncodedSize(OpusCodecPool.Key key, int pcmBytes) {
+        int frames = (pcmBytes + key.frameBytes() - 1) / key.frameBytes();
+        int bytesPerFrame = key.bitrate() / 8 * key.frameSize() / key.sampleRate();
+        return frames * (2 + bytesPerFrame + bytesPerFrame / 4);
+    }
+
+    /**
+     * 创建增量编码器
+     * <p>
+     * 用于 TTS 流式返回的场景：每到一块 PCM 就立即编码出其中完整的 20ms 帧，
+     * 不足一帧的尾部保留到下一块，最后调用 {@link StreamEncoder#finish()} 补0输出最后一帧。
+     *
+     * @return 独占一个池中 native codec 的增量编码器，用完必须 close 归还
+     */
+    public StreamEncoder newStreamEncoder() {
+        return new StreamEncoder(codecPool.acquireEncoder(DEFAULT_KEY));
+    }
+
+    /**
+     * 按会话协商的档位创建增量编码器
+     *
+     * @param profile 码率和帧时长
+     * @return 独占一个池中 native codec 的增量编码器，用完必须 close 归还
+     */
+    public StreamEncoder newStreamEncoder(OpusProfile profile) {
+        return new StreamEncoder(codecPool.acquireEncoder(keyFor(profile)));
+    }
+
     /**
      * 将 Opus 数据解码为 PCM
      * 输入数据格式：多个帧拼接，每帧前有2字节长度头（小端序）+ 帧数据
@@ -106,54 +209,305 @@ public class OpusCodec {
             return new byte[0];
         }
 
-        net.labymod.opus.OpusCodec codec = createCodec();
-        try {
-            ByteArrayOutputStream outputStream = new ByteArrayOutputStream();
-            int offset = 0;
+        try (OpusCodecPool.Lease lease = codecPool.acquireDecoder(DEFAULT_KEY)) {
+            try {
+                net.labymod.opus.OpusCodec codec = lease.codec();
+                ByteArrayOutputStream outputStream = new ByteArrayOutputStream();
+                int offset = 0;
 
-            while (offset + 2 <= opusData.length) {
-                // 读取2字节帧长度（小端序）
-                int len = (opusData[offset] & 0xFF) | ((opusData[offset + 1] & 0xFF) << 8);
-                offset += 2;
+                while (offset + 2 <= opusData.length) {
+                    // 读取2字节帧长度（小端序）
+                    int len = (opusData[offset] & 0xFF) | ((opusData[offset + 1] & 0xFF) << 8);
+                    offset += 2;
 
-                if (len == 0) {
-                    // 长度异常：直接跳出或继续（这里选择跳出，避免死循环）
-                    break;
-                }
-                if (offset + len > opusData.length) {
-                    // 数据不完整：直接跳出
-                    break;
-                }
+                    if (len == 0) {
+                        // 长度异常：直接跳出或继续（这里选择跳出，避免死循环）
+                        break;
+                    }
+                    if (offset + len > opusData.length) {
+                        // 数据不完整：直接跳出
+                        break;
+                    }
 
-                // 取出该帧Opus数据
-                byte[] frame = new byte[len];
-                System.arraycopy(opusData, offset, frame, 0, len);
-                offset += len;
+                    // 取出该帧Opus数据
+                    byte[] frame = new byte[len];
+                    System.arraycopy(opusData, offset, frame, 0, len);
+                    offset += len;
 
-                // 解码该帧 -> PCM
-                // 返回PCM一般是一帧对应的PCM字节：FRAME_SIZE * CHANNELS * 2
-                byte[] pcmFrame = codec.decodeFrame(frame);
+                    // 解码该帧 -> PCM
+                    // 返回PCM一般是一帧对应的PCM字节：FRAME_SIZE * CHANNELS * 2
+                    byte[] pcmFrame = codec.decodeFrame(frame);
 
-                outputStream.write(pcmFrame);
-            }
+                    outputStream.write(pcmFrame);
+                }
 
-            return outputStream.toByteArray();
+                return outputStream.toByteArray();
+            } catch (Exception e) {
+                lease.invalidate();
+                throw e;
+            }
         } catch (Exception e) {
             log.error("Opus转PCM解码失败", e);
             throw new RuntimeException("音频解码失败", e);
-        } finally {
-            safeDestroy(codec);
         }
     }
 
-    private void safeDestroy(net.labymod.opus.OpusCodec codec) {
-        if (codec == null) {
-            return;
+    /**
+     * 解码从容器中取出的 Opus 包（如浏览器录音）
+     * <p>
+     * 与 {@link #decodeOpusToPcm(byte[])} 相同的池化解码流程，区别是输入已按包拆分、参数由调用方指定。
+     * 解码失败的包（损坏或时长超过 {@code key.frameSize()}）补一帧静音，保持时间轴不变。
+     *
+     * @param packets Opus 包
+     * @param key     解码参数（采样率、输出声道数、单包最大采样数）
+     * @return 16位PCM数据(小端序)
+     */
+    public byte[] decodeOpusPackets(List<byte[]> packets, OpusCodecPool.Key key) {
+        if (packets == null || packets.isEmpty()) {
+            return new byte[0];
         }
-        try {
-            codec.destroy();
+
+        try (OpusCodecPool.Lease lease = codecPool.acquireDecoder(key)) {
+            net.labymod.opus.OpusCodec codec = lease.codec();
+            ByteArrayOutputStream outputStream = new ByteArrayOutputStream(packets.size() * key.frameBytes());
+            int failures = 0;
+            for (byte[] packet : packets) {
+                try {
+                    outputStream.write(codec.decodeFrame(packet));
+                } catch (RuntimeException e) {
+                    failures++;
+                    outputStream.write(new byte[key.frameBytes()]);
+                }
+            }
+            if (failures > 0) {
+                log.warn("Opus 包解码失败 {} / {}，已用静音代替", failures, packets.size());
+                lease.invalidate();
+            }
+            return outputStream.toByteArray();
         } catch (Exception e) {
-            log.warn("释放 OpusCodec 失败", e);
+            log.error("Opus包解码失败", e);
+            throw new RuntimeException("音频解码失败", e);
+        }
+    }
+
+    /**
+     * 增量 PCM -> Opus 编码器
+     * <p>
+     * 输出的每个元素是一个完整的 Opus 帧包：[2字节长度头(小端序)][帧数据]，
+     * 与 {@link #encodePcmToOpus(byte[])} 的输出格式一致，可以直接逐帧下发。
+     * <p>
+     * 非线程安全的 native codec 由该对象独占，方法均已加锁；close 时归还到池中。
+     */
+    public static final class StreamEncoder implements AutoCloseable {
+
+        private final OpusCodecPool.Lease lease;
+        private final net.labymod.opus.OpusCodec codec;
+        private final int frameBytes;
+
+        /**
+         * 上一块 PCM 留下的不足一帧的数据
+         */
+        private final byte[] remainder;
+        private int remainderLength = 0;
+
+        private boolean closed = false;
+
+        private StreamEncoder(OpusCodecPool.Lease lease) {
+            this.lease = lease;
+            this.codec = lease.codec();
+            this.frameBytes = lease.key().frameBytes();
+            this.remainder = new byte[frameBytes];
+        }
+
+        /**
+         * 编码一块 PCM，返回其中所有完整帧
+         *
+         * @param pcmChunk 16位PCM数据(小端序)，长度任意
+         * @return 编码出的帧包列表，可能为空
+         */
+        public synchronized List<byte[]> encode(byte[] pcmChunk) {
+            if (closed) {
+                throw new IllegalStateException("StreamEncoder 已关闭");
+            }
+            if (pcmChunk == null || pcmChunk.length == 0) {
+                return List.of();
+            }
+
+            List<byte[]> frames = new ArrayList<>((remainderLength + pcmChunk.length) / frameBytes);
+            int offset = 0;
+
+            // 先用新数据把上次剩余的半帧补齐
+            if (remainderLength > 0) {
+                int needed = frameBytes - remainderLength;
+                int copied = Math.min(needed, pcmChunk.length);
+                System.arraycopy(pcmChunk, 0, remainder, remainderLength, copied);
+                remainderLength += copied;
+                offset = copied;
+                if (remainderLength < frameBytes) {
+                    return frames;
+                }
+                frames.add(encodeFrame(remainder, 0));
+                remainderLength = 0;
+            }
+
+            // 直接在输入数组上按帧编码，不再复制
+            while (offset + frameBytes <= pcmChunk.length) {
+                frames.add(encodeFrame(pcmChunk, offset));
+                offset += frameBytes;
+            }
+
+            // 不足一帧的部分留到下一块
+            int tail = pcmChunk.length - offset;
+            if (tail > 0) {
+                System.arraycopy(pcmChunk, offset, remainder, 0, tail);
+                remainderLength = tail;
+            }
+            return frames;
+        }
+
+        /**
+         * 编码 ByteBuffer 中的一块 PCM，把其中所有完整帧写入输出缓冲区
+         * <p>
+         * 堆内缓冲区直接按偏移编码；direct 缓冲区逐帧批量读入复用的帧缓冲后编码。
+         *
+         * @param pcmChunk 16位PCM数据(小端序)，读取 position 到 limit 之间的数据
+         * @param out      输出缓冲区，写入 [2字节长度头][帧数据]...，剩余空间应不小于 {@link #maxEncodedSize(int)}
+         * @return 写入的帧数
+         * @throws BufferOverflowException 输出缓冲区空间不足；已写入的帧保留，pcmChunk 停在第一个未编码的帧上，
+         *                                 换用更大的缓冲区后可继续调用
+         */
+        public synchronized int encode(ByteBuffer pcmChunk, ByteBuffer out) {
+            if (closed) {
+                throw new IllegalStateException("StreamEncoder 已关闭");
+            }
+            int count = 0;
+            while (remainderLength + pcmChunk.remaining() >= frameBytes) {
+                // 编码前检查空间，编码器状态只随实际写出的帧推进
+                if (out.remaining() < 2 + MAX_PACKET_BYTES) {
+                    throw new BufferOverflowException();
+                }
+                if (remainderLength > 0) {
+                    // 先用新数据把上次剩余的半帧补齐
+                    pcmChunk.get(remainder, remainderLength, frameBytes - remainderLength);
+                    remainderLength = 0;
+                    writePacket(encodeRaw(remainder, 0), out);
+                } else if (pcmChunk.hasArray()) {
+                    int offset = pcmChunk.arrayOffset() + pcmChunk.position();
+                    writePacket(encodeRaw(pcmChunk.array(), offset), out);
+                    pcmChunk.position(pcmChunk.position() + frameBytes);
+                } else {
+                    // 半帧缓冲此时为空，复用为帧缓冲
+                    pcmChunk.get(remainder, 0, frameBytes);
+                    writePacket(encodeRaw(remainder, 0), out);
+                }
+                count++;
+            }
+
+            // 不足一帧的部分留到下一块
+            int tail = pcmChunk.remaining();
+            if (tail > 0) {
+                pcmChunk.get(remainder, remainderLength, tail);
+                remainderLength += tail;
+            }
+            return count;
+        }
+
+        /**
+         * 结束编码：剩余不足一帧的数据补0写入输出缓冲区，然后归还 native codec
+         *
+         * @return 写入的帧数（0 或 1）
+         * @throws BufferOverflowException 输出缓冲区剩余空间小于一个最大帧包；此时不关闭，换用更大的缓冲区后可重新调用
+         */
+        public synchronized int finish(ByteBuffer out) {
+            if (closed) {
+                return 0;
+            }
+            if (remainderLength > 0 && out.remaining() < 2 + MAX_PACKET_BYTES) {
+                throw new BufferOverflowException();
+            }
+            try {
+                if (remainderLength == 0) {
+                    return 0;
+                }
+                Arrays.fill(remainder, remainderLength, frameBytes, (byte) 0);
+                remainderLength = 0;
+                writePacket(encodeRaw(remainder, 0), out);
+                return 1;
+            } finally {
+                close();
+            }
+        }
+
+        /**
+         * 结束编码：剩余不足一帧的数据补0输出，然后归还 native codec
+         *
+         * @return 最后一帧帧包；没有剩余数据时返回 null
+         */
+        public synchronized byte[] finish() {
+            if (closed) {
+                return null;
+            }
+            try {
+                if (remainderLength == 0) {
+                    return null;
+                }
+                Arrays.fill(remainder, remainderLength, frameBytes, (byte) 0);
+                remainderLength = 0;
+                return encodeFrame(remainder, 0);
+            } finally {
+                close();
+            }
+        }
+
+        /**
+         * 再编码指定长度的 PCM 时，{@link #encode(ByteBuffer, ByteBuffer)} 可能写出的最大字节数（含缓存的半帧）
+         */
+        public synchronized int maxEncodedSize(int pcmBytes) {
+            return (remainderLength + pcmBytes) / frameBytes * (2 + MAX_PACKET_BYTES);
+        }
+
+        /**
+         * 当前缓存的不足一帧的字节数
+         */
+        public synchronized int getPendingBytes() {
+            return remainderLength;
+        }
+
+        private byte[] encodeRaw(byte[] pcm, int offset) {
+            try {
+                return codec.encodeFrame(pcm, offset, frameBytes);
+            } catch (RuntimeException e) {
+                lease.invalidate();
+                throw e;
+            }
+        }
+
+        private static void writePacket(byte[] encoded, ByteBuffer out) {
+            if (out.remaining() < 2 + encoded.length) {
+                throw new BufferOverflowException();
+            }
+            out.put((byte) (encoded.length & 0xFF));
+            out.put((byte) ((encoded.length >> 8) & 0xFF));
+            out.put(encoded);
+        }
+
+        private byte[] encodeFrame(byte[] pcm, int offset) {
+            byte[] encoded = encodeRaw(pcm, offset);
+            byte[] packet = new byte[2 + encoded.length];
+            packet[0] = (byte) (encoded.length & 0xFF);
+            packet[1] = (byte) ((encoded.length >> 8) & 0xFF);
+            System.arraycopy(encoded, 0, packet, 2, encoded.length);
+            return packet;
+        }
+
+        @Override
+        public synchronized void close() {
+            if (closed) {
+                return;
+            }
+            closed = true;
+            remainderLength = 0;
+            lease.close();
         }
     }
 }
@@ -0,0 +1,386 @@
+package com.miaomiao.assistant.codec;
+
+import jakarta.annotation.PreDestroy;
+import lombok.extern.slf4j.Slf4j;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.scheduling.annotation.Scheduled;
+import org.springframework.stereotype.Component;
+
+import java.util.Deque;
+import java.util.Map;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.ConcurrentLinkedDeque;
+import java.util.concurrent.Semaphore;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicBoolean;
+import java.util.concurrent.atomic.AtomicLong;
+
+/**
+ * Opus native 编解码器池
+ * <p>
+ * 创建/销毁 native codec 需要一次 JNI 分配与初始化，按句子创建会把这部分开销放进热路径。
+ * 这里按 (采样率, 声道, 码率, 帧长) 分别维护有上限的编码器池和解码器池：
+ * 1. 借出期间由调用方独占，保证同一实例不会被多个线程同时使用
+ * 2. 再次借出前用静音帧冲刷内部历史，避免上一个流的状态带入下一个流
+ * 3. 借出超过阈值仍未归还的实例会被定时任务报告为疑似泄漏
+ * 4. 统计命中率和等待耗时
+ */
+@Slf4j
+@Component
+public class OpusCodecPool {
+
+    /**
+     * 冲刷时编码/解码的静音帧数。
+     * opus-jni 未暴露 OPUS_RESET_STATE，60ms 静音足以覆盖编码器前瞻和预测历史。
+     */
+    private static final int FLUSH_FRAMES = 3;
+
+    /**
+     * 池的键：一组完全相同的 codec 参数
+     */
+    public record Key(int sampleRate, int channels, int bitrate, int frameSize) {
+
+        /**
+         * 一帧 PCM 的字节数（16位采样）
+         */
+        public int frameBytes() {
+            return frameSize * channels * 2;
+        }
+    }
+
+    /**
+     * codec 用途：编码器和解码器的 native 状态相互独立，分开池化
+     */
+    public enum Kind {
+        ENCODER, DECODER
+    }
+
+    /**
+     * 每个键每种用途最多持有的实例数
+     */
+    @Value("${opus.pool.max-per-key:32}")
+    private int maxPerKey = 32;
+
+    /**
+     * 池耗尽时的最长等待时间（毫秒）
+     */
+    @Value("${opus.pool.acquire-timeout-ms:2000}")
+    private long acquireTimeoutMs = 2000;
+
+    /**
+     * 单次借出超过该时长视为疑似泄漏（毫秒）
+     */
+    @Value("${opus.pool.leak-threshold-ms:120000}")
+    private long leakThresholdMs = 120000;
+
+    /**
+     * 单个实例最多被借出的次数，超过后销毁重建
+     */
+    @Value("${opus.pool.max-uses:2000}")
+    private int maxUses = 2000;
+
+    /**
+     * 是否记录借出位置的调用栈（排查泄漏时开启，有额外开销）
+     */
+    @Value("${opus.pool.leak-trace:false}")
+    private boolean leakTrace = false;
+
+    private final Map<PoolId, KeyedPool> pools = new ConcurrentHashMap<>();
+    private final Map<Lease, Boolean> outstanding = new ConcurrentHashMap<>();
+
+    // 统计
+    private final AtomicLong hits = new AtomicLong();
+    private final AtomicLong misses = new AtomicLong();
+    private final AtomicLong waits = new AtomicLong();
+    private final AtomicLong totalWaitNanos = new AtomicLong();
+    private final AtomicLong maxWaitNanos = new AtomicLong();
+    private final AtomicLong timeouts = new AtomicLong();
+    private final AtomicLong leaksDetected = new AtomicLong();
+
+    /**
+     * 借出编码器
+     */
+    public Lease acquireEncoder(Key key) {
+        return acquire(new PoolId(key, Kind.ENCODER));
+    }
+
+    /**
+     * 借出解码器
+     */
+    public Lease acquireDecoder(Key key) {
+        return acquire(new PoolId(key, Kind.DECODER));
+    }
+
+    private Lease acquire(PoolId id) {
+        KeyedPool pool = pools.computeIfAbsent(id, KeyedPool::new);
+
+        if (!pool.permits.tryAcquire()) {
+            long waitStart = System.nanoTime();
+            waits.incrementAndGet();
+            boolean acquired;
+            try {
+                acquired = pool.permits.tryAcquire(acquireTimeoutMs, TimeUnit.MILLISECONDS);
+            } catch (InterruptedException e) {
+                Thread.currentThread().interrupt();
+                throw new IllegalStateException("等待 Opus codec 被中断", e);
+            }
+            long waited = System.nanoTime() - waitStart;
+            totalWaitNanos.addAndGet(waited);
+            maxWaitNanos.accumulateAndGet(waited, Math::max);
+            if (!acquired) {
+                timeouts.incrementAndGet();
+                throw new IllegalStateException("Opus codec 池已耗尽: " + id + ", 上限=" + maxPerKey);
+            }
+        }
+
+        PooledCodec pooled;
+        try {
+            pooled = pool.idle.pollFirst();
+            if (pooled != null) {
+                hits.incrementAndGet();
+                try {
+                    pool.flush(pooled);
+                } catch (RuntimeException e) {
+                    log.warn("冲刷 Opus codec 失败，重建实例: {}", id, e);
+                    safeDestroy(pooled.codec);
+                    pooled = new PooledCodec(createCodec(id.key()));
+                }
+            } else {
+                misses.incrementAndGet();
+                pooled = new PooledCodec(createCodec(id.key()));
+            }
+        } catch (RuntimeException e) {
+            pool.permits.release();
+            throw e;
+        }
+
+        pooled.uses++;
+        Lease lease = new Lease(pool, pooled);
+        outstanding.put(lease, Boolean.TRUE);
+        return lease;
+    }
+
+    private void release(Lease lease) {
+        outstanding.remove(lease);
+        KeyedPool pool = lease.pool;
+        PooledCodec pooled = lease.pooled;
+        try {
+            if (lease.broken || pooled.uses >= maxUses) {
+                safeDestroy(pooled.codec);
+            } else {
+                pooled.dirty = true;
+                // 后进先出，优先复用最近用过的实例
+                pool.idle.offerFirst(pooled);
+            }
+        } finally {
+            pool.permits.release();
+        }
+    }
+
+    /**
+     * 创建 native codec
+     */
+    static net.labymod.opus.OpusCodec createCodec(Key key) {
+        return net.labymod.opus.OpusCodec.newBuilder()
+                .withSampleRate(key.sampleRate())
+                .withChannels(key.channels())
+                .withBitrate(key.bitrate())
+                .withFrameSize(key.frameSize())
+                .build();
+    }
+
+    static void safeDestroy(net.labymod.opus.OpusCodec codec) {
+        if (codec == null) {
+            return;
+        }
+        try {
+            codec.destroy();
+        } catch (Exception e) {
+            log.warn("释放 OpusCodec 失败", e);
+        }
+    }
+
+    /**
+     * 定时检查借出过久的实例
+     */
+    @Scheduled(fixedDelayString = "${opus.pool.leak-check-interval-ms:30000}")
+    public void detectLeaks() {
+        long now = System.nanoTime();
+        long threshold = TimeUnit.MILLISECONDS.toNanos(leakThresholdMs);
+        for (Lease lease : outstanding.keySet()) {
+            if (now - lease.acquiredAtNanos > threshold && lease.leakReported.compareAndSet(false, true)) {
+                leaksDetected.incrementAndGet();
+                log.warn("疑似 Opus codec 泄漏: {} 已借出 {}ms 未归还，线程={}",
+                        lease.pool.id, TimeUnit.NANOSECONDS.toMillis(now - lease.acquiredAtNanos),
+                        lease.acquiredBy, lease.acquiredAt);
+            }
+        }
+    }
+
+    /**
+     * 获取池统计快照
+     */
+    public Stats getStats() {
+        long hitCount = hits.get();
+        long missCount = misses.get();
+        long total = hitCount + missCount;
+        long waitCount = waits.get();
+        int idle = 0;
+        for (KeyedPool pool : pools.values()) {
+            idle += pool.idle.size();
+        }
+        return new Stats(
+                hitCount,
+                missCount,
+                total == 0 ? 0 : (double) hitCount / total,
+                waitCount,
+                waitCount == 0 ? 0 : TimeUnit.NANOSECONDS.toMicros(totalWaitNanos.get()) / 1000.0 / waitCount,
+                TimeUnit.NANOSECONDS.toMicros(maxWaitNanos.get()) / 1000.0,
+                timeouts.get(),
+                idle,
+                outstanding.size(),
+                leaksDetected.get()
+        );
+    }
+
+    @PreDestroy
+    public void shutdown() {
+        for (KeyedPool pool : pools.values()) {
+            PooledCodec pooled;
+            while ((pooled = pool.idle.pollFirst()) != null) {
+                safeDestroy(pooled.codec);
+            }
+        }
+        if (!outstanding.isEmpty()) {
+            log.warn("Opus codec 池关闭时仍有 {} 个实例未归还", outstanding.size());
+        }
+    }
+
+    /**
+     * 池统计
+     *
+     * @param hits          复用已有实例的次数
+     * @param misses        新建实例的次数
+     * @param hitRate       命中率
+     * @param waits         因池满而等待的次数
+     * @param avgWaitMs     平均等待耗时（毫秒）
+     * @param maxWaitMs     最大等待耗时（毫秒）
+     * @param timeouts      等待超时次数
+     * @param idle          当前空闲实例数
+     * @param inUse         当前借出实例数
+     * @param leaksDetected 检测到的疑似泄漏数
+     */
+    public record Stats(long hits, long misses, double hitRate, long waits, double avgWaitMs,
+                        double maxWaitMs, long timeouts, int idle, int inUse, long leaksDetected) {
+    }
+
+    /**
+     * 借出凭证，close 时归还实例
+     * <p>
+     * 借出期间调用方独占 codec，不允许跨线程共享。
+     */
+    public final class Lease implements AutoCloseable {
+
+        private final KeyedPool pool;
+        private final PooledCodec pooled;
+        private final long acquiredAtNanos = System.nanoTime();
+        private final String acquiredBy = Thread.currentThread().getName();
+        private final Throwable acquiredAt = leakTrace ? new Throwable("Opus codec 借出位置") : null;
+        private final AtomicBoolean leakReported = new AtomicBoolean(false);
+        private final AtomicBoolean released = new AtomicBoolean(false);
+        private volatile boolean broken = false;
+
+        private Lease(KeyedPool pool, PooledCodec pooled) {
+            this.pool = pool;
+            this.pooled = pooled;
+        }
+
+        /**
+         * 借出的 native codec
+         */
+        public net.labymod.opus.OpusCodec codec() {
+            if (released.get()) {
+                throw new IllegalStateException("Opus codec 已归还");
+            }
+            return pooled.codec;
+        }
+
+        public Key key() {
+            return pool.id.key();
+        }
+
+        /**
+         * 标记实例不可复用（如编解码抛出异常后），归还时直接销毁
+         */
+        public void invalidate() {
+            this.broken = true;
+        }
+
+        @Override
+        public void close() {
+            if (released.compareAndSet(false, true)) {
+                release(this);
+            }
+        }
+    }
+
+    private record PoolId(Key key, Kind kind) {
+    }
+
+    private static final class PooledCodec {
+        private final net.labymod.opus.OpusCodec codec;
+        private int uses = 0;
+        private boolean dirty = false;
+
+        private PooledCodec(net.labymod.opus.OpusCodec codec) {
+            this.codec = codec;
+        }
+    }
+
+    private final class KeyedPool {
+        private final PoolId id;
+        private final Semaphore permits = new Semaphore(maxPerKey);
+        private final Deque<PooledCodec> idle = new ConcurrentLinkedDeque<>();
+
+        /**
+         * 解码器冲刷用的静音包，首次需要时生成
+         */
+        private volatile byte[] silencePacket;
+
+        private KeyedPool(PoolId id) {
+            this.id = id;
+        }
+
+        /**
+         * 冲刷上一次使用留下的内部状态
+         */
+        private void flush(PooledCodec pooled) {
+            if (!pooled.dirty) {
+                return;
+            }
+            byte[] silence = new byte[id.key().frameBytes()];
+            for (int i = 0; i < FLUSH_FRAMES; i++) {
+                if (id.kind() == Kind.ENCODER) {
+                    pooled.codec.encodeFrame(silence);
+                } else {
+                    pooled.codec.decodeFrame(silencePacket());
+                }
+            }
+            pooled.dirty = false;
+        }
+
+        private byte[] silencePacket() {
+            byte[] packet = silencePacket;
+            if (packet == null) {
+                net.labymod.opus.OpusCodec encoder = createCodec(id.key());
+                try {
+                    packet = encoder.encodeFrame(new byte[id.key().frameBytes()]);
+                } finally {
+                    safeDestroy(encoder);
+                }
+                silencePacket = packet;
+            }
+            return packet;
+        }
+    }
+}
@@ -0,0 +1,267 @@
+package com.miaomiao.assistant.codec;
+
+import java.io.ByteArrayOutputStream;
+import java.nio.charset.StandardCharsets;
+import java.util.ArrayList;
+import java.util.List;
+
+/**
+ * Opus 容器解封装
+ * <p>
+ * 从浏览器 MediaRecorder 录制的 WebM（Matroska）或 Ogg 文件中取出 Opus 包：
+ * 1. Ogg：按页解析 lacing 表拼出包，跳过 OpusHead / OpusTags 两个头包
+ * 2. WebM：线性扫描 EBML 元素，进入 Segment / Cluster / BlockGroup 等容器元素（兼容 MediaRecorder 写出的未知长度），
+ * 读取 A_OPUS 音轨的 SimpleBlock / Block
+ * <p>
+ * 只处理单音轨、无 lacing 的 WebM 块（MediaRecorder 的输出即如此）。无状态，线程安全。
+ */
+public final class OpusContainerDemuxer {
+
+    /**
+     * 解封装结果
+     *
+     * @param channels 声道数（来自 OpusHead / 音轨信息，缺失时为 1）
+     * @param preSkip  解码后需丢弃的起始采样数（48kHz）
+     * @param packets  Opus 包，按时间顺序
+     */
+    public record Demuxed(int channels, int preSkip, List<byte[]> packets) {
+    }
+
+    private static final byte[] OPUS_HEAD = "OpusHead".getBytes(StandardCharsets.US_ASCII);
+    private static final byte[] OPUS_TAGS = "OpusTags".getBytes(StandardCharsets.US_ASCII);
+
+    // EBML 元素 ID（保留长度标记位）
+    private static final long EBML_HEADER = 0x1A45DFA3L;
+    private static final long SEGMENT = 0x18538067L;
+    private static final long CLUSTER = 0x1F43B675L;
+    private static final long TRACKS = 0x1654AE6BL;
+    private static final long TRACK_ENTRY = 0xAEL;
+    private static final long TRACK_NUMBER = 0xD7L;
+    private static final long CODEC_ID = 0x86L;
+    private static final long CODEC_PRIVATE = 0x63A2L;
+    private static final long AUDIO = 0xE1L;
+    private static final long CHANNELS = 0x9FL;
+    private static final long BLOCK_GROUP = 0xA0L;
+    private static final long BLOCK = 0xA1L;
+    private static final long SIMPLE_BLOCK = 0xA3L;
+
+    private OpusContainerDemuxer() {
+    }
+
+    /**
+     * 根据文件头判断容器类型并解封装
+     *
+     * @return 不是 Ogg / WebM 或其中没有 Opus 音频时返回 null
+     */
+    public static Demuxed demux(byte[] data) {
+        if (data == null || data.length < 4) {
+            return null;
+        }
+        if (data[0] == 'O' && data[1] == 'g' && data[2] == 'g' && data[3] == 'S') {
+            return demuxOgg(data);
+        }
+        if (readUInt(data, 0, 4) == EBML_HEADER) {
+            return demuxWebm(data);
+        }
+        return null;
+    }
+
+    // ==================== Ogg ====================
+
+    private static Demuxed demuxOgg(byte[] data) {
+        List<byte[]> packets = new ArrayList<>();
+        ByteArrayOutputStream packet = new ByteArrayOutputStream();
+        int channels = 1;
+        int preSkip = 0;
+        boolean headParsed = false;
+
+        int offset = 0;
+        while (offset + 27 <= data.length) {
+            if (data[offset] != 'O' || data[offset + 1] != 'g' || data[offset + 2] != 'g' || data[offset + 3] != 'S') {
+                break;
+            }
+            int segments = data[offset + 26] & 0xFF;
+            int tableStart = offset + 27;
+            int payload = tableStart + segments;
+            if (payload > data.length) {
+                break;
+            }
+            for (int i = 0; i < segments; i++) {
+                int lacing = data[tableStart + i] & 0xFF;
+                if (payload + lacing > data.length) {
+                    return finish(channels, preSkip, packets, headParsed);
+                }
+                packet.write(data, payload, lacing);
+                payload += lacing;
+                // lacing 值小于 255 表示包结束
+                if (lacing < 255) {
+                    byte[] complete = packet.toByteArray();
+                    packet.reset();
+                    if (startsWith(complete, OPUS_HEAD)) {
+                        if (complete.length >= 12) {
+                            channels = Math.max(1, complete[9] & 0xFF);
+                            preSkip = (complete[10] & 0xFF) | ((complete[11] & 0xFF) << 8);
+                        }
+                        headParsed = true;
+                    } else if (!startsWith(complete, OPUS_TAGS) && complete.length > 0) {
+                        packets.add(complete);
+                    }
+                }
+            }
+            offset = payload;
+        }
+        return finish(channels, preSkip, packets, headParsed);
+    }
+
+    // ==================== WebM ====================
+
+    private static Demuxed demuxWebm(byte[] data) {
+        List<byte[]> packets = new ArrayList<>();
+        int channels = 1;
+        int preSkip = 0;
+        boolean opusTrack = false;
+        long opusTrackNumber = -1;
+
+        // 当前 TrackEntry 的字段
+        long entryTrackNumber = -1;
+        boolean entryIsOpus = false;
+
+        int offset = 0;
+        while (offset < data.length) {
+            int idLength = vintLength(data, offset);
+            if (idLength == 0 || offset + idLength > data.length) {
+                break;
+            }
+            long id = readUInt(data, offset, idLength);
+            offset += idLength;
+
+            int sizeLength = vintLength(data, offset);
+            if (sizeLength == 0 || offset + sizeLength > data.length) {
+                break;
+            }
+            long size = readVintValue(data, offset, sizeLength);
+            boolean unknownSize = size == (1L << (7 * sizeLength)) - 1;
+            offset += sizeLength;
+
+            if (id == SEGMENT || id == CLUSTER || id == TRACKS || id == BLOCK_GROUP || id == AUDIO) {
+                // 容器元素：进入内部继续扫描
+                continue;
+            }
+            if (id == TRACK_ENTRY) {
+                entryTrackNumber = -1;
+                entryIsOpus = false;
+                continue;
+            }
+            if (unknownSize) {
+                break;
+            }
+            int end = (int) Math.min(data.length, offset + size);
+
+            if (id == TRACK_NUMBER) {
+                entryTrackNumber = readUInt(data, offset, end - offset);
+                if (entryIsOpus) {
+                    opusTrackNumber = entryTrackNumber;
+                }
+            } else if (id == CODEC_ID) {
+                entryIsOpus = "A_OPUS".equals(new String(data, offset, end - offset, StandardCharsets.US_ASCII).trim());
+                if (entryIsOpus) {
+                    opusTrack = true;
+                    opusTrackNumber = entryTrackNumber;
+                }
+            } else if (id == CODEC_PRIVATE && end - offset >= 12 && startsWith(data, offset, OPUS_HEAD)) {
+                channels = Math.max(1, data[offset + 9] & 0xFF);
+                preSkip = (data[offset + 10] & 0xFF) | ((data[offset + 11] & 0xFF) << 8);
+            } else if (id == CHANNELS && entryIsOpus) {
+                channels = Math.max(1, (int) readUInt(data, offset, end - offset));
+            } else if (id == SIMPLE_BLOCK || id == BLOCK) {
+                byte[] frame = readBlockFrame(data, offset, end, opusTrackNumber);
+                if (frame != null) {
+                    packets.add(frame);
+                }
+            }
+            offset = end;
+        }
+        return finish(channels, preSkip, packets, opusTrack);
+    }
+
+    /**
+     * 读取 Block 中的帧：[轨道号 vint][2字节时间码][flags][帧数据]
+     */
+    private static byte[] readBlockFrame(byte[] data, int offset, int end, long trackNumber) {
+        int trackLength = vintLength(data, offset);
+        if (trackLength == 0 || offset + trackLength + 3 > end) {
+            return null;
+        }
+        long track = readVintValue(data, offset, trackLength);
+        if (trackNumber >= 0 && track != trackNumber) {
+            return null;
+        }
+        int flags = data[offset + trackLength + 2] & 0xFF;
+        if ((flags & 0x06) != 0) {
+            // lacing：MediaRecorder 不会写出，不支持
+            return null;
+        }
+        int frameStart = offset + trackLength + 3;
+        if (frameStart >= end) {
+            return null;
+        }
+        byte[] frame = new byte[end - frameStart];
+        System.arraycopy(data, frameStart, frame, 0, frame.length);
+        return frame;
+    }
+
+    // ==================== 工具 ====================
+
+    private static Demuxed finish(int channels, int preSkip, List<byte[]> packets, boolean isOpus) {
+        if (!isOpus || packets.isEmpty()) {
+            return null;
+        }
+        return new Demuxed(channels, preSkip, packets);
+    }
+
+    /**
+     * EBML 变长整数的字节数（由首字节前导零个数决定）
+     */
+    private static int vintLength(byte[] data, int offset) {
+        int first = data[offset] & 0xFF;
+        if (first == 0) {
+            return 0;
+        }
+        return Integer.numberOfLeadingZeros(first) - 23;
+    }
+
+    /**
+     * 读取 EBML 变长整数的值（去掉长度标记位）
+     */
+    private static long readVintValue(byte[] data, int offset, int length) {
+        long value = (data[offset] & 0xFF) & (0xFF >> length);
+        for (int i = 1; i < length; i++) {
+            value = (value << 8) | (data[offset + i] & 0xFF);
+        }
+        return value;
+    }
+
+    private static long readUInt(byte[] data, int offset, int length) {
+        long value = 0;
+        for (int i = 0; i < length && offset + i < data.length; i++) {
+            value = (value << 8) | (data[offset + i] & 0xFF);
+        }
+        return value;
+    }
+
+    private static boolean startsWith(byte[] data, byte[] prefix) {
+        return startsWith(data, 0, prefix);
+    }
+
+    private static boolean startsWith(byte[] data, int offset, byte[] prefix) {
+        if (offset + prefix.length > data.length) {
+            return false;
+        }
+        for (int i = 0; i < prefix.length; i++) {
+            if (data[offset + i] != prefix[i]) {
+                return false;
+            }
+        }
+        return true;
+    }
+}
@@ -0,0 +1,113 @@
+package com.miaomiao.assistant.codec;
+
+/**
+ * 会话级 Opus 编码档位
+ * <p>
+ * 采样率和声道固定（由 TTS 输出决定），按会话调整码率和帧时长：
+ * 码率越低带宽越小，帧越长下行消息数和 JNI 调用次数越少。
+ *
+ * @param bitrate         码率（bps），16000 - 64000
+ * @param frameDurationMs 帧时长（毫秒），20 / 40 / 60
+ */
+public record OpusProfile(int bitrate, int frameDurationMs) {
+
+    public static final int MIN_BITRATE = 16000;
+    public static final int MAX_BITRATE = 64000;
+
+    /**
+     * 码率档位，从高到低
+     */
+    private static final int[] BITRATE_LADDER = {64000, 48000, 32000, 24000, 16000};
+
+    /**
+     * 支持的帧时长，从短到长
+     */
+    private static final int[] FRAME_DURATIONS = {20, 40, 60};
+
+    /**
+     * 默认档位：64kbps，20ms
+     */
+    public static final OpusProfile DEFAULT = new OpusProfile(MAX_BITRATE, 20);
+
+    /**
+     * 最低档位：16kbps，60ms
+     */
+    public static final OpusProfile LOWEST = new OpusProfile(MIN_BITRATE, 60);
+
+    public OpusProfile {
+        bitrate = Math.max(MIN_BITRATE, Math.min(MAX_BITRATE, bitrate));
+        frameDurationMs = snapFrameDuration(frameDurationMs);
+    }
+
+    /**
+     * 帧时长对应的每帧采样数
+     */
+    public int frameSize(int sampleRate) {
+        return sampleRate * frameDurationMs / 1000;
+    }
+
+    /**
+     * 降一档：先降码率，码率到底后再加长帧
+     */
+    public OpusProfile stepDown() {
+        for (int candidate : BITRATE_LADDER) {
+            if (candidate < bitrate) {
+                return new OpusProfile(candidate, frameDurationMs);
+            }
+        }
+        for (int candidate : FRAME_DURATIONS) {
+            if (candidate > frameDurationMs) {
+                return new OpusProfile(bitrate, candidate);
+            }
+        }
+        return this;
+    }
+
+    /**
+     * 升一档：先缩短帧，帧到最短后再升码率，不超过上限档位
+     */
+    public OpusProfile stepUp(OpusProfile ceiling) {
+        OpusProfile next = this;
+        for (int i = FRAME_DURATIONS.length - 1; i >= 0; i--) {
+            if (FRAME_DURATIONS[i] < frameDurationMs) {
+                next = new OpusProfile(bitrate, FRAME_DURATIONS[i]);
+                break;
+            }
+        }
+        if (next == this) {
+            for (int i = BITRATE_LADDER.length - 1; i >= 0; i--) {
+                if (BITRATE_LADDER[i] > bitrate) {
+                    next = new OpusProfile(BITRATE_LADDER[i], frameDurationMs);
+                    break;
+                }
+            }
+        }
+        return next.within(ceiling);
+    }
+
+    /**
+     * 限制在上限档位之内：码率不高于上限，帧不短于上限
+     */
+    public OpusProfile within(OpusProfile ceiling) {
+        if (ceiling == null) {
+            return this;
+        }
+        return new OpusProfile(
+                Math.min(bitrate, ceiling.bitrate()),
+                Math.max(frameDurationMs, ceiling.frameDurationMs())
+        );
+    }
+
+    /**
+     * 就近取支持的帧时长
+     */
+    private static int snapFrameDuration(int frameDurationMs) {
+        int best = FRAME_DURATIONS[0];
+        for (int candidate : FRAME_DURATIONS) {
+            if (Math.abs(candidate - frameDurationMs) < Math.abs(best - frameDurationMs)) {
+                best = candidate;
+            }
+        }
+        return best;
+    }
+}
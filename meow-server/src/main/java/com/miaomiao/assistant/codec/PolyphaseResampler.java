@@ -0,0 +1,128 @@
+package com.miaomiao.assistant.codec;
+
+/**
+ * 多相 FIR 重采样器（有理数倍率 L/M）
+ * <p>
+ * 等效于先插 L-1 个零、低通滤波、再每 M 个取一个，但只计算实际输出的采样：
+ * 每个输出采样只用到滤波器的一个相位（{@code tapsPerPhase} 个系数），
+ * 48kHz -> 16kHz（L=1, M=3）时每个输出约 {@code tapsPerPhase} 次乘加。
+ * 低通截止频率取输入、输出中较低采样率的奈奎斯特频率，使用 Blackman 窗。
+ * <p>
+ * 系数在构造时计算，实例不可变、线程安全，可按采样率组合复用。
+ */
+public final class PolyphaseResampler {
+
+    private final int inputRate;
+    private final int outputRate;
+    private final int up;
+    private final int down;
+    private final int tapsPerPhase;
+
+    /**
+     * 按相位排列的系数：coefficients[phase][tap]
+     */
+    private final float[][] coefficients;
+
+    /**
+     * @param inputRate    输入采样率
+     * @param outputRate   输出采样率
+     * @param tapsPerPhase 每个相位的系数个数，越大过渡带越窄（常用 16 - 48）
+     */
+    public PolyphaseResampler(int inputRate, int outputRate, int tapsPerPhase) {
+        if (inputRate <= 0 || outputRate <= 0 || tapsPerPhase <= 0) {
+            throw new IllegalArgumentException("非法的重采样参数: " + inputRate + " -> " + outputRate);
+        }
+        int gcd = gcd(inputRate, outputRate);
+        this.inputRate = inputRate;
+        this.outputRate = outputRate;
+        this.up = outputRate / gcd;
+        this.down = inputRate / gcd;
+        this.tapsPerPhase = tapsPerPhase;
+        this.coefficients = designFilter();
+    }
+
+    public int getInputRate() {
+        return inputRate;
+    }
+
+    public int getOutputRate() {
+        return outputRate;
+    }
+
+    /**
+     * 重采样 16 位单声道 PCM
+     *
+     * @param input 输入采样
+     * @return 输出采样
+     */
+    public short[] process(short[] input) {
+        if (input.length == 0) {
+            return new short[0];
+        }
+        if (up == down) {
+            return input.clone();
+        }
+
+        int outputLength = (int) ((long) input.length * up / down);
+        short[] output = new short[outputLength];
+        // 滤波器居中对齐，补偿群延迟
+        long delay = (long) tapsPerPhase * up / 2;
+        for (int k = 0; k < outputLength; k++) {
+            long position = (long) k * down + delay;
+            int phase = (int) (position % up);
+            int base = (int) (position / up);
+            float[] taps = coefficients[phase];
+
+            double sum = 0;
+            for (int j = 0; j < tapsPerPhase; j++) {
+                int index = base - j;
+                if (index >= 0 && index < input.length) {
+                    sum += taps[j] * input[index];
+                }
+            }
+            output[k] = clamp(sum);
+        }
+        return output;
+    }
+
+    /**
+     * 设计原型低通滤波器（工作在 inputRate * up 上），按相位拆分
+     */
+    private float[][] designFilter() {
+        int length = tapsPerPhase * up;
+        // 截止频率（相对上采样后的采样率），留 10% 过渡带
+        double cutoff = 0.5 * Math.min(1.0, (double) up / down) / up * 0.9;
+        double center = (length - 1) / 2.0;
+
+        float[][] phases = new float[up][tapsPerPhase];
+        for (int n = 0; n < length; n++) {
+            double x = n - center;
+            double sinc = x == 0 ? 2 * cutoff : Math.sin(2 * Math.PI * cutoff * x) / (Math.PI * x);
+            double window = 0.42 - 0.5 * Math.cos(2 * Math.PI * n / (length - 1))
+                    + 0.08 * Math.cos(4 * Math.PI * n / (length - 1));
+            // 乘以 up 补偿插零带来的幅度损失
+            phases[n % up][n / up] = (float) (sinc * window * up);
+        }
+        return phases;
+    }
+
+    private static short clamp(double value) {
+        long rounded = Math.round(value);
+        if (rounded > Short.MAX_VALUE) {
+            return Short.MAX_VALUE;
+        }
+        if (rounded < Short.MIN_VALUE) {
+            return Short.MIN_VALUE;
+        }
+        return (short) rounded;
+    }
+
+    private static int gcd(int a, int b) {
+        while (b != 0) {
+            int t = a % b;
+            a = b;
+            b = t;
+        }
+        return a;
+    }
+}
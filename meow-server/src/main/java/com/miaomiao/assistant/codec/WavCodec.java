@@ -0,0 +1,144 @@
+package com.miaomiao.assistant.codec;
+
+import java.nio.ByteBuffer;
+import java.nio.ByteOrder;
+
+/**
+ * WAV 封装工具
+ * <p>
+ * 写出时只生成 16 位小端 PCM 的标准 44 字节头；解析时按 chunk 遍历，兼容带 LIST 等附加 chunk 的文件。
+ */
+public final class WavCodec {
+
+    public static final int HEADER_BYTES = 44;
+
+    private WavCodec() {
+    }
+
+    /**
+     * WAV 文件中 PCM 数据的位置和格式
+     *
+     * @param sampleRate    采样率
+     * @param channels      声道数
+     * @param bitsPerSample 采样位数
+     * @param dataOffset    data chunk 载荷起始偏移
+     * @param dataLength    data chunk 载荷长度（已按文件实际长度截断）
+     */
+    public record WavInfo(int sampleRate, int channels, int bitsPerSample, int dataOffset, int dataLength) {
+
+        /**
+         * 是否是 16 位 PCM
+         */
+        public boolean isPcm16() {
+            return bitsPerSample == 16;
+        }
+
+        /**
+         * 每帧（所有声道各一个采样）的字节数
+         */
+        public int frameBytes() {
+            return channels * bitsPerSample / 8;
+        }
+
+        /**
+         * 音频时长（毫秒）
+         */
+        public long durationMs() {
+            long bytesPerSecond = (long) sampleRate * frameBytes();
+            return bytesPerSecond == 0 ? 0 : dataLength * 1000L / bytesPerSecond;
+        }
+    }
+
+    /**
+     * 解析 WAV 头
+     *
+     * @return 非 RIFF/WAVE 或非 PCM 编码时返回 null
+     */
+    public static WavInfo parse(byte[] wav) {
+        if (wav == null || wav.length < 12
+                || !matches(wav, 0, "RIFF") || !matches(wav, 8, "WAVE")) {
+            return null;
+        }
+        ByteBuffer buffer = ByteBuffer.wrap(wav).order(ByteOrder.LITTLE_ENDIAN);
+        int sampleRate = 0;
+        int channels = 0;
+        int bitsPerSample = 0;
+        boolean hasFormat = false;
+
+        int offset = 12;
+        while (offset + 8 <= wav.length) {
+            int chunkSize = buffer.getInt(offset + 4);
+            int payload = offset + 8;
+            if (matches(wav, offset, "fmt ")) {
+                if (chunkSize < 16 || payload + 16 > wav.length) {
+                    return null;
+                }
+                int audioFormat = buffer.getShort(payload) & 0xFFFF;
+                // 1 = PCM，0xFFFE = WAVE_FORMAT_EXTENSIBLE（子格式按 PCM 处理）
+                if (audioFormat != 1 && audioFormat != 0xFFFE) {
+                    return null;
+                }
+                channels = buffer.getShort(payload + 2) & 0xFFFF;
+                sampleRate = buffer.getInt(payload + 4);
+                bitsPerSample = buffer.getShort(payload + 14) & 0xFFFF;
+                hasFormat = true;
+            } else if (matches(wav, offset, "data")) {
+                if (!hasFormat || channels <= 0 || sampleRate <= 0) {
+                    return null;
+                }
+                // 流式写出的 WAV 可能把 data 长度写成 0 或 0xFFFFFFFF，以文件实际长度为准
+                int available = wav.length - payload;
+                int dataLength = chunkSize <= 0 || chunkSize > available ? available : chunkSize;
+                return new WavInfo(sampleRate, channels, bitsPerSample, payload, dataLength);
+            }
+            if (chunkSize < 0) {
+                return null;
+            }
+            // chunk 按偶数字节对齐
+            offset = payload + chunkSize + (chunkSize & 1);
+        }
+        return null;
+    }
+
+    private static boolean matches(byte[] data, int offset, String tag) {
+        if (offset + 4 > data.length) {
+            return false;
+        }
+        for (int i = 0; i < 4; i++) {
+            if (data[offset + i] != tag.charAt(i)) {
+                return false;
+            }
+        }
+        return true;
+    }
+
+    /**
+     * 把 16 位小端 PCM 封装为 WAV
+     *
+     * @param pcm        PCM 数据
+     * @param sampleRate 采样率
+     * @param channels   声道数
+     */
+    public static byte[] toWav(byte[] pcm, int sampleRate, int channels) {
+        int dataLength = pcm == null ? 0 : pcm.length;
+        int blockAlign = channels * 2;
+        ByteBuffer buffer = ByteBuffer.allocate(HEADER_BYTES + dataLength).order(ByteOrder.LITTLE_ENDIAN);
+        buffer.put(new byte[]{'R', 'I', 'F', 'F'});
+        buffer.putInt(36 + dataLength);
+        buffer.put(new byte[]{'W', 'A', 'V', 'E'});
+        buffer.put(new byte[]{'f', 'm', 't', ' '});
+        buffer.putInt(16);
+        buffer.putShort((short) 1);
+        buffer.putShort((short) channels);
+        buffer.putInt(sampleRate);
+        buffer.putInt(sampleRate * blockAlign);
+        buffer.putShort((short) blockAlign);
+        buffer.putShort((short) 16);
+        buffer.put(new byte[]{'d', 'a', 't', 'a'});
+        buffer.putInt(dataLength);
+        if (dataLength > 0) {
+            buffer.put(pcm);
+        }
+        return buffer.array();
+    }
+}
@@ -3,6 +3,7 @@ package com.miaomiao.assistant.config;
 import ai.z.openapi.ZhipuAiClient;
 import lombok.RequiredArgsConstructor;
 import lombok.extern.slf4j.Slf4j;
+import okhttp3.ConnectionPool;
 import org.springframework.context.annotation.Bean;
 import org.springframework.context.annotation.Configuration;
 
@@ -16,9 +17,10 @@ import org.springframework.context.annotation.Configuration;
 public class AIClientConfig {
 
     private final AIServiceConfig aiServiceConfig;
+    private final ConnectionPool httpConnectionPool;
 
     /**
-     * 智谱AI客户端（全局单例）
+     * 智谱AI客户端（全局单例），与共享 HTTP 连接层使用同一个连接池
      */
     @Bean
     public ZhipuAiClient zhipuAiClient() {
@@ -29,7 +31,9 @@ public class AIClientConfig {
         }
 
         log.info("初始化智谱AI客户端 (tokenCache={})", config.getEnableTokenCache());
-        ZhipuAiClient.Builder builder = ZhipuAiClient.builder().apiKey(config.getApiKey());
+        ZhipuAiClient.Builder builder = ZhipuAiClient.builder()
+                .apiKey(config.getApiKey())
+                .connectionPool(httpConnectionPool);
         if (config.getEnableTokenCache()) {
             builder.enableTokenCache().tokenExpire(config.getTokenExpire());
         }
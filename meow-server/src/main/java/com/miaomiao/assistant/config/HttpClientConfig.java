@@ -0,0 +1,117 @@
+package com.miaomiao.assistant.config;
+
+import com.miaomiao.assistant.http.CachingDns;
+import com.miaomiao.assistant.http.HttpClientMetrics;
+import lombok.extern.slf4j.Slf4j;
+import okhttp3.ConnectionPool;
+import okhttp3.Dispatcher;
+import okhttp3.Dns;
+import okhttp3.OkHttpClient;
+import okhttp3.Protocol;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.context.annotation.Bean;
+import org.springframework.context.annotation.Configuration;
+
+import java.util.List;
+import java.util.concurrent.TimeUnit;
+
+/**
+ * 共享 HTTP 连接层
+ * <p>
+ * ASR / LLM / TTS 的 HTTP 调用共用一个连接池、调度器和 DNS 缓存：
+ * 1. 连接池保持长连接，配合 {@link com.miaomiao.assistant.http.ConnectionPrewarmer} 定时预热，首 token / 首音频不再承担握手
+ * 2. 优先协商 HTTP/2，同一主机的并发请求复用一条连接；HTTP/1.1 时按主机限制并发请求数
+ * 3. 各 provider 通过 {@link OkHttpClient#newBuilder()} 派生自己的超时配置，仍共享连接池
+ * <p>
+ * 智谱 SDK 客户端使用同一个连接池，其请求计入池统计，但不经过本层的 DNS 缓存和调用计时。
+ */
+@Slf4j
+@Configuration
+public class HttpClientConfig {
+
+    /**
+     * 连接池最多保留的空闲连接数
+     */
+    @Value("${http.pool.max-idle-connections:32}")
+    private int maxIdleConnections = 32;
+
+    /**
+     * 空闲连接保活时间（秒），应大于预热间隔
+     */
+    @Value("${http.pool.keep-alive-seconds:300}")
+    private long keepAliveSeconds = 300;
+
+    /**
+     * 全局最大并发请求数
+     */
+    @Value("${http.dispatcher.max-requests:256}")
+    private int maxRequests = 256;
+
+    /**
+     * 每个主机的最大并发请求数（HTTP/1.1 时即该主机最多同时占用的连接数）
+     */
+    @Value("${http.dispatcher.max-requests-per-host:32}")
+    private int maxRequestsPerHost = 32;
+
+    /**
+     * DNS 缓存有效期（秒），0 表示不缓存
+     */
+    @Value("${http.dns.ttl-seconds:300}")
+    private long dnsTtlSeconds = 300;
+
+    /**
+     * HTTP/2 连接的 PING 间隔（秒），用于保活和尽早发现断开的连接，0 表示不发送
+     */
+    @Value("${http.ping-interval-seconds:30}")
+    private long pingIntervalSeconds = 30;
+
+    @Value("${http.connect-timeout-ms:10000}")
+    private long connectTimeoutMs = 10000;
+
+    @Value("${http.read-timeout-ms:120000}")
+    private long readTimeoutMs = 120000;
+
+    @Value("${http.write-timeout-ms:30000}")
+    private long writeTimeoutMs = 30000;
+
+    @Bean
+    public ConnectionPool httpConnectionPool() {
+        return new ConnectionPool(maxIdleConnections, keepAliveSeconds, TimeUnit.SECONDS);
+    }
+
+    @Bean
+    public CachingDns cachingDns() {
+        return new CachingDns(Dns.SYSTEM, dnsTtlSeconds);
+    }
+
+    @Bean
+    public HttpClientMetrics httpClientMetrics(ConnectionPool httpConnectionPool, CachingDns cachingDns) {
+        return new HttpClientMetrics(httpConnectionPool, cachingDns);
+    }
+
+    /**
+     * 共享的 OkHttpClient（全局单例）
+     */
+    @Bean
+    public OkHttpClient sharedHttpClient(ConnectionPool httpConnectionPool, CachingDns cachingDns,
+                                         HttpClientMetrics httpClientMetrics) {
+        Dispatcher dispatcher = new Dispatcher();
+        dispatcher.setMaxRequests(maxRequests);
+        dispatcher.setMaxRequestsPerHost(maxRequestsPerHost);
+
+        log.info("初始化共享 HTTP 客户端: maxIdle={}, keepAlive={}s, maxRequestsPerHost={}, dnsTtl={}s",
+                maxIdleConnections, keepAliveSeconds, maxRequestsPerHost, dnsTtlSeconds);
+        return new OkHttpClient.Builder()
+                .connectionPool(httpConnectionPool)
+                .dispatcher(dispatcher)
+                .dns(cachingDns)
+                .eventListenerFactory(httpClientMetrics)
+                .protocols(List.of(Protocol.HTTP_2, Protocol.HTTP_1_1))
+                .pingInterval(pingIntervalSeconds, TimeUnit.SECONDS)
+                .retryOnConnectionFailure(true)
+                .connectTimeout(connectTimeoutMs, TimeUnit.MILLISECONDS)
+                .readTimeout(readTimeoutMs, TimeUnit.MILLISECONDS)
+                .writeTimeout(writeTimeoutMs, TimeUnit.MILLISECONDS)
+                .build();
+    }
+}
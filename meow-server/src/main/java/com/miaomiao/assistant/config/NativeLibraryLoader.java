@@ -8,12 +8,17 @@ import org.springframework.stereotype.Component;
 import org.springframework.util.StringUtils;
 
 import java.io.File;
+import java.io.InputStream;
+import java.nio.file.Files;
+import java.nio.file.Path;
 import java.nio.file.Paths;
+import java.nio.file.StandardCopyOption;
 
 /**
  * Native库加载配置
  * 用于加载Opus编码的native库
  * 支持通过配置文件指定native库所在文件夹: native.opus.library-dir
+ * 未指定且本地找不到时，从 classpath 中随包分发的库文件解压到临时目录后加载
  */
 @Slf4j
 @Component
@@ -21,6 +26,14 @@ public class NativeLibraryLoader {
 
     private static final String LIBRARY_NAME = "opus-jni-native";
 
+    /**
+     * classpath 中随包分发的库文件位置（按优先级）：
+     * 1. 本项目 resources 下的 native/平台/库文件
+     * 2. opus-jni jar 自带的 native-binaries（包含 Linux x64 和 Windows x64 构建）
+     */
+    private static final String RESOURCE_DIR = "native/";
+    private static final String OPUS_JNI_RESOURCE_DIR = "native-binaries/";
+
     /**
      * 配置文件指定的native库所在文件夹路径
      * 可以是绝对路径，如: D:/libs/native 或 /opt/native
@@ -85,7 +98,12 @@ public class NativeLibraryLoader {
             }
         }
 
-        // 3. 尝试从系统库路径加载
+        // 3. 从 classpath 解压随包分发的库文件
+        if (loadFromClasspath(platform, libraryFileName)) {
+            return;
+        }
+
+        // 4. 尝试从系统库路径加载
         try {
             System.loadLibrary(LIBRARY_NAME);
             loaded = true;
@@ -119,6 +137,50 @@ public class NativeLibraryLoader {
         return false;
     }
 
+    /**
+     * 从 classpath 解压 native 库到临时目录并加载
+     */
+    private boolean loadFromClasspath(String platform, String libraryFileName) {
+        String[] resources = {
+                RESOURCE_DIR + platform + "/" + libraryFileName,
+                OPUS_JNI_RESOURCE_DIR + getBundledLibraryFileName()
+        };
+        ClassLoader classLoader = getClass().getClassLoader();
+        for (String resource : resources) {
+            try (InputStream in = classLoader.getResourceAsStream(resource)) {
+                if (in == null) {
+                    continue;
+                }
+                Path tempDir = Files.createTempDirectory("opus-jni");
+                Path target = tempDir.resolve(libraryFileName);
+                Files.copy(in, target, StandardCopyOption.REPLACE_EXISTING);
+                target.toFile().deleteOnExit();
+                tempDir.toFile().deleteOnExit();
+
+                System.load(target.toAbsolutePath().toString());
+                loaded = true;
+                nativeDirectory = tempDir.toFile();
+                log.info("从classpath加载Opus native库成功: {} -> {}", resource, target);
+                return true;
+            } catch (Exception | UnsatisfiedLinkError e) {
+                log.warn("从classpath加载native库失败 [{}]: {}", resource, e.getMessage());
+            }
+        }
+        return false;
+    }
+
+    /**
+     * opus-jni jar 内的库文件名
+     */
+    private String getBundledLibraryFileName() {
+        String osName = System.getProperty("os.name").toLowerCase();
+        if (osName.contains("win")) {
+            return LIBRARY_NAME + "-64.dll";
+        } else {
+            return "lib" + LIBRARY_NAME + "-64.so";
+        }
+    }
+
     /**
      * 检测平台，仅支持64位Windows和Linux
      */
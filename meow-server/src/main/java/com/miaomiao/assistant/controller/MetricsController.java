@@ -0,0 +1,120 @@
+package com.miaomiao.assistant.controller;
+
+import com.miaomiao.assistant.codec.OpusCodecPool;
+import com.miaomiao.assistant.http.HttpClientMetrics;
+import com.miaomiao.assistant.websocket.service.ASRService;
+import com.miaomiao.assistant.websocket.service.HistorySummarizer;
+import com.miaomiao.assistant.websocket.service.LLMModelRace;
+import com.miaomiao.assistant.websocket.service.LLMResponseCache;
+import com.miaomiao.assistant.websocket.service.NearDuplicateQuestionIndex;
+import com.miaomiao.assistant.websocket.service.SpeculativeLLMService;
+import com.miaomiao.assistant.websocket.session.OutboundMetrics;
+import com.miaomiao.assistant.websocket.session.OutboundQueue;
+import com.miaomiao.assistant.websocket.session.WebSocketMessageSender;
+import lombok.RequiredArgsConstructor;
+import org.springframework.http.ResponseEntity;
+import org.springframework.web.bind.annotation.GetMapping;
+import org.springframework.web.bind.annotation.RequestMapping;
+import org.springframework.web.bind.annotation.RestController;
+
+import java.util.List;
+
+/**
+ * 运行指标 Controller
+ * 暴露各组件的运行统计，便于排查性能问题
+ */
+@RestController
+@RequestMapping("/api/metrics")
+@RequiredArgsConstructor
+public class MetricsController {
+
+    private final OpusCodecPool opusCodecPool;
+    private final WebSocketMessageSender messageSender;
+    private final ASRService asrService;
+    private final SpeculativeLLMService speculativeLLMService;
+    private final LLMResponseCache llmResponseCache;
+    private final NearDuplicateQuestionIndex nearDuplicateQuestionIndex;
+    private final HttpClientMetrics httpClientMetrics;
+    private final HistorySummarizer historySummarizer;
+    private final LLMModelRace llmModelRace;
+
+    /**
+     * Opus codec 池统计：命中率、等待耗时、借出/空闲数量、疑似泄漏数
+     */
+    @GetMapping("/opus-pool")
+    public ResponseEntity<OpusCodecPool.Stats> getOpusPoolStats() {
+        return ResponseEntity.ok(opusCodecPool.getStats());
+    }
+
+    /**
+     * WebSocket 下行队列汇总统计：队列深度、排队/发送耗时、丢弃和合并次数
+     */
+    @GetMapping("/outbound")
+    public ResponseEntity<OutboundMetrics.Snapshot> getOutboundStats() {
+        return ResponseEntity.ok(messageSender.getMetrics());
+    }
+
+    /**
+     * 各会话下行队列统计
+     */
+    @GetMapping("/outbound/sessions")
+    public ResponseEntity<List<OutboundQueue.Stats>> getOutboundSessionStats() {
+        return ResponseEntity.ok(messageSender.getQueueStats());
+    }
+
+    /**
+     * ASR 前置闸门统计：拒绝/裁剪次数、节省的上传字节
+     */
+    @GetMapping("/asr-gate")
+    public ResponseEntity<ASRService.GateStats> getAsrGateStats() {
+        return ResponseEntity.ok(asrService.getGateStats());
+    }
+
+    /**
+     * LLM 推测执行统计：命中率、重新推测次数、命中时提前的时间
+     */
+    @GetMapping("/llm-speculation")
+    public ResponseEntity<SpeculativeLLMService.Stats> getLlmSpeculationStats() {
+        return ResponseEntity.ok(speculativeLLMService.getStats());
+    }
+
+    /**
+     * LLM 回复缓存统计：命中率、条目数和占用字节、节省的首 token 与生成时间
+     */
+    @GetMapping("/llm-cache")
+    public ResponseEntity<LLMResponseCache.Stats> getLlmCacheStats() {
+        return ResponseEntity.ok(llmResponseCache.getStats());
+    }
+
+    /**
+     * 近似重复问题索引统计：本可命中/实际采用次数、查找耗时、最近邻距离分布（用于调整阈值）
+     */
+    @GetMapping("/llm-near-duplicate")
+    public ResponseEntity<NearDuplicateQuestionIndex.Stats> getLlmNearDuplicateStats() {
+        return ResponseEntity.ok(nearDuplicateQuestionIndex.getStats());
+    }
+
+    /**
+     * 快模型与主模型竞速统计：双方胜出次数、首句耗时、被取消一路浪费的 token、估算节省的时间
+     */
+    @GetMapping("/llm-race")
+    public ResponseEntity<LLMModelRace.Stats> getLlmRaceStats() {
+        return ResponseEntity.ok(llmModelRace.getStats());
+    }
+
+    /**
+     * 对话历史压缩统计：摘要次数、失败次数、移出近期历史的消息数、平均摘要耗时
+     */
+    @GetMapping("/llm-history")
+    public ResponseEntity<HistorySummarizer.Stats> getLlmHistoryStats() {
+        return ResponseEntity.ok(historySummarizer.getStats());
+    }
+
+    /**
+     * 共享 HTTP 连接层统计：连接复用率、业务请求上的新建连接数、DNS / 建连 / TLS / 首个响应头耗时、连接池占用
+     */
+    @GetMapping("/http")
+    public ResponseEntity<HttpClientMetrics.Snapshot> getHttpStats() {
+        return ResponseEntity.ok(httpClientMetrics.snapshot());
+    }
+}
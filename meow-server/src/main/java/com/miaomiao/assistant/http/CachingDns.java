@@ -0,0 +1,80 @@
+package com.miaomiao.assistant.http;
+
+import lombok.extern.slf4j.Slf4j;
+import okhttp3.Dns;
+
+import java.net.InetAddress;
+import java.net.UnknownHostException;
+import java.util.List;
+import java.util.Map;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicLong;
+
+/**
+ * 带缓存的 DNS 解析
+ * <p>
+ * 解析结果在 TTL 内直接复用；过期后重新解析，解析失败时继续使用过期结果，
+ * 避免 DNS 抖动让建连失败。
+ */
+@Slf4j
+public class CachingDns implements Dns {
+
+    private record CachedLookup(List<InetAddress> addresses, long expiresAtNanos) {
+    }
+
+    private final Dns delegate;
+    private final long ttlNanos;
+    private final Map<String, CachedLookup> cache = new ConcurrentHashMap<>();
+
+    private final AtomicLong hits = new AtomicLong();
+    private final AtomicLong misses = new AtomicLong();
+    private final AtomicLong staleServed = new AtomicLong();
+
+    /**
+     * @param delegate   实际解析器
+     * @param ttlSeconds 缓存有效期（秒），0 表示不缓存
+     */
+    public CachingDns(Dns delegate, long ttlSeconds) {
+        this.delegate = delegate;
+        this.ttlNanos = TimeUnit.SECONDS.toNanos(Math.max(0, ttlSeconds));
+    }
+
+    @Override
+    public List<InetAddress> lookup(String hostname) throws UnknownHostException {
+        long now = System.nanoTime();
+        CachedLookup cached = cache.get(hostname);
+        if (cached != null && now - cached.expiresAtNanos() < 0) {
+            hits.incrementAndGet();
+            return cached.addresses();
+        }
+
+        misses.incrementAndGet();
+        try {
+            List<InetAddress> addresses = delegate.lookup(hostname);
+            if (ttlNanos > 0 && !addresses.isEmpty()) {
+                cache.put(hostname, new CachedLookup(List.copyOf(addresses), now + ttlNanos));
+            }
+            return addresses;
+        } catch (UnknownHostException e) {
+            if (cached != null) {
+                staleServed.incrementAndGet();
+                log.warn("DNS 解析失败，使用过期结果: host={}, error={}", hostname, e.getMessage());
+                return cached.addresses();
+            }
+            throw e;
+        }
+    }
+
+    public long getHits() {
+        return hits.get();
+    }
+
+    public long getMisses() {
+        return misses.get();
+    }
+
+    public long getStaleServed() {
+        return staleServed.get();
+    }
+}
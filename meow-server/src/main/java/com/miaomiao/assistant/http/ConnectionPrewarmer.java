@@ -0,0 +1,122 @@
+package com.miaomiao.assistant.http;
+
+import com.miaomiao.assistant.config.AIServiceConfig;
+import lombok.RequiredArgsConstructor;
+import lombok.extern.slf4j.Slf4j;
+import okhttp3.Call;
+import okhttp3.Callback;
+import okhttp3.HttpUrl;
+import okhttp3.OkHttpClient;
+import okhttp3.Request;
+import okhttp3.Response;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.boot.context.event.ApplicationReadyEvent;
+import org.springframework.context.event.EventListener;
+import org.springframework.scheduling.annotation.Scheduled;
+import org.springframework.stereotype.Component;
+
+import java.io.IOException;
+import java.util.LinkedHashSet;
+import java.util.List;
+import java.util.Set;
+
+/**
+ * HTTP 连接预热
+ * <p>
+ * 应用启动后及之后每隔 {@code http.prewarm.interval-ms}，向各 provider 主机发送 HEAD 请求，
+ * 让共享连接池里始终有已完成 DNS、TCP 和 TLS 的空闲连接，业务请求直接复用。
+ * 预热间隔应小于连接池保活时间（{@code http.pool.keep-alive-seconds}）和服务端的空闲断开时间。
+ * <p>
+ * 目标主机为 {@code http.prewarm.urls} 加上各 provider 配置的 baseUrl。
+ */
+@Slf4j
+@Component
+@RequiredArgsConstructor
+public class ConnectionPrewarmer {
+
+    private final OkHttpClient sharedHttpClient;
+    private final AIServiceConfig aiServiceConfig;
+
+    /**
+     * 是否启用预热
+     */
+    @Value("${http.prewarm.enabled:true}")
+    private boolean enabled = true;
+
+    /**
+     * 额外的预热地址（逗号分隔），只取 scheme、主机和端口
+     */
+    @Value("${http.prewarm.urls:https://open.bigmodel.cn/}")
+    private List<String> urls = List.of("https://open.bigmodel.cn/");
+
+    /**
+     * 每个主机预热的连接数（HTTP/2 下并发请求共用一条连接，1 即可）
+     */
+    @Value("${http.prewarm.connections-per-host:1}")
+    private int connectionsPerHost = 1;
+
+    @EventListener(ApplicationReadyEvent.class)
+    public void prewarmOnStartup() {
+        prewarm();
+    }
+
+    /**
+     * 定时预热
+     */
+    @Scheduled(initialDelayString = "${http.prewarm.interval-ms:60000}", fixedDelayString = "${http.prewarm.interval-ms:60000}")
+    public void prewarm() {
+        if (!enabled) {
+            return;
+        }
+        for (HttpUrl origin : origins()) {
+            Request request = new Request.Builder()
+                    .url(origin)
+                    .head()
+                    .tag(HttpClientMetrics.Prewarm.class, HttpClientMetrics.Prewarm.INSTANCE)
+                    .build();
+            for (int i = 0; i < Math.max(1, connectionsPerHost); i++) {
+                sharedHttpClient.newCall(request).enqueue(new Callback() {
+                    @Override
+                    public void onResponse(Call call, Response response) {
+                        response.close();
+                    }
+
+                    @Override
+                    public void onFailure(Call call, IOException e) {
+                        log.debug("HTTP 连接预热失败: url={}, error={}", origin, e.getMessage());
+                    }
+                });
+            }
+        }
+    }
+
+    /**
+     * 需要预热的源（scheme + 主机 + 端口），去重
+     */
+    private Set<HttpUrl> origins() {
+        Set<HttpUrl> origins = new LinkedHashSet<>();
+        for (String url : urls) {
+            addOrigin(origins, url);
+        }
+        for (AIServiceConfig.ProviderConfig provider : aiServiceConfig.getProviders().values()) {
+            if (provider.isEnabled()) {
+                addOrigin(origins, provider.getBaseUrl());
+            }
+        }
+        return origins;
+    }
+
+    private static void addOrigin(Set<HttpUrl> origins, String url) {
+        if (url == null || url.isBlank()) {
+            return;
+        }
+        HttpUrl parsed = HttpUrl.parse(url.trim());
+        if (parsed != null) {
+            origins.add(new HttpUrl.Builder()
+                    .scheme(parsed.scheme())
+                    .host(parsed.host())
+                    .port(parsed.port())
+                    .build());
+        }
+    }
+}
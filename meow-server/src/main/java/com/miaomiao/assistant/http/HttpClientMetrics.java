@@ -0,0 +1,220 @@
+package com.miaomiao.assistant.http;
+
+import okhttp3.Call;
+import okhttp3.Connection;
+import okhttp3.ConnectionPool;
+import okhttp3.EventListener;
+import okhttp3.Handshake;
+import okhttp3.Protocol;
+import okhttp3.Response;
+
+import java.io.IOException;
+import java.net.InetAddress;
+import java.net.InetSocketAddress;
+import java.net.Proxy;
+import java.util.List;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicLong;
+
+/**
+ * 共享 HTTP 连接层的调用统计
+ * <p>
+ * 通过 OkHttp {@link EventListener} 记录每次调用的 DNS、TCP + TLS 建连、首个响应头耗时，
+ * 以及连接是新建还是复用。预热请求（带 {@link Prewarm} 标签）单独计数，
+ * 业务请求上的新建连接数即首 token / 首音频仍在承担握手开销的次数。
+ */
+public class HttpClientMetrics extends EventListener.Factory {
+
+    /**
+     * 预热请求标签
+     */
+    public static final class Prewarm {
+        public static final Prewarm INSTANCE = new Prewarm();
+
+        private Prewarm() {
+        }
+    }
+
+    private final ConnectionPool connectionPool;
+    private final CachingDns dns;
+
+    private final AtomicLong calls = new AtomicLong();
+    private final AtomicLong failedCalls = new AtomicLong();
+    private final AtomicLong prewarmCalls = new AtomicLong();
+    private final AtomicLong reusedConnections = new AtomicLong();
+    private final AtomicLong newConnections = new AtomicLong();
+    private final AtomicLong newConnectionsOnLiveCalls = new AtomicLong();
+    private final AtomicLong http2Connections = new AtomicLong();
+    private final AtomicLong dnsCount = new AtomicLong();
+    private final AtomicLong dnsNanos = new AtomicLong();
+    private final AtomicLong connectCount = new AtomicLong();
+    private final AtomicLong connectNanos = new AtomicLong();
+    private final AtomicLong maxConnectNanos = new AtomicLong();
+    private final AtomicLong tlsCount = new AtomicLong();
+    private final AtomicLong tlsNanos = new AtomicLong();
+    private final AtomicLong headersCount = new AtomicLong();
+    private final AtomicLong headersNanos = new AtomicLong();
+
+    public HttpClientMetrics(ConnectionPool connectionPool, CachingDns dns) {
+        this.connectionPool = connectionPool;
+        this.dns = dns;
+    }
+
+    @Override
+    public EventListener create(Call call) {
+        return new CallListener(call.request().tag(Prewarm.class) != null);
+    }
+
+    /**
+     * 单次调用的计时（OkHttp 对同一调用的事件串行回调）
+     */
+    private final class CallListener extends EventListener {
+
+        private final boolean prewarm;
+        private long callStartNanos;
+        private long dnsStartNanos;
+        private long connectStartNanos;
+        private long tlsStartNanos;
+        private boolean connected;
+
+        private CallListener(boolean prewarm) {
+            this.prewarm = prewarm;
+        }
+
+        @Override
+        public void callStart(Call call) {
+            callStartNanos = System.nanoTime();
+            if (prewarm) {
+                prewarmCalls.incrementAndGet();
+            } else {
+                calls.incrementAndGet();
+            }
+        }
+
+        @Override
+        public void dnsStart(Call call, String domainName) {
+            dnsStartNanos = System.nanoTime();
+        }
+
+        @Override
+        public void dnsEnd(Call call, String domainName, List<InetAddress> inetAddressList) {
+            dnsCount.incrementAndGet();
+            dnsNanos.addAndGet(System.nanoTime() - dnsStartNanos);
+        }
+
+        @Override
+        public void connectStart(Call call, InetSocketAddress inetSocketAddress, Proxy proxy) {
+            connectStartNanos = System.nanoTime();
+        }
+
+        @Override
+        public void secureConnectStart(Call call) {
+            tlsStartNanos = System.nanoTime();
+        }
+
+        @Override
+        public void secureConnectEnd(Call call, Handshake handshake) {
+            tlsCount.incrementAndGet();
+            tlsNanos.addAndGet(System.nanoTime() - tlsStartNanos);
+        }
+
+        @Override
+        public void connectEnd(Call call, InetSocketAddress inetSocketAddress, Proxy proxy, Protocol protocol) {
+            long elapsed = System.nanoTime() - connectStartNanos;
+            connected = true;
+            connectCount.incrementAndGet();
+            connectNanos.addAndGet(elapsed);
+            maxConnectNanos.accumulateAndGet(elapsed, Math::max);
+            if (protocol == Protocol.HTTP_2) {
+                http2Connections.incrementAndGet();
+            }
+        }
+
+        @Override
+        public void connectionAcquired(Call call, Connection connection) {
+            if (connected) {
+                newConnections.incrementAndGet();
+                if (!prewarm) {
+                    newConnectionsOnLiveCalls.incrementAndGet();
+                }
+            } else {
+                reusedConnections.incrementAndGet();
+            }
+        }
+
+        @Override
+        public void responseHeadersEnd(Call call, Response response) {
+            if (!prewarm) {
+                headersCount.incrementAndGet();
+                headersNanos.addAndGet(System.nanoTime() - callStartNanos);
+            }
+        }
+
+        @Override
+        public void callFailed(Call call, IOException ioe) {
+            if (!prewarm) {
+                failedCalls.incrementAndGet();
+            }
+        }
+    }
+
+    public Snapshot snapshot() {
+        long reused = reusedConnections.get();
+        long created = newConnections.get();
+        long acquired = reused + created;
+        return new Snapshot(
+                calls.get(),
+                failedCalls.get(),
+                prewarmCalls.get(),
+                reused,
+                created,
+                newConnectionsOnLiveCalls.get(),
+                acquired == 0 ? 0 : (double) reused / acquired,
+                http2Connections.get(),
+                connectionPool.connectionCount(),
+                connectionPool.idleConnectionCount(),
+                average(dnsNanos, dnsCount),
+                average(connectNanos, connectCount),
+                TimeUnit.NANOSECONDS.toMicros(maxConnectNanos.get()) / 1000.0,
+                average(tlsNanos, tlsCount),
+                average(headersNanos, headersCount),
+                dns.getHits(),
+                dns.getMisses(),
+                dns.getStaleServed()
+        );
+    }
+
+    private static double average(AtomicLong totalNanos, AtomicLong count) {
+        long n = count.get();
+        return n == 0 ? 0 : TimeUnit.NANOSECONDS.toMicros(totalNanos.get()) / 1000.0 / n;
+    }
+
+    /**
+     * HTTP 连接层统计
+     *
+     * @param calls                     业务请求数
+     * @param failedCalls               失败的业务请求数
+     * @param prewarmCalls              预热请求数
+     * @param reusedConnections         复用池中连接的次数（含预热请求）
+     * @param newConnections            新建连接数（含预热请求）
+     * @param newConnectionsOnLiveCalls 业务请求上新建的连接数（这些请求承担了握手开销）
+     * @param reuseRatio                连接复用率
+     * @param http2Connections          协商为 HTTP/2 的新建连接数
+     * @param poolConnections           池中当前连接数
+     * @param poolIdleConnections       池中当前空闲连接数
+     * @param avgDnsMs                  平均 DNS 解析耗时（毫秒，仅实际解析）
+     * @param avgConnectMs              平均建连耗时（TCP + TLS，毫秒）
+     * @param maxConnectMs              最大建连耗时（毫秒）
+     * @param avgTlsMs                  平均 TLS 握手耗时（毫秒）
+     * @param avgTimeToHeadersMs        业务请求从发起到收到响应头的平均耗时（毫秒）
+     * @param dnsCacheHits              DNS 缓存命中次数
+     * @param dnsCacheMisses            DNS 缓存未命中次数
+     * @param dnsStaleServed            解析失败时使用过期结果的次数
+     */
+    public record Snapshot(long calls, long failedCalls, long prewarmCalls, long reusedConnections,
+                           long newConnections, long newConnectionsOnLiveCalls, double reuseRatio,
+                           long http2Connections, int poolConnections, int poolIdleConnections,
+                           double avgDnsMs, double avgConnectMs, double maxConnectMs, double avgTlsMs,
+                           double avgTimeToHeadersMs, long dnsCacheHits, long dnsCacheMisses, long dnsStaleServed) {
+    }
+}
@@ -4,6 +4,7 @@ import ai.z.openapi.ZhipuAiClient;
 import com.miaomiao.assistant.config.AIServiceConfig;
 import com.miaomiao.assistant.model.AbstractModelManager;
 import com.miaomiao.assistant.model.asr.provider.ZhipuASRProvider;
+import okhttp3.OkHttpClient;
 import org.springframework.stereotype.Component;
 import reactor.core.publisher.Flux;
 
@@ -17,10 +18,12 @@ import java.util.TreeSet;
 public class ASRManager extends AbstractModelManager {
 
     private final ZhipuAiClient zhipuAiClient;
+    private final OkHttpClient sharedHttpClient;
 
-    public ASRManager(AIServiceConfig config, ZhipuAiClient zhipuAiClient) {
+    public ASRManager(AIServiceConfig config, ZhipuAiClient zhipuAiClient, OkHttpClient sharedHttpClient) {
         super(config);
         this.zhipuAiClient = zhipuAiClient;
+        this.sharedHttpClient = sharedHttpClient;
     }
 
     @Override
@@ -31,7 +34,11 @@ public class ASRManager extends AbstractModelManager {
     @Override
     protected BaseASRModelProvider createProvider(String name) {
         if (name.contains("zhipu") && zhipuAiClient != null) {
-            return new ZhipuASRProvider(name, zhipuAiClient);
+            AIServiceConfig.ProviderConfig providerConfig = config.getProviders().get(name);
+            return new ZhipuASRProvider(name, zhipuAiClient,
+                    providerConfig != null ? providerConfig.getApiKey() : null,
+                    providerConfig != null ? providerConfig.getBaseUrl() : null,
+                    sharedHttpClient);
         }
         return null;
     }
@@ -44,6 +51,13 @@ public class ASRManager extends AbstractModelManager {
         return provider.speechToTextStream(audioStream, options);
     }
 
+    /**
+     * 指定模型是否支持边上传边识别
+     */
+    public boolean supportsStreamingInput(String providerAndModelKey) {
+        return getProviderOrThrow(providerAndModelKey).supportsStreamingInput();
+    }
+
     private BaseASRModelProvider getProviderOrThrow(String providerAndModelKey) {
         BaseASRModelProvider provider = (BaseASRModelProvider) getProvider(providerAndModelKey);
         if (provider != null) {
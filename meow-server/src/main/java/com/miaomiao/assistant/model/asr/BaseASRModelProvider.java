@@ -17,4 +17,14 @@ public abstract class BaseASRModelProvider extends BaseModelProvider {
      * @return 识别结果流
      */
     public abstract Flux<ASRResult> speechToTextStream(Flux<byte[]> audioStream, ASROptions options);
+
+    /**
+     * 是否支持边上传边识别
+     * <p>
+     * 返回 true 时，{@link #speechToTextStream} 会在音频块到达时立即消费，而不是等整段音频收齐；
+     * 调用方据此决定是否在用户说话过程中就开始转发音频。
+     */
+    public boolean supportsStreamingInput() {
+        return false;
+    }
 }
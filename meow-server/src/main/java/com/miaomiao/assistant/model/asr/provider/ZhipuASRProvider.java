@@ -4,91 +4,260 @@ import ai.z.openapi.ZhipuAiClient;
 import ai.z.openapi.service.audio.AudioTranscriptionRequest;
 import ai.z.openapi.service.audio.AudioTranscriptionResponse;
 import ai.z.openapi.service.audio.AudioTranscriptionChunk;
+import com.fasterxml.jackson.databind.JsonNode;
+import com.fasterxml.jackson.databind.ObjectMapper;
 import com.miaomiao.assistant.model.asr.ASROptions;
 import com.miaomiao.assistant.model.asr.ASRResult;
 import com.miaomiao.assistant.model.asr.BaseASRModelProvider;
 import lombok.extern.slf4j.Slf4j;
+import okhttp3.MediaType;
+import okhttp3.MultipartBody;
+import okhttp3.OkHttpClient;
+import okhttp3.Request;
+import okhttp3.RequestBody;
+import okhttp3.Response;
+import okhttp3.sse.EventSource;
+import okhttp3.sse.EventSourceListener;
+import okhttp3.sse.EventSources;
+import okio.Buffer;
+import okio.BufferedSink;
 import reactor.core.publisher.Flux;
+import reactor.core.publisher.FluxSink;
 
 import java.io.IOException;
+import java.io.OutputStream;
 import java.nio.file.Files;
 import java.nio.file.Path;
+import java.util.concurrent.TimeUnit;
 
 /**
  * 智谱AI ASR提供商
+ * <p>
+ * 音频块追加到 okio {@link Buffer}（分段池化，追加不复制已有数据），收齐后：
+ * 1. 配置了 apiKey 时直接用 OkHttp 发 multipart 请求，请求体从内存 Buffer 写出，SSE 解析识别结果
+ * 2. 否则走 SDK，SDK 只接受 {@link java.io.File}，此时才落临时文件
  */
 @Slf4j
 public class ZhipuASRProvider extends BaseASRModelProvider {
 
     private static final String FILE_EXTENSION = ".wav";
 
+    private static final String DEFAULT_TRANSCRIPTION_URL = "https://open.bigmodel.cn/api/paas/v4/audio/transcriptions";
+
+    private static final MediaType WAV = MediaType.get("audio/wav");
+
     private final ZhipuAiClient client;
+    private final String apiKey;
+    private final String transcriptionUrl;
+    private final OkHttpClient httpClient;
+    private final ObjectMapper objectMapper = new ObjectMapper();
 
     public ZhipuASRProvider(String providerName, ZhipuAiClient client) {
+        this(providerName, client, null, null, null);
+    }
+
+    /**
+     * @param apiKey     配置了 apiKey 且提供了 httpClient 时直接上传，否则走 SDK
+     * @param baseUrl    provider 配置的 baseUrl，未配置时使用智谱默认地址
+     * @param httpClient 共享的 HTTP 客户端
+     */
+    public ZhipuASRProvider(String providerName, ZhipuAiClient client, String apiKey, String baseUrl,
+                            OkHttpClient httpClient) {
         this.providerName = providerName;
         this.client = client;
-        log.info("初始化智谱ASR Provider: name={}", providerName);
+        this.apiKey = apiKey;
+        this.transcriptionUrl = resolveTranscriptionUrl(baseUrl);
+        this.httpClient = hasText(apiKey) && httpClient != null
+                ? httpClient.newBuilder()
+                .readTimeout(120, TimeUnit.SECONDS)
+                .build()
+                : null;
+        log.info("初始化智谱ASR Provider: name={}, directUpload={}, url={}",
+                providerName, this.httpClient != null, transcriptionUrl);
+    }
+
+    /**
+     * 由 provider 的 baseUrl 得到语音转写地址
+     * <p>
+     * baseUrl 可以是 API 根路径（如 {@code https://open.bigmodel.cn/api/paas/v4/}），
+     * 也可以是 LLM 使用的对话补全地址（以 {@code /chat/completions} 结尾），两者都换成同一根路径下的 {@code /audio/transcriptions}。
+     */
+    static String resolveTranscriptionUrl(String baseUrl) {
+        if (!hasText(baseUrl)) {
+            return DEFAULT_TRANSCRIPTION_URL;
+        }
+        String url = baseUrl.trim();
+        while (url.endsWith("/")) {
+            url = url.substring(0, url.length() - 1);
+        }
+        if (url.endsWith("/audio/transcriptions")) {
+            return url;
+        }
+        if (url.endsWith("/chat/completions")) {
+            url = url.substring(0, url.length() - "/chat/completions".length());
+        }
+        return url + "/audio/transcriptions";
     }
 
     @Override
     public Flux<ASRResult> speechToTextStream(Flux<byte[]> audioStream, ASROptions options) {
         return audioStream
-                .reduce(new byte[0], this::concatBytes)
-                .flatMapMany(allData -> {
-                    if (allData.length == 0) {
+                .collect(Buffer::new, Buffer::write)
+                .flatMapMany(audio -> {
+                    if (audio.size() == 0) {
                         return Flux.empty();
                     }
+                    return httpClient != null
+                            ? transcribeDirect(audio, options)
+                            : transcribeWithTempFile(audio, options);
+                });
+    }
 
-                    Path tempFile = null;
-                    try {
-                        tempFile = createTempFile(allData);
-
-                        AudioTranscriptionRequest request = AudioTranscriptionRequest.builder()
-                                .model(options.getModel())
-                                .file(tempFile.toFile())
-                                .stream(true)
-                                .build();
-
-                        AudioTranscriptionResponse response = client.audio().createTranscription(request);
-
-                        Flux<ASRResult> chunkFlux = Flux.empty();
-                        if (response.getFlowable() != null) {
-                            chunkFlux = Flux.from(response.getFlowable())
-                                    .handle((chunk, sink) -> {
-                                        String text = extractChunkText(chunk);
-                                        if (hasText(text)) {
-                                            sink.next(new ASRResult(text, false, null));
-                                        }
-                                    });
-                        }
+    /**
+     * 直接上传：multipart 请求体从内存 Buffer 写出，不落盘
+     */
+    private Flux<ASRResult> transcribeDirect(Buffer audio, ASROptions options) {
+        RequestBody body = new MultipartBody.Builder()
+                .setType(MultipartBody.FORM)
+                .addFormDataPart("model", options.getModel())
+                .addFormDataPart("stream", "true")
+                .addFormDataPart("file", "audio" + FILE_EXTENSION, new BufferRequestBody(audio, WAV))
+                .build();
+        Request request = new Request.Builder()
+                .url(transcriptionUrl)
+                .addHeader("Authorization", "Bearer " + apiKey)
+                .post(body)
+                .build();
 
-                        String finalText = null;
-                        if (response.getData() != null) {
-                            finalText = response.getData().getText();
-                        }
-                        if (response.getFlowable() == null && !hasText(finalText) && !response.isSuccess()) {
-                            throw new RuntimeException("ASR流式请求失败: " + response.getMsg());
+        // 请求体每次写出的都是 audio 的副本，重试或重新订阅时可以再次上传；audio 随返回的 Flux 一起释放
+        return Flux.<ASRResult>create(sink -> {
+            EventSource eventSource = EventSources.createFactory(httpClient)
+                    .newEventSource(request, createEventSourceListener(sink));
+            sink.onDispose(eventSource::cancel);
+        });
+    }
+
+    /**
+     * SDK 只接受文件：把 Buffer 写入临时文件后上传，结束后删除
+     */
+    private Flux<ASRResult> transcribeWithTempFile(Buffer audio, ASROptions options) {
+        Path tempFile = null;
+        try {
+            tempFile = createTempFile(audio);
+
+            AudioTranscriptionRequest request = AudioTranscriptionRequest.builder()
+                    .model(options.getModel())
+                    .file(tempFile.toFile())
+                    .stream(true)
+                    .build();
+
+            AudioTranscriptionResponse response = client.audio().createTranscription(request);
+
+            Flux<ASRResult> chunkFlux = Flux.empty();
+            if (response.getFlowable() != null) {
+                chunkFlux = Flux.from(response.getFlowable())
+                        .handle((chunk, sink) -> {
+                            String text = extractChunkText(chunk);
+                            if (hasText(text)) {
+                                sink.next(new ASRResult(text, false, null));
+                            }
+                        });
+            }
+
+            String finalText = null;
+            if (response.getData() != null) {
+                finalText = response.getData().getText();
+            }
+            if (response.getFlowable() == null && !hasText(finalText) && !response.isSuccess()) {
+                throw new RuntimeException("ASR流式请求失败: " + response.getMsg());
+            }
+            Flux<ASRResult> finalFlux = hasText(finalText)
+                    ? Flux.just(new ASRResult(finalText, true, null))
+                    : Flux.empty();
+
+            Path finalTempFile = tempFile;
+            return chunkFlux.concatWith(finalFlux)
+                    .doFinally(signal -> deleteTempFile(finalTempFile));
+        } catch (Exception e) {
+            deleteTempFile(tempFile);
+            log.error("ASR流式请求失败", e);
+            return Flux.error(new RuntimeException("语音流式识别失败", e));
+        }
+    }
+
+    /**
+     * 创建SSE事件监听器
+     * <p>
+     * {@code transcript.text.delta} 为增量文本，{@code transcript.text.done} 为完整文本
+     */
+    private EventSourceListener createEventSourceListener(FluxSink<ASRResult> sink) {
+        return new EventSourceListener() {
+            @Override
+            public void onEvent(EventSource eventSource, String id, String type, String data) {
+                if ("[DONE]".equals(data)) {
+                    sink.complete();
+                    return;
+                }
+                try {
+                    JsonNode node = objectMapper.readTree(data);
+                    String eventType = node.path("type").asText("");
+                    if ("transcript.text.done".equals(eventType)) {
+                        String text = node.path("text").asText("");
+                        if (hasText(text)) {
+                            sink.next(new ASRResult(text, true, null));
                         }
-                        Flux<ASRResult> finalFlux = hasText(finalText)
-                                ? Flux.just(new ASRResult(finalText, true, null))
-                                : Flux.empty();
-
-                        Path finalTempFile = tempFile;
-                        return chunkFlux.concatWith(finalFlux)
-                                .doFinally(signal -> deleteTempFile(finalTempFile));
-                    } catch (Exception e) {
-                        deleteTempFile(tempFile);
-                        log.error("ASR流式请求失败", e);
-                        return Flux.error(new RuntimeException("语音流式识别失败", e));
+                        return;
                     }
-                });
+                    String delta = extractDeltaText(node);
+                    if (hasText(delta)) {
+                        sink.next(new ASRResult(delta, false, null));
+                    }
+                } catch (Exception e) {
+                    log.error("解析ASR SSE事件失败: {}", data, e);
+                    sink.error(e);
+                }
+            }
+
+            @Override
+            public void onClosed(EventSource eventSource) {
+                sink.complete();
+            }
+
+            @Override
+            public void onFailure(EventSource eventSource, Throwable t, Response response) {
+                String detail = describeFailure(response);
+                log.error("ASR SSE请求失败: {}", detail, t);
+                sink.error(new RuntimeException("语音流式识别失败: " + detail, t));
+            }
+        };
+    }
+
+    private String extractDeltaText(JsonNode node) {
+        String delta = node.path("delta").asText("");
+        if (hasText(delta)) {
+            return delta;
+        }
+        JsonNode choices = node.path("choices");
+        if (!choices.isArray()) {
+            return null;
+        }
+        StringBuilder builder = new StringBuilder();
+        for (JsonNode choice : choices) {
+            builder.append(choice.path("delta").path("content").asText(""));
+        }
+        return builder.toString();
     }
 
-    private byte[] concatBytes(byte[] a, byte[] b) {
-        byte[] result = new byte[a.length + b.length];
-        System.arraycopy(a, 0, result, 0, a.length);
-        System.arraycopy(b, 0, result, a.length, b.length);
-        return result;
+    private String describeFailure(Response response) {
+        if (response == null) {
+            return "连接失败";
+        }
+        try {
+            String body = response.body() != null ? response.body().string() : "";
+            return response.code() + " " + body;
+        } catch (IOException e) {
+            return String.valueOf(response.code());
+        }
     }
 
     private String extractChunkText(AudioTranscriptionChunk chunk) {
@@ -115,13 +284,15 @@ public class ZhipuASRProvider extends BaseASRModelProvider {
         return hasText(text) ? text : null;
     }
 
-    private boolean hasText(String text) {
+    private static boolean hasText(String text) {
         return text != null && !text.isBlank();
     }
 
-    private Path createTempFile(byte[] audioData) throws IOException {
+    private Path createTempFile(Buffer audio) throws IOException {
         Path tempFile = Files.createTempFile("asr_", FILE_EXTENSION);
-        Files.write(tempFile, audioData);
+        try (OutputStream out = Files.newOutputStream(tempFile)) {
+            audio.writeTo(out);
+        }
         return tempFile;
     }
 
@@ -135,4 +306,34 @@ public class ZhipuASRProvider extends BaseASRModelProvider {
         }
     }
 
+    /**
+     * 以内存 Buffer 为内容的请求体
+     * <p>
+     * 每次写出都用 {@link Buffer#copy()}（共享分段，不复制字节），OkHttp 重试时可以重复写出。
+     */
+    private static final class BufferRequestBody extends RequestBody {
+
+        private final Buffer audio;
+        private final MediaType contentType;
+
+        private BufferRequestBody(Buffer audio, MediaType contentType) {
+            this.audio = audio;
+            this.contentType = contentType;
+        }
+
+        @Override
+        public MediaType contentType() {
+            return contentType;
+        }
+
+        @Override
+        public long contentLength() {
+            return audio.size();
+        }
+
+        @Override
+        public void writeTo(BufferedSink sink) throws IOException {
+            sink.writeAll(audio.copy());
+        }
+    }
 }
@@ -5,6 +5,7 @@ import com.miaomiao.assistant.config.AIServiceConfig;
 import com.miaomiao.assistant.model.AbstractModelManager;
 import com.miaomiao.assistant.model.llm.provider.HttpLLMProvider;
 import com.miaomiao.assistant.model.llm.provider.ZhipuLLMProvider;
+import okhttp3.OkHttpClient;
 import org.springframework.stereotype.Component;
 import reactor.core.publisher.Flux;
 
@@ -17,10 +18,12 @@ import java.util.List;
 public class LLMManager extends AbstractModelManager {
 
     private final ZhipuAiClient zhipuAiClient;
+    private final OkHttpClient sharedHttpClient;
 
-    public LLMManager(AIServiceConfig config, ZhipuAiClient zhipuAiClient) {
+    public LLMManager(AIServiceConfig config, ZhipuAiClient zhipuAiClient, OkHttpClient sharedHttpClient) {
         super(config);
         this.zhipuAiClient = zhipuAiClient;
+        this.sharedHttpClient = sharedHttpClient;
     }
 
     @Override
@@ -33,7 +36,7 @@ public class LLMManager extends AbstractModelManager {
         AIServiceConfig.ProviderConfig providerConfig = config.getProviders().get(name);
         // 智谱AI Coding端点（使用HTTP方式）
         if (name.contains("zhipu-coding")) {
-            return new HttpLLMProvider(name, providerConfig.getApiKey(), providerConfig.getBaseUrl());
+            return new HttpLLMProvider(name, providerConfig.getApiKey(), providerConfig.getBaseUrl(), sharedHttpClient);
         }
         // 智谱AI 通用端点（使用SDK）
         if (name.contains("zhipu") && zhipuAiClient != null) {
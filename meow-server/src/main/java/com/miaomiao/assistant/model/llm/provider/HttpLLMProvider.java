@@ -33,14 +33,15 @@ public class HttpLLMProvider extends BaseLLMProvider {
     private final String baseUrl;
     private final String apiKey;
 
-    public HttpLLMProvider(String providerName, String apiKey, String baseUrl) {
+    /**
+     * @param httpClient 共享的 HTTP 客户端，派生出的客户端只调整超时，仍共用连接池
+     */
+    public HttpLLMProvider(String providerName, String apiKey, String baseUrl, OkHttpClient httpClient) {
         this.providerName = providerName;
         this.apiKey = apiKey;
         this.baseUrl = baseUrl;
-        this.client = new OkHttpClient.Builder()
-                .connectTimeout(30, TimeUnit.SECONDS)
+        this.client = httpClient.newBuilder()
                 .readTimeout(300, TimeUnit.SECONDS)
-                .writeTimeout(30, TimeUnit.SECONDS)
                 .build();
         this.objectMapper = new ObjectMapper();
         log.info("初始化HTTP API Provider: name={}, baseUrl={}", providerName, baseUrl);
@@ -131,6 +132,8 @@ public class HttpLLMProvider extends BaseLLMProvider {
      * 创建SSE事件监听器
      */
     private EventSourceListener createEventSourceListener(Sinks.Many<AppLLMResponse> sink) {
+        // 每个流一个解析器，缓冲区在整个流内复用
+        OpenAIChunkParser chunkParser = new OpenAIChunkParser();
         return new EventSourceListener() {
             @Override
             public void onOpen(EventSource eventSource, Response response) {
@@ -146,21 +149,17 @@ public class HttpLLMProvider extends BaseLLMProvider {
                         return;
                     }
 
-                    JsonNode jsonNode = objectMapper.readTree(data);
-                    JsonNode choices = jsonNode.path("choices");
-                    if (choices.isArray() && choices.size() > 0) {
-                        JsonNode delta = choices.get(0).path("delta");
-                        String content = delta.path("content").asText("");
-
-                        if (!content.isEmpty()) {
-                            sink.tryEmitNext(new AppLLMResponse(content, false));
-                        }
-
-                        String finishReason = choices.get(0).path("finish_reason").asText();
-                        if ("stop".equals(finishReason)) {
-                            sink.tryEmitNext(new AppLLMResponse("", true));
-                            sink.tryEmitComplete();
-                        }
+                    if (!chunkParser.parse(data)) {
+                        return;
+                    }
+                    String content = chunkParser.getContent();
+                    if (content != null && !content.isEmpty()) {
+                        sink.tryEmitNext(new AppLLMResponse(content, false));
+                    }
+
+                    if ("stop".equals(chunkParser.getFinishReason())) {
+                        sink.tryEmitNext(new AppLLMResponse("", true));
+                        sink.tryEmitComplete();
                     }
                 } catch (Exception e) {
                     log.error("解析SSE事件失败", e);
@@ -0,0 +1,106 @@
+package com.miaomiao.assistant.model.llm.provider;
+
+import com.fasterxml.jackson.core.JsonFactory;
+import com.fasterxml.jackson.core.JsonParser;
+import com.fasterxml.jackson.core.JsonToken;
+
+import java.io.IOException;
+
+/**
+ * OpenAI 格式流式响应分片的解析器
+ * <p>
+ * 每个 SSE 事件只需要 {@code choices[0].delta.content} 和 {@code choices[0].finish_reason}，
+ * 这里用 Jackson 流式 {@link JsonParser} 逐个 token 读取，其余字段直接跳过，不构建 JsonNode 树：
+ * 1. 事件文本复制到按流复用的字符缓冲区，解析器直接读缓冲区
+ * 2. 字段名由 Jackson 符号表规范化，比较不分配对象
+ * 3. 解析结果写入实例字段，每个事件只分配 content 字符串本身
+ * <p>
+ * 每个流一个实例，非线程安全（OkHttp 对同一 EventSource 的回调是串行的）。
+ */
+public final class OpenAIChunkParser {
+
+    private static final JsonFactory JSON_FACTORY = new JsonFactory();
+
+    private static final int INITIAL_BUFFER_CHARS = 512;
+
+    private char[] buffer = new char[INITIAL_BUFFER_CHARS];
+
+    private String content;
+    private String finishReason;
+
+    /**
+     * 解析一个 SSE 事件的 data
+     *
+     * @return 是否包含 choices[0]
+     */
+    public boolean parse(String data) throws IOException {
+        content = null;
+        finishReason = null;
+
+        int length = data.length();
+        if (buffer.length < length) {
+            buffer = new char[Math.max(length, buffer.length * 2)];
+        }
+        data.getChars(0, length, buffer, 0);
+
+        try (JsonParser parser = JSON_FACTORY.createParser(buffer, 0, length)) {
+            if (parser.nextToken() != JsonToken.START_OBJECT) {
+                return false;
+            }
+            while (parser.nextToken() == JsonToken.FIELD_NAME) {
+                String field = parser.currentName();
+                JsonToken value = parser.nextToken();
+                if ("choices".equals(field) && value == JsonToken.START_ARRAY) {
+                    // 只读第一个 choice，其余内容不再解析
+                    return parseFirstChoice(parser);
+                }
+                parser.skipChildren();
+            }
+        }
+        return false;
+    }
+
+    private boolean parseFirstChoice(JsonParser parser) throws IOException {
+        if (parser.nextToken() != JsonToken.START_OBJECT) {
+            return false;
+        }
+        while (parser.nextToken() == JsonToken.FIELD_NAME) {
+            String field = parser.currentName();
+            JsonToken value = parser.nextToken();
+            if ("delta".equals(field) && value == JsonToken.START_OBJECT) {
+                parseDelta(parser);
+            } else if ("finish_reason".equals(field) && value == JsonToken.VALUE_STRING) {
+                finishReason = parser.getText();
+            } else {
+                parser.skipChildren();
+            }
+        }
+        return true;
+    }
+
+    private void parseDelta(JsonParser parser) throws IOException {
+        while (parser.nextToken() == JsonToken.FIELD_NAME) {
+            String field = parser.currentName();
+            JsonToken value = parser.nextToken();
+            if ("content".equals(field) && value == JsonToken.VALUE_STRING) {
+                content = parser.getText();
+            } else {
+                parser.skipChildren();
+            }
+        }
+    }
+
+    /**
+     * 上一个事件的 delta.content，没有时为 null
+     */
+    public String getContent() {
+        return content;
+    }
+
+    /**
+     * 上一个事件的 finish_reason，没有或为 null 时为 null
+     */
+    public String getFinishReason() {
+        return finishReason;
+    }
+}
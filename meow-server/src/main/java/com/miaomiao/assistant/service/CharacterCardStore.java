@@ -0,0 +1,188 @@
+package com.miaomiao.assistant.service;
+
+import com.fasterxml.jackson.databind.ObjectMapper;
+import com.miaomiao.assistant.domain.CharacterCard;
+import jakarta.annotation.PostConstruct;
+import lombok.RequiredArgsConstructor;
+import lombok.extern.slf4j.Slf4j;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.core.io.Resource;
+import org.springframework.core.io.support.PathMatchingResourcePatternResolver;
+import org.springframework.scheduling.annotation.Scheduled;
+import org.springframework.stereotype.Component;
+
+import java.io.IOException;
+import java.io.InputStream;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.util.HashMap;
+import java.util.LinkedHashMap;
+import java.util.Map;
+import java.util.concurrent.atomic.AtomicLong;
+import java.util.stream.Stream;
+
+/**
+ * 角色卡存储
+ * <p>
+ * 角色卡以 JSON 文件保存（每个文件一张卡，字段同 {@link CharacterCard}）：
+ * 1. 内置卡：classpath 下的 {@code characters/*.json}，随应用发布
+ * 2. 外部卡：{@code character.dir} 目录下的 {@code *.json}，同 ID 时覆盖内置卡
+ * <p>
+ * 每隔 {@code character.reload.interval-ms} 检查外部目录的文件修改时间和大小，有变化时只重新读取变化的文件。
+ * 卡片内容变化时分配新的版本号，渲染结果按版本号缓存；解析失败的文件保留上一次成功加载的内容。
+ */
+@Slf4j
+@Component
+@RequiredArgsConstructor
+public class CharacterCardStore {
+
+    /**
+     * 未找到指定角色卡时使用的角色卡ID
+     */
+    public static final String DEFAULT_CARD_ID = "default";
+
+    private final ObjectMapper objectMapper;
+
+    /**
+     * 外部角色卡目录，不存在时只使用内置卡
+     */
+    @Value("${character.dir:./data/characters}")
+    private String dir = "./data/characters";
+
+    /**
+     * 是否定时检查外部目录变化
+     */
+    @Value("${character.reload.enabled:true}")
+    private boolean reloadEnabled = true;
+
+    private final AtomicLong versionCounter = new AtomicLong();
+
+    /**
+     * 内置卡（启动时加载一次）
+     */
+    private final Map<String, Entry> bundledCards = new LinkedHashMap<>();
+
+    /**
+     * 外部文件 -> 上次加载结果，仅由加载线程访问
+     */
+    private final Map<Path, FileEntry> fileEntries = new HashMap<>();
+
+    /**
+     * 当前生效的角色卡（ID -> 卡片），整体替换
+     */
+    private volatile Map<String, Entry> cards = Map.of();
+
+    @PostConstruct
+    public void init() {
+        loadBundledCards();
+        reload();
+        log.info("角色卡加载完成: count={}, dir={}", cards.size(), Paths.get(dir).toAbsolutePath());
+    }
+
+    /**
+     * 定时检查外部目录，有变化时重新加载
+     */
+    @Scheduled(initialDelayString = "${character.reload.interval-ms:5000}", fixedDelayString = "${character.reload.interval-ms:5000}")
+    public void reloadIfChanged() {
+        if (reloadEnabled) {
+            reload();
+        }
+    }
+
+    /**
+     * 获取角色卡，不存在时返回默认角色卡
+     *
+     * @throws IllegalStateException 默认角色卡也不存在
+     */
+    public Entry get(String characterId) {
+        Map<String, Entry> current = cards;
+        Entry entry = characterId == null ? null : current.get(characterId);
+        if (entry == null) {
+            entry = current.get(DEFAULT_CARD_ID);
+        }
+        if (entry == null) {
+            throw new IllegalStateException("角色卡未找到，且缺少默认角色卡: " + characterId);
+        }
+        return entry;
+    }
+
+    private void loadBundledCards() {
+        try {
+            Resource[] resources = new PathMatchingResourcePatternResolver().getResources("classpath*:characters/*.json");
+            for (Resource resource : resources) {
+                try (InputStream in = resource.getInputStream()) {
+                    CharacterCard card = objectMapper.readValue(in, CharacterCard.class);
+                    bundledCards.put(card.getId(), new Entry(card, versionCounter.incrementAndGet()));
+                }
+            }
+        } catch (IOException e) {
+            throw new IllegalStateException("加载内置角色卡失败", e);
+        }
+    }
+
+    private synchronized void reload() {
+        Map<Path, FileEntry> seen = new HashMap<>();
+        Path directory = Paths.get(dir);
+        if (Files.isDirectory(directory)) {
+            try (Stream<Path> files = Files.list(directory)) {
+                files.filter(path -> path.getFileName().toString().endsWith(".json") && Files.isRegularFile(path))
+                        .forEach(path -> seen.put(path, loadFile(path)));
+            } catch (IOException e) {
+                log.warn("读取角色卡目录失败，保留当前角色卡: dir={}, error={}", directory, e.getMessage());
+                return;
+            }
+        }
+        seen.values().removeIf(fileEntry -> fileEntry == null);
+
+        boolean changed = !seen.equals(fileEntries);
+        if (!changed && !cards.isEmpty()) {
+            return;
+        }
+        fileEntries.clear();
+        fileEntries.putAll(seen);
+
+        Map<String, Entry> next = new LinkedHashMap<>(bundledCards);
+        for (FileEntry fileEntry : seen.values()) {
+            next.put(fileEntry.entry().card().getId(), fileEntry.entry());
+        }
+        if (!cards.isEmpty()) {
+            log.info("角色卡已重新加载: count={}", next.size());
+        }
+        cards = Map.copyOf(next);
+    }
+
+    /**
+     * 加载单个文件；未变化时复用上次结果，解析失败时保留上次成功的内容
+     */
+    private FileEntry loadFile(Path path) {
+        FileEntry previous = fileEntries.get(path);
+        try {
+            long modified = Files.getLastModifiedTime(path).toMillis();
+            long size = Files.size(path);
+            if (previous != null && previous.modified() == modified && previous.size() == size) {
+                return previous;
+            }
+            CharacterCard card = objectMapper.readValue(path.toFile(), CharacterCard.class);
+            if (card.getId() == null || card.getId().isBlank()) {
+                throw new IllegalArgumentException("缺少 id 字段");
+            }
+            // 内容未变（如只是 touch）时沿用原版本号，渲染缓存继续有效
+            Entry current = cards.get(card.getId());
+            long version = current != null && current.card().equals(card) ? current.version() : versionCounter.incrementAndGet();
+            return new FileEntry(modified, size, new Entry(card, version));
+        } catch (IOException | RuntimeException e) {
+            log.warn("加载角色卡失败，保留上次的内容: file={}, error={}", path, e.getMessage());
+            return previous;
+        }
+    }
+
+    /**
+     * 角色卡及其版本号，内容每次变化版本号递增
+     */
+    public record Entry(CharacterCard card, long version) {
+    }
+
+    private record FileEntry(long modified, long size, Entry entry) {
+    }
+}
@@ -1,49 +1,37 @@
 package com.miaomiao.assistant.service;
 
 import com.miaomiao.assistant.domain.CharacterCard;
+import lombok.RequiredArgsConstructor;
 import lombok.extern.slf4j.Slf4j;
 import org.springframework.stereotype.Service;
 
-import java.util.HashMap;
 import java.util.Map;
+import java.util.concurrent.ConcurrentHashMap;
 
 /**
  * 系统提示词服务
  * <p>
- * 管理角色卡（Character Card）和系统提示词。
+ * 根据角色卡（Character Card）渲染系统提示词。
  * 包含：
  * 1. 角色设定（人设、性格、说话风格）
  * 2. 输出规则（字数限制、格式要求）
  * 3. 安全规则（防越狱、防注入）
  * <p>
- * TODO: 后续从数据库读取角色卡配置
+ * 角色卡由 {@link CharacterCardStore} 提供。同一角色卡版本和字数限制渲染出的提示词逐字节相同，
+ * 渲染结果按（角色卡ID, maxTokens）缓存，角色卡更新后版本号变化时重新渲染。
+ * 提示词中不放任何随轮次变化的内容，保证它作为请求消息的固定前缀，可以命中模型服务端的前缀缓存。
  */
 @Slf4j
 @Service
+@RequiredArgsConstructor
 public class SystemPromptService {
 
-    /**
-     * 角色卡缓存
-     */
-    private final Map<String, CharacterCard> characterCards = new HashMap<>();
-
-    public SystemPromptService() {
-        initDefaultCharacters();
-    }
+    private final CharacterCardStore characterCardStore;
 
     /**
-     * 初始化默认角色卡
+     * 渲染结果缓存：角色卡ID + maxTokens -> 渲染时的版本号和提示词
      */
-    private void initDefaultCharacters() {
-        // 默认角色：贴吧嘴臭老哥
-        characterCards.put("default", CharacterCard.builder()
-                .id("default")
-                .name("曼波")
-                .personality("嘴臭、暴躁、阴阳怪气")
-                .speakingStyle("说话直、不惯着人，常用反问和嘲讽，偶尔爆粗但不失分寸")
-                .background("你是常年混迹贴吧和论坛的老哥，见多了弱智问题和烂活代码，对一切花里胡哨深恶痛绝")
-                .build());
-    }
+    private final Map<PromptKey, RenderedPrompt> renderedPrompts = new ConcurrentHashMap<>();
 
     /**
      * 获取完整的系统提示词
@@ -53,12 +41,24 @@ public class SystemPromptService {
      * @return 完整的系统提示词
      */
     public String getSystemPrompt(String characterId, int maxTokens) {
-        CharacterCard card = characterCards.getOrDefault(characterId, characterCards.get("default"));
+        CharacterCardStore.Entry entry = characterCardStore.get(characterId);
+        PromptKey key = new PromptKey(entry.card().getId(), maxTokens);
 
+        RenderedPrompt rendered = renderedPrompts.get(key);
+        if (rendered == null || rendered.version() != entry.version()) {
+            rendered = new RenderedPrompt(entry.version(), render(entry.card(), maxTokens));
+            renderedPrompts.put(key, rendered);
+            log.debug("生成系统提示词: characterId={}, version={}, maxTokens={}, promptLength={}",
+                    key.characterId(), entry.version(), maxTokens, rendered.prompt().length());
+        }
+        return rendered.prompt();
+    }
+
+    private static String render(CharacterCard card, int maxTokens) {
         // 计算大致字数限制（中文1token≈1.5字，保守估计）
         int maxChars = (int) (maxTokens * 1.2);
 
-        String prompt = """
+        return """
                 【角色设定】
                 你的名字是「%s」。
                 性格特点：%s
@@ -87,10 +87,11 @@ public class SystemPromptService {
                 card.getBackground(),
                 maxChars
         );
+    }
 
-        log.debug("生成系统提示词: characterId={}, maxTokens={}, promptLength={}",
-                characterId, maxTokens, prompt.length());
+    private record PromptKey(String characterId, int maxTokens) {
+    }
 
-        return prompt;
+    private record RenderedPrompt(long version, String prompt) {
     }
 }
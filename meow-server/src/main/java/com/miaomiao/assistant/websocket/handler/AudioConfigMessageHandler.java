@@ -0,0 +1,31 @@
+package com.miaomiao.assistant.websocket.handler;
+
+import com.miaomiao.assistant.websocket.message.AudioConfigMessage;
+import com.miaomiao.assistant.websocket.service.OpusProfileService;
+import com.miaomiao.assistant.websocket.session.SessionState;
+import lombok.extern.slf4j.Slf4j;
+import org.springframework.stereotype.Component;
+
+/**
+ * 音频配置消息处理器 处理客户端上报的网络提示，协商下行 Opus 编码档位
+ */
+@Slf4j
+@Component
+public class AudioConfigMessageHandler implements MessageHandler<AudioConfigMessage> {
+
+    private final OpusProfileService opusProfileService;
+
+    public AudioConfigMessageHandler(OpusProfileService opusProfileService) {
+        this.opusProfileService = opusProfileService;
+    }
+
+    @Override
+    public String getMessageType() {
+        return "audio_config";
+    }
+
+    @Override
+    public void handle(SessionState state, AudioConfigMessage message) {
+        opusProfileService.negotiate(state, message);
+    }
+}
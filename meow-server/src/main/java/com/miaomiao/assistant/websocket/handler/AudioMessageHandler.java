@@ -2,6 +2,7 @@ package com.miaomiao.assistant.websocket.handler;
 
 import com.miaomiao.assistant.websocket.message.AudioMessage;
 import com.miaomiao.assistant.websocket.service.ConversationService;
+import com.miaomiao.assistant.websocket.service.VoiceInputService;
 import com.miaomiao.assistant.websocket.session.SessionState;
 import lombok.extern.slf4j.Slf4j;
 import org.springframework.stereotype.Component;
@@ -14,9 +15,11 @@ import org.springframework.stereotype.Component;
 public class AudioMessageHandler implements MessageHandler<AudioMessage> {
 
     private final ConversationService conversationService;
+    private final VoiceInputService voiceInputService;
 
-    public AudioMessageHandler(ConversationService conversationService) {
+    public AudioMessageHandler(ConversationService conversationService, VoiceInputService voiceInputService) {
         this.conversationService = conversationService;
+        this.voiceInputService = voiceInputService;
     }
 
     @Override
@@ -26,8 +29,32 @@ public class AudioMessageHandler implements MessageHandler<AudioMessage> {
 
     @Override
     public void handle(SessionState state, AudioMessage message) {
-        // 累积音频数据
         byte[] audioData = message.getData();
+
+        // 边录边传的 PCM：由服务端端点检测决定何时结束本段输入
+        if (VoiceInputService.isPcmFormat(message.getFormat())) {
+            voiceInputService.acceptPcm(state, audioData, message.getFormat(), message.isLast());
+            return;
+        }
+
+        // 一段输入的第一块：ASR 支持流式输入时立即开始识别，后续音频块边到边转发
+        if (!state.hasAudioInput() && state.getAudioBufferSize() == 0
+                && conversationService.startStreamingAudioInput(state, message.getFormat())) {
+            log.debug("音频输入走流式识别: session={}", state.getSessionId());
+        }
+
+        if (state.hasAudioInput()) {
+            if (audioData != null && audioData.length > 0 && !state.emitAudioInput(audioData)) {
+                log.warn("转发音频块失败: session={}, bytes={}", state.getSessionId(), audioData.length);
+            }
+            if (message.isLast()) {
+                log.debug("流式音频输入结束: session={}", state.getSessionId());
+                state.completeAudioInput();
+            }
+            return;
+        }
+
+        // 累积音频数据
         if (audioData != null && audioData.length > 0) {
             state.accumulateAudio(audioData);
             log.debug("累积音频数据: {} 字节", audioData.length);
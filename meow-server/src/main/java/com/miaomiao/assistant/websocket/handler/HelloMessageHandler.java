@@ -0,0 +1,63 @@
+package com.miaomiao.assistant.websocket.handler;
+
+import com.miaomiao.assistant.websocket.message.HelloMessage;
+import com.miaomiao.assistant.websocket.protocol.BinaryAudioFrame;
+import com.miaomiao.assistant.websocket.service.VoiceInputService;
+import com.miaomiao.assistant.websocket.session.SessionState;
+import com.miaomiao.assistant.websocket.session.WebSocketMessageSender;
+import lombok.extern.slf4j.Slf4j;
+import org.springframework.stereotype.Component;
+
+import java.io.IOException;
+import java.util.ArrayList;
+import java.util.List;
+
+/**
+ * 能力协商消息处理器 记录客户端支持的协议能力，并回复双方都支持的能力
+ */
+@Slf4j
+@Component
+public class HelloMessageHandler implements MessageHandler<HelloMessage> {
+
+    private final WebSocketMessageSender messageSender;
+    private final VoiceInputService voiceInputService;
+
+    public HelloMessageHandler(WebSocketMessageSender messageSender, VoiceInputService voiceInputService) {
+        this.messageSender = messageSender;
+        this.voiceInputService = voiceInputService;
+    }
+
+    @Override
+    public String getMessageType() {
+        return "hello";
+    }
+
+    @Override
+    public void handle(SessionState state, HelloMessage message) throws IOException {
+        List<String> offered = message.getCapabilities() == null ? List.of() : message.getCapabilities();
+        List<String> accepted = new ArrayList<>();
+
+        boolean llmDelta = offered.contains(HelloMessage.CAPABILITY_LLM_DELTA);
+        state.setLlmDeltaEnabled(llmDelta);
+        if (llmDelta) {
+            accepted.add(HelloMessage.CAPABILITY_LLM_DELTA);
+        }
+
+        boolean audioV2 = offered.contains(HelloMessage.CAPABILITY_AUDIO_V2);
+        state.setBinaryProtocolVersion(audioV2 ? BinaryAudioFrame.VERSION_2 : BinaryAudioFrame.VERSION_1);
+        if (audioV2) {
+            accepted.add(HelloMessage.CAPABILITY_AUDIO_V2);
+        }
+
+        if (offered.contains(HelloMessage.CAPABILITY_SERVER_VAD) && voiceInputService.isEnabled()) {
+            accepted.add(HelloMessage.CAPABILITY_SERVER_VAD);
+        }
+
+        if (offered.contains(HelloMessage.CAPABILITY_OPUS_INPUT)) {
+            accepted.add(HelloMessage.CAPABILITY_OPUS_INPUT);
+        }
+
+        log.debug("能力协商: session={}, offered={}, accepted={}", state.getSessionId(), offered, accepted);
+        messageSender.sendHello(state, accepted);
+    }
+}
@@ -0,0 +1,25 @@
+package com.miaomiao.assistant.websocket.handler;
+
+import com.miaomiao.assistant.websocket.message.LLMResyncMessage;
+import com.miaomiao.assistant.websocket.session.SessionState;
+import lombok.extern.slf4j.Slf4j;
+import org.springframework.stereotype.Component;
+
+/**
+ * llm_token 重同步请求处理器 让下一条 llm_token 携带完整累积文本
+ */
+@Slf4j
+@Component
+public class LLMResyncMessageHandler implements MessageHandler<LLMResyncMessage> {
+
+    @Override
+    public String getMessageType() {
+        return "llm_resync";
+    }
+
+    @Override
+    public void handle(SessionState state, LLMResyncMessage message) {
+        log.debug("客户端请求llm_token重同步: session={}", state.getSessionId());
+        state.requestLlmCheckpoint();
+    }
+}
@@ -0,0 +1,45 @@
+package com.miaomiao.assistant.websocket.message;
+
+import lombok.Data;
+import lombok.EqualsAndHashCode;
+
+/**
+ * 音频下行编码配置消息
+ * <p>
+ * 客户端 -> 服务端：上报网络提示和可接受的上限（任意时刻可重发，用于重新协商）；
+ * 服务端 -> 客户端：告知当前实际使用的编码参数。
+ */
+@Data
+@EqualsAndHashCode(callSuper = true)
+public class AudioConfigMessage extends WSMessage {
+
+    /**
+     * 码率（bps）。客户端上报时表示可接受的最高码率
+     */
+    private Integer bitrate;
+
+    /**
+     * 帧时长（毫秒）：20 / 40 / 60。客户端上报时表示期望的最短帧时长
+     */
+    private Integer frameDurationMs;
+
+    /**
+     * 网络类型提示（客户端上报），如 wifi、4g、3g、2g、slow-2g
+     */
+    private String network;
+
+    /**
+     * 客户端是否开启省流量模式
+     */
+    private Boolean saveData;
+
+    /**
+     * 采样率（服务端下发）
+     */
+    private Integer sampleRate;
+
+    /**
+     * 声道数（服务端下发）
+     */
+    private Integer channels;
+}
@@ -0,0 +1,42 @@
+package com.miaomiao.assistant.websocket.message;
+
+import lombok.Data;
+import lombok.EqualsAndHashCode;
+
+import java.util.ArrayList;
+import java.util.List;
+
+/**
+ * 连接建立后的能力协商消息
+ * <p>
+ * 客户端上报支持的协议能力，服务端回复同类型消息，{@code capabilities} 为双方都支持的能力。
+ */
+@Data
+@EqualsAndHashCode(callSuper = true)
+public class HelloMessage extends WSMessage {
+
+    /**
+     * 增量 llm_token：只发送 token 和序号，定期携带完整文本作为检查点
+     */
+    public static final String CAPABILITY_LLM_DELTA = "llm_delta";
+
+    /**
+     * v2 二进制音频帧：数字编码 ID，携带轮次、分段、帧序号和时间戳
+     */
+    public static final String CAPABILITY_AUDIO_V2 = "audio_v2";
+
+    /**
+     * 服务端端点检测：客户端边录边上传 PCM，由服务端判断何时说完
+     */
+    public static final String CAPABILITY_SERVER_VAD = "server_vad";
+
+    /**
+     * 压缩录音输入：客户端可直接上传 WebM / Ogg Opus 录音，由服务端解码转为 ASR 需要的 WAV
+     */
+    public static final String CAPABILITY_OPUS_INPUT = "opus_input";
+
+    /**
+     * 支持的能力列表
+     */
+    private List<String> capabilities = new ArrayList<>();
+}
@@ -0,0 +1,12 @@
+package com.miaomiao.assistant.websocket.message;
+
+import lombok.Data;
+import lombok.EqualsAndHashCode;
+
+/**
+ * 客户端发现 llm_token 序号不连续时请求重同步，服务端下一条 llm_token 携带完整累积文本
+ */
+@Data
+@EqualsAndHashCode(callSuper = true)
+public class LLMResyncMessage extends WSMessage {
+}
@@ -1,10 +1,14 @@
 package com.miaomiao.assistant.websocket.message;
 
+import com.fasterxml.jackson.annotation.JsonInclude;
 import lombok.Data;
 import lombok.EqualsAndHashCode;
 
 /**
  * LLM 流式 Token 消息（用于前端打字效果）
+ * <p>
+ * 增量模式下（hello 协商 {@code llm_delta}）只有检查点消息和最终消息携带 {@code accumulated}，
+ * 其余消息只有 {@code token} 和 {@code seq}，客户端按序追加。
  */
 @Data
 @EqualsAndHashCode(callSuper = true)
@@ -15,8 +19,14 @@ public class LLMTokenMessage extends WSMessage {
     private String token;
 
     /**
-     * 累积文本（从开始到当前的完整文本）
+     * 本轮回复内的消息序号，从 0 开始连续递增
      */
+    private int seq;
+
+    /**
+     * 累积文本（从开始到当前的完整文本），增量模式下只在检查点和最终消息中出现
+     */
+    @JsonInclude(JsonInclude.Include.NON_NULL)
     private String accumulated;
 
     /**
@@ -0,0 +1,22 @@
+package com.miaomiao.assistant.websocket.message;
+
+import lombok.Data;
+import lombok.EqualsAndHashCode;
+
+/**
+ * 服务端结束本段语音输入的通知，客户端收到后停止录音
+ */
+@Data
+@EqualsAndHashCode(callSuper = true)
+public class ListeningStoppedMessage extends WSMessage {
+
+    /**
+     * 结束原因：vad（检测到说完）、client（客户端主动结束）、no_speech（未检测到语音，已丢弃）
+     */
+    private String reason;
+
+    /**
+     * 检测到的语音时长（毫秒）
+     */
+    private int speechMs;
+}
@@ -16,7 +16,10 @@ import lombok.Data;
 )
 @JsonSubTypes({
         @JsonSubTypes.Type(value = StringMessage.class, name = "text"),
-        @JsonSubTypes.Type(value = TerminateMessage.class, name = "terminate")
+        @JsonSubTypes.Type(value = TerminateMessage.class, name = "terminate"),
+        @JsonSubTypes.Type(value = AudioConfigMessage.class, name = "audio_config"),
+        @JsonSubTypes.Type(value = HelloMessage.class, name = "hello"),
+        @JsonSubTypes.Type(value = LLMResyncMessage.class, name = "llm_resync")
 })
 
 public abstract class WSMessage {
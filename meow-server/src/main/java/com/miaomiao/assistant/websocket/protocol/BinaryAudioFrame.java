@@ -8,7 +8,7 @@ import java.nio.charset.StandardCharsets;
 /**
  * WebSocket 二进制音频帧协议
  *
- * <p>帧结构：
+ * <p>v1 帧结构：
  * <pre>
  * [0]   magic(0x4D)
  * [1]   messageType (1=client audio, 2=server tts)
@@ -17,6 +17,21 @@ import java.nio.charset.StandardCharsets;
  * [4..] format UTF-8 bytes
  * [..]  payload bytes
  * </pre>
+ *
+ * <p>v2 帧结构（hello 协商 {@code audio_v2} 后服务端使用）：
+ * <pre>
+ * [0]   magic(0x4D)
+ * [1]   version(高4位, =2) | messageType(低4位)
+ * [2]   flags (bit0=final)
+ * [3]   codecId (见 CODEC_*)
+ * [..]  varint turn        本轮回复序号
+ * [..]  varint segment     分段（句子）序号
+ * [..]  varint sequence    第一帧在本轮内的帧序号
+ * [..]  varint timestampMs 第一帧在本轮内的媒体时间
+ * [..]  varint frameCount  帧数
+ * [..]  payload: frameCount 个 [2字节小端长度][帧数据]
+ * </pre>
+ * v1 的第 1 字节高 4 位恒为 0，解码时据此区分版本。
  */
 @Getter
 public final class BinaryAudioFrame {
@@ -26,24 +41,86 @@ public final class BinaryAudioFrame {
     public static final byte TYPE_SERVER_TTS = 0x02;
     public static final byte FLAG_FINAL = 0x01;
 
+    public static final int VERSION_1 = 1;
+    public static final int VERSION_2 = 2;
+
+    public static final int CODEC_UNKNOWN = 0;
+    public static final int CODEC_OPUS = 1;
+    public static final int CODEC_PCM = 2;
+    public static final int CODEC_WAV = 3;
+    public static final int CODEC_WEBM = 4;
+    public static final int CODEC_OGG = 5;
+
+    private static final String[] CODEC_NAMES = {"", "opus", "pcm", "wav", "webm", "ogg"};
+
+    /**
+     * 音频在本轮回复中的位置（v2）
+     *
+     * @param turn        本轮回复序号
+     * @param segment     分段（句子）序号
+     * @param sequence    第一帧在本轮内的帧序号
+     * @param timestampMs 第一帧在本轮内的媒体时间（毫秒）
+     */
+    public record Position(long turn, long segment, long sequence, long timestampMs) {
+    }
+
+    private final int version;
     private final byte messageType;
     private final boolean finalChunk;
     private final String format;
     private final byte[] payload;
+    private final Position position;
+    private final int frameCount;
 
-    private BinaryAudioFrame(byte messageType, boolean finalChunk, String format, byte[] payload) {
+    private BinaryAudioFrame(int version, byte messageType, boolean finalChunk, String format, byte[] payload,
+                             Position position, int frameCount) {
+        this.version = version;
         this.messageType = messageType;
         this.finalChunk = finalChunk;
         this.format = format == null ? "" : format;
         this.payload = payload == null ? new byte[0] : payload;
+        this.position = position;
+        this.frameCount = frameCount;
     }
 
     public static BinaryAudioFrame clientAudio(String format, byte[] payload, boolean finalChunk) {
-        return new BinaryAudioFrame(TYPE_CLIENT_AUDIO, finalChunk, format, payload);
+        return new BinaryAudioFrame(VERSION_1, TYPE_CLIENT_AUDIO, finalChunk, format, payload, null, 0);
     }
 
     public static BinaryAudioFrame serverTTS(String format, byte[] payload, boolean finalChunk) {
-        return new BinaryAudioFrame(TYPE_SERVER_TTS, finalChunk, format, payload);
+        return new BinaryAudioFrame(VERSION_1, TYPE_SERVER_TTS, finalChunk, format, payload, null, 0);
+    }
+
+    /**
+     * v2 服务端音频帧
+     *
+     * @param format     音频格式，必须是已知编码
+     * @param payload    frameCount 个 [2字节小端长度][帧数据]
+     * @param finalChunk 是否是本轮最后一帧
+     * @param position   第一帧的位置
+     * @param frameCount 帧数
+     */
+    public static BinaryAudioFrame serverTTS(String format, byte[] payload, boolean finalChunk,
+                                             Position position, int frameCount) {
+        if (codecId(format) == CODEC_UNKNOWN) {
+            throw new IllegalArgumentException("v2 帧不支持的音频格式: " + format);
+        }
+        return new BinaryAudioFrame(VERSION_2, TYPE_SERVER_TTS, finalChunk, format, payload, position, frameCount);
+    }
+
+    /**
+     * 格式名对应的编码 ID，未知格式返回 {@link #CODEC_UNKNOWN}
+     */
+    public static int codecId(String format) {
+        if (format == null || format.isEmpty()) {
+            return CODEC_UNKNOWN;
+        }
+        for (int i = 1; i < CODEC_NAMES.length; i++) {
+            if (CODEC_NAMES[i].equalsIgnoreCase(format)) {
+                return i;
+            }
+        }
+        return CODEC_UNKNOWN;
     }
 
     public static BinaryAudioFrame decode(ByteBuffer buffer) {
@@ -56,8 +133,21 @@ public final class BinaryAudioFrame {
             throw new IllegalArgumentException("二进制帧 magic 非法: " + (magic & 0xFF));
         }
 
-        byte messageType = buffer.get();
+        int typeByte = Byte.toUnsignedInt(buffer.get());
         byte flags = buffer.get();
+        boolean finalChunk = (flags & FLAG_FINAL) != 0;
+        int version = typeByte >> 4;
+
+        if (version == 0) {
+            return decodeV1((byte) typeByte, finalChunk, buffer);
+        }
+        if (version == VERSION_2) {
+            return decodeV2((byte) (typeByte & 0x0F), finalChunk, buffer);
+        }
+        throw new IllegalArgumentException("不支持的二进制帧版本: " + version);
+    }
+
+    private static BinaryAudioFrame decodeV1(byte messageType, boolean finalChunk, ByteBuffer buffer) {
         int formatLength = Byte.toUnsignedInt(buffer.get());
 
         if (buffer.remaining() < formatLength) {
@@ -71,11 +161,35 @@ public final class BinaryAudioFrame {
         byte[] payload = new byte[buffer.remaining()];
         buffer.get(payload);
 
-        boolean finalChunk = (flags & FLAG_FINAL) != 0;
-        return new BinaryAudioFrame(messageType, finalChunk, format, payload);
+        return new BinaryAudioFrame(VERSION_1, messageType, finalChunk, format, payload, null, 0);
+    }
+
+    private static BinaryAudioFrame decodeV2(byte messageType, boolean finalChunk, ByteBuffer buffer) {
+        int codecId = Byte.toUnsignedInt(buffer.get());
+        String format = codecId < CODEC_NAMES.length ? CODEC_NAMES[codecId] : "";
+
+        Position position = new Position(
+                readVarint(buffer),
+                readVarint(buffer),
+                readVarint(buffer),
+                readVarint(buffer)
+        );
+        long frameCount = readVarint(buffer);
+        if (frameCount > Integer.MAX_VALUE) {
+            throw new IllegalArgumentException("二进制帧 frameCount 非法");
+        }
+
+        byte[] payload = new byte[buffer.remaining()];
+        buffer.get(payload);
+
+        return new BinaryAudioFrame(VERSION_2, messageType, finalChunk, format, payload, position, (int) frameCount);
     }
 
     public byte[] encode() {
+        if (version == VERSION_2) {
+            return encodeV2();
+        }
+
         byte[] formatBytes = format.getBytes(StandardCharsets.UTF_8);
         if (formatBytes.length > 255) {
             throw new IllegalArgumentException("format 长度超过 255 字节");
@@ -90,4 +204,65 @@ public final class BinaryAudioFrame {
         buffer.put(payload);
         return buffer.array();
     }
+
+    private byte[] encodeV2() {
+        Position pos = position == null ? new Position(0, 0, 0, 0) : position;
+        int headerLength = 4
+                + varintSize(pos.turn())
+                + varintSize(pos.segment())
+                + varintSize(pos.sequence())
+                + varintSize(pos.timestampMs())
+                + varintSize(frameCount);
+
+        ByteBuffer buffer = ByteBuffer.allocate(headerLength + payload.length);
+        buffer.put(MAGIC);
+        buffer.put((byte) ((VERSION_2 << 4) | (messageType & 0x0F)));
+        buffer.put(finalChunk ? FLAG_FINAL : 0);
+        buffer.put((byte) codecId(format));
+        writeVarint(buffer, pos.turn());
+        writeVarint(buffer, pos.segment());
+        writeVarint(buffer, pos.sequence());
+        writeVarint(buffer, pos.timestampMs());
+        writeVarint(buffer, frameCount);
+        buffer.put(payload);
+        return buffer.array();
+    }
+
+    /**
+     * 无符号 LEB128 变长整数编码
+     */
+    static void writeVarint(ByteBuffer buffer, long value) {
+        if (value < 0) {
+            throw new IllegalArgumentException("varint 不支持负数: " + value);
+        }
+        while ((value & ~0x7FL) != 0) {
+            buffer.put((byte) ((value & 0x7F) | 0x80));
+            value >>>= 7;
+        }
+        buffer.put((byte) value);
+    }
+
+    static long readVarint(ByteBuffer buffer) {
+        long value = 0;
+        for (int shift = 0; shift < 64; shift += 7) {
+            if (!buffer.hasRemaining()) {
+                throw new IllegalArgumentException("二进制帧 varint 截断");
+            }
+            int b = Byte.toUnsignedInt(buffer.get());
+            value |= (long) (b & 0x7F) << shift;
+            if ((b & 0x80) == 0) {
+                return value;
+            }
+        }
+        throw new IllegalArgumentException("二进制帧 varint 过长");
+    }
+
+    static int varintSize(long value) {
+        int size = 1;
+        while ((value & ~0x7FL) != 0) {
+            value >>>= 7;
+            size++;
+        }
+        return size;
+    }
 }
@@ -1,15 +1,23 @@
 package com.miaomiao.assistant.websocket.service;
 
+import com.miaomiao.assistant.codec.AsrAudioTranscoder;
+import com.miaomiao.assistant.codec.WavCodec;
 import com.miaomiao.assistant.model.asr.ASRManager;
 import com.miaomiao.assistant.model.asr.ASROptions;
 import com.miaomiao.assistant.model.asr.ASRResult;
 import com.miaomiao.assistant.websocket.ConversationConfig;
+import com.miaomiao.assistant.websocket.service.pipeline.AsrAudioGate;
+import com.miaomiao.assistant.websocket.service.pipeline.AudioSegmenter;
 import lombok.RequiredArgsConstructor;
 import lombok.extern.slf4j.Slf4j;
+import org.springframework.beans.factory.annotation.Value;
 import org.springframework.stereotype.Service;
 import reactor.core.publisher.Flux;
+import reactor.core.scheduler.Schedulers;
 
+import java.util.List;
 import java.util.Locale;
+import java.util.concurrent.atomic.AtomicLong;
 
 /**
  * ASR（语音识别）处理服务 负责将音频数据转换为文本
@@ -19,27 +27,223 @@ import java.util.Locale;
 @RequiredArgsConstructor
 public class ASRService {
 
-    private static final String SUPPORTED_FORMAT = "wav";
+    /**
+     * ASR 输入格式，其他格式先经 {@link #toAsrWav} 转码
+     */
+    public static final String SUPPORTED_FORMAT = "wav";
 
     private final ASRManager asrManager;
+    private final AsrAudioTranscoder audioTranscoder;
+
+    /**
+     * 是否启用 ASR 前置静音闸门
+     */
+    @Value("${asr.gate.enabled:true}")
+    private boolean gateEnabled = true;
+
+    /**
+     * 静音阈值（dBFS）
+     */
+    @Value("${asr.gate.threshold-dbfs:-45}")
+    private double gateThresholdDbfs = -45;
+
+    /**
+     * 能量计算窗口（毫秒）
+     */
+    @Value("${asr.gate.window-ms:20}")
+    private int gateWindowMs = 20;
+
+    /**
+     * 有效语音低于该时长（毫秒）时不调用 ASR
+     */
+    @Value("${asr.gate.min-speech-ms:100}")
+    private int gateMinSpeechMs = 100;
+
+    /**
+     * 语音前/后保留的静音（毫秒）
+     */
+    @Value("${asr.gate.leading-guard-ms:100}")
+    private int gateLeadingGuardMs = 100;
+
+    @Value("${asr.gate.trailing-guard-ms:200}")
+    private int gateTrailingGuardMs = 200;
+
+    /**
+     * 是否对长录音分段并行识别
+     */
+    @Value("${asr.parallel.enabled:true}")
+    private boolean parallelEnabled = true;
+
+    /**
+     * 录音超过该时长（毫秒）才分段
+     */
+    @Value("${asr.parallel.min-duration-ms:20000}")
+    private int parallelMinDurationMs = 20000;
+
+    /**
+     * 目标分段时长（毫秒）
+     */
+    @Value("${asr.parallel.segment-ms:10000}")
+    private int parallelSegmentMs = 10000;
+
+    /**
+     * 切点搜索范围（毫秒），在目标切点前后找能量最低处
+     */
+    @Value("${asr.parallel.search-ms:1500}")
+    private int parallelSearchMs = 1500;
+
+    /**
+     * 相邻分段重叠时长（毫秒）
+     */
+    @Value("${asr.parallel.overlap-ms:300}")
+    private int parallelOverlapMs = 300;
+
+    /**
+     * 同一段录音最多同时识别的分段数
+     */
+    @Value("${asr.parallel.max-concurrency:3}")
+    private int parallelMaxConcurrency = 3;
+
+    // 闸门统计
+    private final AtomicLong gateChecked = new AtomicLong();
+    private final AtomicLong gateRejected = new AtomicLong();
+    private final AtomicLong gateTrimmed = new AtomicLong();
+    private final AtomicLong gateInputBytes = new AtomicLong();
+    private final AtomicLong gateSavedBytes = new AtomicLong();
+
+    /**
+     * 把整段录音转为 ASR 输入的 16kHz 单声道 WAV
+     * <p>
+     * WebM / Ogg Opus 录音在服务端解码并重采样；高采样率或多声道的 WAV 降采样、混为单声道。
+     *
+     * @param audioData   整段录音
+     * @param audioFormat 客户端上报的音频格式
+     * @return 16kHz 单声道 WAV
+     * @throws IllegalArgumentException 不支持的音频格式
+     */
+    public byte[] toAsrWav(byte[] audioData, String audioFormat) {
+        byte[] wav = audioTranscoder.toAsrWav(audioData, audioFormat);
+        if (wav == null) {
+            throw new IllegalArgumentException("ASR仅支持wav/webm/ogg格式音频，当前格式: " + audioFormat);
+        }
+        return wav;
+    }
+
+    /**
+     * 整段录音送 ASR 前过闸门：没有语音时拒绝，否则裁掉首尾静音
+     *
+     * @param audioData   整段录音
+     * @param audioFormat 客户端上报的音频格式
+     * @return 闸门结果，{@link AsrAudioGate.Decision#REJECTED} 时不应再调用 ASR
+     */
+    public AsrAudioGate.Result gateAudio(byte[] audioData, String audioFormat) {
+        AsrAudioGate.Config gateConfig = new AsrAudioGate.Config(
+                gateEnabled && SUPPORTED_FORMAT.equals(normalizeAudioFormat(audioFormat)),
+                gateThresholdDbfs, gateWindowMs, gateMinSpeechMs, gateLeadingGuardMs, gateTrailingGuardMs);
+        AsrAudioGate.Result result = AsrAudioGate.apply(gateConfig, audioData);
+
+        gateChecked.incrementAndGet();
+        gateInputBytes.addAndGet(result.inputBytes());
+        gateSavedBytes.addAndGet(result.savedBytes());
+        switch (result.decision()) {
+            case REJECTED -> gateRejected.incrementAndGet();
+            case TRIMMED -> gateTrimmed.incrementAndGet();
+            default -> {
+            }
+        }
+        if (result.decision() != AsrAudioGate.Decision.PASS) {
+            log.debug("ASR 闸门: decision={}, speechMs={}, bytes={} -> {}",
+                    result.decision(), result.speechMs(), result.inputBytes(), result.outputBytes());
+        }
+        return result;
+    }
+
+    /**
+     * 闸门统计
+     */
+    public GateStats getGateStats() {
+        long checked = gateChecked.get();
+        long inputBytes = gateInputBytes.get();
+        long savedBytes = gateSavedBytes.get();
+        return new GateStats(checked, gateRejected.get(), gateTrimmed.get(), inputBytes, savedBytes,
+                inputBytes == 0 ? 0 : (double) savedBytes / inputBytes);
+    }
 
     /**
      * 将音频数据流式转换为文本
+     * <p>
+     * 整段上传时为单个音频块；ASR 支持流式输入时为持续到达的音频块，上传结束时完成。
      *
-     * @param audioData 音频数据
+     * @param audioStream 音频块流，上传结束时完成
      * @param audioFormat 客户端上报的音频格式
      * @param config 对话配置
      * @return ASR识别结果流
      */
-    public Flux<ASRResult> speechToTextStream(byte[] audioData, String audioFormat, ConversationConfig config) {
+    public Flux<ASRResult> speechToTextStream(Flux<byte[]> audioStream, String audioFormat, ConversationConfig config) {
         String normalizedFormat = normalizeAudioFormat(audioFormat);
         if (!SUPPORTED_FORMAT.equals(normalizedFormat)) {
-            throw new IllegalArgumentException("ASR仅支持wav格式音频，当前格式: " + audioFormat);
+            return Flux.error(new IllegalArgumentException("ASR仅支持wav格式音频，当前格式: " + audioFormat));
         }
 
         ASROptions asrOptions = ASROptions.of(config.getAsrModel(), SUPPORTED_FORMAT);
-        log.debug("ASR 流式识别开始: format={}, bytes={}", SUPPORTED_FORMAT, audioData.length);
-        return asrManager.speechToTextStream(config.getASRModelKey(), Flux.just(audioData), asrOptions);
+        log.debug("ASR 流式识别开始: format={}", SUPPORTED_FORMAT);
+        return asrManager.speechToTextStream(config.getASRModelKey(), audioStream, asrOptions);
+    }
+
+    /**
+     * 识别整段录音
+     * <p>
+     * 超过 {@code asr.parallel.min-duration-ms} 的录音在低能量处切成相互重叠的分段，
+     * 通过 {@link ASRManager} 并行识别（最多 {@code asr.parallel.max-concurrency} 段同时进行），
+     * 按分段顺序拼接：每段完成且之前各段都已完成时，输出到目前为止拼好的完整文本（非最终结果）。
+     * 总耗时接近单段识别耗时，而不是随录音时长线性增长。
+     *
+     * @param audioData   整段录音
+     * @param audioFormat 客户端上报的音频格式
+     * @param config      对话配置
+     * @return ASR识别结果流，分段识别时每条为累计文本
+     */
+    public Flux<ASRResult> speechToText(byte[] audioData, String audioFormat, ConversationConfig config) {
+        List<byte[]> segments = splitForParallel(audioData, audioFormat);
+        if (segments.size() <= 1) {
+            return speechToTextStream(Flux.just(audioData), audioFormat, config);
+        }
+
+        log.debug("ASR 分段并行识别: segments={}, concurrency={}", segments.size(), parallelMaxConcurrency);
+        ASROptions asrOptions = ASROptions.of(config.getAsrModel(), SUPPORTED_FORMAT);
+        String modelKey = config.getASRModelKey();
+        return Flux.fromIterable(segments)
+                .flatMapSequential(segment -> Flux.defer(() ->
+                                        asrManager.speechToTextStream(modelKey, Flux.just(segment), asrOptions))
+                                .subscribeOn(Schedulers.boundedElastic())
+                                .mapNotNull(ASRResult::getText)
+                                .reduce("", TranscriptMerger::merge),
+                        Math.max(1, parallelMaxConcurrency))
+                .scan("", TranscriptMerger::appendSegment)
+                .skip(1)
+                .filter(text -> !text.isBlank())
+                .map(text -> new ASRResult(text, false, null));
+    }
+
+    private List<byte[]> splitForParallel(byte[] audioData, String audioFormat) {
+        if (!parallelEnabled || !SUPPORTED_FORMAT.equals(normalizeAudioFormat(audioFormat))) {
+            return List.of(audioData);
+        }
+        WavCodec.WavInfo info = WavCodec.parse(audioData);
+        if (info == null || info.durationMs() < parallelMinDurationMs) {
+            return List.of(audioData);
+        }
+        AudioSegmenter.Config segmenterConfig = new AudioSegmenter.Config(
+                parallelSegmentMs, parallelSearchMs, parallelOverlapMs, gateWindowMs);
+        return AudioSegmenter.split(segmenterConfig, audioData);
+    }
+
+    /**
+     * 当前配置的 ASR 模型是否支持边上传边识别
+     */
+    public boolean supportsStreamingInput(String audioFormat, ConversationConfig config) {
+        return SUPPORTED_FORMAT.equals(normalizeAudioFormat(audioFormat))
+                && asrManager.supportsStreamingInput(config.getASRModelKey());
     }
 
     private String normalizeAudioFormat(String audioFormat) {
@@ -59,4 +263,18 @@ public class ASRService {
             default -> normalized;
         };
     }
+
+    /**
+     * ASR 闸门统计
+     *
+     * @param checked     经过闸门的录音数
+     * @param rejected    判定无语音、未调用 ASR 的次数
+     * @param trimmed     裁剪了首尾静音的次数
+     * @param inputBytes  原始总字节数
+     * @param savedBytes  未上传的字节数（拒绝 + 裁剪）
+     * @param savedRatio  节省比例
+     */
+    public record GateStats(long checked, long rejected, long trimmed, long inputBytes, long savedBytes,
+                            double savedRatio) {
+    }
 }
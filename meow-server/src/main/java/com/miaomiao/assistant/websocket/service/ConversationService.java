@@ -3,17 +3,26 @@ package com.miaomiao.assistant.websocket.service;
 import com.miaomiao.assistant.model.asr.ASRResult;
 import com.miaomiao.assistant.service.ConversationConfigService;
 import com.miaomiao.assistant.websocket.ConversationConfig;
+import com.miaomiao.assistant.websocket.service.pipeline.AsrAudioGate;
 import com.miaomiao.assistant.websocket.session.WebSocketMessageSender;
 import com.miaomiao.assistant.websocket.session.SessionState;
 import lombok.RequiredArgsConstructor;
 import lombok.extern.slf4j.Slf4j;
 import org.springframework.stereotype.Service;
+import reactor.core.Disposable;
+import reactor.core.Disposables;
+import reactor.core.Exceptions;
 import reactor.core.publisher.Flux;
+import reactor.core.publisher.Mono;
+import reactor.core.scheduler.Schedulers;
 
-import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.CancellationException;
 
 /**
  * 对话处理服务（入口） 负责编排 ASR -> LLM -> TTS 的完整流程
+ * <p>
+ * 每一轮对话是一条 Reactor 链路，等待 ASR / LLM / TTS 响应时不占用线程；
+ * 链路订阅登记在会话上，中止或断开时整条取消。
  */
 @Slf4j
 @Service
@@ -25,6 +34,7 @@ public class ConversationService {
     private final TTSService ttsService;
     private final WebSocketMessageSender messageSender;
     private final ConversationConfigService configService;
+    private final SpeculativeLLMService speculativeLLMService;
 
     /**
      * 处理音频输入，执行完整的 ASR -> LLM -> TTS 流程
@@ -43,44 +53,118 @@ public class ConversationService {
             return;
         }
 
-        // 异步处理完整流程
-        CompletableFuture.runAsync(() -> {
-            try {
-                if (!state.getSession().isOpen()) {
-                    log.debug("会话 {} 已断开，取消 ASR->LLM->TTS 流程", state.getSessionId());
-                    return;
-                }
-                ConversationConfig config = configService.getConfigBySessionId(state.getSessionId());
-
-                // 1. ASR: 流式语音转文本（仅流式，不降级）
-                String transcript = transcribeAudioStreaming(state, audioData, audioFormat, config);
-                if (!state.getSession().isOpen()) {
-                    log.debug("会话 {} 在 ASR 后已断开，终止后续流程", state.getSessionId());
-                    return;
-                }
-                if (transcript == null || transcript.isBlank()) {
-                    log.debug("ASR 识别结果为空，跳过后续流程");
-                    return;
-                }
-
-                // 发送最终 STT 结果到客户端
-                messageSender.sendSTTResult(state, transcript, true);
-
-                // 2. LLM + TTS: 对话生成和语音合成
-                processTextInput(state, transcript, config);
+        ConversationConfig config = configService.getConfigBySessionId(state.getSessionId());
+        // 转码、闸门和识别都在异步流程中执行，不占用 WebSocket 接收线程
+        runAudioPipeline(state, Flux.defer(() -> transcribeWholeAudio(state, audioData, audioFormat, config)), config);
+    }
 
+    /**
+     * 整段录音：转为 16kHz 单声道 WAV，没有语音的录音不调用 ASR，有语音则裁掉首尾静音再识别
+     */
+    private Flux<ASRResult> transcribeWholeAudio(SessionState state, byte[] audioData, String audioFormat,
+                                                 ConversationConfig config) {
+        byte[] wav = asrService.toAsrWav(audioData, audioFormat);
+        AsrAudioGate.Result gated = asrService.gateAudio(wav, ASRService.SUPPORTED_FORMAT);
+        if (gated.decision() == AsrAudioGate.Decision.REJECTED) {
+            log.debug("录音中未检测到语音，跳过 ASR: session={}, bytes={}", state.getSessionId(), audioData.length);
+            try {
+                messageSender.sendListeningStopped(state, "no_speech", gated.speechMs());
             } catch (Exception e) {
-                log.error("对话处理失败", e);
-                if (!state.getSession().isOpen()) {
-                    return;
-                }
-                try {
-                    messageSender.sendError(state, "处理失败: " + e.getMessage());
-                } catch (Exception ex) {
-                    log.error("发送错误消息失败", ex);
-                }
+                log.warn("发送 listening_stopped 失败: {}", e.getMessage());
             }
+            return Flux.empty();
+        }
+        return asrService.speechToText(gated.audio(), ASRService.SUPPORTED_FORMAT, config);
+    }
+
+    /**
+     * 开始流式音频输入：当前 ASR 模型支持流式输入时，立即启动 ASR -> LLM -> TTS 流程，
+     * 之后到达的音频块通过 {@link SessionState#emitAudioInput} 转发，上传结束时 {@link SessionState#completeAudioInput}
+     *
+     * @param state 会话状态
+     * @param audioFormat 音频格式（来自客户端）
+     * @return false 表示 ASR 不支持流式输入，调用方应继续累积整段音频
+     */
+    public boolean startStreamingAudioInput(SessionState state, String audioFormat) {
+        if (!state.getSession().isOpen()) {
+            return false;
+        }
+        ConversationConfig config = configService.getConfigBySessionId(state.getSessionId());
+        if (!asrService.supportsStreamingInput(audioFormat, config)) {
+            return false;
+        }
+
+        log.debug("开始流式音频输入: session={}, format={}", state.getSessionId(), audioFormat);
+        runAudioPipeline(state, asrService.speechToTextStream(state.openAudioInput(), audioFormat, config), config);
+        return true;
+    }
+
+    private void runAudioPipeline(SessionState state, Flux<ASRResult> asrStream, ConversationConfig config) {
+        Mono<Void> turn = Mono.defer(() -> {
+            if (!state.getSession().isOpen()) {
+                log.debug("会话 {} 已断开，取消 ASR->LLM->TTS 流程", state.getSessionId());
+                return Mono.empty();
+            }
+            SpeculativeLLMService.Turn speculation = speculativeLLMService.begin(state, config);
+
+            // 1. ASR: 流式语音转文本（仅流式，不降级）
+            return transcribeAudioStreaming(state, asrStream, speculation)
+                    .filter(transcript -> {
+                        if (!state.getSession().isOpen()) {
+                            log.debug("会话 {} 在 ASR 后已断开，终止后续流程", state.getSessionId());
+                            return false;
+                        }
+                        if (transcript.isBlank()) {
+                            log.debug("ASR 识别结果为空，跳过后续流程");
+                            return false;
+                        }
+                        return true;
+                    })
+                    // 智谱 SDK 在创建流时同步建连，切到 boundedElastic，不占用 ASR 回调线程
+                    .publishOn(Schedulers.boundedElastic())
+                    .flatMap(transcript -> {
+                        try {
+                            // 发送最终 STT 结果到客户端
+                            messageSender.sendSTTResult(state, transcript, true);
+                        } catch (Exception e) {
+                            return Mono.<Void>error(e);
+                        }
+                        // 2. LLM + TTS: 对话生成和语音合成；中间结果已提前发起且与最终结果一致时直接采用
+                        return respond(state, transcript, config, speculation.resolve(transcript));
+                    })
+                    .doFinally(signalType -> speculation.cancel());
         });
+        subscribeTurn(state, turn);
+    }
+
+    /**
+     * 订阅一轮对话并登记到会话，中止时取消
+     * <p>
+     * 转码、闸门等同步步骤放到 boundedElastic 执行，不占用 WebSocket 接收线程。
+     */
+    private void subscribeTurn(SessionState state, Mono<Void> turn) {
+        Disposable.Swap handle = Disposables.swap();
+        state.addActiveTurn(handle);
+        handle.update(turn
+                .subscribeOn(Schedulers.boundedElastic())
+                .doFinally(signalType -> state.removeActiveTurn(handle))
+                .subscribe(null, error -> handleTurnError(state, error)));
+    }
+
+    private void handleTurnError(SessionState state, Throwable error) {
+        if (Exceptions.unwrap(error) instanceof CancellationException) {
+            log.debug("音频输入已取消: session={}", state.getSessionId());
+            return;
+        }
+        log.error("对话处理失败", error);
+        if (!state.getSession().isOpen()) {
+            return;
+        }
+        try {
+            messageSender.sendError(state, "处理失败: " + error.getMessage());
+        } catch (Exception ex) {
+            log.error("发送错误消息失败", ex);
+        }
     }
 
     /**
@@ -91,19 +175,22 @@ public class ConversationService {
             return;
         }
         state.abort();
-        state.getAndClearAudioBuffer();
+        state.cancelAudioInput();
+        state.resetVoiceInput();
     }
 
-    private String transcribeAudioStreaming(SessionState state, byte[] audioData, String audioFormat, ConversationConfig config) {
-        return asrService.speechToTextStream(audioData, audioFormat, config)
+    private Mono<String> transcribeAudioStreaming(SessionState state, Flux<ASRResult> asrStream,
+                                                  SpeculativeLLMService.Turn speculation) {
+        return asrStream
                 .map(ASRResult::getText)
                 .filter(text -> text != null && !text.isBlank())
-                .scan("", this::mergeTranscript)
+                .scan("", TranscriptMerger::merge)
                 .skip(1)
-                .doOnNext(partial -> sendPartialSTT(state, partial))
-                .last("")
-                .blockOptional()
-                .orElse("");
+                .doOnNext(partial -> {
+                    sendPartialSTT(state, partial);
+                    speculation.onPartial(partial);
+                })
+                .last("");
     }
 
     private void sendPartialSTT(SessionState state, String partialText) {
@@ -117,27 +204,6 @@ public class ConversationService {
         }
     }
 
-    /**
-     * 兼容增量和累计两种 ASR chunk 文本格式：
-     * - 若 incoming 以 accumulated 开头，则视为累计文本，直接替换
-     * - 否则视为增量文本，追加
-     */
-    private String mergeTranscript(String accumulated, String incoming) {
-        if (incoming == null || incoming.isBlank()) {
-            return accumulated;
-        }
-        if (accumulated == null || accumulated.isBlank()) {
-            return incoming;
-        }
-        if (incoming.startsWith(accumulated)) {
-            return incoming;
-        }
-        if (accumulated.startsWith(incoming)) {
-            return accumulated;
-        }
-        return accumulated + incoming;
-    }
-
     /**
      * 处理文本输入，执行 LLM -> TTS 流程
      *
@@ -146,24 +212,27 @@ public class ConversationService {
      */
     public void processTextInput(SessionState state, String text) {
         ConversationConfig config = configService.getConfigBySessionId(state.getSessionId());
-        processTextInput(state, text, config);
+        subscribeTurn(state, Mono.defer(() -> respond(state, text, config, null)));
     }
 
     /**
-     * 处理文本输入，执行 LLM -> TTS 流程
+     * 执行 LLM -> TTS 流程
      *
      * @param state 会话状态
      * @param text 用户输入文本
      * @param config 对话配置
+     * @param prefetched 已提前发起的 LLM 请求，为 null 时按 text 发起
+     * @return 本轮回复音频全部发送后完成
      */
-    private void processTextInput(SessionState state, String text, ConversationConfig config) {
+    private Mono<Void> respond(SessionState state, String text, ConversationConfig config,
+                               LLMService.PrefetchedStream prefetched) {
         if (!state.getSession().isOpen()) {
             log.debug("会话 {} 已断开，忽略文本输入处理", state.getSessionId());
-            return;
+            return Mono.empty();
         }
         if (text == null || text.isBlank()) {
             log.debug("文本输入为空，跳过处理");
-            return;
+            return Mono.empty();
         }
 
         // 重置中止状态
@@ -173,9 +242,11 @@ public class ConversationService {
         state.getPerformanceMetrics().recordUserInputStart();
 
         // 2. LLM: 流式对话，返回句子流
-        Flux<String> sentenceStream = llmService.processLLMStream(state, text, config);
+        Flux<String> sentenceStream = prefetched != null
+                ? llmService.processLLMStream(state, text, prefetched)
+                : llmService.processLLMStream(state, text, config);
 
         // 3. TTS: 将句子流转为音频并发送
-        ttsService.processTTSStream(state, sentenceStream);
+        return ttsService.processTTSStream(state, sentenceStream);
     }
 }
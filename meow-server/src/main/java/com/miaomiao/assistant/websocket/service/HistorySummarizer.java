@@ -0,0 +1,145 @@
+package com.miaomiao.assistant.websocket.service;
+
+import com.miaomiao.assistant.model.llm.AppChatMessage;
+import com.miaomiao.assistant.model.llm.AppLLMResponse;
+import com.miaomiao.assistant.model.llm.LLMManager;
+import com.miaomiao.assistant.model.llm.LLMOptions;
+import com.miaomiao.assistant.websocket.session.ConversationHistory;
+import com.miaomiao.assistant.websocket.session.SessionState;
+import lombok.RequiredArgsConstructor;
+import lombok.extern.slf4j.Slf4j;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.stereotype.Service;
+import reactor.core.scheduler.Schedulers;
+
+import java.time.Duration;
+import java.util.List;
+import java.util.Objects;
+import java.util.concurrent.atomic.AtomicLong;
+import java.util.stream.Collectors;
+
+/**
+ * 对话历史后台压缩
+ * <p>
+ * 每轮对话写入历史后检查 token 预算，超出时把最早的若干轮连同已有摘要交给（较快的）摘要模型，
+ * 生成新的滚动摘要替换这些消息。压缩在后台进行，不阻塞当前和下一轮回复；
+ * 压缩完成前这些消息仍按原文参与对话。摘要失败或关闭时直接丢弃超出预算的最早消息。
+ */
+@Slf4j
+@Service
+@RequiredArgsConstructor
+public class HistorySummarizer {
+
+    private static final String SUMMARY_INSTRUCTION = """
+            你负责压缩一段角色扮演对话的历史。请把“已有摘要”和“新增对话”合并成一段新的摘要：
+            保留用户透露的个人信息、偏好、约定和尚未完成的话题，以及角色已经做出的承诺；
+            省略寒暄和重复内容。使用第三人称陈述，不要输出摘要以外的任何内容。""";
+
+    private final LLMManager llmManager;
+
+    /**
+     * 是否用 LLM 生成摘要，关闭时超出预算的消息直接丢弃
+     */
+    @Value("${llm.history.summary.enabled:true}")
+    private boolean enabled = true;
+
+    /**
+     * 生成摘要使用的模型（provider:model）
+     */
+    @Value("${llm.history.summary.model:zhipu:glm-4.7-flash}")
+    private String modelKey = "zhipu:glm-4.7-flash";
+
+    /**
+     * 摘要的最大 token 数
+     */
+    @Value("${llm.history.summary.max-tokens:300}")
+    private int maxTokens = 300;
+
+    /**
+     * 单次摘要的超时时间（毫秒），超时按失败处理
+     */
+    @Value("${llm.history.summary.timeout-ms:15000}")
+    private long timeoutMs = 15000;
+
+    private final AtomicLong compactions = new AtomicLong();
+    private final AtomicLong failures = new AtomicLong();
+    private final AtomicLong compactedMessages = new AtomicLong();
+    private final AtomicLong totalLatencyNanos = new AtomicLong();
+
+    /**
+     * 历史超出预算时在后台压缩，立即返回
+     */
+    public void compactIfNeeded(SessionState state) {
+        ConversationHistory history = state.getHistory();
+        List<AppChatMessage> batch = history.beginCompaction();
+        if (batch.isEmpty()) {
+            return;
+        }
+        if (!enabled) {
+            history.abortCompaction();
+            compactedMessages.addAndGet(batch.size());
+            return;
+        }
+
+        long start = System.nanoTime();
+        LLMOptions options = LLMOptions.of(modelKey.substring(modelKey.indexOf(':') + 1));
+        options.setMaxTokens(maxTokens);
+        options.setTemperature(0.3);
+        List<AppChatMessage> messages = List.of(
+                new AppChatMessage("system", SUMMARY_INSTRUCTION),
+                new AppChatMessage("user", buildPrompt(history.getSummary(), batch)));
+
+        llmManager.chatStream(modelKey, messages, options)
+                .map(AppLLMResponse::text)
+                .filter(Objects::nonNull)
+                .collect(Collectors.joining())
+                .timeout(Duration.ofMillis(timeoutMs))
+                // 智谱 SDK 的流式调用在订阅线程上同步建立连接
+                .subscribeOn(Schedulers.boundedElastic())
+                .subscribe(summary -> {
+                    if (summary.isBlank()) {
+                        failures.incrementAndGet();
+                        history.abortCompaction();
+                    } else {
+                        history.completeCompaction(summary);
+                        compactions.incrementAndGet();
+                        totalLatencyNanos.addAndGet(System.nanoTime() - start);
+                    }
+                    compactedMessages.addAndGet(batch.size());
+                    log.debug("对话历史压缩完成: session={}, messages={}, summaryLen={}, historyTokens={}",
+                            state.getSessionId(), batch.size(), summary.length(), history.totalTokens());
+                }, error -> {
+                    failures.incrementAndGet();
+                    compactedMessages.addAndGet(batch.size());
+                    history.abortCompaction();
+                    log.warn("对话历史压缩失败，丢弃最早的 {} 条消息: session={}, error={}",
+                            batch.size(), state.getSessionId(), error.getMessage());
+                });
+    }
+
+    private static String buildPrompt(String previousSummary, List<AppChatMessage> batch) {
+        StringBuilder prompt = new StringBuilder();
+        prompt.append("已有摘要：\n").append(previousSummary == null ? "（无）" : previousSummary).append("\n\n新增对话：\n");
+        for (AppChatMessage message : batch) {
+            prompt.append("user".equals(message.role()) ? "用户：" : "角色：").append(message.content()).append('\n');
+        }
+        return prompt.toString();
+    }
+
+    public Stats getStats() {
+        long count = compactions.get();
+        return new Stats(count, failures.get(), compactedMessages.get(),
+                count == 0 ? 0 : totalLatencyNanos.get() / count / 1_000_000);
+    }
+
+    /**
+     * 历史压缩统计
+     *
+     * @param compactions       成功生成摘要的次数
+     * @param failures          摘要失败（超时、出错或为空）的次数，失败时直接丢弃消息
+     * @param compactedMessages 移出近期历史的消息总数
+     * @param avgLatencyMs      成功摘要的平均耗时（毫秒）
+     */
+    public record Stats(long compactions, long failures, long compactedMessages, long avgLatencyMs) {
+    }
+}
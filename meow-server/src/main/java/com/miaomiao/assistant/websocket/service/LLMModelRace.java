@@ -0,0 +1,262 @@
+package com.miaomiao.assistant.websocket.service;
+
+import com.miaomiao.assistant.model.llm.AppLLMResponse;
+import com.miaomiao.assistant.model.llm.LLMOptions;
+import lombok.Getter;
+import lombok.extern.slf4j.Slf4j;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.stereotype.Component;
+import reactor.core.Disposable;
+import reactor.core.publisher.ConnectableFlux;
+import reactor.core.publisher.Flux;
+import reactor.core.publisher.Mono;
+import reactor.core.publisher.Sinks;
+import reactor.core.scheduler.Schedulers;
+
+import java.util.Set;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicLong;
+import java.util.function.Supplier;
+
+/**
+ * 快模型与主模型竞速
+ * <p>
+ * 同时向主模型和快模型（如 glm-4.7-flash）发起同一请求，哪一路先产出可用的首句（达到最小字数且以标点结束，
+ * 或整段回复已结束）就采用哪一路，立即取消另一路；采用的一路从头回放，后续与普通流式回复完全一致。
+ * 两路都没有可用首句时回退到主模型的结果（包括其错误）。
+ * <p>
+ * 每轮记录：胜出方、首句耗时、被取消一路已生成的 token 数（按流式分片计），以及估算节省的时间
+ * （主模型首句耗时的历史均值减去快模型首句耗时，均值取自主模型胜出的轮次）。
+ */
+@Slf4j
+@Component
+public class LLMModelRace {
+
+    /**
+     * 首句可在这些标点处结束（与 TTS 首句断句一致，逗号也可以）
+     */
+    private static final Set<Character> CLAUSE_PUNCTUATIONS = Set.of(
+            '，', ',', '、', '。', '.', '？', '?', '！', '!', '；', ';', '：', ':', '~', '\n'
+    );
+
+    /**
+     * 是否启用竞速
+     */
+    @Getter
+    @Value("${llm.race.enabled:false}")
+    private boolean enabled = false;
+
+    /**
+     * 参与竞速的快模型（provider:model）
+     */
+    @Getter
+    @Value("${llm.race.model:zhipu:glm-4.7-flash}")
+    private String modelKey = "zhipu:glm-4.7-flash";
+
+    /**
+     * 首句的最少字符数，避免只凭一个“嗯，”就判定胜负
+     */
+    @Value("${llm.race.min-clause-chars:4}")
+    private int minClauseChars = 4;
+
+    private final AtomicLong races = new AtomicLong();
+    private final AtomicLong primaryWins = new AtomicLong();
+    private final AtomicLong fastWins = new AtomicLong();
+    private final AtomicLong fallbacks = new AtomicLong();
+    private final AtomicLong wastedTokens = new AtomicLong();
+    private final AtomicLong totalWinnerNanos = new AtomicLong();
+    private final AtomicLong totalPrimaryWinNanos = new AtomicLong();
+    private final AtomicLong totalSavedNanos = new AtomicLong();
+
+    /**
+     * 本轮是否竞速：已启用且主模型不是快模型本身
+     */
+    public boolean appliesTo(String primaryModelKey) {
+        return enabled && !modelKey.equals(primaryModelKey);
+    }
+
+    /**
+     * 快模型的请求选项，输出长度与主模型一致
+     */
+    public LLMOptions fastOptions(LLMOptions primaryOptions) {
+        LLMOptions options = LLMOptions.of(modelKey.substring(modelKey.indexOf(':') + 1));
+        options.setMaxTokens(primaryOptions.getMaxTokens());
+        options.setTemperature(primaryOptions.getTemperature());
+        return options;
+    }
+
+    /**
+     * 两路同时发起，返回先产出可用首句的一路
+     *
+     * @param sessionId       会话ID（日志用）
+     * @param primaryModelKey 主模型（provider:model）
+     * @param primary         主模型请求，订阅时才发起
+     * @param fast            快模型请求，订阅时才发起
+     * @return 胜出的模型及其回复流（从头回放）；回复流结束或取消时断开该路请求
+     */
+    public Mono<Winner> race(String sessionId, String primaryModelKey,
+                             Supplier<Flux<AppLLMResponse>> primary,
+                             Supplier<Flux<AppLLMResponse>> fast) {
+        return Mono.defer(() -> {
+            long start = System.nanoTime();
+            races.incrementAndGet();
+            Candidate primaryCandidate = new Candidate(primary);
+            Candidate fastCandidate = new Candidate(fast);
+
+            return Mono.firstWithValue(primaryCandidate.ready(), fastCandidate.ready())
+                    .onErrorResume(e -> {
+                        // 两路都没有可用首句
+                        fallbacks.incrementAndGet();
+                        fastCandidate.cancel();
+                        return Mono.just(primaryCandidate);
+                    })
+                    .map(winner -> {
+                        boolean fastWon = winner == fastCandidate;
+                        Candidate loser = fastWon ? primaryCandidate : fastCandidate;
+                        if (winner.readyNanos > 0) {
+                            loser.cancel();
+                            account(sessionId, start, fastWon, winner, loser);
+                        }
+                        return new Winner(fastWon ? modelKey : primaryModelKey,
+                                winner.stream().doFinally(signalType -> winner.cancel()));
+                    })
+                    .doOnCancel(() -> {
+                        primaryCandidate.cancel();
+                        fastCandidate.cancel();
+                    });
+        });
+    }
+
+    private void account(String sessionId, long start, boolean fastWon, Candidate winner, Candidate loser) {
+        long winnerNanos = winner.readyNanos - start;
+        long wasted = loser.tokens.get();
+        long savedNanos = 0;
+        totalWinnerNanos.addAndGet(winnerNanos);
+        wastedTokens.addAndGet(wasted);
+        if (fastWon) {
+            long wins = primaryWins.get();
+            long primaryBaseline = wins == 0 ? 0 : totalPrimaryWinNanos.get() / wins;
+            savedNanos = Math.max(0, primaryBaseline - winnerNanos);
+            totalSavedNanos.addAndGet(savedNanos);
+            fastWins.incrementAndGet();
+        } else {
+            totalPrimaryWinNanos.addAndGet(winnerNanos);
+            primaryWins.incrementAndGet();
+        }
+        log.info("LLM 模型竞速: session={}, winner={}, firstClauseMs={}, wastedTokens={}, estimatedSavedMs={}",
+                sessionId, fastWon ? modelKey : "primary", TimeUnit.NANOSECONDS.toMillis(winnerNanos), wasted,
+                TimeUnit.NANOSECONDS.toMillis(savedNanos));
+    }
+
+    public Stats getStats() {
+        long fast = fastWins.get();
+        long primary = primaryWins.get();
+        long decided = fast + primary;
+        return new Stats(
+                races.get(),
+                primary,
+                fast,
+                fallbacks.get(),
+                wastedTokens.get(),
+                decided == 0 ? 0 : TimeUnit.NANOSECONDS.toMillis(totalWinnerNanos.get() / decided),
+                primary == 0 ? 0 : TimeUnit.NANOSECONDS.toMillis(totalPrimaryWinNanos.get() / primary),
+                TimeUnit.NANOSECONDS.toMillis(totalSavedNanos.get())
+        );
+    }
+
+    /**
+     * 竞速中的一路：立即连接上游并缓冲全部响应，首句可用时发出就绪信号
+     */
+    private final class Candidate {
+
+        private final ConnectableFlux<AppLLMResponse> replay;
+        private final Disposable connection;
+        private final Sinks.One<Candidate> readySink = Sinks.one();
+        private final AtomicLong tokens = new AtomicLong();
+
+        /**
+         * 仅由上游回调线程访问（同一流的回调是串行的）
+         */
+        private int chars = 0;
+        private volatile long readyNanos = 0;
+
+        Candidate(Supplier<Flux<AppLLMResponse>> request) {
+            // 智谱 SDK 在订阅线程上同步建立连接，两路分别放到弹性线程池上才能同时发起
+            this.replay = Flux.defer(request)
+                    .subscribeOn(Schedulers.boundedElastic())
+                    .doOnNext(this::onResponse)
+                    .doOnComplete(() -> markReady(chars > 0))
+                    .doOnError(e -> readySink.tryEmitError(e))
+                    .replay();
+            this.connection = replay.connect();
+        }
+
+        private void onResponse(AppLLMResponse response) {
+            String text = response.text();
+            if (text != null && !text.isEmpty()) {
+                tokens.incrementAndGet();
+                if (readyNanos == 0) {
+                    for (int i = 0; i < text.length(); i++) {
+                        if (CLAUSE_PUNCTUATIONS.contains(text.charAt(i)) && chars + i + 1 >= minClauseChars) {
+                            markReady(true);
+                            break;
+                        }
+                    }
+                }
+                chars += text.length();
+            }
+            if (response.finished()) {
+                markReady(chars > 0);
+            }
+        }
+
+        private void markReady(boolean usable) {
+            if (readyNanos != 0) {
+                return;
+            }
+            if (usable) {
+                readyNanos = System.nanoTime();
+                readySink.tryEmitValue(this);
+            } else {
+                readySink.tryEmitEmpty();
+            }
+        }
+
+        Mono<Candidate> ready() {
+            return readySink.asMono();
+        }
+
+        Flux<AppLLMResponse> stream() {
+            return replay;
+        }
+
+        void cancel() {
+            connection.dispose();
+        }
+    }
+
+    /**
+     * 竞速结果
+     *
+     * @param modelKey 胜出的模型（provider:model），回复缓存和近似问题索引按它记录
+     * @param stream   胜出一路的回复流
+     */
+    public record Winner(String modelKey, Flux<AppLLMResponse> stream) {
+    }
+
+    /**
+     * 模型竞速统计
+     *
+     * @param races                   竞速轮数
+     * @param primaryWins             主模型胜出次数
+     * @param fastWins                快模型胜出次数
+     * @param fallbacks               两路都没有可用首句、回退主模型的次数
+     * @param wastedTokens            被取消一路已生成的 token 数（按流式分片计）
+     * @param avgFirstClauseMs        胜出方首句的平均耗时（毫秒）
+     * @param avgPrimaryFirstClauseMs 主模型胜出时首句的平均耗时（毫秒），用作估算节省时间的基线
+     * @param totalEstimatedSavedMs   快模型胜出时累计估算节省的首句时间（毫秒）
+     */
+    public record Stats(long races, long primaryWins, long fastWins, long fallbacks, long wastedTokens,
+                        long avgFirstClauseMs, long avgPrimaryFirstClauseMs, long totalEstimatedSavedMs) {
+    }
+}
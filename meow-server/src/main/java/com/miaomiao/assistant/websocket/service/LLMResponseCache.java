@@ -0,0 +1,320 @@
+package com.miaomiao.assistant.websocket.service;
+
+import com.miaomiao.assistant.model.llm.AppChatMessage;
+import com.miaomiao.assistant.model.llm.AppLLMResponse;
+import lombok.extern.slf4j.Slf4j;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.stereotype.Component;
+import reactor.core.publisher.Flux;
+
+import java.nio.charset.StandardCharsets;
+import java.security.MessageDigest;
+import java.security.NoSuchAlgorithmException;
+import java.time.Duration;
+import java.util.ArrayList;
+import java.util.HexFormat;
+import java.util.Iterator;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicLong;
+
+/**
+ * LLM 回复精确匹配缓存
+ * <p>
+ * 新会话里的打招呼、"你是谁"这类固定问题经常完全重复，命中缓存时不再请求模型：
+ * 1. 键：模型、渲染后的系统提示词、最近若干条对话历史（空白规整后）和用户输入的 SHA-256
+ * 2. 只缓存正常结束（finished）的非空回复；中断、出错的回复不缓存
+ * 3. 条目超过 TTL 失效，总大小超过字节预算时按最近最少使用淘汰
+ * 4. 命中时按 {@code replay-chars-per-second} 把回复切成 token 回放，前端打字效果和 TTS 断句与实时生成一致
+ * <p>
+ * 命中率和节省的时间见 {@code GET /api/metrics/llm-cache}。
+ */
+@Slf4j
+@Component
+public class LLMResponseCache {
+
+    /**
+     * 每个字符按 UTF-16 计 2 字节，另加固定的条目开销
+     */
+    private static final int ENTRY_OVERHEAD_BYTES = 128;
+
+    /**
+     * 是否启用缓存
+     */
+    @Value("${llm.cache.enabled:true}")
+    private boolean enabled = true;
+
+    /**
+     * 条目有效期（秒）
+     */
+    @Value("${llm.cache.ttl-seconds:3600}")
+    private long ttlSeconds = 3600;
+
+    /**
+     * 缓存总大小上限（字节）
+     */
+    @Value("${llm.cache.max-bytes:8388608}")
+    private long maxBytes = 8 * 1024 * 1024;
+
+    /**
+     * 参与键计算的最近历史消息条数
+     */
+    @Value("${llm.cache.history-messages:6}")
+    private int historyMessages = 6;
+
+    /**
+     * 命中时的回放速度（字符/秒），0 表示一次性回放
+     */
+    @Value("${llm.cache.replay-chars-per-second:60}")
+    private int replayCharsPerSecond = 60;
+
+    /**
+     * 回放时每个 token 的字符数
+     */
+    @Value("${llm.cache.replay-chunk-chars:4}")
+    private int replayChunkChars = 4;
+
+    /**
+     * 访问顺序的 LinkedHashMap，头部即最近最少使用
+     */
+    private final LinkedHashMap<String, Entry> entries = new LinkedHashMap<>(64, 0.75f, true);
+    private long totalBytes = 0;
+
+    // 统计
+    private final AtomicLong lookups = new AtomicLong();
+    private final AtomicLong hits = new AtomicLong();
+    private final AtomicLong stores = new AtomicLong();
+    private final AtomicLong evictions = new AtomicLong();
+    private final AtomicLong expirations = new AtomicLong();
+    private final AtomicLong totalSavedFirstTokenNanos = new AtomicLong();
+    private final AtomicLong totalSavedNanos = new AtomicLong();
+
+    /**
+     * 缓存条目
+     *
+     * @param text             完整回复
+     * @param expiresAtNanos   过期时间
+     * @param firstTokenNanos  原始请求的首 token 耗时
+     * @param generationNanos  原始请求的总耗时
+     * @param bytes            条目占用的字节数（估算）
+     */
+    private record Entry(String text, long expiresAtNanos, long firstTokenNanos, long generationNanos, long bytes) {
+    }
+
+    /**
+     * 计算缓存键
+     *
+     * @param modelKey     模型（provider:model）
+     * @param maxTokens    最大输出 token 数
+     * @param systemPrompt 渲染后的系统提示词
+     * @param history      对话历史（只取最近 {@code history-messages} 条）
+     * @param userText     用户输入
+     * @return 未启用缓存时返回 null
+     */
+    public String key(String modelKey, Integer maxTokens, String systemPrompt,
+                      List<AppChatMessage> history, String userText) {
+        if (!enabled) {
+            return null;
+        }
+        MessageDigest digest = sha256();
+        update(digest, modelKey);
+        update(digest, String.valueOf(maxTokens));
+        update(digest, systemPrompt);
+        int from = Math.max(0, history.size() - Math.max(0, historyMessages));
+        for (AppChatMessage message : history.subList(from, history.size())) {
+            update(digest, message.role());
+            update(digest, normalize(message.content()));
+        }
+        update(digest, normalize(userText));
+        return HexFormat.of().formatHex(digest.digest());
+    }
+
+    /**
+     * 查找缓存并构造回放流
+     *
+     * @param key {@link #key} 的返回值，为 null 时直接未命中
+     * @return 未命中时返回 null
+     */
+    public Flux<AppLLMResponse> replay(String key) {
+        if (key == null) {
+            return null;
+        }
+        lookups.incrementAndGet();
+        Entry entry;
+        synchronized (this) {
+            entry = entries.get(key);
+            if (entry != null && System.nanoTime() - entry.expiresAtNanos() > 0) {
+                removeEntry(key);
+                expirations.incrementAndGet();
+                entry = null;
+            }
+        }
+        if (entry == null) {
+            return null;
+        }
+
+        hits.incrementAndGet();
+        totalSavedFirstTokenNanos.addAndGet(entry.firstTokenNanos());
+        long replayNanos = replayCharsPerSecond > 0
+                ? TimeUnit.SECONDS.toNanos(entry.text().length()) / replayCharsPerSecond
+                : 0;
+        totalSavedNanos.addAndGet(Math.max(0, entry.generationNanos() - replayNanos));
+        log.debug("LLM 缓存命中: key={}, chars={}, 原始耗时 {}ms", key.substring(0, 12), entry.text().length(),
+                TimeUnit.NANOSECONDS.toMillis(entry.generationNanos()));
+        return tokenStream(entry.text());
+    }
+
+    /**
+     * 包装实时 LLM 流：正常结束时把完整回复写入缓存
+     *
+     * @param key    {@link #key} 的返回值，为 null 时原样返回
+     * @param stream LLM 响应流
+     */
+    public Flux<AppLLMResponse> record(String key, Flux<AppLLMResponse> stream) {
+        if (key == null) {
+            return stream;
+        }
+        return Flux.defer(() -> {
+            long startNanos = System.nanoTime();
+            long[] firstTokenNanos = {-1};
+            StringBuilder text = new StringBuilder();
+            return stream.doOnNext(response -> {
+                if (response.text() != null && !response.text().isEmpty()) {
+                    if (firstTokenNanos[0] < 0) {
+                        firstTokenNanos[0] = System.nanoTime() - startNanos;
+                    }
+                    text.append(response.text());
+                }
+                if (response.finished() && !text.isEmpty()) {
+                    put(key, text.toString(), Math.max(0, firstTokenNanos[0]), System.nanoTime() - startNanos);
+                }
+            });
+        });
+    }
+
+    private synchronized void put(String key, String text, long firstTokenNanos, long generationNanos) {
+        long bytes = text.length() * 2L + ENTRY_OVERHEAD_BYTES;
+        if (bytes > maxBytes) {
+            return;
+        }
+        removeEntry(key);
+        entries.put(key, new Entry(text, System.nanoTime() + TimeUnit.SECONDS.toNanos(ttlSeconds),
+                firstTokenNanos, generationNanos, bytes));
+        totalBytes += bytes;
+        stores.incrementAndGet();
+
+        // 超出预算时从最近最少使用的一端淘汰
+        Iterator<Map.Entry<String, Entry>> iterator = entries.entrySet().iterator();
+        while (totalBytes > maxBytes && iterator.hasNext()) {
+            Map.Entry<String, Entry> eldest = iterator.next();
+            totalBytes -= eldest.getValue().bytes();
+            iterator.remove();
+            evictions.incrementAndGet();
+        }
+    }
+
+    private void removeEntry(String key) {
+        Entry removed = entries.remove(key);
+        if (removed != null) {
+            totalBytes -= removed.bytes();
+        }
+    }
+
+    /**
+     * 把已生成的回复按回放速度切成 token 流，最后一条标记 finished
+     */
+    public Flux<AppLLMResponse> tokenStream(String text) {
+        int chunkChars = Math.max(1, replayChunkChars);
+        List<AppLLMResponse> tokens = new ArrayList<>();
+        int offset = 0;
+        while (offset < text.length()) {
+            int end = Math.min(text.length(), offset + chunkChars);
+            // 不拆开代理对
+            if (end < text.length() && Character.isHighSurrogate(text.charAt(end - 1))) {
+                end++;
+            }
+            tokens.add(new AppLLMResponse(text.substring(offset, end), false));
+            offset = end;
+        }
+        tokens.add(new AppLLMResponse("", true));
+
+        Flux<AppLLMResponse> flux = Flux.fromIterable(tokens);
+        if (replayCharsPerSecond <= 0) {
+            return flux;
+        }
+        Duration interval = Duration.ofNanos(TimeUnit.SECONDS.toNanos(chunkChars) / replayCharsPerSecond);
+        // 首个 token 立即下发，之后按速率回放
+        return flux.take(1).concatWith(flux.skip(1).delayElements(interval));
+    }
+
+    public Stats getStats() {
+        long lookupCount = lookups.get();
+        long hitCount = hits.get();
+        int size;
+        long bytes;
+        synchronized (this) {
+            size = entries.size();
+            bytes = totalBytes;
+        }
+        return new Stats(
+                lookupCount,
+                hitCount,
+                lookupCount == 0 ? 0 : (double) hitCount / lookupCount,
+                stores.get(),
+                evictions.get(),
+                expirations.get(),
+                size,
+                bytes,
+                hitCount == 0 ? 0 : TimeUnit.NANOSECONDS.toMillis(totalSavedFirstTokenNanos.get() / hitCount),
+                TimeUnit.NANOSECONDS.toMillis(totalSavedNanos.get())
+        );
+    }
+
+    /**
+     * 键计算前规整文本：去掉首尾空白，连续空白合并为一个空格
+     */
+    static String normalize(String text) {
+        if (text == null) {
+            return "";
+        }
+        return text.strip().replaceAll("\\s+", " ");
+    }
+
+    private static void update(MessageDigest digest, String value) {
+        byte[] bytes = (value == null ? "" : value).getBytes(StandardCharsets.UTF_8);
+        // 带长度前缀，避免字段拼接产生歧义
+        digest.update((byte) (bytes.length >>> 24));
+        digest.update((byte) (bytes.length >>> 16));
+        digest.update((byte) (bytes.length >>> 8));
+        digest.update((byte) bytes.length);
+        digest.update(bytes);
+    }
+
+    private static MessageDigest sha256() {
+        try {
+            return MessageDigest.getInstance("SHA-256");
+        } catch (NoSuchAlgorithmException e) {
+            throw new IllegalStateException("SHA-256 不可用", e);
+        }
+    }
+
+    /**
+     * LLM 回复缓存统计
+     *
+     * @param lookups              查找次数
+     * @param hits                 命中次数
+     * @param hitRate              命中率
+     * @param stores               写入次数
+     * @param evictions            超出字节预算被淘汰的条目数
+     * @param expirations          过期失效的条目数
+     * @param entries              当前条目数
+     * @param bytes                当前占用字节数（估算）
+     * @param avgSavedFirstTokenMs 命中时平均节省的首 token 时间（毫秒）
+     * @param totalSavedMs         累计节省的生成时间（原始耗时减去回放耗时，毫秒）
+     */
+    public record Stats(long lookups, long hits, double hitRate, long stores, long evictions, long expirations,
+                        int entries, long bytes, long avgSavedFirstTokenMs, long totalSavedMs) {
+    }
+}
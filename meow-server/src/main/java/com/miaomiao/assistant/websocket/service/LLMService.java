@@ -10,14 +10,18 @@ import com.miaomiao.assistant.websocket.session.WebSocketMessageSender;
 import com.miaomiao.assistant.websocket.session.SessionState;
 import lombok.RequiredArgsConstructor;
 import lombok.extern.slf4j.Slf4j;
+import org.springframework.beans.factory.annotation.Value;
 import org.springframework.stereotype.Service;
 import reactor.core.Disposable;
+import reactor.core.publisher.ConnectableFlux;
 import reactor.core.publisher.Flux;
-import reactor.core.publisher.Sinks;
+import reactor.core.scheduler.Schedulers;
 
 import java.io.IOException;
 import java.util.ArrayList;
 import java.util.List;
+import java.util.concurrent.atomic.AtomicInteger;
+import java.util.concurrent.atomic.AtomicLong;
 
 /**
  * LLM（大语言模型）处理服务
@@ -35,6 +39,28 @@ public class LLMService {
     private final LLMManager llmManager;
     private final WebSocketMessageSender messageSender;
     private final SystemPromptService systemPromptService;
+    private final LLMResponseCache responseCache;
+    private final NearDuplicateQuestionIndex nearDuplicateIndex;
+    private final HistorySummarizer historySummarizer;
+    private final LLMModelRace modelRace;
+
+    /**
+     * 增量 llm_token 模式下每隔多少条消息携带一次完整累积文本（检查点），0 表示只在结束时携带
+     */
+    @Value("${ws.llm-token.checkpoint-interval:64}")
+    private int checkpointInterval = 64;
+
+    /**
+     * 前端 token 合并窗口（毫秒），0 表示不合并
+     */
+    @Value("${ws.llm-token.coalesce-window-ms:50}")
+    private long coalesceWindowMs = 50;
+
+    /**
+     * 合并的 token 达到多少字符立即下发
+     */
+    @Value("${ws.llm-token.coalesce-max-chars:32}")
+    private int coalesceMaxChars = 32;
 
     /**
      * 处理LLM流式对话
@@ -45,6 +71,49 @@ public class LLMService {
      * @return token流（用于TTS处理，由TextAggregator断句）
      */
     public Flux<String> processLLMStream(SessionState state, String text, ConversationConfig config) {
+        return streamResponse(state, text, openLLMStream(state, text, config));
+    }
+
+    /**
+     * 采用提前发起的 LLM 请求继续本轮对话
+     * <p>
+     * 已经缓冲的 token 立即回放，之后的 token 实时转发；下发前端、送 TTS、写对话历史与
+     * {@link #processLLMStream(SessionState, String, ConversationConfig)} 完全一致。
+     *
+     * @param state      会话状态
+     * @param text       最终用户输入文本（写入对话历史）
+     * @param prefetched {@link #prefetchLLMStream} 返回的请求
+     * @return token流（用于TTS处理，由TextAggregator断句）
+     */
+    public Flux<String> processLLMStream(SessionState state, String text, PrefetchedStream prefetched) {
+        return streamResponse(state, text, prefetched.stream().doFinally(signalType -> prefetched.cancel()));
+    }
+
+    /**
+     * 提前发起 LLM 请求（推测执行）
+     * <p>
+     * 立即连接上游并缓冲全部响应，但不下发前端、不送 TTS、不写对话历史；
+     * 由调用方决定采用（{@link #processLLMStream(SessionState, String, PrefetchedStream)}）或取消（{@link PrefetchedStream#cancel()}）。
+     *
+     * @param state  会话状态
+     * @param text   推测的用户输入文本
+     * @param config 对话配置
+     */
+    public PrefetchedStream prefetchLLMStream(SessionState state, String text, ConversationConfig config) {
+        AtomicLong firstResponseNanos = new AtomicLong();
+        ConnectableFlux<AppLLMResponse> replay = openLLMStream(state, text, config)
+                .doOnNext(response -> firstResponseNanos.compareAndSet(0, System.nanoTime()))
+                .replay();
+        long startNanos = System.nanoTime();
+        Disposable connection = replay.connect();
+        log.debug("提前发起LLM请求: session={}, textLen={}", state.getSessionId(), text.length());
+        return new PrefetchedStream(text, replay, connection, startNanos, firstResponseNanos);
+    }
+
+    /**
+     * 构建本轮对话消息并发起 LLM 流式请求，命中回复缓存时改为回放缓存
+     */
+    private Flux<AppLLMResponse> openLLMStream(SessionState state, String text, ConversationConfig config) {
         // 构建LLM选项
         LLMOptions llmOptions = LLMOptions.of(config.getLlmModel());
         llmOptions.setMaxTokens(config.getMaxTokens());
@@ -55,54 +124,97 @@ public class LLMService {
                 config.getMaxTokens()
         );
 
+        List<AppChatMessage> history = state.getConversationHistory();
+
+        // 完全相同的请求直接回放缓存的回复
+        String cacheKey = responseCache.key(config.getLMModelKey(), config.getMaxTokens(), systemPrompt, history, text);
+        Flux<AppLLMResponse> cached = responseCache.replay(cacheKey);
+        if (cached != null) {
+            return cached;
+        }
+
+        // 无历史的首轮问题：查找近似重复的问题（shadow 模式只记录不采用）
+        boolean stateless = history.isEmpty();
+        String partition = config.getCharacterId() + "|" + config.getLMModelKey();
+        if (stateless) {
+            String answer = nearDuplicateIndex.lookup(partition, text);
+            if (answer != null) {
+                return responseCache.tokenStream(answer);
+            }
+        }
+
         // 构建对话历史（系统提示词 + 历史 + 当前输入）
+        // 系统提示词按角色卡版本缓存、历史在两次压缩之间只追加，前面的消息与上一轮逐字节相同，可命中服务端前缀缓存
         List<AppChatMessage> messages = new ArrayList<>();
         messages.add(new AppChatMessage("system", systemPrompt));
-        messages.addAll(state.getConversationHistory());
+        messages.addAll(history);
         messages.add(new AppChatMessage("user", text));
 
-        // 设置token sink用于TTS pipeline
-        Sinks.Many<String> tokenSink = Sinks.many().unicast().onBackpressureBuffer();
-        StringBuilder fullResponse = new StringBuilder();
-
-        // 开始LLM流式响应
-        Flux<AppLLMResponse> llmStream = llmManager.chatStream(config.getLMModelKey(), messages, llmOptions);
-
-        // 订阅LLM流 - 直接把token发给TTS pipeline
-        Disposable llmDisposable = llmStream
-                .takeWhile(response -> !state.isAborted())
-                .doFinally(signalType -> {
-                    log.debug("LLM流结束: session={}, signal={}", state.getSessionId(), signalType);
-                    tokenSink.tryEmitComplete();
-                })
-                .subscribe(
-                        llmResponse -> handleLLMResponse(state, llmResponse, text, fullResponse, tokenSink),
-                        error -> {
-                            log.error("LLM流错误", error);
-                        },
-                        () -> {
-                            log.debug("LLM流完成");
-                        }
-                );
-
-        // 保存订阅以便取消
-        state.setActiveDisposable(llmDisposable);
-
-        return tokenSink.asFlux();
+        if (modelRace.appliesTo(config.getLMModelKey())) {
+            // 主模型与快模型同时发起，先产出可用首句的一路胜出；
+            // 快模型胜出时回复按快模型的键写入缓存和近似问题索引，不会在主模型的键下被回放
+            LLMOptions fastOptions = modelRace.fastOptions(llmOptions);
+            return modelRace.race(state.getSessionId(), config.getLMModelKey(),
+                            () -> llmManager.chatStream(config.getLMModelKey(), messages, llmOptions),
+                            () -> llmManager.chatStream(modelRace.getModelKey(), messages, fastOptions))
+                    .flatMapMany(winner -> winner.modelKey().equals(config.getLMModelKey())
+                            ? recordReply(cacheKey, partition, stateless, text, winner.stream())
+                            : recordReply(
+                                    responseCache.key(winner.modelKey(), config.getMaxTokens(), systemPrompt, history, text),
+                                    config.getCharacterId() + "|" + winner.modelKey(),
+                                    stateless, text, winner.stream()));
+        }
+        return recordReply(cacheKey, partition, stateless, text,
+                llmManager.chatStream(config.getLMModelKey(), messages, llmOptions));
+    }
+
+    /**
+     * 实时回复写入回复缓存，无历史时同时写入近似问题索引
+     */
+    private Flux<AppLLMResponse> recordReply(String cacheKey, String partition, boolean stateless, String text,
+                                             Flux<AppLLMResponse> stream) {
+        Flux<AppLLMResponse> live = responseCache.record(cacheKey, stream);
+        return stateless ? nearDuplicateIndex.record(partition, text, live) : live;
+    }
+
+    /**
+     * 把 LLM 响应流转为送往 TTS 的 token 流
+     * <p>
+     * LLM 请求随返回的 token 流一起订阅、一起取消，错误沿本轮对话链路传播；
+     * 同一会话开始新的回复后，旧回复的 LLM 流在下一个响应到达时结束。
+     */
+    private Flux<String> streamResponse(SessionState state, String text, Flux<AppLLMResponse> llmStream) {
+        return Flux.defer(() -> {
+            long response = state.beginResponse();
+            StringBuilder fullResponse = new StringBuilder();
+            AtomicInteger tokenSeq = new AtomicInteger();
+            LLMTokenCoalescer tokenCoalescer = createTokenCoalescer(state, tokenSeq);
+
+            return llmStream
+                    .takeWhile(llmResponse -> !state.isAborted() && state.isCurrentResponse(response))
+                    .takeUntil(AppLLMResponse::finished)
+                    .doOnNext(llmResponse -> handleLLMResponse(state, llmResponse, text, fullResponse, tokenSeq, tokenCoalescer))
+                    .filter(llmResponse -> llmResponse.text() != null && !llmResponse.text().isEmpty())
+                    .map(AppLLMResponse::text)
+                    .doOnError(error -> log.error("LLM流错误: session={}", state.getSessionId(), error))
+                    .doFinally(signalType -> {
+                        log.debug("LLM流结束: session={}, signal={}", state.getSessionId(), signalType);
+                        tokenCoalescer.close();
+                    });
+        });
     }
 
     /**
      * 处理LLM响应
      * <p>
-     * 只做两件事：
-     * 1. 发送token给前端（打字效果）
-     * 2. 把token发给TTS pipeline（由TextAggregator断句）
+     * 发送token给前端（打字效果），流结束时写入对话历史；token 本身由返回的流送往 TTS pipeline
      */
     private void handleLLMResponse(SessionState state,
                                    AppLLMResponse appLlmResponse,
                                    String userText,
                                    StringBuilder fullResponse,
-                                   Sinks.Many<String> tokenSink) {
+                                   AtomicInteger tokenSeq,
+                                   LLMTokenCoalescer tokenCoalescer) {
         String content = appLlmResponse.text();
         if (content != null && !content.isEmpty()) {
             fullResponse.append(content);
@@ -110,15 +222,8 @@ public class LLMService {
             // 记录 LLM 首次响应时间（性能指标）
             state.getPerformanceMetrics().recordLLMFirstResponse();
 
-            // 1. 发送流式token给前端（用于打字效果）
-            try {
-                messageSender.sendLLMToken(state, content, fullResponse.toString(), false);
-            } catch (IOException e) {
-                log.error("发送LLM token消息失败", e);
-            }
-
-            // 2. 把token发给TTS pipeline（由TextAggregator断句）
-            tokenSink.tryEmitNext(content);
+            // 发送流式token给前端（用于打字效果），按时间窗口合并；送往 TTS 的 token 不经过合并
+            tokenCoalescer.append(content);
         }
 
         // 流结束
@@ -127,11 +232,11 @@ public class LLMService {
                 log.warn("LLM流结束但无文本输出: session={}, userTextLen={}",
                         state.getSessionId(), userText == null ? 0 : userText.length());
             }
-            tokenSink.tryEmitComplete();
+            tokenCoalescer.close();
 
             // 发送完成标记给前端
             try {
-                messageSender.sendLLMToken(state, "", fullResponse.toString(), true);
+                messageSender.sendLLMToken(state, tokenSeq.getAndIncrement(), "", fullResponse.toString(), true);
             } catch (IOException e) {
                 log.error("发送LLM完成消息失败", e);
             }
@@ -139,6 +244,73 @@ public class LLMService {
             // 保存到对话历史
             state.addMessage("user", userText);
             state.addMessage("assistant", fullResponse.toString());
+            // 超出 token 预算时在后台把最早的几轮压缩为摘要
+            historySummarizer.compactIfNeeded(state);
+        }
+    }
+
+    /**
+     * 创建本轮回复的前端 token 合并器
+     * <p>
+     * 合并后的每一批作为一条 llm_token 下发；检查点携带的累积文本只包含已下发的部分。
+     */
+    private LLMTokenCoalescer createTokenCoalescer(SessionState state, AtomicInteger tokenSeq) {
+        StringBuilder sentText = new StringBuilder();
+        return new LLMTokenCoalescer(coalesceWindowMs, coalesceMaxChars, Schedulers.parallel(), batch -> {
+            sentText.append(batch);
+            int seq = tokenSeq.getAndIncrement();
+            String accumulated = isCheckpoint(state, seq) ? sentText.toString() : null;
+            try {
+                messageSender.sendLLMToken(state, seq, batch, accumulated, false);
+            } catch (IOException e) {
+                log.error("发送LLM token消息失败", e);
+            }
+        });
+    }
+
+    /**
+     * 当前 token 消息是否需要携带完整累积文本
+     * <p>
+     * 旧协议每条都携带；增量模式下只在固定间隔、下行丢弃或客户端请求重同步后携带，
+     * 使整轮回复的序列化和传输量与回复长度成线性关系。
+     */
+    private boolean isCheckpoint(SessionState state, int seq) {
+        if (!state.isLlmDeltaEnabled()) {
+            return true;
+        }
+        if (state.consumeLlmCheckpointRequest()) {
+            return true;
+        }
+        return checkpointInterval > 0 && seq > 0 && seq % checkpointInterval == 0;
+    }
+
+    /**
+     * 提前发起的 LLM 请求
+     *
+     * @param text               发起请求时使用的用户输入文本
+     * @param stream             可重复订阅的响应流，订阅时先回放已缓冲的响应
+     * @param connection         上游连接，取消即中止 LLM 请求
+     * @param startNanos         发起时间
+     * @param firstResponseNanos 收到第一个响应的时间，尚未收到时为 0
+     */
+    public record PrefetchedStream(String text, Flux<AppLLMResponse> stream, Disposable connection, long startNanos,
+                                   AtomicLong firstResponseNanos) {
+
+        /**
+         * 采用时节省的等待时间：提前发起到首个响应之间的部分，首个响应之后的缓冲时间不计入
+         *
+         * @param nowNanos 采用的时间
+         */
+        public long savedNanos(long nowNanos) {
+            long first = firstResponseNanos.get();
+            return Math.max(0, (first == 0 ? nowNanos : Math.min(nowNanos, first)) - startNanos);
+        }
+
+        /**
+         * 中止 LLM 请求，已完成时为空操作
+         */
+        public void cancel() {
+            connection.dispose();
         }
     }
 }
@@ -0,0 +1,93 @@
+package com.miaomiao.assistant.websocket.service;
+
+import lombok.extern.slf4j.Slf4j;
+import reactor.core.Disposable;
+import reactor.core.scheduler.Scheduler;
+
+import java.util.concurrent.TimeUnit;
+import java.util.function.Consumer;
+
+/**
+ * 前端 llm_token 合并器
+ * <p>
+ * LLM 每秒可能输出几十个很短的 token，逐个下发会带来同样数量的 JSON 序列化、WebSocket 帧和前端重渲染。
+ * 每轮回复一个实例，把 token 攒成一批再交给 {@code flusher}：
+ * 1. 第一个 token 到达后最多等待 {@code windowMs} 毫秒
+ * 2. 攒够 {@code maxChars} 个字符立即下发
+ * 3. 结束或中断时调用 {@link #close()} 立即下发剩余内容
+ * <p>
+ * {@code flusher} 在本对象锁内调用，各批次按顺序串行执行。
+ * {@code windowMs <= 0} 时不合并，每个 token 直接下发。
+ */
+@Slf4j
+public class LLMTokenCoalescer {
+
+    private final long windowMs;
+    private final int maxChars;
+    private final Scheduler scheduler;
+    private final Consumer<String> flusher;
+
+    private final StringBuilder pending = new StringBuilder();
+    private Disposable scheduledFlush;
+    private boolean closed = false;
+
+    public LLMTokenCoalescer(long windowMs, int maxChars, Scheduler scheduler, Consumer<String> flusher) {
+        this.windowMs = windowMs;
+        this.maxChars = maxChars;
+        this.scheduler = scheduler;
+        this.flusher = flusher;
+    }
+
+    /**
+     * 追加一个 token
+     */
+    public synchronized void append(String token) {
+        if (closed || token == null || token.isEmpty()) {
+            return;
+        }
+        pending.append(token);
+
+        if (windowMs <= 0 || (maxChars > 0 && pending.length() >= maxChars)) {
+            flushLocked();
+            return;
+        }
+        if (scheduledFlush == null) {
+            scheduledFlush = scheduler.schedule(this::flush, windowMs, TimeUnit.MILLISECONDS);
+        }
+    }
+
+    /**
+     * 立即下发已攒的内容
+     */
+    public synchronized void flush() {
+        flushLocked();
+    }
+
+    /**
+     * 下发剩余内容并停止合并，之后追加的 token 被忽略
+     */
+    public synchronized void close() {
+        if (closed) {
+            return;
+        }
+        flushLocked();
+        closed = true;
+    }
+
+    private void flushLocked() {
+        if (scheduledFlush != null) {
+            scheduledFlush.dispose();
+            scheduledFlush = null;
+        }
+        if (closed || pending.isEmpty()) {
+            return;
+        }
+        String batch = pending.toString();
+        pending.setLength(0);
+        try {
+            flusher.accept(batch);
+        } catch (Exception e) {
+            log.error("下发合并的LLM token失败", e);
+        }
+    }
+}
@@ -0,0 +1,389 @@
+package com.miaomiao.assistant.websocket.service;
+
+import com.miaomiao.assistant.model.llm.AppLLMResponse;
+import lombok.extern.slf4j.Slf4j;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.stereotype.Component;
+import reactor.core.publisher.Flux;
+
+import java.nio.charset.StandardCharsets;
+import java.util.Iterator;
+import java.util.LinkedHashMap;
+import java.util.Locale;
+import java.util.Map;
+import java.util.Set;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.atomic.AtomicLong;
+import java.util.concurrent.atomic.AtomicLongArray;
+
+/**
+ * 近似重复问题索引
+ * <p>
+ * 精确缓存（{@link LLMResponseCache}）之外，用户常发只差标点、语气词或语序的同一个问题。
+ * 对无历史的首轮问题按角色卡和模型分区建立 SimHash 索引：
+ * 1. 规整：转小写，去掉标点、空白和常见语气词（嗯、啊、请问……）
+ * 2. 指纹：字符二元组（单字问题用一元组）各自哈希为 64 位后按位投票得到 SimHash，对语序变化不敏感
+ * 3. 查找：在分区内找汉明距离最小的问题，不超过 {@code max-hamming} 视为命中
+ * <p>
+ * 每个分区最多保留 {@code max-entries-per-card} 条（最近最少使用淘汰），查找是对有界数组的线性扫描，
+ * 耗时在微秒级。
+ * <p>
+ * 工作模式（{@code llm.near-duplicate.mode}）：
+ * - off：不查找、不记录
+ * - shadow：只记录并打印“本可命中”的日志和距离分布，不改变回复，用于离线调整阈值
+ * - serve：命中时直接回放已生成的回答
+ * <p>
+ * 统计见 {@code GET /api/metrics/llm-near-duplicate}。
+ */
+@Slf4j
+@Component
+public class NearDuplicateQuestionIndex {
+
+    /**
+     * 统计距离分布时的最大距离，更大的距离计入最后一档
+     */
+    private static final int MAX_TRACKED_DISTANCE = 16;
+
+    /**
+     * 分句开头去掉的客套词（按长度从长到短匹配），单独成句时（如“请问，”）整句去掉
+     */
+    private static final String[] LEADING_PHRASES = {"请问一下", "麻烦问下", "问一下", "请问"};
+
+    /**
+     * 整个分句只由这些字组成时视为语气词，整句去掉（如“嗯，”“哈哈，”）
+     */
+    private static final String INTERJECTION_CHARS = "嗯啊呃额哦噢哈呀";
+
+    /**
+     * 单独成句时去掉的口头禅
+     */
+    private static final Set<String> VERBAL_FILLERS = Set.of("那个", "就是", "然后");
+
+    /**
+     * 分句末尾去掉的语气助词；“吧”“哈”常作词尾（酒吧、网吧），不在此列
+     */
+    private static final String TRAILING_PARTICLES = "呢嘛啦呀啊哦";
+
+    public enum Mode {
+        OFF, SHADOW, SERVE
+    }
+
+    /**
+     * 工作模式：off / shadow / serve
+     */
+    @Value("${llm.near-duplicate.mode:shadow}")
+    private String mode = "shadow";
+
+    /**
+     * 视为同一问题的最大汉明距离（0 - 64）
+     */
+    @Value("${llm.near-duplicate.max-hamming:3}")
+    private int maxHamming = 3;
+
+    /**
+     * 每个分区（角色卡 + 模型）最多保留的问题数
+     */
+    @Value("${llm.near-duplicate.max-entries-per-card:512}")
+    private int maxEntriesPerCard = 512;
+
+    /**
+     * 超过该字符数的回答不收录
+     */
+    @Value("${llm.near-duplicate.max-answer-chars:400}")
+    private int maxAnswerChars = 400;
+
+    /**
+     * 规整后少于该字符数的问题不参与
+     */
+    @Value("${llm.near-duplicate.min-chars:2}")
+    private int minChars = 2;
+
+    private final Map<String, Partition> partitions = new ConcurrentHashMap<>();
+
+    // 统计
+    private final AtomicLong lookups = new AtomicLong();
+    private final AtomicLong hits = new AtomicLong();
+    private final AtomicLong served = new AtomicLong();
+    private final AtomicLong stored = new AtomicLong();
+    private final AtomicLong lookupNanos = new AtomicLong();
+    private final AtomicLongArray nearestDistances = new AtomicLongArray(MAX_TRACKED_DISTANCE + 1);
+
+    /**
+     * 已收录的问题
+     *
+     * @param question 原始问题
+     * @param answer   回答
+     */
+    private record Entry(String question, String answer) {
+    }
+
+    /**
+     * 一个分区：SimHash -> 问题，访问顺序，头部即最近最少使用
+     */
+    private final class Partition {
+        private final LinkedHashMap<Long, Entry> entries = new LinkedHashMap<>(64, 0.75f, true);
+
+        synchronized Match nearest(long fingerprint) {
+            long bestKey = 0;
+            int bestDistance = Integer.MAX_VALUE;
+            for (Long key : entries.keySet()) {
+                int distance = Long.bitCount(key ^ fingerprint);
+                if (distance < bestDistance) {
+                    bestDistance = distance;
+                    bestKey = key;
+                    if (distance == 0) {
+                        break;
+                    }
+                }
+            }
+            if (bestDistance == Integer.MAX_VALUE) {
+                return null;
+            }
+            // get 同时刷新访问顺序
+            return new Match(entries.get(bestKey), bestDistance);
+        }
+
+        synchronized void put(long fingerprint, Entry entry) {
+            entries.put(fingerprint, entry);
+            Iterator<Long> iterator = entries.keySet().iterator();
+            while (entries.size() > Math.max(1, maxEntriesPerCard) && iterator.hasNext()) {
+                iterator.next();
+                iterator.remove();
+            }
+        }
+
+        synchronized int size() {
+            return entries.size();
+        }
+    }
+
+    private record Match(Entry entry, int distance) {
+    }
+
+    public Mode getMode() {
+        try {
+            return Mode.valueOf(mode.trim().toUpperCase(Locale.ROOT));
+        } catch (IllegalArgumentException e) {
+            return Mode.OFF;
+        }
+    }
+
+    /**
+     * 查找近似重复的问题
+     *
+     * @param partition 分区（角色卡 + 模型）
+     * @param question  用户输入
+     * @return serve 模式下命中时返回已生成的回答，其他情况返回 null
+     */
+    public String lookup(String partition, String question) {
+        Mode currentMode = getMode();
+        if (currentMode == Mode.OFF) {
+            return null;
+        }
+        String normalized = normalize(question);
+        if (normalized.codePointCount(0, normalized.length()) < minChars) {
+            return null;
+        }
+        Partition index = partitions.get(partition);
+        if (index == null) {
+            return null;
+        }
+
+        long start = System.nanoTime();
+        Match match = index.nearest(simHash(normalized));
+        lookupNanos.addAndGet(System.nanoTime() - start);
+        lookups.incrementAndGet();
+        if (match == null) {
+            return null;
+        }
+        nearestDistances.incrementAndGet(Math.min(match.distance(), MAX_TRACKED_DISTANCE));
+        if (match.distance() > maxHamming) {
+            return null;
+        }
+
+        hits.incrementAndGet();
+        if (currentMode == Mode.SHADOW) {
+            log.info("近似重复问题（shadow）: partition={}, distance={}, question={}, matched={}",
+                    partition, match.distance(), question, match.entry().question());
+            return null;
+        }
+        served.incrementAndGet();
+        log.debug("近似重复问题命中: partition={}, distance={}, question={}, matched={}",
+                partition, match.distance(), question, match.entry().question());
+        return match.entry().answer();
+    }
+
+    /**
+     * 包装实时 LLM 流：正常结束时收录问题和回答
+     *
+     * @param partition 分区（角色卡 + 模型）
+     * @param question  用户输入
+     * @param stream    LLM 响应流
+     */
+    public Flux<AppLLMResponse> record(String partition, String question, Flux<AppLLMResponse> stream) {
+        if (getMode() == Mode.OFF) {
+            return stream;
+        }
+        String normalized = normalize(question);
+        if (normalized.codePointCount(0, normalized.length()) < minChars) {
+            return stream;
+        }
+        return Flux.defer(() -> {
+            StringBuilder answer = new StringBuilder();
+            return stream.doOnNext(response -> {
+                if (response.text() != null) {
+                    answer.append(response.text());
+                }
+                if (response.finished() && !answer.isEmpty() && answer.length() <= maxAnswerChars) {
+                    partitions.computeIfAbsent(partition, key -> new Partition())
+                            .put(simHash(normalized), new Entry(question, answer.toString()));
+                    stored.incrementAndGet();
+                }
+            });
+        });
+    }
+
+    public Stats getStats() {
+        long lookupCount = lookups.get();
+        long[] distances = new long[nearestDistances.length()];
+        for (int i = 0; i < distances.length; i++) {
+            distances[i] = nearestDistances.get(i);
+        }
+        int entries = partitions.values().stream().mapToInt(Partition::size).sum();
+        return new Stats(
+                getMode().name().toLowerCase(Locale.ROOT),
+                maxHamming,
+                lookupCount,
+                hits.get(),
+                served.get(),
+                stored.get(),
+                partitions.size(),
+                entries,
+                lookupCount == 0 ? 0 : lookupNanos.get() / 1000.0 / lookupCount,
+                distances
+        );
+    }
+
+    /**
+     * 规整问题：转小写，去掉标点和空白，以及分句边界上的语气词
+     * <p>
+     * 按标点和空白切分句，语气词只在单独成句、句首（客套词）或句尾（语气助词）时去掉，
+     * 不做子串替换，避免误删词语中的字（如“额度”“哈密瓜”“酒吧”）。
+     */
+    static String normalize(String text) {
+        if (text == null) {
+            return "";
+        }
+        String lower = text.toLowerCase(Locale.ROOT);
+        StringBuilder builder = new StringBuilder(lower.length());
+        StringBuilder clause = new StringBuilder();
+        lower.codePoints().forEach(codePoint -> {
+            if (Character.isLetterOrDigit(codePoint)) {
+                clause.appendCodePoint(codePoint);
+            } else {
+                appendClause(builder, clause);
+            }
+        });
+        appendClause(builder, clause);
+        return builder.toString();
+    }
+
+    private static void appendClause(StringBuilder builder, StringBuilder clause) {
+        if (clause.isEmpty()) {
+            return;
+        }
+        String text = clause.toString();
+        clause.setLength(0);
+        if (VERBAL_FILLERS.contains(text) || isInterjection(text)) {
+            return;
+        }
+        for (String phrase : LEADING_PHRASES) {
+            if (text.startsWith(phrase)) {
+                if (text.length() == phrase.length()) {
+                    return;
+                }
+                text = text.substring(phrase.length());
+                break;
+            }
+        }
+        int end = text.length();
+        while (end > 1 && TRAILING_PARTICLES.indexOf(text.charAt(end - 1)) >= 0) {
+            end--;
+        }
+        builder.append(text, 0, end);
+    }
+
+    private static boolean isInterjection(String clause) {
+        for (int i = 0; i < clause.length(); i++) {
+            if (INTERJECTION_CHARS.indexOf(clause.charAt(i)) < 0) {
+                return false;
+            }
+        }
+        return true;
+    }
+
+    /**
+     * 字符二元组 SimHash
+     */
+    static long simHash(String normalized) {
+        int[] codePoints = normalized.codePoints().toArray();
+        int[] votes = new int[64];
+        if (codePoints.length == 1) {
+            vote(votes, hash(codePoints, 0, 1));
+        }
+        for (int i = 0; i + 1 < codePoints.length; i++) {
+            vote(votes, hash(codePoints, i, 2));
+        }
+        long fingerprint = 0;
+        for (int bit = 0; bit < 64; bit++) {
+            if (votes[bit] > 0) {
+                fingerprint |= 1L << bit;
+            }
+        }
+        return fingerprint;
+    }
+
+    private static void vote(int[] votes, long hash) {
+        for (int bit = 0; bit < 64; bit++) {
+            votes[bit] += ((hash >>> bit) & 1L) != 0 ? 1 : -1;
+        }
+    }
+
+    /**
+     * FNV-1a 64 位哈希，再做一次 murmur3 fmix64 打散
+     */
+    private static long hash(int[] codePoints, int offset, int length) {
+        long h = 0xcbf29ce484222325L;
+        for (int i = offset; i < offset + length; i++) {
+            byte[] bytes = new String(codePoints, i, 1).getBytes(StandardCharsets.UTF_8);
+            for (byte b : bytes) {
+                h ^= b & 0xFF;
+                h *= 0x100000001b3L;
+            }
+        }
+        h ^= h >>> 33;
+        h *= 0xff51afd7ed558ccdL;
+        h ^= h >>> 33;
+        h *= 0xc4ceb9fe1a85ec53L;
+        h ^= h >>> 33;
+        return h;
+    }
+
+    /**
+     * 近似重复索引统计
+     *
+     * @param mode             当前模式
+     * @param maxHamming       命中阈值
+     * @param lookups          查找次数（分区非空时）
+     * @param hits             距离不超过阈值的次数（shadow 模式下为“本可命中”次数）
+     * @param served           实际用已有回答回复的次数
+     * @param stored           收录次数
+     * @param partitions       分区数
+     * @param entries          收录的问题总数
+     * @param avgLookupMicros  平均查找耗时（微秒）
+     * @param nearestDistances 最近邻距离分布，下标为汉明距离（最后一档含更大距离），用于离线调整阈值
+     */
+    public record Stats(String mode, int maxHamming, long lookups, long hits, long served, long stored,
+                        int partitions, int entries, double avgLookupMicros, long[] nearestDistances) {
+    }
+}
@@ -0,0 +1,137 @@
+package com.miaomiao.assistant.websocket.service;
+
+import com.miaomiao.assistant.codec.OpusCodec;
+import com.miaomiao.assistant.codec.OpusProfile;
+import com.miaomiao.assistant.websocket.message.AudioConfigMessage;
+import com.miaomiao.assistant.websocket.session.AudioLinkMonitor;
+import com.miaomiao.assistant.websocket.session.SessionState;
+import com.miaomiao.assistant.websocket.session.WebSocketMessageSender;
+import lombok.RequiredArgsConstructor;
+import lombok.extern.slf4j.Slf4j;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.stereotype.Service;
+
+/**
+ * 下行 Opus 编码档位协商服务
+ * <p>
+ * 1. 客户端通过 audio_config 上报网络提示和上限，得出会话的最高档位
+ * 2. 每轮回复开始时根据上一轮音频在下行队列中的排队情况降档或逐步升档
+ * 3. 档位只在回复开始时切换，一轮内的 Opus 流参数不变；变化后通知客户端
+ */
+@Slf4j
+@Service
+@RequiredArgsConstructor
+public class OpusProfileService {
+
+    private final WebSocketMessageSender messageSender;
+
+    /**
+     * 是否根据链路拥塞自动调整档位
+     */
+    @Value("${opus.adaptive.enabled:true}")
+    private boolean adaptiveEnabled;
+
+    /**
+     * 下行排队时长 / 音频时长超过该值视为拥塞，下一轮降一档
+     */
+    @Value("${opus.adaptive.congestion-ratio:0.3}")
+    private double congestionRatio;
+
+    /**
+     * 一轮内慢发送次数超过该值也视为拥塞
+     */
+    @Value("${opus.adaptive.max-slow-sends:5}")
+    private int maxSlowSends;
+
+    /**
+     * 连续多少轮无拥塞后升一档
+     */
+    @Value("${opus.adaptive.recover-turns:3}")
+    private int recoverTurns;
+
+    /**
+     * 根据客户端提示协商档位，立即生效于下一轮回复
+     */
+    public OpusProfile negotiate(SessionState state, AudioConfigMessage hint) {
+        OpusProfile ceiling = ceilingFromHint(hint);
+        state.setOpusCeiling(ceiling);
+        state.setOpusProfile(ceiling);
+        state.setHealthyTurns(0);
+        // 之前的统计基于旧档位，丢弃
+        state.getAudioLinkMonitor().drain();
+
+        log.info("协商 Opus 档位: session={}, network={}, saveData={}, profile={}",
+                state.getSessionId(), hint.getNetwork(), hint.getSaveData(), ceiling);
+        notifyClient(state, ceiling);
+        return ceiling;
+    }
+
+    /**
+     * 获取本轮回复使用的档位
+     * <p>
+     * 上一轮拥塞则降一档；连续 {@code recoverTurns} 轮无拥塞则升一档，不超过协商上限。
+     */
+    public OpusProfile profileForTurn(SessionState state) {
+        OpusProfile current = state.getOpusProfile();
+        AudioLinkMonitor.Snapshot snapshot = state.getAudioLinkMonitor().drain();
+        if (!adaptiveEnabled || snapshot.frames() == 0) {
+            return current;
+        }
+
+        OpusProfile next = current;
+        boolean congested = snapshot.congestionRatio() > congestionRatio
+                || snapshot.slowSends() > maxSlowSends;
+        if (congested) {
+            state.setHealthyTurns(0);
+            next = current.stepDown();
+        } else {
+            int healthy = state.getHealthyTurns() + 1;
+            if (healthy >= recoverTurns) {
+                healthy = 0;
+                next = current.stepUp(state.getOpusCeiling());
+            }
+            state.setHealthyTurns(healthy);
+        }
+
+        if (!next.equals(current)) {
+            log.info("调整 Opus 档位: session={}, {} -> {}, congestionRatio={}, slowSends={}",
+                    state.getSessionId(), current, next,
+                    String.format("%.2f", snapshot.congestionRatio()), snapshot.slowSends());
+            state.setOpusProfile(next);
+            notifyClient(state, next);
+        }
+        return next;
+    }
+
+    /**
+     * 由客户端提示得出最高档位：显式上限优先，其次按网络类型和省流量模式推断
+     */
+    private OpusProfile ceilingFromHint(AudioConfigMessage hint) {
+        OpusProfile ceiling = OpusProfile.DEFAULT;
+        String network = hint.getNetwork() == null ? "" : hint.getNetwork().toLowerCase();
+        switch (network) {
+            case "slow-2g", "2g" -> ceiling = OpusProfile.LOWEST;
+            case "3g", "cellular" -> ceiling = new OpusProfile(32000, 40);
+            default -> {
+            }
+        }
+        if (Boolean.TRUE.equals(hint.getSaveData())) {
+            ceiling = ceiling.within(new OpusProfile(24000, 40));
+        }
+        if (hint.getBitrate() != null || hint.getFrameDurationMs() != null) {
+            ceiling = ceiling.within(new OpusProfile(
+                    hint.getBitrate() != null ? hint.getBitrate() : OpusProfile.MAX_BITRATE,
+                    hint.getFrameDurationMs() != null ? hint.getFrameDurationMs() : 20
+            ));
+        }
+        return ceiling;
+    }
+
+    private void notifyClient(SessionState state, OpusProfile profile) {
+        try {
+            messageSender.sendAudioConfig(state, profile, OpusCodec.getSampleRate());
+        } catch (Exception e) {
+            log.warn("发送 audio_config 失败: session={}", state.getSessionId(), e);
+        }
+    }
+}
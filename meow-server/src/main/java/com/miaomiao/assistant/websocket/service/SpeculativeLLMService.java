@@ -0,0 +1,228 @@
+package com.miaomiao.assistant.websocket.service;
+
+import com.miaomiao.assistant.websocket.ConversationConfig;
+import com.miaomiao.assistant.websocket.session.SessionState;
+import lombok.RequiredArgsConstructor;
+import lombok.extern.slf4j.Slf4j;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.stereotype.Service;
+import reactor.core.Disposable;
+import reactor.core.scheduler.Schedulers;
+
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicLong;
+
+/**
+ * LLM 推测执行服务
+ * <p>
+ * ASR 中间结果在 {@code stable-ms} 内没有变化时，就用它提前发起 LLM 请求（只缓冲，不下发），
+ * 让 ASR 收尾与 LLM 首 token 等待重叠：
+ * 1. 最终识别结果与推测文本一致（忽略标点、空白和大小写）：直接采用推测请求
+ * 2. 不一致：取消推测请求，按最终结果重新发起
+ * 3. 推测期间中间结果又稳定在不同文本上：取消旧请求，按新文本重新推测
+ * <p>
+ * 默认关闭。命中率和节省的时间见 {@code GET /api/metrics/llm-speculation}，用于调整稳定窗口。
+ */
+@Slf4j
+@Service
+@RequiredArgsConstructor
+public class SpeculativeLLMService {
+
+    private final LLMService llmService;
+
+    /**
+     * 是否启用推测执行（未命中时多一次上游请求，默认关闭，按命中率指标决定是否开启）
+     */
+    @Value("${llm.speculation.enabled:false}")
+    private boolean enabled = false;
+
+    /**
+     * 中间结果保持不变多久（毫秒）视为稳定
+     */
+    @Value("${llm.speculation.stable-ms:300}")
+    private long stableMs = 300;
+
+    /**
+     * 中间结果去掉标点后少于该字符数时不推测
+     */
+    @Value("${llm.speculation.min-chars:2}")
+    private int minChars = 2;
+
+    // 统计
+    private final AtomicLong started = new AtomicLong();
+    private final AtomicLong hits = new AtomicLong();
+    private final AtomicLong misses = new AtomicLong();
+    private final AtomicLong restarts = new AtomicLong();
+    private final AtomicLong totalSavedNanos = new AtomicLong();
+
+    /**
+     * 开始一轮语音输入的推测
+     *
+     * @param state  会话状态
+     * @param config 对话配置
+     */
+    public Turn begin(SessionState state, ConversationConfig config) {
+        return new Turn(state, config);
+    }
+
+    public Stats getStats() {
+        long hitCount = hits.get();
+        long resolved = hitCount + misses.get();
+        return new Stats(
+                started.get(),
+                hitCount,
+                misses.get(),
+                restarts.get(),
+                resolved == 0 ? 0 : (double) hitCount / resolved,
+                hitCount == 0 ? 0 : TimeUnit.NANOSECONDS.toMillis(totalSavedNanos.get() / hitCount),
+                TimeUnit.NANOSECONDS.toMillis(totalSavedNanos.get())
+        );
+    }
+
+    /**
+     * 比较时忽略标点、空白和大小写
+     */
+    static String normalize(String text) {
+        if (text == null) {
+            return "";
+        }
+        StringBuilder builder = new StringBuilder(text.length());
+        text.codePoints()
+                .filter(Character::isLetterOrDigit)
+                .map(Character::toLowerCase)
+                .forEach(builder::appendCodePoint);
+        return builder.toString();
+    }
+
+    /**
+     * 一轮语音输入的推测状态
+     * <p>
+     * 中间结果回调、稳定计时器和最终结果分别在不同线程上执行，状态读写均已加锁（发起请求除外）。
+     */
+    public final class Turn {
+
+        private final SessionState state;
+        private final ConversationConfig config;
+
+        private String latestPartial;
+        private Disposable stabilityTimer;
+        private LLMService.PrefetchedStream speculative;
+        private boolean closed = false;
+
+        private Turn(SessionState state, ConversationConfig config) {
+            this.state = state;
+            this.config = config;
+        }
+
+        /**
+         * 收到新的中间识别结果（累计文本），重新开始稳定计时
+         */
+        public synchronized void onPartial(String text) {
+            if (!enabled || closed || text == null || text.equals(latestPartial)) {
+                return;
+            }
+            latestPartial = text;
+            disposeTimer();
+            // 到期时可能同步发起 LLM 请求（SDK 提供商会阻塞建连），在 boundedElastic 上执行
+            stabilityTimer = Schedulers.boundedElastic().schedule(() -> onStable(text), stableMs, TimeUnit.MILLISECONDS);
+        }
+
+        /**
+         * 中间结果稳定：发起推测请求
+         * <p>
+         * 建连可能阻塞，放在锁外执行，避免中间结果回调和最终结果等待建连；
+         * 建连期间本轮已结束或中间结果已变化时，取消刚发起的请求。
+         */
+        private void onStable(String text) {
+            String normalized = normalize(text);
+            synchronized (this) {
+                if (closed || !text.equals(latestPartial) || normalized.length() < minChars) {
+                    return;
+                }
+                if (speculative != null && normalize(speculative.text()).equals(normalized)) {
+                    return;
+                }
+            }
+
+            LLMService.PrefetchedStream next = llmService.prefetchLLMStream(state, text, config);
+            started.incrementAndGet();
+            LLMService.PrefetchedStream stale;
+            synchronized (this) {
+                if (closed || !text.equals(latestPartial)) {
+                    stale = next;
+                } else {
+                    stale = speculative;
+                    speculative = next;
+                    if (stale != null) {
+                        restarts.incrementAndGet();
+                    }
+                }
+            }
+            if (stale != null) {
+                stale.cancel();
+            }
+        }
+
+        /**
+         * 得到最终识别结果
+         *
+         * @return 推测命中时返回可直接采用的请求；未推测或未命中时返回 null，调用方按最终结果正常发起
+         */
+        public synchronized LLMService.PrefetchedStream resolve(String finalText) {
+            closed = true;
+            disposeTimer();
+            if (speculative == null) {
+                return null;
+            }
+
+            LLMService.PrefetchedStream candidate = speculative;
+            speculative = null;
+            if (normalize(candidate.text()).equals(normalize(finalText))) {
+                long savedNanos = candidate.savedNanos(System.nanoTime());
+                hits.incrementAndGet();
+                totalSavedNanos.addAndGet(savedNanos);
+                log.debug("推测命中: session={}, 节省 {}ms", state.getSessionId(), TimeUnit.NANOSECONDS.toMillis(savedNanos));
+                return candidate;
+            }
+
+            candidate.cancel();
+            misses.incrementAndGet();
+            log.debug("推测未命中: session={}, speculative={}, final={}", state.getSessionId(), candidate.text(), finalText);
+            return null;
+        }
+
+        /**
+         * 结束本轮推测，取消未被采用的请求（中断、出错或识别结果为空时调用）
+         */
+        public synchronized void cancel() {
+            closed = true;
+            disposeTimer();
+            if (speculative != null) {
+                speculative.cancel();
+                speculative = null;
+            }
+        }
+
+        private void disposeTimer() {
+            if (stabilityTimer != null) {
+                stabilityTimer.dispose();
+                stabilityTimer = null;
+            }
+        }
+    }
+
+    /**
+     * 推测执行统计
+     *
+     * @param started      发起的推测请求数（含重新推测）
+     * @param hits         最终结果与推测一致、直接采用的次数
+     * @param misses       最终结果不一致、取消后重新发起的次数
+     * @param restarts     推测期间中间结果变化导致的重新推测次数
+     * @param hitRate      命中率（hits / (hits + misses)）
+     * @param avgSavedMs   命中时平均节省的首响应等待时间（毫秒），不超过 LLM 首响应耗时
+     * @param totalSavedMs 命中累计节省的首响应等待时间（毫秒）
+     */
+    public record Stats(long started, long hits, long misses, long restarts, double hitRate,
+                        long avgSavedMs, long totalSavedMs) {
+    }
+}
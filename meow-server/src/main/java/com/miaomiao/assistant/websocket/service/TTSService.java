@@ -1,6 +1,7 @@
 package com.miaomiao.assistant.websocket.service;
 
 import com.miaomiao.assistant.codec.OpusCodec;
+import com.miaomiao.assistant.codec.OpusProfile;
 import com.miaomiao.assistant.model.tts.TTSManager;
 import com.miaomiao.assistant.service.ConversationConfigService;
 import com.miaomiao.assistant.websocket.ConversationConfig;
@@ -8,6 +9,7 @@ import com.miaomiao.assistant.websocket.session.WebSocketMessageSender;
 import com.miaomiao.assistant.websocket.service.pipeline.ConcurrentTTSFrameProcessor;
 import com.miaomiao.assistant.websocket.service.pipeline.FrameProcessor;
 import com.miaomiao.assistant.websocket.service.pipeline.Frames;
+import com.miaomiao.assistant.websocket.service.pipeline.PcmSilenceTrimmer;
 import com.miaomiao.assistant.websocket.service.pipeline.TextAggregator;
 import com.miaomiao.assistant.websocket.session.SessionState;
 import lombok.RequiredArgsConstructor;
@@ -15,7 +17,7 @@ import lombok.extern.slf4j.Slf4j;
 import org.springframework.beans.factory.annotation.Value;
 import org.springframework.stereotype.Service;
 import reactor.core.publisher.Flux;
-import reactor.core.scheduler.Schedulers;
+import reactor.core.publisher.Mono;
 
 /**
  * TTS（语音合成）处理服务
@@ -37,6 +39,7 @@ public class TTSService {
     private final OpusCodec opusCodec;
     private final WebSocketMessageSender messageSender;
     private final ConversationConfigService configService;
+    private final OpusProfileService opusProfileService;
 
     /**
      * TTS 并发数
@@ -46,6 +49,42 @@ public class TTSService {
     @Value("${tts.concurrent.max-concurrency:3}")
     private int maxConcurrency;
 
+    /**
+     * 是否裁剪 TTS 音频首尾静音
+     */
+    @Value("${tts.silence-trim.enabled:true}")
+    private boolean trimEnabled;
+
+    /**
+     * 静音阈值（dBFS）
+     */
+    @Value("${tts.silence-trim.threshold-dbfs:-45}")
+    private double trimThresholdDbfs;
+
+    /**
+     * 能量计算窗口（毫秒）
+     */
+    @Value("${tts.silence-trim.window-ms:10}")
+    private int trimWindowMs;
+
+    /**
+     * 语音前保留的静音（毫秒）
+     */
+    @Value("${tts.silence-trim.leading-guard-ms:30}")
+    private int trimLeadingGuardMs;
+
+    /**
+     * 语音后保留的静音（毫秒）
+     */
+    @Value("${tts.silence-trim.trailing-guard-ms:60}")
+    private int trimTrailingGuardMs;
+
+    /**
+     * 句间插入的固定停顿（毫秒），0 表示不插入
+     */
+    @Value("${tts.silence-trim.segment-pause-ms:0}")
+    private int trimSegmentPauseMs;
+
     /**
      * 处理TTS流 - 使用 Pipecat 管道架构
      * <p>
@@ -53,56 +92,66 @@ public class TTSService {
      * - 首句使用宽松标点（逗号、顿号等）→ 降低首句延迟
      * - 后续使用完整句子标点 → 保证 TTS 合成质量
      * <p>
-     * 使用并发模式：多线程并发调用 TTS，有序队列保证播放顺序
+     * 使用并发模式：并发调用 TTS，按序编码发送保证播放顺序。
+     * 编码档位在回复开始时确定，整轮不变。
+     * <p>
+     * 返回的 Mono 在本轮音频全部发送后完成，期间不占用线程；取消订阅即中止本轮 TTS，文本流出错时以同一错误结束。
      *
      * @param state      会话状态
      * @param textStream 句子文本流（来自 LLM）
+     * @return 本轮 TTS 完成信号
      */
-    public void processTTSStream(SessionState state, Flux<String> textStream) {
-        ConcurrentTTSFrameProcessor processor = new ConcurrentTTSFrameProcessor(
-                ttsManager,
-                opusCodec,
-                messageSender,
-                configService,
-                state,
-                TextAggregator.AggregationStrategy.HYBRID,
-                maxConcurrency
-        );
+    public Mono<Void> processTTSStream(SessionState state, Flux<String> textStream) {
+        return Mono.defer(() -> {
+            OpusProfile opusProfile = opusProfileService.profileForTurn(state);
+            ConcurrentTTSFrameProcessor processor = new ConcurrentTTSFrameProcessor(
+                    ttsManager,
+                    opusCodec,
+                    opusProfile,
+                    messageSender,
+                    configService,
+                    state,
+                    TextAggregator.AggregationStrategy.HYBRID,
+                    maxConcurrency,
+                    new PcmSilenceTrimmer.Config(trimEnabled, trimThresholdDbfs, trimWindowMs,
+                            trimLeadingGuardMs, trimTrailingGuardMs, trimSegmentPauseMs)
+            );
 
-        FrameProcessor.ProcessingContext context = new FrameProcessor.ProcessingContext(state.getSessionId());
+            FrameProcessor.ProcessingContext context = new FrameProcessor.ProcessingContext(state.getSessionId());
 
-        textStream
-                .takeWhile(text -> !state.isAborted())
-                .publishOn(Schedulers.boundedElastic())
-                .doOnNext(text -> {
-                    if (state.isAborted() || context.isInterrupted()) {
-                        return;
-                    }
-                    try {
-                        processor.processFrame(new Frames.TextFrame(text), context);
-                    } catch (FrameProcessor.FrameProcessingException e) {
-                        log.error("TTS 处理文本失败: {}", text, e);
-                    }
-                })
-                .doOnError(error -> {
-                    log.error("TTS 流错误", error);
-                })
-                .doOnComplete(() -> {
-                    if (state.isAborted() || context.isInterrupted()) {
-                        log.debug("会话 {} 已中止，跳过 EndFrame 处理", state.getSessionId());
-                        return;
-                    }
-                    try {
-                        processor.processFrame(new Frames.EndFrame(), context);
-                        log.debug("会话 {} TTS 流处理完成", state.getSessionId());
-                    } catch (FrameProcessor.FrameProcessingException e) {
-                        log.error("处理结束帧失败", e);
-                    }
-                })
-                .doFinally(signalType -> {
-                    processor.close();
-                    log.debug("会话 {} TTS 流结束: {}", state.getSessionId(), signalType);
-                })
-                .subscribe();
+            // 文本处理只做断句和提交任务，不阻塞，直接在 LLM 回调线程上执行
+            return textStream
+                    .takeWhile(text -> !state.isAborted())
+                    .doOnNext(text -> {
+                        if (state.isAborted() || context.isInterrupted()) {
+                            return;
+                        }
+                        try {
+                            processor.processFrame(new Frames.TextFrame(text), context);
+                        } catch (FrameProcessor.FrameProcessingException e) {
+                            log.error("TTS 处理文本失败: {}", text, e);
+                        }
+                    })
+                    .then(Mono.defer(() -> {
+                        if (state.isAborted() || context.isInterrupted()) {
+                            log.debug("会话 {} 已中止，跳过 EndFrame 处理", state.getSessionId());
+                            return Mono.<Void>empty();
+                        }
+                        try {
+                            processor.processFrame(new Frames.EndFrame(), context);
+                        } catch (FrameProcessor.FrameProcessingException e) {
+                            log.error("处理结束帧失败", e);
+                            return Mono.<Void>empty();
+                        }
+                        return processor.completion()
+                                .doOnSuccess(ignored -> log.debug("会话 {} TTS 流处理完成", state.getSessionId()));
+                    }))
+                    // 错误（包括上游 LLM 的错误）继续向本轮对话链路传播，由其通知客户端
+                    .doOnError(error -> log.debug("会话 {} TTS 流因错误结束: {}", state.getSessionId(), error.toString()))
+                    .doFinally(signalType -> {
+                        processor.close();
+                        log.debug("会话 {} TTS 流结束: {}", state.getSessionId(), signalType);
+                    });
+        });
     }
 }
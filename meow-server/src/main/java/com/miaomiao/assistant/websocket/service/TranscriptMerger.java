@@ -0,0 +1,69 @@
+package com.miaomiao.assistant.websocket.service;
+
+/**
+ * ASR 文本拼接工具
+ */
+public final class TranscriptMerger {
+
+    /**
+     * 分段拼接时检查的最大重叠字符数
+     */
+    private static final int MAX_OVERLAP_CHARS = 16;
+
+    /**
+     * 重叠少于该字符数时不去重。分段重叠约 300ms，常常只重复一个字；切点落在停顿处，
+     * 前一段末字与后一段首字相同几乎都是重叠造成的，因此一个字也去重
+     */
+    private static final int MIN_OVERLAP_CHARS = 1;
+
+    private TranscriptMerger() {
+    }
+
+    /**
+     * 兼容增量和累计两种 ASR chunk 文本格式：
+     * - 若 incoming 以 accumulated 开头，则视为累计文本，直接替换
+     * - 否则视为增量文本，追加
+     */
+    public static String merge(String accumulated, String incoming) {
+        if (incoming == null || incoming.isBlank()) {
+            return accumulated;
+        }
+        if (accumulated == null || accumulated.isBlank()) {
+            return incoming;
+        }
+        if (incoming.startsWith(accumulated)) {
+            return incoming;
+        }
+        if (accumulated.startsWith(incoming)) {
+            return accumulated;
+        }
+        return accumulated + incoming;
+    }
+
+    /**
+     * 拼接相邻音频分段的识别结果
+     * <p>
+     * 分段之间有音频重叠，后一段开头可能重复前一段结尾的字：
+     * 找到 accumulated 结尾与 segment 开头最长的相同部分，只追加不重复的部分。
+     * 比较时忽略 accumulated 末尾的标点和空白（ASR 会给每段补句末标点），去重时一并去掉。
+     */
+    public static String appendSegment(String accumulated, String segment) {
+        if (segment == null || segment.isBlank()) {
+            return accumulated;
+        }
+        if (accumulated == null || accumulated.isBlank()) {
+            return segment;
+        }
+        int end = accumulated.length();
+        while (end > 0 && !Character.isLetterOrDigit(accumulated.charAt(end - 1))) {
+            end--;
+        }
+        int maxOverlap = Math.min(MAX_OVERLAP_CHARS, Math.min(end, segment.length()));
+        for (int overlap = maxOverlap; overlap >= MIN_OVERLAP_CHARS; overlap--) {
+            if (accumulated.regionMatches(end - overlap, segment, 0, overlap)) {
+                return accumulated.substring(0, end) + segment.substring(overlap);
+            }
+        }
+        return accumulated + segment;
+    }
+}
@@ -0,0 +1,177 @@
+package com.miaomiao.assistant.websocket.service;
+
+import com.miaomiao.assistant.codec.WavCodec;
+import com.miaomiao.assistant.websocket.service.pipeline.VoiceActivityDetector;
+import com.miaomiao.assistant.websocket.session.SessionState;
+import com.miaomiao.assistant.websocket.session.WebSocketMessageSender;
+import lombok.RequiredArgsConstructor;
+import lombok.extern.slf4j.Slf4j;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.stereotype.Service;
+
+import java.util.Arrays;
+import java.util.Locale;
+
+/**
+ * PCM 语音输入服务
+ * <p>
+ * 客户端边录边上传 16 位单声道 PCM（格式 {@code pcm;rate=16000}），服务端逐块做端点检测：
+ * 1. 检测到说完（末尾静音达到阈值）时立即结束本段输入，下发 {@code listening_stopped}，
+ * 封装为 WAV 进入 ASR -> LLM -> TTS，不必等用户松手
+ * 2. 客户端先结束（结束帧）时同样处理；整段未检测到语音则直接丢弃
+ * 3. 服务端结束后、客户端结束帧到达前的音频被丢弃
+ */
+@Slf4j
+@Service
+@RequiredArgsConstructor
+public class VoiceInputService {
+
+    private static final int DEFAULT_PCM_SAMPLE_RATE = 16000;
+
+    private final ConversationService conversationService;
+    private final WebSocketMessageSender messageSender;
+
+    @Value("${vad.enabled:true}")
+    private boolean enabled = true;
+
+    @Value("${vad.window-ms:20}")
+    private int windowMs = 20;
+
+    @Value("${vad.min-speech-dbfs:-45}")
+    private double minSpeechDbfs = -45;
+
+    @Value("${vad.noise-margin-db:10}")
+    private double noiseMarginDb = 10;
+
+    @Value("${vad.speech-start-ms:120}")
+    private int speechStartMs = 120;
+
+    @Value("${vad.end-silence-ms:600}")
+    private int endSilenceMs = 600;
+
+    @Value("${vad.max-utterance-ms:30000}")
+    private int maxUtteranceMs = 30000;
+
+    /**
+     * 末尾保留的静音（毫秒），避免截断尾音
+     */
+    @Value("${vad.trailing-guard-ms:200}")
+    private int trailingGuardMs = 200;
+
+    /**
+     * 是否启用服务端端点检测
+     */
+    public boolean isEnabled() {
+        return enabled;
+    }
+
+    /**
+     * 是否是 PCM 流式上传格式
+     */
+    public static boolean isPcmFormat(String format) {
+        return format != null && format.trim().toLowerCase(Locale.ROOT).startsWith("pcm");
+    }
+
+    /**
+     * 接收一块 PCM
+     *
+     * @param state  会话状态
+     * @param chunk  16 位小端单声道 PCM
+     * @param format 客户端上报的格式，如 {@code pcm;rate=16000}
+     * @param isLast 是否是客户端的结束帧
+     */
+    public void acceptPcm(SessionState state, byte[] chunk, String format, boolean isLast) {
+        if (state.isVoiceEndpointed()) {
+            // 服务端已结束本段输入，等客户端结束帧到达后开始下一段
+            if (isLast) {
+                state.resetVoiceInput();
+            }
+            return;
+        }
+
+        int sampleRate = parseSampleRate(format);
+        VoiceActivityDetector detector = state.getVoiceActivityDetector();
+        if (detector == null || detector.getSampleRate() != sampleRate) {
+            detector = new VoiceActivityDetector(vadConfig(), sampleRate);
+            state.setVoiceActivityDetector(detector);
+        }
+
+        if (chunk != null && chunk.length > 0) {
+            state.accumulateAudio(chunk);
+        }
+
+        VoiceActivityDetector.Event event = enabled ? detector.process(chunk) : VoiceActivityDetector.Event.NONE;
+        if (event == VoiceActivityDetector.Event.SPEECH_START) {
+            log.debug("VAD 检测到开口: session={}", state.getSessionId());
+        }
+
+        if (event == VoiceActivityDetector.Event.END_OF_SPEECH) {
+            endUtterance(state, detector, sampleRate, "vad");
+            if (isLast) {
+                state.resetVoiceInput();
+            } else {
+                state.setVoiceEndpointed(true);
+            }
+            return;
+        }
+
+        if (isLast) {
+            endUtterance(state, detector, sampleRate, "client");
+            state.resetVoiceInput();
+        }
+    }
+
+    private void endUtterance(SessionState state, VoiceActivityDetector detector, int sampleRate, String reason) {
+        byte[] pcm = state.getAndClearAudioBuffer();
+        boolean hasSpeech = !enabled || detector.isSpeechDetected();
+        String stopReason = hasSpeech ? reason : "no_speech";
+
+        try {
+            messageSender.sendListeningStopped(state, stopReason, detector.getSpeechMs());
+        } catch (Exception e) {
+            log.warn("发送 listening_stopped 失败: {}", e.getMessage());
+        }
+
+        if (!hasSpeech || pcm.length == 0) {
+            log.debug("未检测到语音，丢弃输入: session={}, bytes={}", state.getSessionId(), pcm.length);
+            return;
+        }
+
+        if (enabled) {
+            // 只保留到最后一个语音窗口之后的保护时长
+            long keep = detector.getSpeechEndOffset() + (long) sampleRate * trailingGuardMs / 1000 * 2;
+            if (keep < pcm.length) {
+                pcm = Arrays.copyOf(pcm, (int) keep & ~1);
+            }
+        }
+
+        log.debug("语音输入结束: session={}, reason={}, speechMs={}, bytes={}",
+                state.getSessionId(), reason, detector.getSpeechMs(), pcm.length);
+        conversationService.processAudioInput(state, WavCodec.toWav(pcm, sampleRate, 1), "wav");
+    }
+
+    private VoiceActivityDetector.Config vadConfig() {
+        return new VoiceActivityDetector.Config(enabled, windowMs, minSpeechDbfs, noiseMarginDb,
+                speechStartMs, endSilenceMs, maxUtteranceMs);
+    }
+
+    /**
+     * 从 {@code pcm;rate=16000} 中解析采样率
+     */
+    private static int parseSampleRate(String format) {
+        if (format == null) {
+            return DEFAULT_PCM_SAMPLE_RATE;
+        }
+        for (String part : format.split(";")) {
+            String[] kv = part.trim().split("=", 2);
+            if (kv.length == 2 && "rate".equalsIgnoreCase(kv[0].trim())) {
+                try {
+                    return Integer.parseInt(kv[1].trim());
+                } catch (NumberFormatException ignored) {
+                    return DEFAULT_PCM_SAMPLE_RATE;
+                }
+            }
+        }
+        return DEFAULT_PCM_SAMPLE_RATE;
+    }
+}
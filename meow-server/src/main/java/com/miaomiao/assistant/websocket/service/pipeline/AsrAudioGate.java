@@ -0,0 +1,128 @@
+package com.miaomiao.assistant.websocket.service.pipeline;
+
+import com.miaomiao.assistant.codec.WavCodec;
+
+/**
+ * ASR 前置音频闸门
+ * <p>
+ * 整段上传的录音在送 ASR 之前按固定窗口计算能量：
+ * 1. 有效语音不足 {@code minSpeechMs}：整段拒绝，不调用 ASR
+ * 2. 否则裁掉首尾静音（各保留一小段保护时长），重新封装为 WAV
+ * <p>
+ * 只处理 16 位 PCM WAV，其他格式原样放行。无状态，线程安全。
+ */
+public final class AsrAudioGate {
+
+    /**
+     * 闸门配置
+     *
+     * @param enabled         是否启用
+     * @param thresholdDbfs   静音阈值（dBFS），窗口 RMS 低于该值视为静音
+     * @param windowMs        能量计算窗口（毫秒）
+     * @param minSpeechMs     有效语音总时长低于该值时拒绝
+     * @param leadingGuardMs  语音前保留的静音（毫秒）
+     * @param trailingGuardMs 语音后保留的静音（毫秒）
+     */
+    public record Config(boolean enabled, double thresholdDbfs, int windowMs, int minSpeechMs,
+                         int leadingGuardMs, int trailingGuardMs) {
+    }
+
+    /**
+     * 闸门结论
+     */
+    public enum Decision {
+        /**
+         * 原样放行（未启用、无法解析或无需裁剪）
+         */
+        PASS,
+        /**
+         * 裁掉首尾静音后放行
+         */
+        TRIMMED,
+        /**
+         * 没有语音，不调用 ASR
+         */
+        REJECTED
+    }
+
+    /**
+     * 闸门结果
+     *
+     * @param decision    结论
+     * @param audio       送 ASR 的音频，REJECTED 时为 null
+     * @param inputBytes  原始字节数
+     * @param outputBytes 送 ASR 的字节数
+     * @param speechMs    检测到的语音时长（毫秒），无法分析时为 -1
+     */
+    public record Result(Decision decision, byte[] audio, int inputBytes, int outputBytes, int speechMs) {
+
+        public long savedBytes() {
+            return inputBytes - outputBytes;
+        }
+    }
+
+    private AsrAudioGate() {
+    }
+
+    /**
+     * 对一段 WAV 录音应用闸门
+     */
+    public static Result apply(Config config, byte[] wav) {
+        int inputBytes = wav == null ? 0 : wav.length;
+        if (config == null || !config.enabled() || inputBytes == 0) {
+            return new Result(Decision.PASS, wav, inputBytes, inputBytes, -1);
+        }
+
+        WavCodec.WavInfo info = WavCodec.parse(wav);
+        if (info == null || !info.isPcm16()) {
+            return new Result(Decision.PASS, wav, inputBytes, inputBytes, -1);
+        }
+
+        int frameBytes = info.frameBytes();
+        int windowFrames = Math.max(1, info.sampleRate() * config.windowMs() / 1000);
+        int windowBytes = windowFrames * frameBytes;
+        int windowSamples = windowFrames * info.channels();
+        int windows = info.dataLength() / windowBytes;
+
+        // 比较平方和，避免逐窗口开方：RMS < A  <=>  sum(x^2) < A^2 * n
+        double amplitude = 32768.0 * Math.pow(10, config.thresholdDbfs() / 20.0);
+        long thresholdSumSquares = (long) (amplitude * amplitude * windowSamples);
+
+        int firstVoiced = -1;
+        int lastVoiced = -1;
+        int voicedWindows = 0;
+        int offset = info.dataOffset();
+        for (int i = 0; i < windows; i++, offset += windowBytes) {
+            if (PcmSilenceTrimmer.sumSquares(wav, offset, windowBytes) >= thresholdSumSquares) {
+                if (firstVoiced < 0) {
+                    firstVoiced = i;
+                }
+                lastVoiced = i;
+                voicedWindows++;
+            }
+        }
+
+        int speechMs = voicedWindows * config.windowMs();
+        if (firstVoiced < 0 || speechMs < config.minSpeechMs()) {
+            return new Result(Decision.REJECTED, null, inputBytes, 0, speechMs);
+        }
+
+        long bytesPerMs = (long) info.sampleRate() * frameBytes / 1000;
+        long start = Math.max(0, (long) firstVoiced * windowBytes - config.leadingGuardMs() * bytesPerMs);
+        long end = Math.min(info.dataLength(), (long) (lastVoiced + 1) * windowBytes + config.trailingGuardMs() * bytesPerMs);
+        start -= start % frameBytes;
+        end -= end % frameBytes;
+
+        if (start == 0 && end == info.dataLength()) {
+            return new Result(Decision.PASS, wav, inputBytes, inputBytes, speechMs);
+        }
+
+        byte[] pcm = new byte[(int) (end - start)];
+        System.arraycopy(wav, info.dataOffset() + (int) start, pcm, 0, pcm.length);
+        byte[] trimmed = WavCodec.toWav(pcm, info.sampleRate(), info.channels());
+        if (trimmed.length >= inputBytes) {
+            return new Result(Decision.PASS, wav, inputBytes, inputBytes, speechMs);
+        }
+        return new Result(Decision.TRIMMED, trimmed, inputBytes, trimmed.length, speechMs);
+    }
+}
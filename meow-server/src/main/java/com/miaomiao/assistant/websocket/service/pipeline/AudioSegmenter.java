@@ -0,0 +1,103 @@
+package com.miaomiao.assistant.websocket.service.pipeline;
+
+import com.miaomiao.assistant.codec.WavCodec;
+
+import java.util.ArrayList;
+import java.util.List;
+
+/**
+ * 长录音切分器
+ * <p>
+ * 把一段 16 位 PCM WAV 按目标时长切成多段，用于并行识别：
+ * 1. 每段在目标切点前后 {@code searchMs} 内找能量最低的窗口作为切点，尽量落在字词间的停顿上；
+ *    搜索范围最多半个分段，每段至少半个目标时长，不会切出过短的分段
+ * 2. 后一段向前多带 {@code overlapMs} 音频，避免切点附近的字被截断
+ * 3. 剩余不足一段加搜索范围时并入最后一段
+ * <p>
+ * 无状态，线程安全。
+ */
+public final class AudioSegmenter {
+
+    /**
+     * 切分配置
+     *
+     * @param segmentMs 目标分段时长（毫秒）
+     * @param searchMs  切点搜索范围（目标切点前后各多少毫秒），超过 segmentMs 的一半时按一半计算
+     * @param overlapMs 相邻分段重叠时长（毫秒）
+     * @param windowMs  能量计算窗口（毫秒）
+     */
+    public record Config(int segmentMs, int searchMs, int overlapMs, int windowMs) {
+    }
+
+    private AudioSegmenter() {
+    }
+
+    /**
+     * 切分 WAV 录音
+     *
+     * @return 各分段的 WAV；无法解析或不需要切分时返回只含原音频的列表
+     */
+    public static List<byte[]> split(Config config, byte[] wav) {
+        WavCodec.WavInfo info = WavCodec.parse(wav);
+        if (info == null || !info.isPcm16() || config.segmentMs() <= 0) {
+            return List.of(wav);
+        }
+
+        int frameBytes = info.frameBytes();
+        long bytesPerMs = (long) info.sampleRate() * frameBytes / 1000;
+        int windowBytes = (int) Math.max(frameBytes, config.windowMs() * bytesPerMs / frameBytes * frameBytes);
+        long segmentBytes = align(config.segmentMs() * bytesPerMs, frameBytes);
+        long searchBytes = align(Math.min(config.searchMs(), config.segmentMs() / 2) * bytesPerMs, frameBytes);
+        long overlapBytes = align(config.overlapMs() * bytesPerMs, frameBytes);
+        int dataLength = info.dataLength();
+
+        if (dataLength <= segmentBytes + searchBytes) {
+            return List.of(wav);
+        }
+
+        List<byte[]> segments = new ArrayList<>();
+        long start = 0;
+        while (dataLength - start > segmentBytes + searchBytes) {
+            long target = start + segmentBytes;
+            // 搜索下限不早于本段起点后一个窗口，切点不会落在上一切点或之前
+            long searchFrom = Math.max(target - searchBytes, start + windowBytes);
+            if (searchFrom > dataLength - windowBytes) {
+                break;
+            }
+            long searchTo = Math.max(searchFrom, Math.min(dataLength - windowBytes, target + searchBytes));
+            long cut = findQuietestWindow(wav, info.dataOffset(), searchFrom, searchTo, windowBytes, frameBytes);
+            long from = Math.max(0, start - overlapBytes);
+            segments.add(slice(wav, info, from, cut));
+            start = cut;
+        }
+        segments.add(slice(wav, info, Math.max(0, start - overlapBytes), dataLength));
+        return segments;
+    }
+
+    /**
+     * 在 [from, to] 范围内找能量最低的窗口，返回窗口中点（帧对齐）
+     */
+    private static long findQuietestWindow(byte[] wav, int dataOffset, long from, long to,
+                                           int windowBytes, int frameBytes) {
+        long best = from;
+        long bestEnergy = Long.MAX_VALUE;
+        for (long position = from; position <= to; position += windowBytes) {
+            long energy = PcmSilenceTrimmer.sumSquares(wav, dataOffset + (int) position, windowBytes);
+            if (energy < bestEnergy) {
+                bestEnergy = energy;
+                best = position;
+            }
+        }
+        return align(best + windowBytes / 2, frameBytes);
+    }
+
+    private static byte[] slice(byte[] wav, WavCodec.WavInfo info, long from, long to) {
+        byte[] pcm = new byte[(int) (to - from)];
+        System.arraycopy(wav, info.dataOffset() + (int) from, pcm, 0, pcm.length);
+        return WavCodec.toWav(pcm, info.sampleRate(), info.channels());
+    }
+
+    private static long align(long bytes, int frameBytes) {
+        return Math.max(0, bytes - bytes % frameBytes);
+    }
+}
@@ -1,17 +1,19 @@
 package com.miaomiao.assistant.websocket.service.pipeline;
 
 import com.miaomiao.assistant.codec.OpusCodec;
+import com.miaomiao.assistant.codec.OpusProfile;
 import com.miaomiao.assistant.model.tts.TTSManager;
 import com.miaomiao.assistant.model.tts.TTSOptions;
 import com.miaomiao.assistant.service.ConversationConfigService;
 import com.miaomiao.assistant.websocket.ConversationConfig;
+import com.miaomiao.assistant.websocket.protocol.BinaryAudioFrame;
 import com.miaomiao.assistant.websocket.session.WebSocketMessageSender;
 import com.miaomiao.assistant.websocket.session.SessionState;
 import lombok.Getter;
 import lombok.extern.slf4j.Slf4j;
+import reactor.core.publisher.Mono;
 
 import java.util.List;
-import java.util.concurrent.TimeUnit;
 
 /**
  * 并发 TTS Frame 处理器
@@ -32,25 +34,37 @@ public class ConcurrentTTSFrameProcessor implements FrameProcessor {
     private final TextAggregator textAggregator;
     private final ConcurrentTTSProcessor concurrentProcessor;
 
+    /**
+     * 本轮回复共用的增量编码器
+     * <p>
+     * 所有分段的 PCM 按序接续编码为一条连续的 Opus 流，分段边界不补0、不重建 codec，
+     * 只在整轮结束时补0一次。
+     */
+    private final OpusCodec.StreamEncoder turnEncoder;
+
     /**
      * 构造函数
      *
      * @param ttsManager          TTS 管理器
      * @param opusCodec         音频转换器
+     * @param opusProfile       本轮回复的 Opus 编码档位
      * @param messageSender       WebSocket 消息发送器
      * @param configService       配置服务
      * @param sessionState        会话状态
      * @param aggregationStrategy 聚合策略
      * @param maxConcurrency      最大并发数（建议 2-4）
+     * @param trimConfig          TTS 首尾静音裁剪配置
      */
     public ConcurrentTTSFrameProcessor(
             TTSManager ttsManager,
             OpusCodec opusCodec,
+            OpusProfile opusProfile,
             WebSocketMessageSender messageSender,
             ConversationConfigService configService,
             SessionState sessionState,
             TextAggregator.AggregationStrategy aggregationStrategy,
-            int maxConcurrency) {
+            int maxConcurrency,
+            PcmSilenceTrimmer.Config trimConfig) {
         this.configService = configService;
         this.sessionState = sessionState;
 
@@ -60,15 +74,21 @@ public class ConcurrentTTSFrameProcessor implements FrameProcessor {
                         .strategy(aggregationStrategy)
         );
 
+        this.turnEncoder = opusCodec.newStreamEncoder(opusProfile);
+        long audioTurn = sessionState.nextAudioTurn();
+        int frameDurationMs = opusProfile.frameDurationMs();
+
         // 创建并发 TTS 处理器
         this.concurrentProcessor = new ConcurrentTTSProcessor(
                 ttsManager,
-                opusCodec,
-                (opusFrame, isLast) -> {
+                turnEncoder,
+                (opusFrame, segment, frameIndex, isLast) -> {
                     try {
                         // 记录 TTS 首次响应时间（性能指标）
                         sessionState.getPerformanceMetrics().recordTTSFirstResponse();
-                        messageSender.sendTTSAudio(sessionState, opusFrame, isLast);
+                        BinaryAudioFrame.Position position = new BinaryAudioFrame.Position(
+                                audioTurn, segment, frameIndex, frameIndex * frameDurationMs);
+                        messageSender.sendTTSAudio(sessionState, opusFrame, isLast, position);
                     } catch (Exception e) {
                         log.error("发送音频帧失败", e);
                     }
@@ -76,7 +96,9 @@ public class ConcurrentTTSFrameProcessor implements FrameProcessor {
                 errorMsg -> log.warn("TTS 错误: {}", errorMsg),
                 maxConcurrency,
                 // 音频保存回调（性能指标 - 同时保存 PCM 和 OPUS 文件）
-                (pcmData, opusData) -> sessionState.getPerformanceMetrics().saveAudioPair(pcmData, opusData)
+                (pcmData, opusData) -> sessionState.getPerformanceMetrics().saveAudioPair(pcmData, opusData),
+                trimConfig,
+                OpusCodec.getSampleRate()
         );
     }
 
@@ -205,21 +227,16 @@ public class ConcurrentTTSFrameProcessor implements FrameProcessor {
             log.debug("无剩余文本需要处理");
         }
 
-        // 标记任务提交完成
+        // 标记任务提交完成，剩余分段在后台按序发送，完成信号见 completion()
         concurrentProcessor.complete();
+        log.debug("TTS 任务已全部提交");
+    }
 
-        // 等待所有任务处理完成（最多等待 30 秒）
-        try {
-            boolean completed = concurrentProcessor.awaitCompletion(30, TimeUnit.SECONDS);
-            if (!completed) {
-                log.warn("等待 TTS 任务完成超时");
-            }
-        } catch (InterruptedException e) {
-            Thread.currentThread().interrupt();
-            log.warn("等待 TTS 任务完成被中断");
-        }
-
-        log.debug("并发 TTS 处理完成");
+    /**
+     * 本轮 TTS 结束信号：全部音频发送完成、中断或关闭时完成
+     */
+    public Mono<Void> completion() {
+        return concurrentProcessor.completion();
     }
 
     /**
@@ -234,5 +251,6 @@ public class ConcurrentTTSFrameProcessor implements FrameProcessor {
      */
     public void close() {
         concurrentProcessor.close();
+        turnEncoder.close();
     }
 }
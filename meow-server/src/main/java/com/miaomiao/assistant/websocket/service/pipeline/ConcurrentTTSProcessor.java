@@ -6,10 +6,15 @@ import com.miaomiao.assistant.model.tts.TTSManager;
 import com.miaomiao.assistant.model.tts.TTSOptions;
 import lombok.Data;
 import lombok.extern.slf4j.Slf4j;
+import reactor.core.Disposable;
+import reactor.core.publisher.Flux;
+import reactor.core.publisher.Mono;
+import reactor.core.publisher.Sinks;
+import reactor.core.scheduler.Schedulers;
 
 import java.io.ByteArrayOutputStream;
-import java.util.List;
-import java.util.concurrent.*;
+import java.nio.ByteBuffer;
+import java.util.concurrent.TimeUnit;
 import java.util.concurrent.atomic.AtomicBoolean;
 import java.util.concurrent.atomic.AtomicInteger;
 import java.util.function.BiConsumer;
@@ -18,15 +23,19 @@ import java.util.function.Consumer;
 /**
  * 并发 TTS 处理器
  * <p>
- * 实现 LLM -> TTS 的多线程并发处理，同时保证播放顺序：
- * 1. 使用线程池并发执行 TTS 调用，提高吞吐量
- * 2. 使用有序结果队列，确保音频按句子顺序播放
- * 3. 支持中断和优雅关闭
+ * 实现 LLM -> TTS 的并发处理，同时保证播放顺序：
+ * 1. 多个分段的 TTS 调用并发执行，提高吞吐量
+ * 2. 每个任务对应一个有序分段，音频按句子顺序播放
+ * 3. 整轮回复共用一个增量编码器，各分段 PCM 按序接续编码成一条连续的 Opus 流
+ * 4. 支持中断和优雅关闭
  * <p>
- * 工作原理：
- * - 生产者线程：接收聚合后的句子，提交到线程池执行TTS转换
- * - 工作线程池：并发执行TTS调用，结果放入有序队列
- * - 消费者线程：按序号顺序从队列取出结果并播放
+ * 工作原理（整条链路是一个 Reactor 流，不占用等待线程）：
+ * - 任务流：接收聚合后的句子，按序号创建任务发到任务 sink
+ * - flatMapSequential：最多 maxConcurrency 个分段同时合成，当前分段的 PCM 到达即下发，
+ *   后续分段先在内部缓冲，当前分段结束后按序号依次下发
+ * - 编码发送：串行地把 PCM 编码成 Opus 帧发送；不足一帧的尾部跨分段保留，只在整轮结束时补0一次
+ * <p>
+ * 中断或关闭时取消订阅，正在进行的 TTS 请求随之取消。
  *
  * @author Pipecat移植优化
  */
@@ -55,91 +64,149 @@ public class ConcurrentTTSProcessor implements AutoCloseable {
     }
 
     /**
-     * TTS 结果
+     * 分段事件：一块 PCM，或分段结束
+     *
+     * @param sequence     分段序号
+     * @param pcm          PCM 数据，分段结束时为 null
+     * @param errorMessage 分段失败时的错误信息
      */
-    @Data
-    public static class TTSResult {
-        private final int sequence;           // 序号（对应任务序号）
-        private final String text;            // 原始文本
-        private final byte[] pcmData;         // 原始 PCM 音频数据
-        private final byte[] opusData;        // OPUS 编码后的音频数据
-        private final boolean success;        // 是否成功
-        private final String errorMessage;    // 错误信息（如果失败）
-
-        public static TTSResult success(int sequence, String text, byte[] pcmData, byte[] opusData) {
-            return new TTSResult(sequence, text, pcmData, opusData, true, null);
+    private record SegmentEvent(int sequence, byte[] pcm, String errorMessage) {
+
+        static SegmentEvent audio(int sequence, byte[] pcm) {
+            return new SegmentEvent(sequence, pcm, null);
+        }
+
+        static SegmentEvent end(int sequence, String errorMessage) {
+            return new SegmentEvent(sequence, null, errorMessage);
         }
 
-        public static TTSResult failure(int sequence, String text, String errorMessage) {
-            return new TTSResult(sequence, text, null, null, false, errorMessage);
+        boolean isEnd() {
+            return pcm == null;
         }
     }
 
     // 依赖组件
     private final TTSManager ttsManager;
-    private final OpusCodec opusCodec;
+    private final OpusCodec.StreamEncoder turnEncoder;
 
-    // 线程池和队列
-    private final ExecutorService ttsExecutor;
-    private final BlockingQueue<TTSResult> resultQueue;
-    private final Thread consumerThread;
+    // 任务流和订阅
+    private final Sinks.Many<TTSTask> taskSink = Sinks.many().unicast().onBackpressureBuffer();
+    private final Sinks.Empty<Void> completionSink = Sinks.empty();
+    private final Disposable subscription;
 
     // 状态控制
     private final AtomicInteger sequenceCounter = new AtomicInteger(0);
     private final AtomicInteger expectedSequence = new AtomicInteger(0);
-    private final ConcurrentHashMap<Integer, TTSResult> pendingResults = new ConcurrentHashMap<>();
     private final AtomicBoolean running = new AtomicBoolean(true);
-    private final AtomicBoolean completed = new AtomicBoolean(false);
-    private final CountDownLatch completionLatch = new CountDownLatch(1);
+
+    /**
+     * 编码状态锁：编码发送与关闭互斥，关闭返回后不会再使用编码器
+     */
+    private final Object encoderLock = new Object();
+
+    // 整轮音频（编码时串行访问），用于回复结束后的音频保存
+    private final ByteArrayOutputStream turnPcm = new ByteArrayOutputStream();
+    private final ByteArrayOutputStream turnOpus = new ByteArrayOutputStream();
+
+    /**
+     * 编码输出缓冲区，本轮复用，按分段 PCM 块的大小按需扩容（编码时串行访问）
+     */
+    private ByteBuffer encodeBuffer;
+
+    /**
+     * 已编码、尚未发送的一帧。始终持有一帧，便于在整轮最后一帧上标记 finished
+     */
+    private byte[] pendingFrame;
+    private int pendingSegment;
+    private long pendingFrameIndex;
+
+    /**
+     * 正在编码的分段序号，以及本轮已编码的帧数
+     */
+    private int currentSegment = -1;
+    private long frameCounter = 0;
+
+    /**
+     * 音频帧发送回调
+     */
+    @FunctionalInterface
+    public interface AudioSender {
+        /**
+         * @param opusFrame  一帧 Opus 数据（[2字节长度头][帧数据]）
+         * @param segment    帧所属分段序号（跨分段的帧归属于补齐它的分段）
+         * @param frameIndex 帧在本轮内的序号，从 0 开始连续递增
+         * @param isLast     是否是本轮最后一帧
+         */
+        void send(byte[] opusFrame, int segment, long frameIndex, boolean isLast);
+    }
 
     // 回调
-    private final BiConsumer<byte[], Boolean> audioSender;  // 音频发送回调 (opusData, isLast)
+    private final AudioSender audioSender;                   // 音频发送回调
     private final Consumer<String> errorHandler;             // 错误处理回调
     private final BiConsumer<byte[], byte[]> audioSaver;     // 音频保存回调 (pcmData, opusData)
 
     // 配置
     private final int maxConcurrency;
-    private final int queueCapacity;
+    private final PcmSilenceTrimmer.Config trimConfig;
+    private final int sampleRate;
+
+    /**
+     * 分段之间插入的固定停顿（静音 PCM），未配置时为空数组
+     */
+    private final byte[] segmentPause;
 
     /**
      * 构造函数（带音频保存回调）
      *
      * @param ttsManager     TTS 管理器
-     * @param opusCodec    音频转换器
+     * @param turnEncoder    本轮回复共用的增量编码器（由调用方持有并负责关闭）
      * @param audioSender    音频发送回调
      * @param errorHandler   错误处理回调
      * @param maxConcurrency 最大并发数（建议 2-4）
-     * @param audioSaver     音频保存回调 (pcmData, opusData)
+     * @param audioSaver     音频保存回调 (pcmData, opusData)，整轮结束时调用一次
+     * @param trimConfig     首尾静音裁剪配置
+     * @param sampleRate     TTS PCM 采样率
      */
     public ConcurrentTTSProcessor(
             TTSManager ttsManager,
-            OpusCodec opusCodec,
-            BiConsumer<byte[], Boolean> audioSender,
+            OpusCodec.StreamEncoder turnEncoder,
+            AudioSender audioSender,
             Consumer<String> errorHandler,
             int maxConcurrency,
-            BiConsumer<byte[], byte[]> audioSaver) {
+            BiConsumer<byte[], byte[]> audioSaver,
+            PcmSilenceTrimmer.Config trimConfig,
+            int sampleRate) {
         this.ttsManager = ttsManager;
-        this.opusCodec = opusCodec;
+        this.turnEncoder = turnEncoder;
         this.audioSender = audioSender;
         this.errorHandler = errorHandler;
         this.audioSaver = audioSaver;
         this.maxConcurrency = Math.max(1, Math.min(maxConcurrency, 8)); // 限制 1-8
-        this.queueCapacity = this.maxConcurrency * 2;
-
-        // 创建固定大小的线程池
-        this.ttsExecutor = Executors.newFixedThreadPool(this.maxConcurrency, r -> {
-            Thread t = new Thread(r, "TTS-Worker");
-            t.setDaemon(true);
-            return t;
-        });
-
-        // 创建结果队列
-        this.resultQueue = new LinkedBlockingQueue<>(queueCapacity);
-
-        // 启动消费者线程（按序播放）
-        this.consumerThread = new Thread(this::consumeResults, "TTS-Consumer");
-        this.consumerThread.setDaemon(true);
-        this.consumerThread.start();
+        this.trimConfig = trimConfig == null ? PcmSilenceTrimmer.Config.DISABLED : trimConfig;
+        this.sampleRate = sampleRate;
+        this.segmentPause = PcmSilenceTrimmer.pause(this.trimConfig, sampleRate);
+
+        // 并发合成、按序编码发送
+        this.subscription = taskSink.asFlux()
+                .flatMapSequential(this::synthesize, this.maxConcurrency)
+                .subscribe(
+                        this::handleEvent,
+                        error -> {
+                            log.error("TTS 处理流异常", error);
+                            // 已发出的音频仍需以 finished 帧收尾，客户端才能结束本轮播放
+                            try {
+                                finishTurn();
+                            } catch (RuntimeException e) {
+                                log.error("TTS 异常后结束本轮失败", e);
+                            }
+                            completionSink.tryEmitEmpty();
+                        },
+                        () -> {
+                            log.debug("所有任务已处理完成");
+                            finishTurn();
+                            completionSink.tryEmitEmpty();
+                        }
+                );
     }
 
     /**
@@ -151,217 +218,194 @@ public class ConcurrentTTSProcessor implements AutoCloseable {
      * @param options          TTS 选项
      * @return 任务序号
      */
-    public int submitTask(String text, TextAggregator.AggregationType type,
-                          String providerModelKey, TTSOptions options) {
+    public synchronized int submitTask(String text, TextAggregator.AggregationType type,
+                                       String providerModelKey, TTSOptions options) {
         if (!running.get()) {
             log.warn("处理器已关闭，拒绝新任务");
             return -1;
         }
 
         int sequence = sequenceCounter.getAndIncrement();
-        TTSTask task = new TTSTask(sequence, text, type, providerModelKey, options);
-        ttsExecutor.submit(() -> executeTask(task));
+        // 在同步块内发出，保证任务顺序与序号一致
+        Sinks.EmitResult result = taskSink.tryEmitNext(new TTSTask(sequence, text, type, providerModelKey, options));
+        if (result.isFailure()) {
+            log.warn("提交 TTS 任务失败: seq={}, result={}", sequence, result);
+            return -1;
+        }
         return sequence;
     }
 
     /**
-     * 执行 TTS 任务
+     * 合成一个分段
+     * <p>
+     * 每收到一块 PCM 就立即下发；启用静音裁剪时先裁掉首尾静音。
+     * 失败不会中断整轮，而是以带错误信息的分段结束事件下发。
      */
-    private void executeTask(TTSTask task) {
-        if (!running.get()) {
-            return;
-        }
-        TTSResult result;
+    private Flux<SegmentEvent> synthesize(TTSTask task) {
         long startNanos = System.nanoTime();
-        try {
-            // 调用 TTS 获取音频流
-            List<TTSAudio> audioChunks = ttsManager.textToSpeechStream(
-                    task.getProviderModelKey(),
-                    task.getText(),
-                    task.getOptions()
-            ).collectList().block();
-
-            if (audioChunks == null || audioChunks.isEmpty()) {
-                log.warn("TTS 返回空音频: seq={}, text={}", task.getSequence(), task.getText());
-                result = TTSResult.failure(task.getSequence(), task.getText(), "TTS 返回空音频");
-            } else {
-                // 收集 PCM 数据
-                ByteArrayOutputStream pcmBuffer = new ByteArrayOutputStream();
-                for (TTSAudio audio : audioChunks) {
-                    if (!running.get()) {
-                        return; // 被中断
+        AtomicBoolean firstChunk = new AtomicBoolean(true);
+        AtomicInteger pcmSize = new AtomicInteger(0);
+        PcmSilenceTrimmer trimmer = trimConfig.enabled() ? new PcmSilenceTrimmer(trimConfig, sampleRate) : null;
+
+        // SDK 类提供商在创建流时同步发起请求，放到 boundedElastic 上执行，不阻塞上游线程
+        Flux<SegmentEvent> audio = Flux.defer(() -> ttsManager.textToSpeechStream(
+                        task.getProviderModelKey(),
+                        task.getText(),
+                        task.getOptions()))
+                .subscribeOn(Schedulers.boundedElastic())
+                .map(TTSAudio::getAudioData)
+                .filter(pcm -> pcm != null && pcm.length > 0)
+                .map(pcm -> {
+                    if (firstChunk.compareAndSet(true, false)) {
+                        log.debug("TTS 首个音频块: seq={}, elapsedMs={}", task.getSequence(),
+                                TimeUnit.NANOSECONDS.toMillis(System.nanoTime() - startNanos));
                     }
-                    if (audio.getAudioData() != null) {
-                        pcmBuffer.write(audio.getAudioData());
-                    }
-                }
-
-                byte[] pcmData = pcmBuffer.toByteArray();
-                if (pcmData.length == 0) {
-                    result = TTSResult.failure(task.getSequence(), task.getText(), "PCM 数据为空");
-                } else {
-                    // 转换为 OPUS
-                    byte[] opusData = opusCodec.encodePcmToOpus(pcmData);
-                    result = TTSResult.success(task.getSequence(), task.getText(), pcmData, opusData);
-                }
+                    pcmSize.addAndGet(pcm.length);
+                    return SegmentEvent.audio(task.getSequence(), trimmer == null ? pcm : trimmer.process(pcm));
+                });
+
+        Flux<SegmentEvent> tail = Flux.defer(() -> {
+            byte[] rest = new byte[0];
+            if (trimmer != null) {
+                rest = trimmer.finish();
+                log.debug("TTS 静音裁剪: seq={}, trimmedMs={}", task.getSequence(),
+                        trimmer.getTrimmedBytes() * 1000 / (sampleRate * 2L));
             }
-        } catch (Exception e) {
-            log.error("TTS 任务执行失败: seq={}, text={}", task.getSequence(), task.getText(), e);
-            result = TTSResult.failure(task.getSequence(), task.getText(), e.getMessage());
-        }
+            if (pcmSize.get() == 0) {
+                log.warn("TTS 返回空音频: seq={}, text={}", task.getSequence(), task.getText());
+                return Flux.just(endSegment(task, "TTS 返回空音频", startNanos));
+            }
+            SegmentEvent end = endSegment(task, null, startNanos);
+            return rest.length == 0
+                    ? Flux.just(end)
+                    : Flux.just(SegmentEvent.audio(task.getSequence(), rest), end);
+        });
 
+        return audio.concatWith(tail)
+                .filter(event -> event.isEnd() || event.pcm().length > 0)
+                .onErrorResume(e -> {
+                    log.error("TTS 任务执行失败: seq={}, text={}", task.getSequence(), task.getText(), e);
+                    return Mono.just(endSegment(task, e.getMessage() == null ? "未知错误" : e.getMessage(), startNanos));
+                });
+    }
+
+    private SegmentEvent endSegment(TTSTask task, String errorMessage, long startNanos) {
         long elapsedMs = TimeUnit.NANOSECONDS.toMillis(System.nanoTime() - startNanos);
-        if (result.isSuccess()) {
+        if (errorMessage == null) {
             log.debug("TTS 任务完成: seq={}, text={}, elapsedMs={}",
-                    task.getSequence(), result.getText(), elapsedMs);
+                    task.getSequence(), task.getText(), elapsedMs);
         } else {
             log.warn("TTS 任务完成(失败): seq={}, text={}, error={}, elapsedMs={}",
-                    task.getSequence(), result.getText(), result.getErrorMessage(), elapsedMs);
+                    task.getSequence(), task.getText(), errorMessage, elapsedMs);
         }
-
-        // 将结果放入待处理映射
-        pendingResults.put(result.getSequence(), result);
-
-        // 尝试按序发送结果
-        tryDispatchResults();
+        return SegmentEvent.end(task.getSequence(), errorMessage);
     }
 
     /**
-     * 尝试按序分发结果到队列
+     * 按序处理分段事件：编码发送 PCM，分段结束时记录进度
      * <p>
-     * 只有当期望序号的结果就绪时才发送到队列，确保播放顺序。
-     * 如果后面的任务先完成，会被缓存在 pendingResults 中等待。
+     * 分段之间不补0、不重建编码器，不足一帧的尾部直接与下一分段的 PCM 拼接。
      */
-    private synchronized void tryDispatchResults() {
-        while (true) {
-            int expected = expectedSequence.get();
-            TTSResult result = pendingResults.remove(expected);
-
-            if (result == null) {
-                // 期望的结果还没准备好
-                int pendingCount = pendingResults.size();
-                if (pendingCount > 0) {
-                    log.debug("等待序号 {} 的 TTS 结果，当前有 {} 个提前完成的任务在等待",
-                            expected, pendingCount);
-                }
-                break;
+    private void handleEvent(SegmentEvent event) {
+        synchronized (encoderLock) {
+            if (!running.get()) {
+                return;
             }
-
-            try {
-                // 放入结果队列供消费者处理
-                resultQueue.put(result);
+            if (event.isEnd()) {
                 expectedSequence.incrementAndGet();
-            } catch (InterruptedException e) {
-                Thread.currentThread().interrupt();
-                log.warn("结果入队被中断: seq={}", result.getSequence());
-                break;
+                if (event.errorMessage() != null) {
+                    log.warn("TTS 失败，跳过: seq={}, error={}", event.sequence(), event.errorMessage());
+                    if (errorHandler != null) {
+                        errorHandler.accept(event.errorMessage());
+                    }
+                }
+                return;
+            }
+            if (event.sequence() != currentSegment) {
+                currentSegment = event.sequence();
+                if (currentSegment > 0 && segmentPause.length > 0) {
+                    // 用固定停顿替代裁掉的句间静音
+                    encodeAndSend(segmentPause);
+                }
             }
+            encodeAndSend(event.pcm());
         }
     }
 
     /**
-     * 消费者线程：按序从队列取结果并播放
+     * 编码一块 PCM：帧包写入本轮复用的输出缓冲区，再逐帧取出发送
      */
-    private void consumeResults() {
-        while (running.get() || !resultQueue.isEmpty()) {
-            try {
-                // 等待结果（带超时，便于检查退出条件）
-                TTSResult result = resultQueue.poll(100, TimeUnit.MILLISECONDS);
-
-                if (result == null) {
-                    // 检查是否已完成且队列为空
-                    if (completed.get() && resultQueue.isEmpty() &&
-                            pendingResults.isEmpty() &&
-                            expectedSequence.get() >= sequenceCounter.get()) {
-                        log.debug("所有任务已处理完成");
-                        break;
-                    }
-                    continue;
-                }
-
-                if (result.isSuccess()) {
-                    // 保存音频（PCM 和 OPUS）
-                    if (audioSaver != null) {
-                        audioSaver.accept(result.getPcmData(), result.getOpusData());
-                    }
-
-                    // 发送音频
-                    sendAudioWithTiming(result.getOpusData());
-                } else {
-                    log.warn("TTS 失败，跳过: seq={}, error={}",
-                            result.getSequence(), result.getErrorMessage());
-                    if (errorHandler != null) {
-                        errorHandler.accept(result.getErrorMessage());
-                    }
-                }
-
-            } catch (InterruptedException e) {
-                Thread.currentThread().interrupt();
-                log.debug("消费者线程被中断");
-                break;
-            } catch (Exception e) {
-                log.error("消费者处理异常", e);
-            }
+    private void encodeAndSend(byte[] pcm) {
+        turnPcm.write(pcm, 0, pcm.length);
+        int capacity = turnEncoder.maxEncodedSize(pcm.length);
+        if (encodeBuffer == null || encodeBuffer.capacity() < capacity) {
+            encodeBuffer = ByteBuffer.allocate(capacity);
+        }
+        encodeBuffer.clear();
+        turnEncoder.encode(ByteBuffer.wrap(pcm), encodeBuffer);
+        encodeBuffer.flip();
+
+        // 每帧 [2字节长度头(小端序)][帧数据]，发送回调持有帧数据，需逐帧复制
+        while (encodeBuffer.remaining() >= 2) {
+            int position = encodeBuffer.position();
+            int length = (encodeBuffer.get(position) & 0xFF) | ((encodeBuffer.get(position + 1) & 0xFF) << 8);
+            byte[] frame = new byte[2 + length];
+            encodeBuffer.get(frame);
+            sendFrame(frame);
         }
-        completionLatch.countDown();
     }
 
     /**
-     * 发送 OPUS 音频数据
+     * 发送上一帧，并持有当前帧
      */
-    private void sendAudioWithTiming(byte[] opusData) {
-        if (opusData == null || opusData.length == 0) {
-            return;
+    private void sendFrame(byte[] frame) {
+        turnOpus.write(frame, 0, frame.length);
+        if (pendingFrame != null) {
+            audioSender.send(pendingFrame, pendingSegment, pendingFrameIndex, false);
         }
+        pendingFrame = frame;
+        pendingSegment = currentSegment;
+        pendingFrameIndex = frameCounter++;
+    }
 
-        // 按 OPUS 帧发送，每帧格式：[2字节长度头][帧数据]
-        int offset = 0;
-
-        while (offset + 2 <= opusData.length && running.get()) {
-            // 读取帧长度（2字节小端序）
-            int frameLen = (opusData[offset] & 0xFF) | ((opusData[offset + 1] & 0xFF) << 8);
-            int totalFrameSize = 2 + frameLen;
-
-            if (offset + totalFrameSize > opusData.length) {
-                log.warn("OPUS 帧数据不完整: offset={}, frameLen={}, dataLen={}",
-                        offset, frameLen, opusData.length);
-                break;
+    /**
+     * 结束本轮编码：剩余不足一帧的数据补0输出，最后一帧标记 finished
+     */
+    private void finishTurn() {
+        synchronized (encoderLock) {
+            if (!running.get()) {
+                return;
+            }
+            byte[] lastFrame = turnEncoder.finish();
+            if (lastFrame != null) {
+                sendFrame(lastFrame);
+            }
+            if (pendingFrame != null) {
+                // finished 表示“本轮回复的最后一帧”
+                audioSender.send(pendingFrame, pendingSegment, pendingFrameIndex, true);
+                pendingFrame = null;
             }
 
-            // 提取完整帧
-            byte[] frame = new byte[totalFrameSize];
-            System.arraycopy(opusData, offset, frame, 0, totalFrameSize);
-
-            // 发送帧
-            // finished 表示“本段 TTS 的最后一帧”
-            boolean isLastFrame = (offset + totalFrameSize >= opusData.length);
-            audioSender.accept(frame, isLastFrame);
-
-            offset += totalFrameSize;
+            if (audioSaver != null && turnPcm.size() > 0) {
+                audioSaver.accept(turnPcm.toByteArray(), turnOpus.toByteArray());
+            }
         }
     }
 
     /**
      * 标记所有任务已提交完成
      * <p>
-     * 调用后不再接受新任务，等待现有任务处理完成
+     * 调用后不再接受新任务，现有任务处理完成后结束本轮编码
      */
-    public void complete() {
-        completed.set(true);
-
-        // 尝试分发剩余结果
-        tryDispatchResults();
+    public synchronized void complete() {
+        taskSink.tryEmitComplete();
     }
 
     /**
-     * 等待所有任务处理完成
-     *
-     * @param timeout 超时时间
-     * @param unit    时间单位
-     * @return 是否在超时前完成
+     * 本轮处理结束信号：全部分段发送完成、中断或关闭时完成
      */
-    public boolean awaitCompletion(long timeout, TimeUnit unit) throws InterruptedException {
-        return completionLatch.await(timeout, unit);
+    public Mono<Void> completion() {
+        return completionSink.asMono();
     }
 
     /**
@@ -369,11 +413,7 @@ public class ConcurrentTTSProcessor implements AutoCloseable {
      */
     public void interrupt() {
         log.info("中断并发 TTS 处理器");
-        running.set(false);
-        completed.set(true);
-        pendingResults.clear();
-        resultQueue.clear();
-        completionLatch.countDown();
+        stop();
     }
 
     /**
@@ -383,40 +423,20 @@ public class ConcurrentTTSProcessor implements AutoCloseable {
         return sequenceCounter.get() - expectedSequence.get();
     }
 
-    /**
-     * 是否所有任务已完成
-     */
-    public boolean isAllCompleted() {
-        return completed.get() &&
-                pendingResults.isEmpty() &&
-                resultQueue.isEmpty() &&
-                expectedSequence.get() >= sequenceCounter.get();
-    }
-
     @Override
     public void close() {
         log.info("关闭并发 TTS 处理器");
-        running.set(false);
-        completed.set(true);
-
-        // 关闭线程池
-        ttsExecutor.shutdown();
-        try {
-            if (!ttsExecutor.awaitTermination(5, TimeUnit.SECONDS)) {
-                ttsExecutor.shutdownNow();
-            }
-        } catch (InterruptedException e) {
-            ttsExecutor.shutdownNow();
-            Thread.currentThread().interrupt();
-        }
+        stop();
+    }
 
-        // 等待消费者线程退出
-        try {
-            consumerThread.join(1000);
-        } catch (InterruptedException e) {
-            Thread.currentThread().interrupt();
+    /**
+     * 取消订阅（正在进行的 TTS 请求随之取消），并等待正在进行的编码结束
+     */
+    private void stop() {
+        synchronized (encoderLock) {
+            running.set(false);
         }
-
-        completionLatch.countDown();
+        subscription.dispose();
+        completionSink.tryEmitEmpty();
     }
 }
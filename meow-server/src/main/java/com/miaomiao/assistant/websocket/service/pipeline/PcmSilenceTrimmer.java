@@ -0,0 +1,231 @@
+package com.miaomiao.assistant.websocket.service.pipeline;
+
+import java.io.ByteArrayOutputStream;
+import java.util.ArrayDeque;
+import java.util.Deque;
+
+/**
+ * TTS PCM 首尾静音裁剪器
+ * <p>
+ * TTS 返回的每句音频通常带有首尾静音，逐句拼接播放时会在句子边界累积出明显停顿。
+ * 按固定窗口计算能量，流式裁掉首尾静音：
+ * 1. 首段静音：丢弃，只保留紧挨语音之前 {@code leadingGuardMs} 的音频
+ * 2. 尾段静音：语音之后的静音先暂存，再次出现语音则原样放行（句中停顿不受影响），
+ * 分段结束时只保留 {@code trailingGuardMs}
+ * <p>
+ * 输入为 16 位小端单声道 PCM，块长度任意（可以在采样中间断开）。
+ * 每个分段使用一个实例，非线程安全。
+ */
+public class PcmSilenceTrimmer {
+
+    /**
+     * 裁剪配置
+     *
+     * @param enabled         是否启用
+     * @param thresholdDbfs   静音阈值（dBFS），窗口 RMS 低于该值视为静音
+     * @param windowMs        能量计算窗口（毫秒）
+     * @param leadingGuardMs  语音前保留的静音（毫秒）
+     * @param trailingGuardMs 语音后保留的静音（毫秒）
+     * @param segmentPauseMs  分段之间插入的固定停顿（毫秒），0 表示不插入
+     */
+    public record Config(boolean enabled, double thresholdDbfs, int windowMs,
+                         int leadingGuardMs, int trailingGuardMs, int segmentPauseMs) {
+
+        public static final Config DISABLED = new Config(false, -45, 10, 30, 60, 0);
+    }
+
+    private final int windowBytes;
+    private final long thresholdSumSquares;
+    private final int leadingGuardBytes;
+    private final int trailingGuardBytes;
+
+    /**
+     * 当前正在填充的窗口
+     */
+    private final byte[] window;
+    private int windowFill = 0;
+
+    /**
+     * 是否已出现过语音
+     */
+    private boolean voiced = false;
+
+    /**
+     * 语音出现前最近的静音窗口（不超过 leadingGuardBytes）
+     */
+    private final Deque<byte[]> leadingSilence = new ArrayDeque<>();
+    private int leadingSilenceBytes = 0;
+
+    /**
+     * 语音之后暂存的静音窗口
+     */
+    private final ByteArrayOutputStream trailingSilence = new ByteArrayOutputStream();
+
+    private long inputBytes = 0;
+    private long outputBytes = 0;
+
+    public PcmSilenceTrimmer(Config config, int sampleRate) {
+        int windowSamples = Math.max(1, sampleRate * config.windowMs() / 1000);
+        this.windowBytes = windowSamples * 2;
+        this.window = new byte[windowBytes];
+        this.leadingGuardBytes = alignToSample(sampleRate * config.leadingGuardMs() / 1000 * 2);
+        this.trailingGuardBytes = alignToSample(sampleRate * config.trailingGuardMs() / 1000 * 2);
+
+        // 比较平方和，避免逐窗口开方：RMS < A  <=>  sum(x^2) < A^2 * n
+        double amplitude = 32768.0 * Math.pow(10, config.thresholdDbfs() / 20.0);
+        this.thresholdSumSquares = (long) (amplitude * amplitude * windowSamples);
+    }
+
+    /**
+     * 计算分段间固定停顿的静音 PCM
+     */
+    public static byte[] pause(Config config, int sampleRate) {
+        if (config == null || !config.enabled() || config.segmentPauseMs() <= 0) {
+            return new byte[0];
+        }
+        return new byte[alignToSample(sampleRate * config.segmentPauseMs() / 1000 * 2)];
+    }
+
+    /**
+     * 处理一块 PCM，返回可以立即输出的部分（可能为空）
+     */
+    public byte[] process(byte[] chunk) {
+        if (chunk == null || chunk.length == 0) {
+            return new byte[0];
+        }
+        inputBytes += chunk.length;
+        ByteArrayOutputStream out = new ByteArrayOutputStream(chunk.length + trailingSilence.size());
+
+        int offset = 0;
+        while (offset < chunk.length) {
+            int copied = Math.min(windowBytes - windowFill, chunk.length - offset);
+            System.arraycopy(chunk, offset, window, windowFill, copied);
+            windowFill += copied;
+            offset += copied;
+            if (windowFill == windowBytes) {
+                acceptWindow(out);
+                windowFill = 0;
+            }
+        }
+
+        outputBytes += out.size();
+        return out.toByteArray();
+    }
+
+    /**
+     * 分段结束：输出语音之后保留的尾部静音
+     * <p>
+     * 最后不足一个窗口的部分按其长度折算阈值单独判断：含语音时连同暂存的静音原样输出，
+     * 否则并入尾部静音，只保留 {@code trailingGuardMs}。
+     */
+    public byte[] finish() {
+        int partialBytes = alignToSample(windowFill);
+        boolean partialVoiced = partialBytes > 0
+                && sumSquares(window, partialBytes) >= thresholdSumSquares * partialBytes / windowBytes;
+        windowFill = 0;
+
+        if (partialVoiced) {
+            ByteArrayOutputStream out = new ByteArrayOutputStream(
+                    leadingSilenceBytes + trailingSilence.size() + partialBytes);
+            // 不足一个窗口的短分段：前面保留的首段静音一并输出
+            for (byte[] guard : leadingSilence) {
+                out.write(guard, 0, guard.length);
+            }
+            leadingSilence.clear();
+            leadingSilenceBytes = 0;
+            out.writeBytes(trailingSilence.toByteArray());
+            trailingSilence.reset();
+            out.write(window, 0, partialBytes);
+            voiced = true;
+            outputBytes += out.size();
+            return out.toByteArray();
+        }
+        if (!voiced) {
+            // 整段都是静音，全部丢弃
+            return new byte[0];
+        }
+        trailingSilence.write(window, 0, partialBytes);
+
+        int keep = Math.min(trailingGuardBytes, alignToSample(trailingSilence.size()));
+        byte[] tail = new byte[keep];
+        System.arraycopy(trailingSilence.toByteArray(), 0, tail, 0, keep);
+        trailingSilence.reset();
+        outputBytes += tail.length;
+        return tail;
+    }
+
+    /**
+     * 被裁掉的字节数
+     */
+    public long getTrimmedBytes() {
+        return inputBytes - outputBytes;
+    }
+
+    private void acceptWindow(ByteArrayOutputStream out) {
+        boolean silent = sumSquares(window, windowBytes) < thresholdSumSquares;
+
+        if (!voiced) {
+            if (silent) {
+                rememberLeadingSilence();
+                return;
+            }
+            voiced = true;
+            for (byte[] guard : leadingSilence) {
+                out.write(guard, 0, guard.length);
+            }
+            leadingSilence.clear();
+            leadingSilenceBytes = 0;
+            out.write(window, 0, windowBytes);
+            return;
+        }
+
+        if (silent) {
+            trailingSilence.write(window, 0, windowBytes);
+            return;
+        }
+        // 语音再次出现，中间的静音属于句中停顿，原样放行
+        if (trailingSilence.size() > 0) {
+            out.writeBytes(trailingSilence.toByteArray());
+            trailingSilence.reset();
+        }
+        out.write(window, 0, windowBytes);
+    }
+
+    private void rememberLeadingSilence() {
+        if (leadingGuardBytes <= 0) {
+            return;
+        }
+        leadingSilence.addLast(window.clone());
+        leadingSilenceBytes += windowBytes;
+        while (leadingSilenceBytes - leadingSilence.peekFirst().length >= leadingGuardBytes) {
+            leadingSilenceBytes -= leadingSilence.pollFirst().length;
+        }
+    }
+
+    /**
+     * 窗口内 16 位小端采样的平方和
+     * <p>
+     * 简单的定长计数循环，便于 JIT 展开和向量化。
+     */
+    static long sumSquares(byte[] pcm, int length) {
+        return sumSquares(pcm, 0, length);
+    }
+
+    /**
+     * 从 {@code offset} 开始 {@code length} 字节内 16 位小端采样的平方和
+     */
+    static long sumSquares(byte[] pcm, int offset, int length) {
+        long sum = 0;
+        int samples = length >> 1;
+        for (int i = 0; i < samples; i++) {
+            int base = offset + 2 * i;
+            int sample = (short) ((pcm[base] & 0xFF) | (pcm[base + 1] << 8));
+            sum += (long) sample * sample;
+        }
+        return sum;
+    }
+
+    private static int alignToSample(int bytes) {
+        return Math.max(0, bytes & ~1);
+    }
+}
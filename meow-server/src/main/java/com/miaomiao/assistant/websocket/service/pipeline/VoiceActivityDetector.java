@@ -0,0 +1,204 @@
+package com.miaomiao.assistant.websocket.service.pipeline;
+
+/**
+ * 上行语音端点检测（VAD）
+ * <p>
+ * 按固定窗口（10-30ms）计算两个特征：
+ * 1. 均方能量，与自适应噪声底比较（噪声底只在非语音窗口更新）
+ * 2. 过零率，能量不够高且过零率很高的窗口视为噪声（如风声、底噪）
+ * <p>
+ * 连续语音超过 {@code speechStartMs} 视为开口，开口后连续静音超过 {@code endSilenceMs}
+ * 或整段超过 {@code maxUtteranceMs} 视为说完。
+ * 输入为 16 位小端单声道 PCM，块长度任意。每段输入一个实例，非线程安全。
+ */
+public class VoiceActivityDetector {
+
+    /**
+     * 检测配置
+     *
+     * @param enabled        是否启用
+     * @param windowMs       分析窗口（毫秒），10 - 30
+     * @param minSpeechDbfs  语音最低能量（dBFS），噪声底很低时以此为准
+     * @param noiseMarginDb  语音需高出噪声底的分贝数
+     * @param speechStartMs  连续语音达到该时长视为开口
+     * @param endSilenceMs   开口后连续静音达到该时长视为说完
+     * @param maxUtteranceMs 单段输入最长时长，超过即结束
+     */
+    public record Config(boolean enabled, int windowMs, double minSpeechDbfs, double noiseMarginDb,
+                         int speechStartMs, int endSilenceMs, int maxUtteranceMs) {
+
+        public Config {
+            windowMs = Math.max(10, Math.min(30, windowMs));
+        }
+    }
+
+    /**
+     * 检测事件
+     */
+    public enum Event {
+        NONE,
+        /**
+         * 检测到开口
+         */
+        SPEECH_START,
+        /**
+         * 检测到说完，只触发一次
+         */
+        END_OF_SPEECH
+    }
+
+    /**
+     * 过零率高于该值且能量不到阈值 4 倍的窗口视为噪声
+     */
+    private static final double MAX_SPEECH_ZCR = 0.35;
+
+    /**
+     * 噪声底更新速度
+     */
+    private static final double NOISE_ADAPT = 0.05;
+
+    private final Config config;
+    private final int sampleRate;
+    private final int windowSamples;
+    private final int windowBytes;
+    private final byte[] window;
+    private int windowFill = 0;
+
+    private final double minSpeechPower;
+    private final double marginFactor;
+    private double noiseFloor;
+
+    private long processedBytes = 0;
+    private int speechRunMs = 0;
+    private int silenceRunMs = 0;
+    private int utteranceMs = 0;
+    private int speechMs = 0;
+    private boolean triggered = false;
+    private boolean ended = false;
+
+    /**
+     * 最后一个语音窗口结束处的字节偏移
+     */
+    private long speechEndOffset = 0;
+
+    public VoiceActivityDetector(Config config, int sampleRate) {
+        this.config = config;
+        this.sampleRate = sampleRate;
+        this.windowSamples = Math.max(1, sampleRate * config.windowMs() / 1000);
+        this.windowBytes = windowSamples * 2;
+        this.window = new byte[windowBytes];
+
+        double fullScale = 32768.0 * 32768.0;
+        this.minSpeechPower = fullScale * Math.pow(10, config.minSpeechDbfs() / 10.0);
+        this.marginFactor = Math.pow(10, config.noiseMarginDb() / 10.0);
+        this.noiseFloor = minSpeechPower / marginFactor;
+    }
+
+    /**
+     * 处理一块 PCM
+     *
+     * @return 本块内发生的事件，说完优先于开口
+     */
+    public Event process(byte[] chunk) {
+        if (chunk == null || chunk.length == 0 || ended) {
+            return Event.NONE;
+        }
+        Event event = Event.NONE;
+        int offset = 0;
+        while (offset < chunk.length && !ended) {
+            int copied = Math.min(windowBytes - windowFill, chunk.length - offset);
+            System.arraycopy(chunk, offset, window, windowFill, copied);
+            windowFill += copied;
+            offset += copied;
+            processedBytes += copied;
+            if (windowFill == windowBytes) {
+                Event windowEvent = acceptWindow();
+                windowFill = 0;
+                if (windowEvent != Event.NONE) {
+                    event = windowEvent;
+                }
+            }
+        }
+        return event;
+    }
+
+    private Event acceptWindow() {
+        double power = (double) PcmSilenceTrimmer.sumSquares(window, windowBytes) / windowSamples;
+        double zcr = (double) zeroCrossings(window, windowBytes) / windowSamples;
+        double threshold = Math.max(minSpeechPower, noiseFloor * marginFactor);
+        boolean speech = power > threshold && (zcr < MAX_SPEECH_ZCR || power > threshold * 4);
+
+        int windowMs = config.windowMs();
+        if (speech) {
+            speechRunMs += windowMs;
+            silenceRunMs = 0;
+            speechEndOffset = processedBytes;
+        } else {
+            speechRunMs = 0;
+            silenceRunMs += windowMs;
+            noiseFloor += (power - noiseFloor) * NOISE_ADAPT;
+        }
+
+        if (!triggered) {
+            if (speechRunMs >= config.speechStartMs()) {
+                triggered = true;
+                speechMs = speechRunMs;
+                utteranceMs = speechRunMs;
+                return Event.SPEECH_START;
+            }
+            return Event.NONE;
+        }
+
+        utteranceMs += windowMs;
+        if (speech) {
+            speechMs += windowMs;
+        }
+        if (silenceRunMs >= config.endSilenceMs() || utteranceMs >= config.maxUtteranceMs()) {
+            ended = true;
+            return Event.END_OF_SPEECH;
+        }
+        return Event.NONE;
+    }
+
+    /**
+     * 是否检测到过开口
+     */
+    public boolean isSpeechDetected() {
+        return triggered;
+    }
+
+    /**
+     * 检测到的语音时长（毫秒）
+     */
+    public int getSpeechMs() {
+        return speechMs;
+    }
+
+    /**
+     * 最后一个语音窗口结束处的字节偏移，用于裁掉末尾静音
+     */
+    public long getSpeechEndOffset() {
+        return speechEndOffset;
+    }
+
+    public int getSampleRate() {
+        return sampleRate;
+    }
+
+    /**
+     * 窗口内相邻采样符号变化的次数
+     * <p>
+     * 与 {@link PcmSilenceTrimmer#sumSquares} 一样写成定长计数循环，不带分支，便于 JIT 向量化。
+     */
+    static int zeroCrossings(byte[] pcm, int length) {
+        int crossings = 0;
+        int samples = length >> 1;
+        int previous = (short) ((pcm[0] & 0xFF) | (pcm[1] << 8));
+        for (int i = 1; i < samples; i++) {
+            int sample = (short) ((pcm[2 * i] & 0xFF) | (pcm[2 * i + 1] << 8));
+            crossings += ((previous ^ sample) >>> 31);
+            previous = sample;
+        }
+        return crossings;
+    }
+}
@@ -0,0 +1,71 @@
+package com.miaomiao.assistant.websocket.session;
+
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicLong;
+
+/**
+ * 下行音频链路监测
+ * <p>
+ * 统计一轮回复内 TTS 音频消息在下行队列中的排队时长（入队到写完 socket）。
+ * 排队时长增长说明待发数据在堆积，链路跟不上当前码率；排队时长与已发送音频时长之比作为拥塞程度。
+ * 每轮结束时由 {@link #drain()} 取出统计并清零。
+ */
+public class AudioLinkMonitor {
+
+    /**
+     * 单条消息排队时长超过其音频时长的该比例，计为一次慢发送
+     */
+    private static final double SLOW_SEND_RATIO = 0.5;
+
+    private final AtomicLong frames = new AtomicLong();
+    private final AtomicLong audioNanos = new AtomicLong();
+    private final AtomicLong blockedNanos = new AtomicLong();
+    private final AtomicLong slowSends = new AtomicLong();
+
+    /**
+     * 记录一条音频消息送达
+     *
+     * @param queueNanos      排队耗时（入队到写完 socket）
+     * @param frameCount      消息中的帧数（合并后可能多于 1）
+     * @param frameDurationMs 帧时长
+     */
+    public void recordSend(long queueNanos, int frameCount, int frameDurationMs) {
+        long messageAudioNanos = TimeUnit.MILLISECONDS.toNanos(frameDurationMs) * Math.max(1, frameCount);
+        frames.addAndGet(Math.max(1, frameCount));
+        audioNanos.addAndGet(messageAudioNanos);
+        blockedNanos.addAndGet(queueNanos);
+        if (queueNanos > messageAudioNanos * SLOW_SEND_RATIO) {
+            slowSends.incrementAndGet();
+        }
+    }
+
+    /**
+     * 取出本轮统计并清零
+     */
+    public Snapshot drain() {
+        return new Snapshot(
+                frames.getAndSet(0),
+                audioNanos.getAndSet(0),
+                blockedNanos.getAndSet(0),
+                slowSends.getAndSet(0)
+        );
+    }
+
+    /**
+     * 一轮回复的链路统计
+     *
+     * @param frames       发送帧数
+     * @param audioNanos   发送的音频总时长
+     * @param blockedNanos 排队总时长
+     * @param slowSends    慢发送次数
+     */
+    public record Snapshot(long frames, long audioNanos, long blockedNanos, long slowSends) {
+
+        /**
+         * 排队时长 / 音频时长
+         */
+        public double congestionRatio() {
+            return audioNanos == 0 ? 0 : (double) blockedNanos / audioNanos;
+        }
+    }
+}
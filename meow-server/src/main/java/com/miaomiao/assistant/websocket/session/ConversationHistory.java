@@ -0,0 +1,204 @@
+package com.miaomiao.assistant.websocket.session;
+
+import com.miaomiao.assistant.model.llm.AppChatMessage;
+
+import java.util.ArrayList;
+import java.util.List;
+
+/**
+ * 按 token 预算管理的对话历史
+ * <p>
+ * 1. 固定容量的环形缓冲区，追加不复制数组；写满时覆盖最早的消息
+ * 2. 每条消息记录估算的 token 数，维护总数
+ * 3. 总数超过预算时，由 {@link #beginCompaction()} 取出最早的若干轮交给后台压缩，
+ *    压缩完成后 {@link #completeCompaction} 把它们移出缓冲区并更新滚动摘要；
+ *    压缩期间这些消息仍保留在历史里，不会丢失上下文
+ * <p>
+ * 发给 LLM 的历史为：滚动摘要（如有，作为一条 system 消息）+ 缓冲区中的消息。方法均已加锁。
+ * <p>
+ * 两次压缩之间历史只追加不改写，每轮请求的消息都是上一轮的逐字节前缀加新消息，便于命中模型服务端的前缀缓存；
+ * 因此压缩一次压到 {@code compactTarget} 以下，而不是刚好低于预算，避免每轮都触发压缩、改写前缀。
+ */
+public class ConversationHistory {
+
+    /**
+     * 摘要消息的前缀
+     */
+    static final String SUMMARY_PREFIX = "以下是本次对话更早内容的摘要：\n";
+
+    private final AppChatMessage[] messages;
+    private final int[] tokens;
+    private final int tokenBudget;
+    private final int compactTarget;
+
+    private int head = 0;
+    private int size = 0;
+    private int totalTokens = 0;
+
+    private String summary;
+    private int summaryTokens = 0;
+
+    /**
+     * 正在后台压缩的消息数（从最早的一条开始），0 表示没有进行中的压缩
+     */
+    private int compacting = 0;
+
+    /**
+     * 压缩期间被环形缓冲区覆盖掉的消息数，完成时从待移除数中扣除
+     */
+    private int overwrittenWhileCompacting = 0;
+
+    /**
+     * @param maxMessages   最多保留的消息条数
+     * @param tokenBudget   历史（含摘要）的 token 预算，超出时触发压缩
+     * @param compactTarget 压缩后剩余历史（含摘要）的目标 token 数，不超过预算
+     */
+    public ConversationHistory(int maxMessages, int tokenBudget, int compactTarget) {
+        if (maxMessages < 2) {
+            throw new IllegalArgumentException("历史容量至少为 2: " + maxMessages);
+        }
+        this.messages = new AppChatMessage[maxMessages];
+        this.tokens = new int[maxMessages];
+        this.tokenBudget = tokenBudget;
+        this.compactTarget = Math.min(compactTarget, tokenBudget);
+    }
+
+    /**
+     * 追加一条消息，缓冲区已满时覆盖最早的一条
+     */
+    public synchronized void add(String role, String content) {
+        int tokenCount = estimateTokens(content);
+        if (size == messages.length) {
+            totalTokens -= tokens[head];
+            messages[head] = null;
+            head = (head + 1) % messages.length;
+            size--;
+            if (compacting > 0) {
+                overwrittenWhileCompacting++;
+            }
+        }
+        int index = (head + size) % messages.length;
+        messages[index] = new AppChatMessage(role, content);
+        tokens[index] = tokenCount;
+        totalTokens += tokenCount;
+        size++;
+    }
+
+    /**
+     * 发给 LLM 的历史：滚动摘要 + 缓冲区中的消息
+     */
+    public synchronized List<AppChatMessage> snapshot() {
+        List<AppChatMessage> result = new ArrayList<>(size + 1);
+        if (summary != null) {
+            result.add(new AppChatMessage("system", SUMMARY_PREFIX + summary));
+        }
+        for (int i = 0; i < size; i++) {
+            result.add(messages[(head + i) % messages.length]);
+        }
+        return result;
+    }
+
+    /**
+     * 超出预算时取出最早的若干轮用于压缩
+     * <p>
+     * 从最早的消息开始取，直到剩余部分（含摘要）不超过 {@code compactTarget}；按 user / assistant 成对取，
+     * 至少保留最近一轮。已有压缩在进行、或未超出预算时返回空列表。
+     *
+     * @return 待压缩的消息，需随后调用 {@link #completeCompaction} 或 {@link #abortCompaction}
+     */
+    public synchronized List<AppChatMessage> beginCompaction() {
+        if (compacting > 0 || summaryTokens + totalTokens <= tokenBudget) {
+            return List.of();
+        }
+        int remainingTokens = summaryTokens + totalTokens;
+        int count = 0;
+        // 至少保留最后两条（最近一轮）
+        while (count < size - 2 && remainingTokens > compactTarget) {
+            remainingTokens -= tokens[(head + count) % messages.length];
+            count++;
+        }
+        // 不拆开一轮对话：以 assistant 消息结尾
+        while (count < size - 2 && "user".equals(messages[(head + count - 1 + messages.length) % messages.length].role())) {
+            remainingTokens -= tokens[(head + count) % messages.length];
+            count++;
+        }
+        if (count == 0) {
+            return List.of();
+        }
+
+        List<AppChatMessage> batch = new ArrayList<>(count);
+        for (int i = 0; i < count; i++) {
+            batch.add(messages[(head + i) % messages.length]);
+        }
+        compacting = count;
+        overwrittenWhileCompacting = 0;
+        return batch;
+    }
+
+    /**
+     * 压缩完成：移除已压缩的消息，替换滚动摘要
+     *
+     * @param newSummary 合并了旧摘要和被压缩消息的新摘要
+     */
+    public synchronized void completeCompaction(String newSummary) {
+        removeOldest(Math.max(0, compacting - overwrittenWhileCompacting));
+        if (newSummary != null && !newSummary.isBlank()) {
+            summary = newSummary.strip();
+            summaryTokens = estimateTokens(summary);
+        }
+        compacting = 0;
+        overwrittenWhileCompacting = 0;
+    }
+
+    /**
+     * 压缩失败：直接丢弃这些消息，保证历史不超出预算
+     */
+    public synchronized void abortCompaction() {
+        completeCompaction(null);
+    }
+
+    private void removeOldest(int count) {
+        int removing = Math.min(count, size);
+        for (int i = 0; i < removing; i++) {
+            totalTokens -= tokens[head];
+            messages[head] = null;
+            head = (head + 1) % messages.length;
+            size--;
+        }
+    }
+
+    public synchronized String getSummary() {
+        return summary;
+    }
+
+    public synchronized int size() {
+        return size;
+    }
+
+    /**
+     * 当前历史（含摘要）的估算 token 数
+     */
+    public synchronized int totalTokens() {
+        return summaryTokens + totalTokens;
+    }
+
+    /**
+     * 估算 token 数：中日韩字符按每字 1 个，其余按每 4 个字符 1 个，另加每条消息的固定开销
+     */
+    static int estimateTokens(String text) {
+        if (text == null || text.isEmpty()) {
+            return 4;
+        }
+        int cjk = 0;
+        int other = 0;
+        for (int i = 0; i < text.length(); i++) {
+            char c = text.charAt(i);
+            if (Character.isIdeographic(c) || (c >= 0x3000 && c <= 0x30FF) || (c >= 0xFF00 && c <= 0xFFEF)) {
+                cjk++;
+            } else {
+                other++;
+            }
+        }
+        return 4 + cjk + (other + 3) / 4;
+    }
+}
@@ -0,0 +1,81 @@
+package com.miaomiao.assistant.websocket.session;
+
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicLong;
+
+/**
+ * 全部会话下行队列的汇总统计
+ */
+public class OutboundMetrics {
+
+    private final AtomicLong sent = new AtomicLong();
+    private final AtomicLong dropped = new AtomicLong();
+    private final AtomicLong coalesced = new AtomicLong();
+    private final AtomicLong totalQueueNanos = new AtomicLong();
+    private final AtomicLong maxQueueNanos = new AtomicLong();
+    private final AtomicLong totalSendNanos = new AtomicLong();
+    private final AtomicLong maxSendNanos = new AtomicLong();
+    private final AtomicLong maxDepth = new AtomicLong();
+    private final AtomicLong writerRejections = new AtomicLong();
+
+    void recordDepth(int depth) {
+        maxDepth.accumulateAndGet(depth, Math::max);
+    }
+
+    void recordWriterRejection() {
+        writerRejections.incrementAndGet();
+    }
+
+    void recordDrop() {
+        dropped.incrementAndGet();
+    }
+
+    void recordCoalesced(int frames) {
+        coalesced.addAndGet(frames);
+    }
+
+    void recordSend(long queueNanos, long sendNanos) {
+        sent.incrementAndGet();
+        totalQueueNanos.addAndGet(queueNanos);
+        maxQueueNanos.accumulateAndGet(queueNanos, Math::max);
+        totalSendNanos.addAndGet(sendNanos);
+        maxSendNanos.accumulateAndGet(sendNanos, Math::max);
+    }
+
+    public Snapshot snapshot(int activeQueues, int totalDepth) {
+        long sentCount = sent.get();
+        return new Snapshot(
+                activeQueues,
+                totalDepth,
+                maxDepth.get(),
+                sentCount,
+                dropped.get(),
+                coalesced.get(),
+                sentCount == 0 ? 0 : TimeUnit.NANOSECONDS.toMicros(totalQueueNanos.get() / sentCount) / 1000.0,
+                TimeUnit.NANOSECONDS.toMicros(maxQueueNanos.get()) / 1000.0,
+                sentCount == 0 ? 0 : TimeUnit.NANOSECONDS.toMicros(totalSendNanos.get() / sentCount) / 1000.0,
+                TimeUnit.NANOSECONDS.toMicros(maxSendNanos.get()) / 1000.0,
+                writerRejections.get()
+        );
+    }
+
+    /**
+     * 汇总统计
+     *
+     * @param queues           当前队列数（会话数）
+     * @param depth            当前所有队列排队消息总数
+     * @param maxDepth         单个队列出现过的最大排队数
+     * @param sent             已发送消息数
+     * @param dropped          丢弃的过时消息数
+     * @param coalesced        被合并的音频帧数
+     * @param avgQueueMs       平均排队耗时（毫秒）
+     * @param maxQueueMs       最大排队耗时（毫秒）
+     * @param avgSendMs        平均 socket 写耗时（毫秒）
+     * @param maxSendMs        最大 socket 写耗时（毫秒）
+     * @param writerRejections 写线程池已满、写任务延后调度的次数
+     */
+    public record Snapshot(int queues, int depth, long maxDepth, long sent, long dropped, long coalesced,
+                           double avgQueueMs, double maxQueueMs, double avgSendMs, double maxSendMs,
+                           long writerRejections) {
+    }
+}
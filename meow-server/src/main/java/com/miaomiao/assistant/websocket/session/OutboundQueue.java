@@ -0,0 +1,410 @@
+package com.miaomiao.assistant.websocket.session;
+
+import com.miaomiao.assistant.websocket.protocol.BinaryAudioFrame;
+import lombok.extern.slf4j.Slf4j;
+import org.springframework.web.socket.BinaryMessage;
+import org.springframework.web.socket.TextMessage;
+import org.springframework.web.socket.WebSocketMessage;
+import org.springframework.web.socket.WebSocketSession;
+
+import java.io.ByteArrayOutputStream;
+import java.util.ArrayDeque;
+import java.util.Deque;
+import java.util.Iterator;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.Executor;
+import java.util.concurrent.RejectedExecutionException;
+import java.util.concurrent.TimeUnit;
+import java.util.function.Consumer;
+import java.util.concurrent.atomic.AtomicLong;
+
+/**
+ * 单个 WebSocket 会话的下行消息队列
+ * <p>
+ * 业务线程只入队，不再阻塞在 socket 写上；由共享线程池中的一个写任务按序发送（同一时刻每个会话最多一个写任务）。
+ * 1. 队列有消息数和字节数上限；超限时丢弃过时的可替代消息（如非最终的 llm_token、stt 中间结果），音频始终保留
+ * 2. 写任务取消息时把相邻的 TTS 音频帧合并为一条二进制消息，减少消息数
+ * 3. 统计队列深度、排队/发送耗时、丢弃和合并次数
+ */
+@Slf4j
+public class OutboundQueue {
+
+    /**
+     * 写线程池拒绝任务后重新调度的间隔（毫秒）
+     */
+    private static final long WRITER_RETRY_DELAY_MS = 20;
+
+    /**
+     * 消息类别
+     */
+    public enum Kind {
+        /**
+         * TTS 音频，可合并，从不丢弃
+         */
+        AUDIO,
+        /**
+         * 可被同类新消息替代的状态更新，超限时丢弃旧的
+         */
+        UPDATE,
+        /**
+         * 其他控制消息，从不丢弃
+         */
+        CONTROL
+    }
+
+    /**
+     * 队列上限
+     *
+     * @param maxMessages       最多排队消息数
+     * @param maxBytes          最多排队字节数
+     * @param maxCoalescedBytes 合并后单条音频消息的最大载荷字节数
+     */
+    public record Limits(int maxMessages, long maxBytes, int maxCoalescedBytes) {
+    }
+
+    /**
+     * @param bytes 线路上的字节数：文本按 UTF-8 编码长度计，音频为载荷长度
+     */
+    private record Item(Kind kind, String supersedeKey, String text, String audioFormat,
+                        byte[] audioPayload, boolean audioFinal, int frames,
+                        BinaryAudioFrame.Position position, long enqueuedNanos, int bytes) {
+    }
+
+    private final WebSocketSession session;
+    private final Executor writerExecutor;
+    private final Limits limits;
+    private final OutboundMetrics metrics;
+
+    /**
+     * 音频消息发出时的回调（排队耗时纳秒, 帧数），用于链路拥塞判断
+     */
+    private volatile AudioDeliveryListener audioDeliveryListener;
+
+    /**
+     * 状态更新被丢弃时的回调（可替代键）
+     */
+    private volatile Consumer<String> dropListener;
+
+    private final Deque<Item> queue = new ArrayDeque<>();
+    private long queuedBytes = 0;
+    private boolean writerScheduled = false;
+    private boolean closed = false;
+
+    // 统计
+    private final AtomicLong sentMessages = new AtomicLong();
+    private final AtomicLong dropped = new AtomicLong();
+    private final AtomicLong coalesced = new AtomicLong();
+    private final AtomicLong totalQueueNanos = new AtomicLong();
+    private final AtomicLong maxQueueNanos = new AtomicLong();
+    private final AtomicLong totalSendNanos = new AtomicLong();
+    private final AtomicLong maxSendNanos = new AtomicLong();
+    private volatile int maxDepth = 0;
+
+    /**
+     * 音频送达监听
+     */
+    @FunctionalInterface
+    public interface AudioDeliveryListener {
+        void onDelivered(long queueNanos, int frames);
+    }
+
+    public OutboundQueue(WebSocketSession session, Executor writerExecutor, Limits limits, OutboundMetrics metrics) {
+        this.session = session;
+        this.writerExecutor = writerExecutor;
+        this.limits = limits;
+        this.metrics = metrics;
+    }
+
+    public void setAudioDeliveryListener(AudioDeliveryListener listener) {
+        this.audioDeliveryListener = listener;
+    }
+
+    public void setDropListener(Consumer<String> listener) {
+        this.dropListener = listener;
+    }
+
+    /**
+     * 入队文本消息
+     *
+     * @param kind         消息类别（不能是 AUDIO）
+     * @param supersedeKey 可替代键，UPDATE 类消息中相同键的旧消息在超限时会被丢弃
+     * @param json         消息 JSON
+     */
+    public void enqueueText(Kind kind, String supersedeKey, String json) {
+        offer(new Item(kind, supersedeKey, json, null, null, false, 0, null, System.nanoTime(), utf8Length(json)));
+    }
+
+    /**
+     * 入队 TTS 音频帧
+     *
+     * @param format  音频格式
+     * @param payload 帧包数据（[2字节长度头][帧数据]...）
+     * @param frames   帧包中的帧数
+     * @param isFinal  是否是本轮最后一帧
+     * @param position 第一帧在本轮中的位置，非空时按 v2 二进制协议发送，null 时按 v1 发送
+     */
+    public void enqueueAudio(String format, byte[] payload, int frames, boolean isFinal,
+                             BinaryAudioFrame.Position position) {
+        offer(new Item(Kind.AUDIO, null, null, format, payload, isFinal, frames, position, System.nanoTime(),
+                payload.length));
+    }
+
+    private void offer(Item item) {
+        boolean schedule;
+        synchronized (this) {
+            if (closed) {
+                return;
+            }
+            if (overLimit(item.bytes())) {
+                dropStale(item.supersedeKey());
+            }
+            if (item.kind() == Kind.UPDATE && overLimit(item.bytes())) {
+                // 仍然超限：新的状态更新也丢弃，等待后续更新或最终消息
+                recordDrop(item.supersedeKey());
+                return;
+            }
+            if (overLimit(item.bytes())) {
+                log.warn("下行队列超限，保留不可丢弃消息: session={}, depth={}, bytes={}",
+                        session.getId(), queue.size(), queuedBytes);
+            }
+
+            queue.addLast(item);
+            queuedBytes += item.bytes();
+            maxDepth = Math.max(maxDepth, queue.size());
+            metrics.recordDepth(queue.size());
+
+            schedule = !writerScheduled;
+            writerScheduled = true;
+        }
+        if (schedule) {
+            scheduleDrain();
+        }
+    }
+
+    /**
+     * 提交写任务；写线程池已满时稍后重试，消息留在队列中不丢失
+     */
+    private void scheduleDrain() {
+        try {
+            writerExecutor.execute(this::drain);
+        } catch (RejectedExecutionException e) {
+            metrics.recordWriterRejection();
+            log.warn("下行写线程池已满，{}ms 后重试: session={}", WRITER_RETRY_DELAY_MS, session.getId());
+            CompletableFuture.delayedExecutor(WRITER_RETRY_DELAY_MS, TimeUnit.MILLISECONDS).execute(this::scheduleDrain);
+        }
+    }
+
+    /**
+     * 字符串 UTF-8 编码后的字节数（不分配字节数组）
+     */
+    static int utf8Length(String text) {
+        int bytes = 0;
+        for (int i = 0; i < text.length(); i++) {
+            char c = text.charAt(i);
+            if (c < 0x80) {
+                bytes += 1;
+            } else if (c < 0x800) {
+                bytes += 2;
+            } else if (Character.isHighSurrogate(c) && i + 1 < text.length() && Character.isLowSurrogate(text.charAt(i + 1))) {
+                bytes += 4;
+                i++;
+            } else {
+                bytes += 3;
+            }
+        }
+        return bytes;
+    }
+
+    private boolean overLimit(int incomingBytes) {
+        return queue.size() + 1 > limits.maxMessages() || queuedBytes + incomingBytes > limits.maxBytes();
+    }
+
+    /**
+     * 丢弃与新消息同键的旧状态更新；没有键时丢弃所有状态更新
+     */
+    private void dropStale(String supersedeKey) {
+        Iterator<Item> iterator = queue.iterator();
+        while (iterator.hasNext()) {
+            Item queued = iterator.next();
+            if (queued.kind() != Kind.UPDATE) {
+                continue;
+            }
+            if (supersedeKey == null || supersedeKey.equals(queued.supersedeKey())) {
+                iterator.remove();
+                queuedBytes -= queued.bytes();
+                recordDrop(queued.supersedeKey());
+            }
+        }
+    }
+
+    private void recordDrop(String supersedeKey) {
+        dropped.incrementAndGet();
+        metrics.recordDrop();
+        Consumer<String> listener = dropListener;
+        if (listener != null) {
+            listener.accept(supersedeKey);
+        }
+    }
+
+    /**
+     * 写任务：逐条取出并发送，直到队列为空
+     */
+    private void drain() {
+        while (true) {
+            Item first;
+            Deque<Item> batch = new ArrayDeque<>();
+            synchronized (this) {
+                first = queue.pollFirst();
+                if (first == null || closed) {
+                    writerScheduled = false;
+                    return;
+                }
+                queuedBytes -= first.bytes();
+                batch.add(first);
+                if (first.kind() == Kind.AUDIO && !first.audioFinal()) {
+                    collectAdjacentAudio(first, batch);
+                }
+            }
+            send(batch);
+        }
+    }
+
+    /**
+     * 把紧随其后的同格式音频帧一起取出，遇到最终帧或超过合并上限为止
+     * <p>
+     * v2 帧只合并同一轮、同一分段且帧序号连续的音频，合并后的位置取第一帧。
+     */
+    private void collectAdjacentAudio(Item first, Deque<Item> batch) {
+        int payloadBytes = first.audioPayload().length;
+        int frames = first.frames();
+        Item next;
+        while ((next = queue.peekFirst()) != null
+                && next.kind() == Kind.AUDIO
+                && next.audioFormat().equals(first.audioFormat())
+                && isContiguous(first, frames, next)
+                && payloadBytes + next.audioPayload().length <= limits.maxCoalescedBytes()) {
+            queue.pollFirst();
+            queuedBytes -= next.bytes();
+            payloadBytes += next.audioPayload().length;
+            frames += next.frames();
+            batch.add(next);
+            if (next.audioFinal()) {
+                break;
+            }
+        }
+    }
+
+    private static boolean isContiguous(Item first, int framesSoFar, Item next) {
+        BinaryAudioFrame.Position a = first.position();
+        BinaryAudioFrame.Position b = next.position();
+        if (a == null || b == null) {
+            return a == b;
+        }
+        return a.turn() == b.turn()
+                && a.segment() == b.segment()
+                && a.sequence() + framesSoFar == b.sequence();
+    }
+
+    private void send(Deque<Item> batch) {
+        Item first = batch.peekFirst();
+        WebSocketMessage<?> message;
+        int frames = 0;
+        if (first.kind() == Kind.AUDIO) {
+            boolean isFinal = false;
+            byte[] payload;
+            if (batch.size() == 1) {
+                payload = first.audioPayload();
+            } else {
+                ByteArrayOutputStream merged = new ByteArrayOutputStream();
+                for (Item item : batch) {
+                    merged.writeBytes(item.audioPayload());
+                }
+                payload = merged.toByteArray();
+                coalesced.addAndGet(batch.size() - 1);
+                metrics.recordCoalesced(batch.size() - 1);
+            }
+            for (Item item : batch) {
+                isFinal |= item.audioFinal();
+                frames += item.frames();
+            }
+            BinaryAudioFrame frame = first.position() == null
+                    ? BinaryAudioFrame.serverTTS(first.audioFormat(), payload, isFinal)
+                    : BinaryAudioFrame.serverTTS(first.audioFormat(), payload, isFinal, first.position(), frames);
+            message = new BinaryMessage(frame.encode());
+        } else {
+            message = new TextMessage(first.text());
+        }
+
+        long start = System.nanoTime();
+        try {
+            if (session.isOpen()) {
+                session.sendMessage(message);
+            }
+        } catch (Exception e) {
+            log.warn("WebSocket 下行发送失败: session={}, error={}", session.getId(), e.getMessage());
+        }
+        long end = System.nanoTime();
+
+        long sendNanos = end - start;
+        long queueNanos = end - first.enqueuedNanos();
+        sentMessages.incrementAndGet();
+        totalSendNanos.addAndGet(sendNanos);
+        maxSendNanos.accumulateAndGet(sendNanos, Math::max);
+        totalQueueNanos.addAndGet(queueNanos);
+        maxQueueNanos.accumulateAndGet(queueNanos, Math::max);
+        metrics.recordSend(queueNanos, sendNanos);
+
+        AudioDeliveryListener listener = audioDeliveryListener;
+        if (first.kind() == Kind.AUDIO && listener != null) {
+            listener.onDelivered(queueNanos, frames);
+        }
+    }
+
+    /**
+     * 关闭队列，丢弃未发送的消息
+     */
+    public synchronized void close() {
+        closed = true;
+        queue.clear();
+        queuedBytes = 0;
+    }
+
+    /**
+     * 当前队列快照
+     */
+    public synchronized Stats getStats() {
+        long sent = sentMessages.get();
+        return new Stats(
+                session.getId(),
+                queue.size(),
+                queuedBytes,
+                maxDepth,
+                sent,
+                dropped.get(),
+                coalesced.get(),
+                sent == 0 ? 0 : TimeUnit.NANOSECONDS.toMicros(totalQueueNanos.get() / sent) / 1000.0,
+                TimeUnit.NANOSECONDS.toMicros(maxQueueNanos.get()) / 1000.0,
+                sent == 0 ? 0 : TimeUnit.NANOSECONDS.toMicros(totalSendNanos.get() / sent) / 1000.0,
+                TimeUnit.NANOSECONDS.toMicros(maxSendNanos.get()) / 1000.0
+        );
+    }
+
+    /**
+     * 队列统计
+     *
+     * @param sessionId   会话ID
+     * @param depth       当前排队消息数
+     * @param bytes       当前排队字节数
+     * @param maxDepth    最大排队消息数
+     * @param sent        已发送消息数
+     * @param dropped     丢弃的过时消息数
+     * @param coalesced   被合并进其他消息的音频帧数
+     * @param avgQueueMs  平均排队耗时（入队到发送完成，毫秒）
+     * @param maxQueueMs  最大排队耗时（毫秒）
+     * @param avgSendMs   平均 socket 写耗时（毫秒）
+     * @param maxSendMs   最大 socket 写耗时（毫秒）
+     */
+    public record Stats(String sessionId, int depth, long bytes, int maxDepth, long sent, long dropped,
+                        long coalesced, double avgQueueMs, double maxQueueMs, double avgSendMs, double maxSendMs) {
+    }
+}
@@ -1,6 +1,8 @@
 package com.miaomiao.assistant.websocket.session;
 
+import lombok.RequiredArgsConstructor;
 import lombok.extern.slf4j.Slf4j;
+import org.springframework.beans.factory.annotation.Value;
 import org.springframework.stereotype.Component;
 import org.springframework.web.socket.WebSocketSession;
 
@@ -14,16 +16,38 @@ import java.util.concurrent.ConcurrentHashMap;
  */
 @Slf4j
 @Component
+@RequiredArgsConstructor
 public class SessionManager {
 
+    private final WebSocketMessageSender messageSender;
+
     private final Map<String, SessionState> sessionStates = new ConcurrentHashMap<>();
 
+    /**
+     * 每个会话最多保留的历史消息条数
+     */
+    @Value("${llm.history.max-messages:64}")
+    private int historyMaxMessages = 64;
+
+    /**
+     * 每个会话历史（含摘要）的 token 预算
+     */
+    @Value("${llm.history.token-budget:2000}")
+    private int historyTokenBudget = 2000;
+
+    /**
+     * 压缩后历史的目标 token 数（一次压到预算以下较多，减少压缩次数，保持请求前缀稳定）
+     */
+    @Value("${llm.history.compact-target:1200}")
+    private int historyCompactTarget = 1200;
+
     /**
      * 创建新会话
      */
     public SessionState createSession(WebSocketSession session) {
-        SessionState state = new SessionState(session);
+        SessionState state = new SessionState(session, new ConversationHistory(historyMaxMessages, historyTokenBudget, historyCompactTarget));
         sessionStates.put(session.getId(), state);
+        messageSender.openQueue(state);
         return state;
     }
 
@@ -47,6 +71,7 @@ public class SessionManager {
      */
     public void removeSession(String sessionId) {
         SessionState state = sessionStates.remove(sessionId);
+        messageSender.closeQueue(sessionId);
         if (state != null) {
             state.cleanup();
             log.debug("移除会话状态: {}", sessionId);
@@ -1,16 +1,25 @@
 package com.miaomiao.assistant.websocket.session;
 
+import com.miaomiao.assistant.codec.OpusProfile;
 import com.miaomiao.assistant.model.llm.AppChatMessage;
+import com.miaomiao.assistant.websocket.protocol.BinaryAudioFrame;
+import com.miaomiao.assistant.websocket.service.pipeline.VoiceActivityDetector;
 import lombok.Getter;
+import lombok.Setter;
 import lombok.extern.slf4j.Slf4j;
 import org.springframework.web.socket.WebSocketSession;
 import reactor.core.Disposable;
+import reactor.core.publisher.Flux;
+import reactor.core.publisher.Sinks;
 
 import java.io.ByteArrayOutputStream;
 import java.io.IOException;
-import java.util.ArrayList;
 import java.util.List;
-import java.util.concurrent.CopyOnWriteArrayList;
+import java.util.Set;
+import java.util.concurrent.CancellationException;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.atomic.AtomicBoolean;
+import java.util.concurrent.atomic.AtomicLong;
 import java.util.concurrent.atomic.AtomicReference;
 
 /**
@@ -25,12 +34,40 @@ public class SessionState {
 
     private final ByteArrayOutputStream audioBuffer = new ByteArrayOutputStream();
 
-    private final List<AppChatMessage> conversationHistory = new CopyOnWriteArrayList<>();
+    /**
+     * 正在上传的流式音频输入，音频块到达即转发给 ASR（仅在 ASR 支持流式输入时使用）
+     */
+    private final AtomicReference<Sinks.Many<byte[]>> audioInput = new AtomicReference<>();
+
+    /**
+     * 当前 PCM 语音输入的端点检测器，未开始输入时为 null
+     */
+    @Getter
+    @Setter
+    private volatile VoiceActivityDetector voiceActivityDetector;
+
+    /**
+     * 服务端已判定本段输入结束，等待客户端的结束帧；期间到达的音频被丢弃
+     */
+    @Getter
+    @Setter
+    private volatile boolean voiceEndpointed = false;
+
+    /**
+     * 对话历史（按 token 预算管理，超出部分由后台压缩为摘要）
+     */
+    @Getter
+    private final ConversationHistory history;
+
+    /**
+     * 回复序号，开始新的回复时递增；旧回复的 LLM 流据此自行结束
+     */
+    private final AtomicLong responseCounter = new AtomicLong(0);
 
     /**
-     * 当前活跃的流订阅，用于取消操作
+     * 进行中的对话轮次（ASR -> LLM -> TTS 整条链路的订阅），中止时一并取消
      */
-    private final AtomicReference<Disposable> activeDisposable = new AtomicReference<>();
+    private final Set<Disposable> activeTurns = ConcurrentHashMap.newKeySet();
 
     @Getter
     private volatile boolean aborted = false;
@@ -41,8 +78,60 @@ public class SessionState {
     @Getter
     private final PerformanceMetrics performanceMetrics;
 
-    public SessionState(WebSocketSession session) {
+    /**
+     * 当前下行 Opus 编码档位，在回复开始时生效
+     */
+    @Getter
+    @Setter
+    private volatile OpusProfile opusProfile = OpusProfile.DEFAULT;
+
+    /**
+     * 客户端可接受的最高档位（由客户端提示协商得出）
+     */
+    @Getter
+    @Setter
+    private volatile OpusProfile opusCeiling = OpusProfile.DEFAULT;
+
+    /**
+     * 连续无拥塞的回复轮数，用于逐步升档
+     */
+    @Getter
+    @Setter
+    private volatile int healthyTurns = 0;
+
+    /**
+     * 下行音频链路监测
+     */
+    @Getter
+    private final AudioLinkMonitor audioLinkMonitor = new AudioLinkMonitor();
+
+    /**
+     * 客户端是否支持增量 llm_token（只发 token 和序号，由 hello 协商）
+     */
+    @Getter
+    @Setter
+    private volatile boolean llmDeltaEnabled = false;
+
+    /**
+     * 下一条 llm_token 是否需要携带完整累积文本（下行丢弃或客户端请求重同步时置位）
+     */
+    private final AtomicBoolean llmCheckpointRequested = new AtomicBoolean(false);
+
+    /**
+     * 下行二进制音频帧协议版本（由 hello 协商，默认 v1）
+     */
+    @Getter
+    @Setter
+    private volatile int binaryProtocolVersion = BinaryAudioFrame.VERSION_1;
+
+    /**
+     * 下行音频的回复轮次计数，v2 帧用它区分不同轮次的音频
+     */
+    private final AtomicLong audioTurnCounter = new AtomicLong(0);
+
+    public SessionState(WebSocketSession session, ConversationHistory history) {
         this.session = session;
+        this.history = history;
         this.performanceMetrics = new PerformanceMetrics(session.getId());
     }
 
@@ -57,6 +146,13 @@ public class SessionState {
         }
     }
 
+    /**
+     * 已累积的音频字节数
+     */
+    public synchronized int getAudioBufferSize() {
+        return audioBuffer.size();
+    }
+
     /**
      * 获取并清空音频缓冲区
      */
@@ -67,43 +163,139 @@ public class SessionState {
     }
 
     /**
-     * 获取对话历史的副本
+     * 开始新的流式音频输入，未结束的上一段输入会被取消
+     *
+     * @return 音频块流，由 ASR 订阅
+     */
+    public Flux<byte[]> openAudioInput() {
+        Sinks.Many<byte[]> sink = Sinks.many().unicast().onBackpressureBuffer();
+        Sinks.Many<byte[]> previous = audioInput.getAndSet(sink);
+        if (previous != null) {
+            previous.tryEmitError(new CancellationException("音频输入被新的输入替代"));
+        }
+        return sink.asFlux();
+    }
+
+    /**
+     * 是否有正在上传的流式音频输入
+     */
+    public boolean hasAudioInput() {
+        return audioInput.get() != null;
+    }
+
+    /**
+     * 转发一块音频到当前流式输入
+     *
+     * @return false 表示当前没有流式输入或转发失败
+     */
+    public boolean emitAudioInput(byte[] chunk) {
+        Sinks.Many<byte[]> sink = audioInput.get();
+        return sink != null && sink.tryEmitNext(chunk).isSuccess();
+    }
+
+    /**
+     * 音频上传结束，完成当前流式输入
+     */
+    public void completeAudioInput() {
+        Sinks.Many<byte[]> sink = audioInput.getAndSet(null);
+        if (sink != null) {
+            sink.tryEmitComplete();
+        }
+    }
+
+    /**
+     * 取消当前流式输入（用户中断或会话关闭）
+     */
+    public void cancelAudioInput() {
+        Sinks.Many<byte[]> sink = audioInput.getAndSet(null);
+        if (sink != null) {
+            sink.tryEmitError(new CancellationException("音频输入已取消"));
+        }
+    }
+
+    /**
+     * 重置 PCM 语音输入状态
+     */
+    public void resetVoiceInput() {
+        voiceActivityDetector = null;
+        voiceEndpointed = false;
+        getAndClearAudioBuffer();
+    }
+
+    /**
+     * 获取发给 LLM 的对话历史（滚动摘要 + 近期消息）的副本
      */
     public List<AppChatMessage> getConversationHistory() {
-        return new ArrayList<>(conversationHistory);
+        return history.snapshot();
     }
 
     /**
      * 添加消息到对话历史
      */
     public void addMessage(String role, String content) {
-        conversationHistory.add(new AppChatMessage(role, content));
-        // 保持历史在合理大小
-        if (conversationHistory.size() > 50) {
-            conversationHistory.subList(0, 10).clear();
-        }
+        history.add(role, content);
     }
 
     /**
-     * 设置当前活跃的流订阅
+     * 分配下一轮回复的音频轮次序号
      */
-    public void setActiveDisposable(Disposable disposable) {
-        // 先取消之前的订阅
-        Disposable previous = activeDisposable.getAndSet(disposable);
-        if (previous != null && !previous.isDisposed()) {
-            previous.dispose();
-        }
+    public long nextAudioTurn() {
+        return audioTurnCounter.incrementAndGet();
+    }
+
+    /**
+     * 请求下一条 llm_token 携带完整累积文本
+     */
+    public void requestLlmCheckpoint() {
+        llmCheckpointRequested.set(true);
+    }
+
+    /**
+     * 读取并清除重同步请求
+     */
+    public boolean consumeLlmCheckpointRequest() {
+        return llmCheckpointRequested.getAndSet(false);
+    }
+
+    /**
+     * 开始一次新的回复，之前仍在进行的回复不再是当前回复
+     *
+     * @return 本次回复的序号
+     */
+    public long beginResponse() {
+        return responseCounter.incrementAndGet();
+    }
+
+    /**
+     * 指定回复是否仍是会话的当前回复
+     */
+    public boolean isCurrentResponse(long response) {
+        return responseCounter.get() == response;
+    }
+
+    /**
+     * 登记进行中的对话轮次
+     */
+    public void addActiveTurn(Disposable turn) {
+        activeTurns.add(turn);
+    }
+
+    /**
+     * 对话轮次结束，移除登记
+     */
+    public void removeActiveTurn(Disposable turn) {
+        activeTurns.remove(turn);
     }
 
     /**
-     * 中止当前操作，取消活跃的流订阅
+     * 中止当前操作，取消进行中的对话轮次（包括其中的 LLM 请求）
      */
     public void abort() {
         this.aborted = true;
-        Disposable disposable = activeDisposable.getAndSet(null);
-        if (disposable != null && !disposable.isDisposed()) {
-            disposable.dispose();
-            log.info("已取消活跃的流订阅，会话: {}", getSessionId());
+        for (Disposable turn : activeTurns) {
+            activeTurns.remove(turn);
+            turn.dispose();
+            log.info("已取消进行中的对话轮次，会话: {}", getSessionId());
         }
     }
 
@@ -119,6 +311,7 @@ public class SessionState {
      */
     public void cleanup() {
         abort();  // 先取消所有活跃流
+        cancelAudioInput();
         try {
             audioBuffer.close();
         } catch (IOException e) {
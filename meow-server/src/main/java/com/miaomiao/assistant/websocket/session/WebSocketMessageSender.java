@@ -1,50 +1,131 @@
 package com.miaomiao.assistant.websocket.session;
 
 import com.fasterxml.jackson.databind.ObjectMapper;
+import com.miaomiao.assistant.codec.OpusProfile;
+import com.miaomiao.assistant.websocket.message.AudioConfigMessage;
+import com.miaomiao.assistant.websocket.message.HelloMessage;
 import com.miaomiao.assistant.websocket.message.LLMTokenMessage;
+import com.miaomiao.assistant.websocket.message.ListeningStoppedMessage;
 import com.miaomiao.assistant.websocket.message.STTMessage;
 import com.miaomiao.assistant.websocket.message.WSMessage;
 import com.miaomiao.assistant.websocket.protocol.BinaryAudioFrame;
+import jakarta.annotation.PreDestroy;
 import lombok.extern.slf4j.Slf4j;
+import org.springframework.beans.factory.annotation.Value;
 import org.springframework.stereotype.Component;
-import org.springframework.web.socket.BinaryMessage;
 import org.springframework.web.socket.TextMessage;
 import org.springframework.web.socket.WebSocketSession;
 
 import java.io.IOException;
+import java.util.ArrayList;
 import java.util.HashMap;
+import java.util.List;
 import java.util.Map;
+import java.util.concurrent.ArrayBlockingQueue;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.ThreadPoolExecutor;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicInteger;
 
 /**
  * WebSocket消息发送器
  * 负责将各类消息序列化并发送到客户端
+ * <p>
+ * 每个会话一个下行队列（{@link OutboundQueue}），调用方只负责入队，不会被慢客户端阻塞；
+ * 实际的 socket 写由共享的、有界的写线程池完成，每个会话同一时刻只有一个写任务。
  */
 @Slf4j
 @Component
 public class WebSocketMessageSender {
 
+    private static final String LLM_TOKEN_KEY = "llm_token";
+
     private final ObjectMapper objectMapper;
 
-    public WebSocketMessageSender(ObjectMapper objectMapper) {
+    private final Map<String, OutboundQueue> queues = new ConcurrentHashMap<>();
+    private final OutboundMetrics metrics = new OutboundMetrics();
+    private final ExecutorService writerExecutor;
+
+    /**
+     * 每个会话最多排队的消息数
+     */
+    @Value("${ws.outbound.max-messages:2000}")
+    private int maxMessages = 2000;
+
+    /**
+     * 每个会话最多排队的字节数
+     */
+    @Value("${ws.outbound.max-bytes:4194304}")
+    private long maxBytes = 4 * 1024 * 1024;
+
+    /**
+     * 合并相邻音频帧后单条消息的最大载荷字节数
+     */
+    @Value("${ws.outbound.max-coalesced-bytes:8192}")
+    private int maxCoalescedBytes = 8192;
+
+    /**
+     * @param writerThreads       写线程数上限，慢客户端最多同时占住这么多线程，不随会话数增长
+     * @param writerQueueCapacity 等待写线程的写任务数上限（每个会话最多一个），超出时该会话稍后重试调度
+     */
+    public WebSocketMessageSender(ObjectMapper objectMapper,
+                                  @Value("${ws.outbound.writer-threads:16}") int writerThreads,
+                                  @Value("${ws.outbound.writer-queue-capacity:1024}") int writerQueueCapacity) {
         this.objectMapper = objectMapper;
+        AtomicInteger threadIndex = new AtomicInteger();
+        ThreadPoolExecutor executor = new ThreadPoolExecutor(
+                writerThreads, writerThreads, 60, TimeUnit.SECONDS,
+                new ArrayBlockingQueue<>(writerQueueCapacity),
+                r -> {
+                    Thread t = new Thread(r, "WS-Writer-" + threadIndex.incrementAndGet());
+                    t.setDaemon(true);
+                    return t;
+                },
+                new ThreadPoolExecutor.AbortPolicy());
+        executor.allowCoreThreadTimeOut(true);
+        this.writerExecutor = executor;
     }
 
     /**
-     * 发送通用消息（线程安全）
+     * 为会话创建下行队列
      */
-    public void sendMessage(WebSocketSession session, WSMessage message) throws IOException {
-        if (session == null || !session.isOpen()) {
-            log.warn("WebSocket会话已关闭，无法发送消息");
-            return;
-        }
-        String json = objectMapper.writeValueAsString(message);
-        synchronized (session) {
-            if (session.isOpen()) {
-                session.sendMessage(new TextMessage(json));
+    public void openQueue(SessionState state) {
+        OutboundQueue queue = new OutboundQueue(
+                state.getSession(),
+                writerExecutor,
+                new OutboundQueue.Limits(maxMessages, maxBytes, maxCoalescedBytes),
+                metrics
+        );
+        // 音频排队时长用于判断链路拥塞，决定下一轮的编码档位
+        queue.setAudioDeliveryListener((queueNanos, frames) -> state.getAudioLinkMonitor()
+                .recordSend(queueNanos, frames, state.getOpusProfile().frameDurationMs()));
+        // 增量 llm_token 被丢弃后，下一条需要携带完整文本让客户端重新对齐
+        queue.setDropListener(key -> {
+            if (LLM_TOKEN_KEY.equals(key)) {
+                state.requestLlmCheckpoint();
             }
+        });
+        queues.put(state.getSessionId(), queue);
+    }
+
+    /**
+     * 关闭会话的下行队列，丢弃未发送的消息
+     */
+    public void closeQueue(String sessionId) {
+        OutboundQueue queue = queues.remove(sessionId);
+        if (queue != null) {
+            queue.close();
         }
     }
 
+    /**
+     * 发送通用消息（线程安全）
+     */
+    public void sendMessage(WebSocketSession session, WSMessage message) throws IOException {
+        sendText(session, OutboundQueue.Kind.CONTROL, null, objectMapper.writeValueAsString(message));
+    }
+
     /**
      * 发送通用消息（使用SessionState）
      */
@@ -52,26 +133,50 @@ public class WebSocketMessageSender {
         sendMessage(state.getSession(), message);
     }
 
+    /**
+     * 发送能力协商结果
+     *
+     * @param state        会话状态
+     * @param capabilities 双方都支持的能力
+     */
+    public void sendHello(SessionState state, List<String> capabilities) throws IOException {
+        HelloMessage message = new HelloMessage();
+        message.setType("hello");
+        message.setCapabilities(capabilities);
+        message.setTimestamp(System.currentTimeMillis());
+        sendMessage(state, message);
+    }
+
     /**
      * 发送LLM流式Token消息（用于前端打字效果）
+     * <p>
+     * 非最终消息可被后续消息替代，下行队列超限时会被丢弃（增量模式下随后补发检查点）；最终消息不会丢弃。
      *
      * @param state       会话状态
+     * @param seq         本轮消息序号
      * @param token       当前token
-     * @param accumulated 累积文本
+     * @param accumulated 累积文本，增量模式下非检查点消息为 null
      * @param finished    是否完成
      */
-    public void sendLLMToken(SessionState state, String token, String accumulated, boolean finished) throws IOException {
+    public void sendLLMToken(SessionState state, int seq, String token, String accumulated, boolean finished)
+            throws IOException {
         LLMTokenMessage message = new LLMTokenMessage();
         message.setType("llm_token");
+        message.setSeq(seq);
         message.setToken(token);
         message.setAccumulated(accumulated);
         message.setFinished(finished);
         message.setTimestamp(System.currentTimeMillis());
-        sendMessage(state, message);
+        sendText(state.getSession(),
+                finished ? OutboundQueue.Kind.CONTROL : OutboundQueue.Kind.UPDATE,
+                LLM_TOKEN_KEY,
+                objectMapper.writeValueAsString(message));
     }
 
     /**
      * 发送STT结果消息
+     * <p>
+     * 中间结果可被后续结果替代，下行队列超限时会被丢弃。
      */
     public void sendSTTResult(SessionState state, String text, boolean isFinal) throws IOException {
         STTMessage sttMessage = new STTMessage();
@@ -79,47 +184,135 @@ public class WebSocketMessageSender {
         sttMessage.setText(text);
         sttMessage.setFinal(isFinal);
         sttMessage.setTimestamp(System.currentTimeMillis());
-        sendMessage(state, sttMessage);
+        sendText(state.getSession(),
+                isFinal ? OutboundQueue.Kind.CONTROL : OutboundQueue.Kind.UPDATE,
+                "stt",
+                objectMapper.writeValueAsString(sttMessage));
+    }
+
+    /**
+     * 通知客户端本段语音输入已结束
+     *
+     * @param state    会话状态
+     * @param reason   结束原因
+     * @param speechMs 检测到的语音时长（毫秒）
+     */
+    public void sendListeningStopped(SessionState state, String reason, int speechMs) throws IOException {
+        ListeningStoppedMessage message = new ListeningStoppedMessage();
+        message.setType("listening_stopped");
+        message.setReason(reason);
+        message.setSpeechMs(speechMs);
+        message.setTimestamp(System.currentTimeMillis());
+        sendMessage(state, message);
+    }
+
+    /**
+     * 发送当前下行音频编码配置
+     *
+     * @param state      会话状态
+     * @param profile    码率和帧时长
+     * @param sampleRate 采样率
+     */
+    public void sendAudioConfig(SessionState state, OpusProfile profile, int sampleRate) throws IOException {
+        AudioConfigMessage message = new AudioConfigMessage();
+        message.setType("audio_config");
+        message.setBitrate(profile.bitrate());
+        message.setFrameDurationMs(profile.frameDurationMs());
+        message.setSampleRate(sampleRate);
+        message.setChannels(1);
+        message.setTimestamp(System.currentTimeMillis());
+        sendMessage(state, message);
     }
 
     /**
      * 发送TTS音频消息
+     * <p>
+     * 音频从不丢弃；排队中的相邻音频帧会被合并为一条消息发送。
+     * 客户端协商了 {@code audio_v2} 时按 v2 二进制协议携带位置，否则按 v1 发送。
      *
      * @param state    会话状态
      * @param opusData Opus音频数据
-     * @param finished 是否是本段TTS的最后一帧
+     * @param finished 是否是本轮回复的最后一帧
+     * @param position 第一帧在本轮中的位置
      */
-    public void sendTTSAudio(SessionState state, byte[] opusData, boolean finished) throws IOException {
+    public void sendTTSAudio(SessionState state, byte[] opusData, boolean finished,
+                             BinaryAudioFrame.Position position) throws IOException {
         if (state == null || state.getSession() == null || !state.getSession().isOpen()) {
             log.warn("WebSocket会话已关闭，无法发送TTS音频");
             return;
         }
 
-        WebSocketSession session = state.getSession();
         byte[] payload = opusData == null ? new byte[0] : opusData;
-        byte[] frameBytes = BinaryAudioFrame.serverTTS("opus", payload, finished).encode();
-
-        synchronized (session) {
-            if (session.isOpen()) {
-                session.sendMessage(new BinaryMessage(frameBytes));
-            }
+        OutboundQueue queue = queues.get(state.getSessionId());
+        if (queue == null) {
+            log.warn("会话下行队列不存在，丢弃TTS音频: {}", state.getSessionId());
+            return;
         }
+        BinaryAudioFrame.Position v2Position =
+                state.getBinaryProtocolVersion() >= BinaryAudioFrame.VERSION_2 ? position : null;
+        queue.enqueueAudio("opus", payload, countPackets(payload), finished, v2Position);
     }
 
     /**
      * 发送错误消息（线程安全）
      */
     public void sendError(WebSocketSession session, String error) throws IOException {
-        if (session == null || !session.isOpen()) {
-            log.warn("WebSocket会话已关闭，无法发送错误消息");
-            return;
-        }
         Map<String, Object> errorData = new HashMap<>();
         errorData.put("type", "error");
         errorData.put("message", error);
         errorData.put("timestamp", System.currentTimeMillis());
 
-        String json = objectMapper.writeValueAsString(errorData);
+        sendText(session, OutboundQueue.Kind.CONTROL, null, objectMapper.writeValueAsString(errorData));
+    }
+
+    /**
+     * 发送错误消息（使用SessionState）
+     */
+    public void sendError(SessionState state, String error) throws IOException {
+        sendError(state.getSession(), error);
+    }
+
+    /**
+     * 所有会话下行队列的汇总统计
+     */
+    public OutboundMetrics.Snapshot getMetrics() {
+        int depth = 0;
+        for (OutboundQueue queue : queues.values()) {
+            depth += queue.getStats().depth();
+        }
+        return metrics.snapshot(queues.size(), depth);
+    }
+
+    /**
+     * 各会话下行队列统计
+     */
+    public List<OutboundQueue.Stats> getQueueStats() {
+        List<OutboundQueue.Stats> stats = new ArrayList<>(queues.size());
+        for (OutboundQueue queue : queues.values()) {
+            stats.add(queue.getStats());
+        }
+        return stats;
+    }
+
+    @PreDestroy
+    public void shutdown() {
+        queues.values().forEach(OutboundQueue::close);
+        queues.clear();
+        writerExecutor.shutdownNow();
+    }
+
+    private void sendText(WebSocketSession session, OutboundQueue.Kind kind, String supersedeKey, String json)
+            throws IOException {
+        if (session == null || !session.isOpen()) {
+            log.warn("WebSocket会话已关闭，无法发送消息");
+            return;
+        }
+        OutboundQueue queue = queues.get(session.getId());
+        if (queue != null) {
+            queue.enqueueText(kind, supersedeKey, json);
+            return;
+        }
+        // 会话尚未建立队列（如连接建立前后的错误消息），直接发送
         synchronized (session) {
             if (session.isOpen()) {
                 session.sendMessage(new TextMessage(json));
@@ -128,9 +321,19 @@ public class WebSocketMessageSender {
     }
 
     /**
-     * 发送错误消息（使用SessionState）
+     * 统计帧包（[2字节长度头][帧数据]...）中的帧数
      */
-    public void sendError(SessionState state, String error) throws IOException {
-        sendError(state.getSession(), error);
+    private static int countPackets(byte[] payload) {
+        int count = 0;
+        int offset = 0;
+        while (offset + 2 <= payload.length) {
+            int len = (payload[offset] & 0xFF) | ((payload[offset + 1] & 0xFF) << 8);
+            if (len == 0) {
+                break;
+            }
+            offset += 2 + len;
+            count++;
+        }
+        return count;
     }
 }
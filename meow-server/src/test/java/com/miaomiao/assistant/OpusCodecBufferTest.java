@@ -0,0 +1,198 @@
+package com.miaomiao.assistant;
+
+import com.miaomiao.assistant.codec.OpusCodec;
+import com.miaomiao.assistant.config.NativeLibraryLoader;
+import org.junit.jupiter.api.BeforeAll;
+import org.junit.jupiter.api.Test;
+
+import java.io.ByteArrayOutputStream;
+import java.nio.BufferOverflowException;
+import java.nio.ByteBuffer;
+import java.nio.ByteOrder;
+
+import static org.junit.jupiter.api.Assertions.assertEquals;
+import static org.junit.jupiter.api.Assertions.assertThrows;
+import static org.junit.jupiter.api.Assertions.assertTrue;
+import static org.junit.jupiter.api.Assumptions.assumeTrue;
+
+/**
+ * OpusCodec 的 ByteBuffer 编码接口测试：堆内 / direct 缓冲区、块边界落在帧中间、输出缓冲区不足
+ * <p>
+ * 编码结果用 {@link OpusCodec#decodeOpusToPcm(byte[])} 解回，校验帧数、PCM 长度和音量。
+ * 需要 native 库（工作目录 native/平台 或 classpath），加载失败时跳过。
+ */
+class OpusCodecBufferTest {
+
+    private static final int FRAME_BYTES = OpusCodec.DEFAULT_KEY.frameBytes();
+
+    private static OpusCodec codec;
+
+    @BeforeAll
+    static void loadNativeLibrary() {
+        NativeLibraryLoader loader = new NativeLibraryLoader();
+        loader.init();
+        assumeTrue(loader.isLoaded(), "Opus native 库不可用");
+        codec = new OpusCodec();
+    }
+
+    @Test
+    void encodesHeapAndDirectBuffers() {
+        // 10.5 帧：最后半帧补0编码
+        byte[] pcm = sine(FRAME_BYTES * 21 / 2);
+        for (boolean direct : new boolean[]{false, true}) {
+            ByteBuffer input = copyOf(pcm, direct);
+            ByteBuffer out = allocate(OpusCodec.maxEncodedSize(pcm.length), direct);
+
+            int written = codec.encodePcmToOpus(input, out);
+
+            assertEquals(0, input.remaining(), "direct=" + direct);
+            assertEquals(out.position(), written, "direct=" + direct);
+            assertRoundTrip(pcm, toArray(out), 11);
+        }
+    }
+
+    @Test
+    void streamEncoderHandlesChunksSplitMidFrame() {
+        byte[] pcm = sine(FRAME_BYTES * 6 + 100);
+        int[] chunkSizes = {333, FRAME_BYTES, 7, FRAME_BYTES * 2 + 1, 1, pcm.length};
+        ByteArrayOutputStream encoded = new ByteArrayOutputStream();
+        ByteBuffer out = ByteBuffer.allocate(OpusCodec.maxEncodedSize(pcm.length));
+
+        try (OpusCodec.StreamEncoder encoder = codec.newStreamEncoder()) {
+            int offset = 0;
+            int frames = 0;
+            for (int i = 0; offset < pcm.length; i++) {
+                int size = Math.min(chunkSizes[i], pcm.length - offset);
+                // 堆内块是原数组的切片（arrayOffset 不为 0），direct 块是拷贝
+                ByteBuffer chunk = i % 2 == 0
+                        ? ByteBuffer.wrap(pcm, offset, size).slice()
+                        : copyOf(slice(pcm, offset, size), true);
+                offset += size;
+
+                out.clear();
+                assertTrue(out.remaining() >= encoder.maxEncodedSize(size));
+                frames += encoder.encode(chunk, out);
+                assertEquals(0, chunk.remaining());
+                assertEquals(offset - frames * FRAME_BYTES, encoder.getPendingBytes());
+                encoded.write(out.array(), 0, out.position());
+            }
+            assertEquals(6, frames);
+
+            out.clear();
+            assertEquals(1, encoder.finish(out));
+            encoded.write(out.array(), 0, out.position());
+        }
+        assertRoundTrip(pcm, encoded.toByteArray(), 7);
+    }
+
+    @Test
+    void streamEncoderStopsAtFirstUnencodedFrameOnOverflow() {
+        byte[] pcm = sine(FRAME_BYTES * 3);
+        ByteBuffer input = ByteBuffer.wrap(pcm);
+        // 只够写一帧
+        ByteBuffer small = ByteBuffer.allocate(2 + OpusCodec.MAX_PACKET_BYTES + 10);
+        ByteArrayOutputStream encoded = new ByteArrayOutputStream();
+
+        try (OpusCodec.StreamEncoder encoder = codec.newStreamEncoder()) {
+            assertThrows(BufferOverflowException.class, () -> encoder.encode(input, small));
+            assertEquals(FRAME_BYTES, input.position());
+            assertEquals(1, countPackets(toArray(small)));
+            encoded.write(small.array(), 0, small.position());
+
+            ByteBuffer large = ByteBuffer.allocate(encoder.maxEncodedSize(input.remaining()));
+            assertEquals(2, encoder.encode(input, large));
+            encoded.write(large.array(), 0, large.position());
+        }
+        assertRoundTrip(pcm, encoded.toByteArray(), 3);
+    }
+
+    @Test
+    void oneShotEncodeRestoresPositionsOnOverflow() {
+        ByteBuffer input = ByteBuffer.wrap(sine(FRAME_BYTES * 3));
+        input.position(10);
+        ByteBuffer out = ByteBuffer.allocate(100);
+        out.position(5);
+
+        assertThrows(BufferOverflowException.class, () -> codec.encodePcmToOpus(input, out));
+        assertEquals(10, input.position());
+        assertEquals(5, out.position());
+    }
+
+    /**
+     * 解码后帧数、PCM 长度一致，音量与原始信号接近
+     */
+    private static void assertRoundTrip(byte[] pcm, byte[] opus, int expectedFrames) {
+        assertEquals(expectedFrames, countPackets(opus));
+        byte[] decoded = codec.decodeOpusToPcm(opus);
+        assertEquals(expectedFrames * FRAME_BYTES, decoded.length);
+        // 跳过第一帧（编码器前瞻延迟）
+        double expected = rms(pcm, FRAME_BYTES, pcm.length - FRAME_BYTES);
+        double actual = rms(decoded, FRAME_BYTES, pcm.length - FRAME_BYTES);
+        assertEquals(expected, actual, expected * 0.2);
+    }
+
+    /**
+     * 校验 [2字节长度头][帧数据] 结构并返回帧数
+     */
+    private static int countPackets(byte[] opus) {
+        int count = 0;
+        int offset = 0;
+        while (offset < opus.length) {
+            int length = (opus[offset] & 0xFF) | ((opus[offset + 1] & 0xFF) << 8);
+            assertTrue(length > 0 && length <= OpusCodec.MAX_PACKET_BYTES, "packet length " + length);
+            offset += 2 + length;
+            count++;
+        }
+        assertEquals(opus.length, offset);
+        return count;
+    }
+
+    /**
+     * 24kHz、440Hz、幅度 8000 的 16 位小端正弦波
+     */
+    private static byte[] sine(int bytes) {
+        ByteBuffer buffer = ByteBuffer.allocate(bytes).order(ByteOrder.LITTLE_ENDIAN);
+        for (int i = 0; i < bytes / 2; i++) {
+            buffer.putShort((short) Math.round(8000 * Math.sin(2 * Math.PI * 440 * i / OpusCodec.getSampleRate())));
+        }
+        return buffer.array();
+    }
+
+    private static double rms(byte[] pcm, int from, int to) {
+        ByteBuffer buffer = ByteBuffer.wrap(pcm).order(ByteOrder.LITTLE_ENDIAN);
+        double sum = 0;
+        int count = 0;
+        for (int i = from; i + 1 < to; i += 2) {
+            double sample = buffer.getShort(i);
+            sum += sample * sample;
+            count++;
+        }
+        return Math.sqrt(sum / count);
+    }
+
+    private static ByteBuffer allocate(int capacity, boolean direct) {
+        return direct ? ByteBuffer.allocateDirect(capacity) : ByteBuffer.allocate(capacity);
+    }
+
+    private static ByteBuffer copyOf(byte[] data, boolean direct) {
+        ByteBuffer buffer = allocate(data.length, direct);
+        buffer.put(data).flip();
+        return buffer;
+    }
+
+    private static byte[] slice(byte[] data, int offset, int length) {
+        byte[] result = new byte[length];
+        System.arraycopy(data, offset, result, 0, length);
+        return result;
+    }
+
+    /**
+     * 已写入的部分（0 到 position）
+     */
+    private static byte[] toArray(ByteBuffer buffer) {
+        ByteBuffer written = buffer.duplicate().flip();
+        byte[] result = new byte[written.remaining()];
+        written.get(result);
+        return result;
+    }
+}
@@ -0,0 +1,87 @@
+package com.miaomiao.assistant;
+
+import com.miaomiao.assistant.codec.OpusContainerDemuxer;
+import org.junit.jupiter.api.Test;
+
+import java.io.IOException;
+import java.io.InputStream;
+import java.nio.charset.StandardCharsets;
+import java.util.Arrays;
+import java.util.List;
+
+import static org.junit.jupiter.api.Assertions.assertArrayEquals;
+import static org.junit.jupiter.api.Assertions.assertEquals;
+import static org.junit.jupiter.api.Assertions.assertNotNull;
+import static org.junit.jupiter.api.Assertions.assertNull;
+
+/**
+ * Opus 容器解封装测试
+ * <p>
+ * 用例文件（src/test/resources/codec）：
+ * <pre>
+ * opus-mono.ogg     4 页（CRC 有效）：OpusHead（单声道，preSkip=312）、OpusTags、音频页、续页（EOS）
+ *                   音频包 300 字节（lacing 255+45）、3 字节、355 字节（跨页续接）、255 字节（lacing 255+0）
+ * opus-stereo.webm  MediaRecorder 风格：未知长度的 Segment / Cluster，A_OPUS 音轨 1（双声道，CodecPrivate 为 OpusHead）
+ *                   和 V_VP8 音轨 2；Cluster1 为 SimpleBlock 200 字节、视频块、3 字节，Cluster2 为 SimpleBlock 60 字节、
+ *                   BlockGroup/Block 20 字节
+ * </pre>
+ * 第 i 个音频包的内容均为字节 {@code 0x0i}（Ogg）/ {@code 0x1i}（WebM），便于核对顺序。
+ */
+class OpusContainerDemuxerTest {
+
+    @Test
+    void demuxesOggWithLacingAcrossPages() throws IOException {
+        OpusContainerDemuxer.Demuxed demuxed = OpusContainerDemuxer.demux(readFixture("opus-mono.ogg"));
+
+        assertNotNull(demuxed);
+        assertEquals(1, demuxed.channels());
+        assertEquals(312, demuxed.preSkip());
+        assertPackets(demuxed.packets(), new int[]{300, 3, 355, 255}, 0x01);
+    }
+
+    @Test
+    void keepsCompletePacketsOfTruncatedOgg() throws IOException {
+        byte[] data = readFixture("opus-mono.ogg");
+        // 截断在最后一页的 255 字节包中间，录音被中途停止时会这样
+        OpusContainerDemuxer.Demuxed demuxed = OpusContainerDemuxer.demux(Arrays.copyOf(data, data.length - 50));
+
+        assertNotNull(demuxed);
+        assertPackets(demuxed.packets(), new int[]{300, 3, 355}, 0x01);
+    }
+
+    @Test
+    void demuxesWebmWithUnknownSizeElements() throws IOException {
+        OpusContainerDemuxer.Demuxed demuxed = OpusContainerDemuxer.demux(readFixture("opus-stereo.webm"));
+
+        assertNotNull(demuxed);
+        assertEquals(2, demuxed.channels());
+        assertEquals(312, demuxed.preSkip());
+        // 视频轨的块被跳过
+        assertPackets(demuxed.packets(), new int[]{200, 3, 60, 20}, 0x11);
+    }
+
+    @Test
+    void returnsNullForOtherFormats() throws IOException {
+        assertNull(OpusContainerDemuxer.demux(null));
+        assertNull(OpusContainerDemuxer.demux(new byte[]{1, 2}));
+        assertNull(OpusContainerDemuxer.demux("RIFF\0\0\0\0WAVEfmt ".getBytes(StandardCharsets.US_ASCII)));
+        // 只有前两页（OpusHead、OpusTags），没有音频包
+        assertNull(OpusContainerDemuxer.demux(Arrays.copyOf(readFixture("opus-mono.ogg"), 95)));
+    }
+
+    private static void assertPackets(List<byte[]> packets, int[] lengths, int firstMarker) {
+        assertEquals(lengths.length, packets.size());
+        for (int i = 0; i < lengths.length; i++) {
+            byte[] expected = new byte[lengths[i]];
+            Arrays.fill(expected, (byte) (firstMarker + i));
+            assertArrayEquals(expected, packets.get(i), "packet " + i);
+        }
+    }
+
+    private static byte[] readFixture(String name) throws IOException {
+        try (InputStream in = OpusContainerDemuxerTest.class.getResourceAsStream("/codec/" + name)) {
+            assertNotNull(in, "缺少测试用例文件 " + name);
+            return in.readAllBytes();
+        }
+    }
+}
@@ -0,0 +1,102 @@
+package com.miaomiao.assistant;
+
+import com.miaomiao.assistant.codec.PolyphaseResampler;
+import org.junit.jupiter.api.Test;
+
+import java.util.Arrays;
+
+import static org.junit.jupiter.api.Assertions.assertArrayEquals;
+import static org.junit.jupiter.api.Assertions.assertEquals;
+import static org.junit.jupiter.api.Assertions.assertThrows;
+import static org.junit.jupiter.api.Assertions.assertTrue;
+
+/**
+ * 多相重采样器测试：输出长度、直流增益、通带与阻带
+ * <p>
+ * 参数与 AsrAudioTranscoder 一致（目标 16kHz，每相位 32 个系数）。
+ */
+class PolyphaseResamplerTest {
+
+    private static final int TARGET_RATE = 16000;
+    private static final int TAPS_PER_PHASE = 32;
+
+    /**
+     * 首尾滤波器未填满的输出采样数，统计时跳过
+     */
+    private static final int EDGE = TAPS_PER_PHASE;
+
+    @Test
+    void outputLengthFollowsRateRatio() {
+        assertEquals(1600, resample(48000, new short[4800]).length);
+        assertEquals(1600, resample(44100, new short[4410]).length);
+        assertEquals(1600, resample(24000, new short[2400]).length);
+        assertEquals(3200, resample(8000, new short[1600]).length);
+        // 不足一个输出采样的尾部舍去
+        assertEquals(333, resample(48000, new short[1001]).length);
+        assertEquals(0, resample(48000, new short[0]).length);
+    }
+
+    @Test
+    void sameRateReturnsCopy() {
+        short[] input = {1, -2, 3, Short.MAX_VALUE, Short.MIN_VALUE};
+        short[] output = resample(TARGET_RATE, input);
+        assertArrayEquals(input, output);
+        output[0] = 42;
+        assertEquals(1, input[0]);
+    }
+
+    @Test
+    void preservesDcLevel() {
+        for (int inputRate : new int[]{48000, 44100, 24000, 8000}) {
+            short[] input = new short[inputRate / 10];
+            Arrays.fill(input, (short) 10000);
+            short[] output = resample(inputRate, input);
+            for (int i = EDGE; i < output.length - EDGE; i++) {
+                assertEquals(10000, output[i], 10, inputRate + "Hz sample " + i);
+            }
+        }
+    }
+
+    @Test
+    void passesSpeechBandAndRejectsAliases() {
+        // 1kHz 在通带内，幅度基本不变
+        double passRms = rms(resample(48000, tone(48000, 1000)));
+        assertEquals(10000 / Math.sqrt(2), passRms, 10000 * 0.01);
+
+        // 12kHz 高于 16kHz 的奈奎斯特频率，不能混叠回 4kHz（衰减至少 60dB）
+        double stopRms = rms(resample(48000, tone(48000, 12000)));
+        assertTrue(stopRms < 10, "12kHz residual rms " + stopRms);
+    }
+
+    @Test
+    void rejectsInvalidRates() {
+        assertThrows(IllegalArgumentException.class, () -> new PolyphaseResampler(0, TARGET_RATE, TAPS_PER_PHASE));
+        assertThrows(IllegalArgumentException.class, () -> new PolyphaseResampler(48000, -1, TAPS_PER_PHASE));
+        assertThrows(IllegalArgumentException.class, () -> new PolyphaseResampler(48000, TARGET_RATE, 0));
+    }
+
+    private static short[] resample(int inputRate, short[] input) {
+        return new PolyphaseResampler(inputRate, TARGET_RATE, TAPS_PER_PHASE).process(input);
+    }
+
+    /**
+     * 100ms、幅度 10000 的正弦波
+     */
+    private static short[] tone(int sampleRate, int frequency) {
+        short[] samples = new short[sampleRate / 10];
+        for (int i = 0; i < samples.length; i++) {
+            samples[i] = (short) Math.round(10000 * Math.sin(2 * Math.PI * frequency * i / sampleRate));
+        }
+        return samples;
+    }
+
+    private static double rms(short[] samples) {
+        double sum = 0;
+        int count = 0;
+        for (int i = EDGE; i < samples.length - EDGE; i++) {
+            sum += (double) samples[i] * samples[i];
+            count++;
+        }
+        return Math.sqrt(sum / count);
+    }
+}
@@ -0,0 +1,113 @@
+package com.miaomiao.assistant;
+
+import com.fasterxml.jackson.databind.JsonNode;
+import com.fasterxml.jackson.databind.ObjectMapper;
+import com.miaomiao.assistant.model.llm.provider.OpenAIChunkParser;
+
+import java.lang.management.ManagementFactory;
+import java.util.ArrayList;
+import java.util.List;
+
+/**
+ * SSE 分片解析基准测试工具
+ * 对比 ObjectMapper.readTree + JsonNode 取值与 OpenAIChunkParser 流式解析的耗时和内存分配
+ */
+public class SseChunkParserBenchmark {
+
+    private static final int EVENTS = 2000;
+    private static final int WARMUP_ROUNDS = 20;
+    private static final int ROUNDS = 50;
+
+    public static void main(String[] args) throws Exception {
+        List<String> events = sampleEvents();
+        ObjectMapper objectMapper = new ObjectMapper();
+
+        // 结果一致性校验
+        OpenAIChunkParser checkParser = new OpenAIChunkParser();
+        for (String event : events) {
+            JsonNode choice = objectMapper.readTree(event).path("choices").get(0);
+            checkParser.parse(event);
+            String expected = choice.path("delta").path("content").asText("");
+            String actual = checkParser.getContent() == null ? "" : checkParser.getContent();
+            if (!expected.equals(actual)) {
+                throw new IllegalStateException("解析结果不一致: " + event);
+            }
+        }
+
+        for (int i = 0; i < WARMUP_ROUNDS; i++) {
+            runTree(objectMapper, events);
+            runStreaming(events);
+        }
+
+        System.out.println("\n========== SSE 分片解析（每轮 " + EVENTS + " 个事件，" + ROUNDS + " 轮） ==========");
+        report("readTree + JsonNode", () -> runTree(objectMapper, events));
+        report("OpenAIChunkParser", () -> runStreaming(events));
+    }
+
+    private static long runTree(ObjectMapper objectMapper, List<String> events) throws Exception {
+        long chars = 0;
+        for (String event : events) {
+            JsonNode choices = objectMapper.readTree(event).path("choices");
+            if (choices.isArray() && choices.size() > 0) {
+                chars += choices.get(0).path("delta").path("content").asText("").length();
+                chars += choices.get(0).path("finish_reason").asText().length();
+            }
+        }
+        return chars;
+    }
+
+    private static long runStreaming(List<String> events) throws Exception {
+        // 与 HttpLLMProvider 一致：每个流一个解析器
+        OpenAIChunkParser parser = new OpenAIChunkParser();
+        long chars = 0;
+        for (String event : events) {
+            if (parser.parse(event)) {
+                chars += parser.getContent() == null ? 0 : parser.getContent().length();
+                chars += parser.getFinishReason() == null ? 0 : parser.getFinishReason().length();
+            }
+        }
+        return chars;
+    }
+
+    private static void report(String name, Task task) throws Exception {
+        com.sun.management.ThreadMXBean threadBean =
+                (com.sun.management.ThreadMXBean) ManagementFactory.getThreadMXBean();
+        long threadId = Thread.currentThread().getId();
+
+        long sink = 0;
+        long allocatedBefore = threadBean.getThreadAllocatedBytes(threadId);
+        long start = System.nanoTime();
+        for (int i = 0; i < ROUNDS; i++) {
+            sink += task.run();
+        }
+        long elapsed = System.nanoTime() - start;
+        long allocated = threadBean.getThreadAllocatedBytes(threadId) - allocatedBefore;
+
+        long totalEvents = (long) EVENTS * ROUNDS;
+        System.out.printf("%-22s %8.1f ns/事件  %8.1f 字节/事件  (checksum=%d)%n",
+                name, (double) elapsed / totalEvents, (double) allocated / totalEvents, sink);
+    }
+
+    /**
+     * 模拟 OpenAI 格式的流式分片：大部分是 1-4 个字的 delta，最后一个带 finish_reason
+     */
+    private static List<String> sampleEvents() {
+        String[] pieces = {"你", "好呀", "，今天", "天气不错", "。", "Hello", " world", "！"};
+        List<String> events = new ArrayList<>(EVENTS);
+        for (int i = 0; i < EVENTS; i++) {
+            boolean last = i == EVENTS - 1;
+            String content = last ? "" : pieces[i % pieces.length];
+            events.add("{\"id\":\"chatcmpl-20260101123456789\",\"created\":1767225600,\"model\":\"glm-4.7\","
+                    + "\"choices\":[{\"index\":0,\"delta\":{\"role\":\"assistant\",\"content\":\"" + content + "\"},"
+                    + "\"finish_reason\":" + (last ? "\"stop\"" : "null") + "}]"
+                    + (last ? ",\"usage\":{\"prompt_tokens\":120,\"completion_tokens\":2000,\"total_tokens\":2120}" : "")
+                    + "}");
+        }
+        return events;
+    }
+
+    @FunctionalInterface
+    private interface Task {
+        long run() throws Exception;
+    }
+}
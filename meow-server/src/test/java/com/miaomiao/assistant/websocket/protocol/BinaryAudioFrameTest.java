@@ -0,0 +1,114 @@
+package com.miaomiao.assistant.websocket.protocol;
+
+import com.fasterxml.jackson.databind.JsonNode;
+import com.fasterxml.jackson.databind.ObjectMapper;
+import org.junit.jupiter.api.Test;
+
+import java.io.IOException;
+import java.io.InputStream;
+import java.nio.ByteBuffer;
+import java.util.HexFormat;
+
+import static org.junit.jupiter.api.Assertions.assertArrayEquals;
+import static org.junit.jupiter.api.Assertions.assertEquals;
+import static org.junit.jupiter.api.Assertions.assertNotNull;
+import static org.junit.jupiter.api.Assertions.assertNull;
+import static org.junit.jupiter.api.Assertions.assertThrows;
+
+/**
+ * 二进制音频帧编解码测试
+ * <p>
+ * 用例来自 {@code protocol/binary-audio-frames.json}，客户端 {@code meow-client/scripts/check-binary-protocol.mjs}
+ * 使用同一份文件校验 wsBinaryProtocol.js，保证两端对同一字节序列的理解一致。
+ */
+class BinaryAudioFrameTest {
+
+    private static final String FIXTURES = "/protocol/binary-audio-frames.json";
+    private static final HexFormat HEX = HexFormat.of();
+
+    @Test
+    void encodesFixturesByteForByte() throws IOException {
+        for (JsonNode fixture : loadFixtures()) {
+            BinaryAudioFrame frame = toFrame(fixture);
+            assertEquals(fixture.get("frame").asText(), HEX.formatHex(frame.encode()), fixture.get("name").asText());
+        }
+    }
+
+    @Test
+    void decodesFixtures() throws IOException {
+        for (JsonNode fixture : loadFixtures()) {
+            String name = fixture.get("name").asText();
+            BinaryAudioFrame frame = BinaryAudioFrame.decode(ByteBuffer.wrap(HEX.parseHex(fixture.get("frame").asText())));
+
+            assertEquals(fixture.get("version").asInt(), frame.getVersion(), name);
+            assertEquals(fixture.get("frameType").asInt(), frame.getMessageType(), name);
+            assertEquals(fixture.get("format").asText(), frame.getFormat(), name);
+            assertEquals(fixture.get("final").asBoolean(), frame.isFinalChunk(), name);
+            assertArrayEquals(HEX.parseHex(fixture.get("payload").asText()), frame.getPayload(), name);
+            if (frame.getVersion() == BinaryAudioFrame.VERSION_2) {
+                assertNotNull(frame.getPosition(), name);
+                assertEquals(fixture.get("turn").asLong(), frame.getPosition().turn(), name);
+                assertEquals(fixture.get("segment").asLong(), frame.getPosition().segment(), name);
+                assertEquals(fixture.get("sequence").asLong(), frame.getPosition().sequence(), name);
+                assertEquals(fixture.get("timestampMs").asLong(), frame.getPosition().timestampMs(), name);
+                assertEquals(fixture.get("frameCount").asInt(), frame.getFrameCount(), name);
+            } else {
+                assertNull(frame.getPosition(), name);
+            }
+        }
+    }
+
+    @Test
+    void varintRoundTripsAcrossByteBoundaries() {
+        long[] values = {0, 1, 127, 128, 255, 16383, 16384, 2097151, 2097152, 268435455, 268435456,
+                Integer.MAX_VALUE, 1L << 35, Long.MAX_VALUE};
+        for (long value : values) {
+            ByteBuffer buffer = ByteBuffer.allocate(10);
+            BinaryAudioFrame.writeVarint(buffer, value);
+            assertEquals(BinaryAudioFrame.varintSize(value), buffer.position(), "size of " + value);
+
+            buffer.flip();
+            assertEquals(value, BinaryAudioFrame.readVarint(buffer), "value " + value);
+            assertEquals(0, buffer.remaining(), "trailing bytes of " + value);
+        }
+    }
+
+    @Test
+    void rejectsMalformedV2Frames() {
+        // 最后一个 varint 的延续位置位，但后面没有字节
+        byte[] truncated = HEX.parseHex("4d220001010000" + "0080");
+        assertThrows(IllegalArgumentException.class, () -> BinaryAudioFrame.decode(ByteBuffer.wrap(truncated)));
+
+        byte[] unknownVersion = HEX.parseHex("4d32000100000000");
+        assertThrows(IllegalArgumentException.class, () -> BinaryAudioFrame.decode(ByteBuffer.wrap(unknownVersion)));
+
+        assertThrows(IllegalArgumentException.class, () -> BinaryAudioFrame.serverTTS("mp3", new byte[0], false,
+                new BinaryAudioFrame.Position(0, 0, 0, 0), 0));
+        assertThrows(IllegalArgumentException.class, () -> BinaryAudioFrame.writeVarint(ByteBuffer.allocate(10), -1));
+    }
+
+    private static BinaryAudioFrame toFrame(JsonNode fixture) {
+        String format = fixture.get("format").asText();
+        byte[] payload = HEX.parseHex(fixture.get("payload").asText());
+        boolean finalChunk = fixture.get("final").asBoolean();
+        if (fixture.get("version").asInt() == BinaryAudioFrame.VERSION_2) {
+            BinaryAudioFrame.Position position = new BinaryAudioFrame.Position(
+                    fixture.get("turn").asLong(),
+                    fixture.get("segment").asLong(),
+                    fixture.get("sequence").asLong(),
+                    fixture.get("timestampMs").asLong());
+            return BinaryAudioFrame.serverTTS(format, payload, finalChunk, position, fixture.get("frameCount").asInt());
+        }
+        if (fixture.get("frameType").asInt() == BinaryAudioFrame.TYPE_CLIENT_AUDIO) {
+            return BinaryAudioFrame.clientAudio(format, payload, finalChunk);
+        }
+        return BinaryAudioFrame.serverTTS(format, payload, finalChunk);
+    }
+
+    private static JsonNode loadFixtures() throws IOException {
+        try (InputStream in = BinaryAudioFrameTest.class.getResourceAsStream(FIXTURES)) {
+            assertNotNull(in, "缺少测试用例文件 " + FIXTURES);
+            return new ObjectMapper().readTree(in).get("frames");
+        }
+    }
+}
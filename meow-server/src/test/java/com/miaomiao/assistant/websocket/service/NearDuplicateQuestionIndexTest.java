@@ -0,0 +1,67 @@
+package com.miaomiao.assistant.websocket.service;
+
+import org.junit.jupiter.api.Test;
+
+import static org.junit.jupiter.api.Assertions.assertEquals;
+import static org.junit.jupiter.api.Assertions.assertTrue;
+
+/**
+ * 近似重复问题的规整和 SimHash 测试
+ * <p>
+ * 语气词只能在分句边界上去掉：曾经的子串替换把“酒吧”变成“酒”、“哈密瓜”变成“密瓜”、“额度”变成“度”，
+ * serve 模式下会让不相关的问题互相命中。
+ */
+class NearDuplicateQuestionIndexTest {
+
+    /**
+     * 与 {@code llm.near-duplicate.max-hamming} 的默认值一致
+     */
+    private static final int MAX_HAMMING = 3;
+
+    @Test
+    void keepsFillerCharactersInsideWords() {
+        assertEquals("酒吧几点开门", NearDuplicateQuestionIndex.normalize("酒吧几点开门？"));
+        assertEquals("哈密瓜多少钱", NearDuplicateQuestionIndex.normalize("哈密瓜多少钱"));
+        assertEquals("额度是多少", NearDuplicateQuestionIndex.normalize("额度是多少"));
+        assertEquals("我就是想问问", NearDuplicateQuestionIndex.normalize("我就是想问问"));
+        assertEquals("网吧", NearDuplicateQuestionIndex.normalize("网吧"));
+    }
+
+    @Test
+    void stripsFillersAtClauseBoundaries() {
+        String expected = "今天天气怎么样";
+        assertEquals(expected, NearDuplicateQuestionIndex.normalize("请问今天天气怎么样呢？"));
+        assertEquals(expected, NearDuplicateQuestionIndex.normalize("请问，今天天气怎么样"));
+        assertEquals(expected, NearDuplicateQuestionIndex.normalize("嗯，今天天气怎么样"));
+        assertEquals(expected, NearDuplicateQuestionIndex.normalize("那个，就是，今天天气怎么样啊"));
+        assertEquals(expected, NearDuplicateQuestionIndex.normalize("请问一下，嗯，那个，今天 天气 怎么样啊？"));
+        assertEquals("你好", NearDuplicateQuestionIndex.normalize("哈哈，你好呀"));
+        assertEquals("helloworld", NearDuplicateQuestionIndex.normalize("Hello, World!"));
+    }
+
+    @Test
+    void keepsAtLeastOneCharacterOfAClause() {
+        assertEquals("呢", NearDuplicateQuestionIndex.normalize("呢"));
+        assertEquals("", NearDuplicateQuestionIndex.normalize("嗯啊"));
+        assertEquals("", NearDuplicateQuestionIndex.normalize("请问"));
+        assertEquals("", NearDuplicateQuestionIndex.normalize(null));
+    }
+
+    @Test
+    void nearQuestionsAreWithinThresholdAndBugPairsAreNot() {
+        assertEquals(0, distance("今天天气怎么样", "请问，今天天气怎么样呢？"));
+        assertTrue(distance("我想知道明天早上从北京到上海的高铁票还有没有",
+                "我想知道明天的早上从北京到上海的高铁票还有没有") <= MAX_HAMMING);
+
+        // 子串替换时这些问题会规整成同一个文本（距离 0）
+        assertTrue(distance("酒吧几点开门", "酒几点开门") > MAX_HAMMING);
+        assertTrue(distance("哈密瓜多少钱", "密瓜多少钱") > MAX_HAMMING);
+        assertTrue(distance("额度是多少", "度是多少") > MAX_HAMMING);
+        assertTrue(distance("今天天气怎么样", "你叫什么名字") > MAX_HAMMING);
+    }
+
+    private static int distance(String a, String b) {
+        return Long.bitCount(NearDuplicateQuestionIndex.simHash(NearDuplicateQuestionIndex.normalize(a))
+                ^ NearDuplicateQuestionIndex.simHash(NearDuplicateQuestionIndex.normalize(b)));
+    }
+}
@@ -0,0 +1,53 @@
+package com.miaomiao.assistant.websocket.service;
+
+import org.junit.jupiter.api.Test;
+
+import static org.junit.jupiter.api.Assertions.assertEquals;
+import static org.junit.jupiter.api.Assertions.assertNull;
+
+/**
+ * ASR 文本拼接测试
+ * <p>
+ * 分段重叠约 300ms，两段识别结果通常只重复一个字，且前一段末尾常带 ASR 补上的句末标点。
+ */
+class TranscriptMergerTest {
+
+    @Test
+    void dedupesSingleCharacterOverlap() {
+        assertEquals("今天天气很好明天呢", TranscriptMerger.appendSegment("今天天气很好", "好明天呢"));
+    }
+
+    @Test
+    void dedupesOverlapBeforeTrailingPunctuation() {
+        assertEquals("今天天气很好，明天呢", TranscriptMerger.appendSegment("今天天气很好。", "好，明天呢"));
+        assertEquals("我们明天去北京玩", TranscriptMerger.appendSegment("我们明天去北京！ ", "去北京玩"));
+    }
+
+    @Test
+    void prefersLongestOverlap() {
+        assertEquals("我们明天去北京玩", TranscriptMerger.appendSegment("我们明天去北京", "去北京玩"));
+        assertEquals("哈哈哈哈", TranscriptMerger.appendSegment("哈哈哈", "哈哈哈哈"));
+    }
+
+    @Test
+    void concatenatesWithoutOverlap() {
+        assertEquals("今天天气很好。明天呢", TranscriptMerger.appendSegment("今天天气很好。", "明天呢"));
+        assertEquals("hello world", TranscriptMerger.appendSegment("hello", " world"));
+    }
+
+    @Test
+    void ignoresEmptyParts() {
+        assertEquals("明天呢", TranscriptMerger.appendSegment(null, "明天呢"));
+        assertEquals("明天呢", TranscriptMerger.appendSegment(" ", "明天呢"));
+        assertEquals("今天", TranscriptMerger.appendSegment("今天", ""));
+        assertNull(TranscriptMerger.appendSegment(null, null));
+    }
+
+    @Test
+    void mergeHandlesCumulativeAndIncrementalChunks() {
+        assertEquals("今天天气", TranscriptMerger.merge("今天", "今天天气"));
+        assertEquals("今天天气", TranscriptMerger.merge("今天天气", "今天"));
+        assertEquals("今天天气", TranscriptMerger.merge("今天", "天气"));
+        assertEquals("今天", TranscriptMerger.merge("今天", null));
+    }
+}
@@ -0,0 +1,126 @@
+package com.miaomiao.assistant.websocket.service.pipeline;
+
+import com.miaomiao.assistant.codec.WavCodec;
+import org.junit.jupiter.api.Test;
+
+import java.io.ByteArrayOutputStream;
+import java.nio.ByteBuffer;
+import java.nio.ByteOrder;
+import java.util.Arrays;
+import java.util.List;
+
+import static org.junit.jupiter.api.Assertions.assertArrayEquals;
+import static org.junit.jupiter.api.Assertions.assertEquals;
+import static org.junit.jupiter.api.Assertions.assertNotNull;
+import static org.junit.jupiter.api.Assertions.assertSame;
+import static org.junit.jupiter.api.Assertions.assertTrue;
+
+/**
+ * 长录音切分测试（16kHz 单声道合成 WAV，每毫秒 32 字节）
+ */
+class AudioSegmenterTest {
+
+    private static final int SAMPLE_RATE = 16000;
+    private static final int BYTES_PER_MS = SAMPLE_RATE * 2 / 1000;
+
+    @Test
+    void shortAudioIsNotSplit() {
+        byte[] wav = WavCodec.toWav(tone(1200), SAMPLE_RATE, 1);
+        List<byte[]> segments = AudioSegmenter.split(new AudioSegmenter.Config(1000, 200, 100, 20), wav);
+        assertEquals(1, segments.size());
+        assertSame(wav, segments.get(0));
+    }
+
+    @Test
+    void splitsAudioJustOverSegmentPlusSearch() {
+        AudioSegmenter.Config config = new AudioSegmenter.Config(1000, 200, 100, 20);
+        // 比 segment + search 多一个采样
+        byte[] pcm = Arrays.copyOf(tone(1200), 1200 * BYTES_PER_MS + 2);
+
+        List<byte[]> segments = AudioSegmenter.split(config, WavCodec.toWav(pcm, SAMPLE_RATE, 1));
+
+        assertEquals(2, segments.size());
+        assertContiguousWithOverlap(pcm, segments, config.overlapMs());
+    }
+
+    @Test
+    void searchRangeWiderThanSegmentKeepsSegmentsLong() {
+        // searchMs >= segmentMs 时搜索下限曾早于本段起点，产生空段或负长度数组；
+        // 只限制在上一切点之后时，平稳音频上又会每隔一个窗口切一刀
+        AudioSegmenter.Config config = new AudioSegmenter.Config(1000, 1500, 100, 20);
+        byte[] pcm = tone(6000);
+
+        List<byte[]> segments = AudioSegmenter.split(config, WavCodec.toWav(pcm, SAMPLE_RATE, 1));
+
+        assertTrue(segments.size() >= 2, "segments " + segments.size());
+        for (int i = 0; i < segments.size() - 1; i++) {
+            int newBytes = pcmOf(segments.get(i)).length - (i == 0 ? 0 : config.overlapMs() * BYTES_PER_MS);
+            assertTrue(newBytes >= config.segmentMs() / 2 * BYTES_PER_MS, "segment " + i + " new bytes " + newBytes);
+        }
+        assertContiguousWithOverlap(pcm, segments, config.overlapMs());
+    }
+
+    @Test
+    void segmentsOverlapByOverlapMsAndCoverTheWholeRecording() {
+        AudioSegmenter.Config config = new AudioSegmenter.Config(1000, 300, 200, 20);
+        byte[] pcm = tone(5500);
+
+        List<byte[]> segments = AudioSegmenter.split(config, WavCodec.toWav(pcm, SAMPLE_RATE, 1));
+
+        assertTrue(segments.size() >= 4, "segments " + segments.size());
+        assertContiguousWithOverlap(pcm, segments, config.overlapMs());
+    }
+
+    @Test
+    void cutLandsOnTheQuietWindow() {
+        AudioSegmenter.Config config = new AudioSegmenter.Config(1000, 300, 0, 20);
+        byte[] pcm = tone(3000);
+        // 1100 - 1200ms 静音，在第一个切点的搜索范围（700 - 1300ms）内
+        Arrays.fill(pcm, 1100 * BYTES_PER_MS, 1200 * BYTES_PER_MS, (byte) 0);
+
+        List<byte[]> segments = AudioSegmenter.split(config, WavCodec.toWav(pcm, SAMPLE_RATE, 1));
+
+        int firstCut = pcmOf(segments.get(0)).length;
+        assertTrue(firstCut >= 1100 * BYTES_PER_MS && firstCut <= 1200 * BYTES_PER_MS, "cut at " + firstCut);
+        assertContiguousWithOverlap(pcm, segments, config.overlapMs());
+    }
+
+    /**
+     * 每段都比重叠部分长；后一段开头的 overlapMs 与前一段结尾相同，去掉重叠后拼回原始 PCM
+     */
+    private static void assertContiguousWithOverlap(byte[] pcm, List<byte[]> segments, int overlapMs) {
+        int overlapBytes = overlapMs * BYTES_PER_MS;
+        ByteArrayOutputStream rebuilt = new ByteArrayOutputStream();
+        byte[] previous = null;
+        for (byte[] wav : segments) {
+            byte[] data = pcmOf(wav);
+            if (previous == null) {
+                rebuilt.write(data, 0, data.length);
+            } else {
+                assertTrue(data.length > overlapBytes, "segment shorter than overlap: " + data.length);
+                assertArrayEquals(Arrays.copyOfRange(previous, previous.length - overlapBytes, previous.length),
+                        Arrays.copyOfRange(data, 0, overlapBytes));
+                rebuilt.write(data, overlapBytes, data.length - overlapBytes);
+            }
+            previous = data;
+        }
+        assertArrayEquals(pcm, rebuilt.toByteArray());
+    }
+
+    private static byte[] pcmOf(byte[] wav) {
+        WavCodec.WavInfo info = WavCodec.parse(wav);
+        assertNotNull(info);
+        return Arrays.copyOfRange(wav, info.dataOffset(), info.dataOffset() + info.dataLength());
+    }
+
+    /**
+     * 440Hz、幅度 8000 的正弦波（各能量窗口都不为 0）
+     */
+    private static byte[] tone(int durationMs) {
+        ByteBuffer buffer = ByteBuffer.allocate(durationMs * BYTES_PER_MS).order(ByteOrder.LITTLE_ENDIAN);
+        for (int i = 0; i < durationMs * SAMPLE_RATE / 1000; i++) {
+            buffer.putShort((short) Math.round(8000 * Math.sin(2 * Math.PI * 440 * i / SAMPLE_RATE)));
+        }
+        return buffer.array();
+    }
+}
@@ -0,0 +1,103 @@
+package com.miaomiao.assistant.websocket.service.pipeline;
+
+import org.junit.jupiter.api.Test;
+
+import java.io.ByteArrayOutputStream;
+import java.nio.ByteBuffer;
+import java.nio.ByteOrder;
+import java.util.Arrays;
+
+import static org.junit.jupiter.api.Assertions.assertArrayEquals;
+import static org.junit.jupiter.api.Assertions.assertEquals;
+
+/**
+ * TTS PCM 首尾静音裁剪测试（16kHz 单声道，每毫秒 32 字节，窗口 10ms）
+ * <p>
+ * 重点是 finish() 对最后不足一个窗口部分的处理：含语音时不能被当成尾部静音截掉。
+ */
+class PcmSilenceTrimmerTest {
+
+    private static final int SAMPLE_RATE = 16000;
+    private static final int BYTES_PER_MS = SAMPLE_RATE * 2 / 1000;
+
+    /**
+     * 阈值 -45dBFS，首段保留 30ms，尾段保留 60ms
+     */
+    private static final PcmSilenceTrimmer.Config CONFIG = new PcmSilenceTrimmer.Config(true, -45, 10, 30, 60, 0);
+
+    @Test
+    void keepsSpeechInTheLastPartialWindow() {
+        // 语音之后 200ms 静音（超过尾段保留），最后 5ms 又是语音
+        byte[] pcm = concat(tone(100, 8000), new byte[200 * BYTES_PER_MS], tone(5, 8000));
+
+        assertArrayEquals(pcm, trim(pcm));
+    }
+
+    @Test
+    void keepsSegmentShorterThanOneWindow() {
+        byte[] speech = tone(5, 8000);
+        assertArrayEquals(speech, trim(speech));
+
+        // 前面的静音只保留 30ms
+        byte[] pcm = concat(new byte[100 * BYTES_PER_MS], speech);
+        assertArrayEquals(Arrays.copyOfRange(pcm, 70 * BYTES_PER_MS, pcm.length), trim(pcm));
+    }
+
+    @Test
+    void quietPartialWindowIsTrimmedAsTrailingSilence() {
+        // 幅度 50（约 -56dBFS）低于阈值
+        byte[] pcm = concat(tone(100, 8000), new byte[200 * BYTES_PER_MS], tone(5, 50));
+
+        assertArrayEquals(Arrays.copyOf(pcm, 160 * BYTES_PER_MS), trim(pcm));
+    }
+
+    @Test
+    void dropsAllSilentSegment() {
+        assertEquals(0, trim(concat(new byte[100 * BYTES_PER_MS], tone(5, 50))).length);
+    }
+
+    @Test
+    void trimsLeadingAndTrailingSilenceAcrossChunkBoundaries() {
+        byte[] speech = tone(100, 8000);
+        byte[] pcm = concat(new byte[100 * BYTES_PER_MS], speech, new byte[200 * BYTES_PER_MS]);
+
+        // 块长度为奇数，会在采样中间断开
+        PcmSilenceTrimmer trimmer = new PcmSilenceTrimmer(CONFIG, SAMPLE_RATE);
+        ByteArrayOutputStream out = new ByteArrayOutputStream();
+        for (int offset = 0; offset < pcm.length; offset += 333) {
+            out.writeBytes(trimmer.process(Arrays.copyOfRange(pcm, offset, Math.min(pcm.length, offset + 333))));
+        }
+        out.writeBytes(trimmer.finish());
+
+        assertArrayEquals(Arrays.copyOfRange(pcm, 70 * BYTES_PER_MS, 260 * BYTES_PER_MS), out.toByteArray());
+        assertEquals(pcm.length - out.size(), trimmer.getTrimmedBytes());
+    }
+
+    private static byte[] trim(byte[] pcm) {
+        PcmSilenceTrimmer trimmer = new PcmSilenceTrimmer(CONFIG, SAMPLE_RATE);
+        ByteArrayOutputStream out = new ByteArrayOutputStream();
+        out.writeBytes(trimmer.process(pcm));
+        out.writeBytes(trimmer.finish());
+        assertEquals(pcm.length - out.size(), trimmer.getTrimmedBytes());
+        return out.toByteArray();
+    }
+
+    private static byte[] concat(byte[]... parts) {
+        ByteArrayOutputStream out = new ByteArrayOutputStream();
+        for (byte[] part : parts) {
+            out.writeBytes(part);
+        }
+        return out.toByteArray();
+    }
+
+    /**
+     * 440Hz 正弦波
+     */
+    private static byte[] tone(int durationMs, int amplitude) {
+        ByteBuffer buffer = ByteBuffer.allocate(durationMs * BYTES_PER_MS).order(ByteOrder.LITTLE_ENDIAN);
+        for (int i = 0; i < durationMs * SAMPLE_RATE / 1000; i++) {
+            buffer.putShort((short) Math.round(amplitude * Math.sin(2 * Math.PI * 440 * i / SAMPLE_RATE)));
+        }
+        return buffer.array();
+    }
+}